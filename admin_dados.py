@@ -5,48 +5,399 @@ ADMIN_DADOS.PY - Script de Administração do dados.json
 Atualiza preços, descrições, disponibilidade e outros dados do site
 """
 
+import argparse
+import csv
 import json
 import sys
 import os
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from dados_consulta import Consulta, ErroConsulta, parse_consulta
+from dados_delta import ler_indice, publicar_delta
+from dados_io import escrever_atomico, hash_bytes, hash_conteudo, serializar
+from dados_journal import (CHECKPOINT_A_CADA, JOURNAL_FILE, ErroJournal, Journal, agrupar,
+                           sobreposicao)
+from dados_schema import VALIDADOR, ErroValidacao, imprimir_erros
+from dados_shards import exportar_colecao_stream, exportar_shards, ler_manifest
+from dados_sqlite import CatalogSQLite, conectar, importar_json
+from dados_stream import iterar_colecao, ler_chave, reescrever
 
 # Caminho do arquivo dados.json
 DADOS_FILE = os.path.join(os.path.dirname(__file__), 'dados.json')
 
+# Coleções indexadas por id e campos com índice secundário
+COLECOES_INDEXADAS = ('servicos', 'workshops', 'produtos')
+CAMPOS_INDEXADOS = ('categoria', 'disponivel', 'destaque', 'stock')
+
+# Coleções aceites pelo modo de atualização em lote
+COLECOES_LOTE = COLECOES_INDEXADAS + ('configuracoes',)
+
+# Registros por página nas listagens interativas
+TAMANHO_PAGINA = 20
+
+# Saída compacta (produção) em vez de indentada; ativada com --compact ou DADOS_COMPACTO=1
+SAIDA_COMPACTA = os.environ.get('DADOS_COMPACTO') == '1'
+
+# Último estado conhecido do arquivo em disco: (hash do conteúdo, hash dos bytes)
+_estado_arquivo: Dict[str, Tuple[str, str]] = {}
+
+def _ler_estado(conteudo: bytes) -> Tuple[Dict[str, Any], Tuple[str, str]]:
+    """Interpreta os bytes do arquivo e calcula os hashes de conteúdo e de bytes"""
+    dados = json.loads(conteudo.decode('utf-8'))
+    return dados, (hash_conteudo(dados), hash_bytes(conteudo))
+
+def publicar(dados: Dict[str, Any], shards: bool = False):
+    """Atualiza os shards e o feed de alterações que já tenham sido publicados"""
+    # Shards por coleção: só os que mudaram são reescritos
+    if shards or ler_manifest() is not None:
+        exportar_shards(dados)
+    # Feed de JSON Patch entre versões (dados_delta.py)
+    if ler_indice() is not None:
+        publicar_delta(dados)
+
 def carregar_dados() -> Dict[str, Any]:
     """Carrega o arquivo dados.json"""
     try:
-        with open(DADOS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(DADOS_FILE, 'rb') as f:
+            dados, estado = _ler_estado(f.read())
     except FileNotFoundError:
         print(f"❌ Erro: Arquivo {DADOS_FILE} não encontrado!")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         print(f"❌ Erro ao ler JSON: {e}")
         sys.exit(1)
+    _estado_arquivo[DADOS_FILE] = estado
+    return dados
+
+def salvar_dados(dados: Dict[str, Any], compacto: Optional[bool] = None,
+                 validar: bool = True) -> bool:
+    """
+    Salva os dados no arquivo dados.json
+
+    A escrita é atômica (temp + fsync + rename). Se o conteúdo não mudou
+    desde a leitura, nada é escrito e lastUpdate não avança; se só o formato
+    mudou (indentado ↔ compacto), o arquivo é reescrito sem mexer no timestamp.
+    Um documento inválido (dados_schema.py) não é gravado; `validar=False`
+    é para quem já o mantém validado (Catalog).
 
-def salvar_dados(dados: Dict[str, Any]):
-    """Salva os dados no arquivo dados.json"""
+    Returns:
+        True se o arquivo foi escrito
+    """
+    if validar:
+        erros = VALIDADOR.validar(dados)
+        if erros:
+            imprimir_erros(erros, "Dados inválidos - nada foi salvo")
+            return False
+    if compacto is None:
+        compacto = SAIDA_COMPACTA
     try:
-        # Atualiza timestamp e versão
-        dados['lastUpdate'] = datetime.now().isoformat()
+        estado = _estado_arquivo.get(DADOS_FILE)
+        if estado is None and os.path.exists(DADOS_FILE):
+            with open(DADOS_FILE, 'rb') as f:
+                _, estado = _ler_estado(f.read())
+
+        conteudo_igual = estado is not None and hash_conteudo(dados) == estado[0]
+        if conteudo_igual:
+            conteudo = serializar(dados, compacto)
+            if hash_bytes(conteudo) == estado[1]:
+                print("ℹ️ Nenhuma alteração - dados.json mantido")
+                return False
+        else:
+            # Atualiza timestamp e versão
+            dados['lastUpdate'] = datetime.now().isoformat()
+            conteudo = serializar(dados, compacto)
         
-        # Salva com indentação para legibilidade
-        with open(DADOS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, indent=2, ensure_ascii=False)
+        escrever_atomico(DADOS_FILE, conteudo)
+        _estado_arquivo[DADOS_FILE] = (hash_conteudo(dados), hash_bytes(conteudo))
         
         print(f"✅ Dados salvos com sucesso em {DADOS_FILE}")
         print(f"📅 Última atualização: {dados['lastUpdate']}")
+
+        publicar(dados)
+        return True
     except Exception as e:
         print(f"❌ Erro ao salvar: {e}")
         sys.exit(1)
 
+# =============================================
+# CATÁLOGO INDEXADO EM MEMÓRIA
+# =============================================
+
+class Catalog:
+    """
+    Camada indexada sobre o dados.json carregado
+
+    Mantém, para cada coleção, um dict id -> registro (lookup O(1)) e
+    índices secundários campo -> valor -> ids, atualizados a cada alteração.
+    Os registros são os mesmos objetos de `dados`, que continua a ser o
+    documento salvo por salvar_dados.
+
+    Com `usar_journal`, salvar() só acrescenta as alterações ao journal e o
+    dados.json é reescrito no checkpoint (compactar).
+
+    Cada atualização é validada contra o schema antes de ser aplicada, por
+    isso salvar() só precisa de verificar as referências entre coleções.
+    """
+
+    def __init__(self, dados: Dict[str, Any], journal: Optional[Journal] = None,
+                 usar_journal: bool = False):
+        self.dados = dados
+        self.journal = journal
+        self.usar_journal = usar_journal and journal is not None
+        self._nao_registradas: List[Tuple[str, str, List[Tuple[str, Any, Any]]]] = []
+        self._por_id: Dict[str, Dict[str, Dict]] = {}
+        self._posicao: Dict[str, Dict[str, int]] = {}
+        self._indices: Dict[str, Dict[str, Dict[Any, Dict[str, None]]]] = {}
+        for colecao in COLECOES_INDEXADAS:
+            self._indexar(colecao)
+
+    def _indexar(self, colecao: str):
+        """(Re)constrói os índices de uma coleção"""
+        por_id = {}
+        posicao = {}
+        indices = {campo: {} for campo in CAMPOS_INDEXADOS}
+        for i, registro in enumerate(self.dados.get(colecao, [])):
+            registro_id = registro.get('id')
+            # Mantém o primeiro registro em caso de id duplicado (como o next() antigo)
+            if registro_id is None or registro_id in por_id:
+                continue
+            por_id[registro_id] = registro
+            posicao[registro_id] = i
+            for campo in CAMPOS_INDEXADOS:
+                self._adicionar_indice(indices[campo], registro, campo, registro_id)
+        self._por_id[colecao] = por_id
+        self._posicao[colecao] = posicao
+        self._indices[colecao] = indices
+
+    @staticmethod
+    def _adicionar_indice(indice: Dict, registro: Dict, campo: str, registro_id: str):
+        if campo not in registro:
+            return
+        try:
+            indice.setdefault(registro[campo], {})[registro_id] = None
+        except TypeError:
+            pass  # valor não hashable (lista, dict): fica fora do índice
+
+    @staticmethod
+    def _remover_indice(indice: Dict, registro: Dict, campo: str, registro_id: str):
+        if campo not in registro:
+            return
+        try:
+            ids = indice.get(registro[campo])
+        except TypeError:
+            return
+        if ids is not None:
+            ids.pop(registro_id, None)
+            if not ids:
+                del indice[registro[campo]]
+
+    def colecao(self, colecao: str) -> List[Dict]:
+        """Lista completa de uma coleção, na ordem do arquivo"""
+        return self.dados.get(colecao, [])
+
+    def obter(self, colecao: str, registro_id: str) -> Optional[Dict]:
+        """Obtém um registro pelo id em O(1)"""
+        return self._por_id.get(colecao, {}).get(registro_id)
+
+    def filtrar(self, colecao: str, **filtros) -> List[Dict]:
+        """
+        Lista os registros cujos campos indexados têm os valores pedidos
+
+        Só percorre os ids do menor índice envolvido; sem filtros devolve
+        a coleção completa. Os resultados mantêm a ordem do arquivo.
+        """
+        if not filtros:
+            return self.colecao(colecao)
+
+        indices = self._indices.get(colecao, {})
+        conjuntos = []
+        for campo, valor in filtros.items():
+            if campo not in indices:
+                raise KeyError(f"Campo '{campo}' não é indexado em '{colecao}'")
+            conjuntos.append(indices[campo].get(valor, {}))
+
+        conjuntos.sort(key=len)
+        menor, outros = conjuntos[0], conjuntos[1:]
+        ids = [i for i in menor if all(i in outro for outro in outros)]
+        posicao = self._posicao[colecao]
+        ids.sort(key=posicao.__getitem__)
+        por_id = self._por_id[colecao]
+        return [por_id[i] for i in ids]
+
+    def consultar(self, colecao: str, consulta: Consulta) -> Iterator[Dict]:
+        """
+        Executa uma consulta (dados_consulta.py) sobre uma coleção
+
+        As igualdades em campos indexados reduzem os candidatos pelos
+        índices; o resto da consulta é avaliado registro a registro.
+        """
+        igualdades = consulta.igualdades(self._indices.get(colecao, {}))
+        return consulta.executar(self.filtrar(colecao, **igualdades))
+
+    def atualizar(self, colecao: str, registro_id: str,
+                  **kwargs) -> Optional[List[Tuple[str, Any, Any]]]:
+        """
+        Atualiza campos existentes de um registro e mantém os índices
+
+        Returns:
+            Lista de (campo, valor_antigo, valor_novo) ou None se o id não existir
+
+        Raises:
+            ErroValidacao: algum valor não respeita o schema (nada é alterado)
+        """
+        registro = self.obter(colecao, registro_id)
+        if registro is None:
+            return None
+
+        campos = {campo: valor for campo, valor in kwargs.items() if campo in registro}
+        erros = VALIDADOR.validar_campos(colecao, registro, campos)
+        novo_id = campos.get('id', registro_id)
+        if novo_id != registro_id and novo_id in self._por_id[colecao]:
+            erros.append(f"id '{novo_id}' já existe em {colecao}")
+        if erros:
+            raise ErroValidacao(erros)
+
+        indices = self._indices[colecao]
+        alteracoes = []
+        for campo, valor in campos.items():
+            old_value = registro[campo]
+            if campo in indices:
+                self._remover_indice(indices[campo], registro, campo, registro_id)
+            registro[campo] = valor
+            if campo in indices:
+                self._adicionar_indice(indices[campo], registro, campo, registro_id)
+            alteracoes.append((campo, old_value, valor))
+        if novo_id != registro_id:
+            self._renomear(colecao, registro, registro_id, novo_id)
+        if self.usar_journal and alteracoes:
+            self._nao_registradas.append((colecao, registro_id, alteracoes))
+        return alteracoes
+
+    def _renomear(self, colecao: str, registro: Dict, antigo: str, novo: str):
+        """Passa as entradas do registro nos índices do id antigo para o novo"""
+        por_id = self._por_id[colecao]
+        posicao = self._posicao[colecao]
+        del por_id[antigo]
+        por_id[novo] = registro
+        posicao[novo] = posicao.pop(antigo)
+        for campo, indice in self._indices[colecao].items():
+            self._remover_indice(indice, registro, campo, antigo)
+            self._adicionar_indice(indice, registro, campo, novo)
+
+    def atualizar_config(self, secao: str,
+                         **kwargs) -> Optional[List[Tuple[str, Any, Any]]]:
+        """Atualiza campos existentes de uma seção de configuracoes"""
+        config = self.dados.get('configuracoes', {})
+        if not isinstance(config.get(secao), dict):
+            return None
+
+        alteracoes = []
+        for campo, valor in kwargs.items():
+            if campo in config[secao]:
+                old_value = config[secao][campo]
+                config[secao][campo] = valor
+                alteracoes.append((campo, old_value, valor))
+        if self.usar_journal and alteracoes:
+            self._nao_registradas.append(('configuracoes', secao, alteracoes))
+        return alteracoes
+
+    def config(self) -> Dict[str, Any]:
+        """Seções de configuracoes"""
+        return self.dados.get('configuracoes', {})
+
+    def salvar(self) -> bool:
+        """
+        Grava as alterações
+
+        Sem journal grava o dados.json (só se o conteúdo mudou). Com journal
+        acrescenta as alterações pendentes numa única escrita e só compacta
+        quando o journal passa de CHECKPOINT_A_CADA entradas.
+        """
+        erros = VALIDADOR.validar_referencias(self.dados)
+        if erros:
+            imprimir_erros(erros, "Referências inválidas - nada foi salvo")
+            return False
+        if not self.usar_journal:
+            return self.compactar()
+
+        self.journal.registrar(self._nao_registradas)
+        self._nao_registradas = []
+        if self.journal.pendentes < CHECKPOINT_A_CADA:
+            print(f"📒 Alterações registradas no journal ({self.journal.pendentes} pendentes; "
+                  f"o dados.json é reescrito no compact)")
+            return True
+        return self.compactar()
+
+    def compactar(self) -> bool:
+        """Checkpoint: grava o snapshot completo e esvazia o journal"""
+        escrito = salvar_dados(self.dados, validar=False)
+        if self.journal is not None:
+            self.journal.checkpoint()
+        self._nao_registradas = []
+        return escrito
+
+    def descartar(self):
+        """Esquece as alterações ainda não gravadas no journal"""
+        self._nao_registradas = []
+
+def carregar_catalogo(usar_journal: bool = False) -> Catalog:
+    """
+    Carrega o último snapshot (dados.json) e reaplica o journal por cima
+
+    Um campo cujo valor atual não é nem o antigo nem o novo da entrada foi
+    alterado fora do admin_dados.py; a entrada é aplicada na mesma, com aviso.
+    O documento é validado por inteiro uma vez, aqui.
+    """
+    journal = Journal(JOURNAL_FILE)
+    try:
+        entradas = journal.ler()
+    except ErroJournal as e:
+        print(f"❌ Journal corrompido: {e}")
+        sys.exit(1)
+    dados = carregar_dados()
+    # Erros já existentes no arquivo: avisa, mas deixa corrigi-los pelo admin
+    erros = VALIDADOR.validar(dados)
+    if erros:
+        imprimir_erros(erros, f"{DADOS_FILE} não respeita o schema")
+    catalogo = Catalog(dados, journal, usar_journal)
+    if not entradas:
+        return catalogo
+
+    usar, catalogo.usar_journal = catalogo.usar_journal, False
+    for colecao, registro_id, novos, antigos in agrupar(entradas):
+        if colecao == 'configuracoes':
+            registro = catalogo.config().get(registro_id)
+        else:
+            registro = catalogo.obter(colecao, registro_id)
+        if not isinstance(registro, dict):
+            print(f"⚠️ Journal: '{registro_id}' não existe em {colecao}, entrada ignorada")
+            continue
+        for campo, novo in novos.items():
+            if campo in registro and registro[campo] not in (antigos[campo], novo):
+                print(f"⚠️ Journal: {colecao}/{registro_id}.{campo} foi alterado fora do journal "
+                      f"({registro[campo]!r}); aplicando {novo!r}")
+        if colecao == 'configuracoes':
+            catalogo.atualizar_config(registro_id, **novos)
+        else:
+            try:
+                catalogo.atualizar(colecao, registro_id, **novos)
+            except ErroValidacao as e:
+                print(f"⚠️ Journal: {colecao}/{registro_id} ignorado ({e})")
+    catalogo.usar_journal = usar
+    print(f"📒 {len(entradas)} alterações do journal reaplicadas")
+    return catalogo
+
 # =============================================
 # FUNÇÕES DE ATUALIZAÇÃO - SERVIÇOS
 # =============================================
 
-def atualizar_servico(dados: Dict, servico_id: str, **kwargs):
+def _imprimir_alteracoes(alteracoes: List[Tuple[str, Any, Any]], prefixo: str = ''):
+    """Mostra as alterações campo a campo"""
+    for campo, old_value, valor in alteracoes:
+        print(f"  📝 {prefixo}{campo}: {old_value} → {valor}")
+
+def atualizar_servico(catalogo: Catalog, servico_id: str, **kwargs):
     """
     Atualiza um serviço existente
     
@@ -54,114 +405,119 @@ def atualizar_servico(dados: Dict, servico_id: str, **kwargs):
         servico_id: ID do serviço (makeup-noiva, makeup-social, etc)
         kwargs: Campos a atualizar (nome, descricao, preco, disponivel)
     """
-    servicos = dados.get('servicos', [])
-    servico = next((s for s in servicos if s['id'] == servico_id), None)
+    try:
+        alteracoes = catalogo.atualizar('servicos', servico_id, **kwargs)
+    except ErroValidacao as e:
+        imprimir_erros(e.erros, "Atualização rejeitada")
+        return False
     
-    if not servico:
+    if alteracoes is None:
         print(f"❌ Serviço '{servico_id}' não encontrado!")
         return False
     
-    # Atualiza campos fornecidos
-    for campo, valor in kwargs.items():
-        if campo in servico:
-            old_value = servico[campo]
-            servico[campo] = valor
-            print(f"  📝 {campo}: {old_value} → {valor}")
+    _imprimir_alteracoes(alteracoes)
     
+    # Com id=... nas alterações o registro passou a ter o id novo
+    servico = catalogo.obter('servicos', kwargs.get('id', servico_id))
     print(f"✅ Serviço '{servico['titulo']}' atualizado!")
     return True
 
-def listar_servicos(dados: Dict):
-    """Lista todos os serviços"""
-    servicos = dados.get('servicos', [])
-    print(f"\n📋 SERVIÇOS ({len(servicos)} encontrados):")
-    print("-" * 80)
-    for s in servicos:
-        status = "✅ Disponível" if s.get('disponivel') else "❌ Indisponível"
-        print(f"ID: {s['id']}")
-        print(f"  Título: {s['titulo']}")
-        print(f"  Preço: €{s['preco']}")
-        print(f"  Duração: {s['duracao']}")
-        print(f"  Status: {status}")
-        print()
+def listar_servicos(catalogo: Catalog, consulta: Optional[Consulta] = None):
+    """Lista os serviços (opcionalmente filtrados por uma consulta)"""
+    listar(catalogo, 'servicos', consulta)
+
+
+def mostrar_servico(s: Dict):
+    """Mostra um serviço"""
+    status = "✅ Disponível" if s.get('disponivel') else "❌ Indisponível"
+    print(f"ID: {s['id']}")
+    print(f"  Título: {s['titulo']}")
+    print(f"  Preço: €{s['preco']}")
+    print(f"  Duração: {s['duracao']}")
+    print(f"  Status: {status}")
+    print()
 
 # =============================================
 # FUNÇÕES DE ATUALIZAÇÃO - WORKSHOPS
 # =============================================
 
-def atualizar_workshop(dados: Dict, workshop_id: str, **kwargs):
+def atualizar_workshop(catalogo: Catalog, workshop_id: str, **kwargs):
     """Atualiza um workshop existente"""
-    workshops = dados.get('workshops', [])
-    workshop = next((w for w in workshops if w['id'] == workshop_id), None)
+    try:
+        alteracoes = catalogo.atualizar('workshops', workshop_id, **kwargs)
+    except ErroValidacao as e:
+        imprimir_erros(e.erros, "Atualização rejeitada")
+        return False
     
-    if not workshop:
+    if alteracoes is None:
         print(f"❌ Workshop '{workshop_id}' não encontrado!")
         return False
     
-    for campo, valor in kwargs.items():
-        if campo in workshop:
-            old_value = workshop[campo]
-            workshop[campo] = valor
-            print(f"  📝 {campo}: {old_value} → {valor}")
+    _imprimir_alteracoes(alteracoes)
     
+    # Com id=... nas alterações o registro passou a ter o id novo
+    workshop = catalogo.obter('workshops', kwargs.get('id', workshop_id))
     print(f"✅ Workshop '{workshop['titulo']}' atualizado!")
     return True
 
-def listar_workshops(dados: Dict):
-    """Lista todos os workshops"""
-    workshops = dados.get('workshops', [])
-    print(f"\n📚 WORKSHOPS ({len(workshops)} encontrados):")
-    print("-" * 80)
-    for w in workshops:
-        status = "✅ Disponível" if w.get('disponivel') else "❌ Indisponível"
-        print(f"ID: {w['id']}")
-        print(f"  Título: {w['titulo']}")
-        print(f"  Preço: €{w['preco']}")
-        print(f"  Vagas: {w.get('vagas', 'N/A')}")
-        print(f"  Status: {status}")
-        print()
+def listar_workshops(catalogo: Catalog, consulta: Optional[Consulta] = None):
+    """Lista os workshops (opcionalmente filtrados por uma consulta)"""
+    listar(catalogo, 'workshops', consulta)
+
+
+def mostrar_workshop(w: Dict):
+    """Mostra um workshop"""
+    status = "✅ Disponível" if w.get('disponivel') else "❌ Indisponível"
+    print(f"ID: {w['id']}")
+    print(f"  Título: {w['titulo']}")
+    print(f"  Preço: €{w['preco']}")
+    print(f"  Vagas: {w.get('vagas', 'N/A')}")
+    print(f"  Status: {status}")
+    print()
 
 # =============================================
 # FUNÇÕES DE ATUALIZAÇÃO - PRODUTOS
 # =============================================
 
-def atualizar_produto(dados: Dict, produto_id: str, **kwargs):
+def atualizar_produto(catalogo: Catalog, produto_id: str, **kwargs):
     """Atualiza um produto existente"""
-    produtos = dados.get('produtos', [])
-    produto = next((p for p in produtos if p['id'] == produto_id), None)
+    try:
+        alteracoes = catalogo.atualizar('produtos', produto_id, **kwargs)
+    except ErroValidacao as e:
+        imprimir_erros(e.erros, "Atualização rejeitada")
+        return False
     
-    if not produto:
+    if alteracoes is None:
         print(f"❌ Produto '{produto_id}' não encontrado!")
         return False
     
-    for campo, valor in kwargs.items():
-        if campo in produto:
-            old_value = produto[campo]
-            produto[campo] = valor
-            print(f"  📝 {campo}: {old_value} → {valor}")
+    _imprimir_alteracoes(alteracoes)
     
+    # Com id=... nas alterações o registro passou a ter o id novo
+    produto = catalogo.obter('produtos', kwargs.get('id', produto_id))
     print(f"✅ Produto '{produto['nome']}' atualizado!")
     return True
 
-def listar_produtos(dados: Dict):
-    """Lista todos os produtos"""
-    produtos = dados.get('produtos', [])
-    print(f"\n🛍️ PRODUTOS ({len(produtos)} encontrados):")
-    print("-" * 80)
-    for p in produtos:
-        status = "✅ Em estoque" if p.get('stock', 0) > 0 else "❌ Sem estoque"
-        print(f"ID: {p['id']}")
-        print(f"  Nome: {p['nome']}")
-        print(f"  Preço: €{p['preco']}")
-        print(f"  Estoque: {p.get('stock', 0)} unidades")
-        print(f"  Status: {status}")
-        print()
+def listar_produtos(catalogo: Catalog, consulta: Optional[Consulta] = None):
+    """Lista os produtos (opcionalmente filtrados por uma consulta)"""
+    listar(catalogo, 'produtos', consulta)
+
+
+def mostrar_produto(p: Dict):
+    """Mostra um produto"""
+    status = "✅ Em estoque" if (p.get('stock') or 0) > 0 else "❌ Sem estoque"
+    print(f"ID: {p['id']}")
+    print(f"  Nome: {p['nome']}")
+    print(f"  Preço: €{p['preco']}")
+    print(f"  Estoque: {p.get('stock', 0)} unidades")
+    print(f"  Status: {status}")
+    print()
 
 # =============================================
 # FUNÇÕES DE ATUALIZAÇÃO - CONFIGURAÇÕES
 # =============================================
 
-def atualizar_config(dados: Dict, secao: str, **kwargs):
+def atualizar_config(catalogo: Catalog, secao: str, **kwargs):
     """
     Atualiza configurações do site
     
@@ -169,24 +525,20 @@ def atualizar_config(dados: Dict, secao: str, **kwargs):
         secao: site, delivery, payment
         kwargs: Campos a atualizar
     """
-    config = dados.get('configuracoes', {})
+    alteracoes = catalogo.atualizar_config(secao, **kwargs)
     
-    if secao not in config:
+    if alteracoes is None:
         print(f"❌ Seção '{secao}' não encontrada!")
         return False
     
-    for campo, valor in kwargs.items():
-        if campo in config[secao]:
-            old_value = config[secao][campo]
-            config[secao][campo] = valor
-            print(f"  📝 {secao}.{campo}: {old_value} → {valor}")
+    _imprimir_alteracoes(alteracoes, prefixo=f"{secao}.")
     
     print(f"✅ Configuração '{secao}' atualizada!")
     return True
 
-def listar_config(dados: Dict):
+def listar_config(catalogo: Catalog):
     """Lista todas as configurações"""
-    config = dados.get('configuracoes', {})
+    config = catalogo.config()
     print(f"\n⚙️ CONFIGURAÇÕES:")
     print("-" * 80)
     
@@ -206,10 +558,99 @@ def listar_config(dados: Dict):
         print(f"  PIX: {config['payment'].get('pix', 'N/A')}")
     print()
 
+# =============================================
+# CONSULTAS E LISTAGENS
+# =============================================
+
+# Título e função de exibição de cada coleção listável
+LISTAGENS = {
+    'servicos': ("📋 SERVIÇOS", mostrar_servico),
+    'workshops': ("📚 WORKSHOPS", mostrar_workshop),
+    'produtos': ("🛍️ PRODUTOS", mostrar_produto),
+}
+
+def paginar(registros: Iterable[Dict], mostrar, tamanho: int = TAMANHO_PAGINA) -> int:
+    """
+    Mostra os registros à medida que chegam, parando a cada página
+
+    Num terminal pergunta se continua depois de cada `tamanho` registros;
+    com a saída redirecionada mostra tudo. Devolve quantos foram mostrados.
+    """
+    interativo = sys.stdin.isatty() and sys.stdout.isatty()
+    total = 0
+    for registro in registros:
+        if interativo and total and total % tamanho == 0:
+            resposta = input(f"-- {total} mostrados: ENTER para mais, q para parar -- ")
+            if resposta.strip().lower() == 'q':
+                break
+        mostrar(registro)
+        total += 1
+    return total
+
+def escrever_json(registros: Iterable[Dict]) -> int:
+    """Escreve os registros como um array JSON, um de cada vez (para scripts)"""
+    total = 0
+    sys.stdout.write('[')
+    for registro in registros:
+        sys.stdout.write(('\n' if total == 0 else ',\n') + json.dumps(registro, ensure_ascii=False))
+        total += 1
+    sys.stdout.write('\n]\n' if total else ']\n')
+    return total
+
+def mostrar_listagem(colecao: str, registros: Iterable[Dict], como_json: bool = False) -> int:
+    """Lista registros de uma coleção (paginados ou em JSON)"""
+    if como_json:
+        return escrever_json(registros)
+    titulo, mostrar = LISTAGENS[colecao]
+    print(f"\n{titulo}:")
+    print("-" * 80)
+    total = paginar(registros, mostrar)
+    print(f"({total} mostrados)")
+    return total
+
+def listar(catalogo: Catalog, colecao: str, consulta: Optional[Consulta] = None,
+           como_json: bool = False) -> int:
+    """Lista uma coleção do catálogo carregado"""
+    return mostrar_listagem(colecao, catalogo.consultar(colecao, consulta or Consulta()), como_json)
+
+def menu_listar(catalogo: Catalog, colecao: str):
+    """Menu de listagem com consulta opcional"""
+    print("\nConsulta: campo=valor campo<valor campo~texto palavras sort=-campo limit=N offset=N")
+    print("Exemplo: categoria=Base stock<5 sort=-preco")
+    entrada = input("\n🔎 Consulta (ENTER = todos): ").strip()
+    try:
+        consulta = parse_consulta(entrada.split(), converter_valor)
+    except ErroConsulta as e:
+        print(f"❌ {e}")
+        return
+    listar(catalogo, colecao, consulta)
+
 # =============================================
 # MENU INTERATIVO
 # =============================================
 
+def converter_valor(valor: str) -> Any:
+    """Converte o texto digitado para bool/int/float (como nos menus)"""
+    if valor.lower() == 'true':
+        return True
+    if valor.lower() == 'false':
+        return False
+    if valor.replace('.', '').isdigit():
+        try:
+            return float(valor) if '.' in valor else int(valor)
+        except ValueError:
+            pass  # "1.2.3": fica como texto
+    return valor
+
+def parse_atualizacoes(entrada: str) -> Dict[str, Any]:
+    """Converte 'campo=valor campo2=valor2' em kwargs tipados"""
+    kwargs = {}
+    for item in entrada.split():
+        if '=' in item:
+            campo, valor = item.split('=', 1)
+            kwargs[campo] = converter_valor(valor)
+    return kwargs
+
 def menu_principal():
     """Menu principal do administrador"""
     print("\n" + "="*80)
@@ -228,9 +669,9 @@ def menu_principal():
     
     return input("Escolha uma opção: ").strip()
 
-def menu_atualizar_servico(dados: Dict):
+def menu_atualizar_servico(catalogo: Catalog):
     """Menu para atualizar serviço"""
-    listar_servicos(dados)
+    listar_servicos(catalogo)
     servico_id = input("\n📝 ID do serviço a atualizar: ").strip()
     
     print("\nCampos disponíveis: titulo, descricao, preco, duracao, disponivel")
@@ -240,117 +681,552 @@ def menu_atualizar_servico(dados: Dict):
     entrada = input("\n✏️ Atualizações: ").strip()
     
     # Parse entrada
-    kwargs = {}
-    for item in entrada.split():
-        if '=' in item:
-            campo, valor = item.split('=', 1)
-            # Converte tipos
-            if valor.lower() == 'true':
-                valor = True
-            elif valor.lower() == 'false':
-                valor = False
-            elif valor.replace('.', '').isdigit():
-                valor = float(valor) if '.' in valor else int(valor)
-            kwargs[campo] = valor
-    
-    if atualizar_servico(dados, servico_id, **kwargs):
-        salvar_dados(dados)
-
-def menu_atualizar_workshop(dados: Dict):
+    kwargs = parse_atualizacoes(entrada)
+    
+    if atualizar_servico(catalogo, servico_id, **kwargs):
+        catalogo.salvar()
+
+def menu_atualizar_workshop(catalogo: Catalog):
     """Menu para atualizar workshop"""
-    listar_workshops(dados)
+    listar_workshops(catalogo)
     workshop_id = input("\n📝 ID do workshop a atualizar: ").strip()
     
     print("\nCampos disponíveis: titulo, descricao, preco, vagas, disponivel")
     entrada = input("\n✏️ Atualizações (campo=valor): ").strip()
     
-    kwargs = {}
-    for item in entrada.split():
-        if '=' in item:
-            campo, valor = item.split('=', 1)
-            if valor.lower() == 'true':
-                valor = True
-            elif valor.lower() == 'false':
-                valor = False
-            elif valor.replace('.', '').isdigit():
-                valor = float(valor) if '.' in valor else int(valor)
-            kwargs[campo] = valor
-    
-    if atualizar_workshop(dados, workshop_id, **kwargs):
-        salvar_dados(dados)
-
-def menu_atualizar_produto(dados: Dict):
+    kwargs = parse_atualizacoes(entrada)
+    
+    if atualizar_workshop(catalogo, workshop_id, **kwargs):
+        catalogo.salvar()
+
+def menu_atualizar_produto(catalogo: Catalog):
     """Menu para atualizar produto"""
-    listar_produtos(dados)
+    listar_produtos(catalogo)
     produto_id = input("\n📝 ID do produto a atualizar: ").strip()
     
     print("\nCampos disponíveis: nome, descricao, preco, stock")
     entrada = input("\n✏️ Atualizações (campo=valor): ").strip()
     
-    kwargs = {}
-    for item in entrada.split():
-        if '=' in item:
-            campo, valor = item.split('=', 1)
-            if valor.lower() == 'true':
-                valor = True
-            elif valor.lower() == 'false':
-                valor = False
-            elif valor.replace('.', '').isdigit():
-                valor = float(valor) if '.' in valor else int(valor)
-            kwargs[campo] = valor
-    
-    if atualizar_produto(dados, produto_id, **kwargs):
-        salvar_dados(dados)
-
-def menu_atualizar_config(dados: Dict):
+    kwargs = parse_atualizacoes(entrada)
+    
+    if atualizar_produto(catalogo, produto_id, **kwargs):
+        catalogo.salvar()
+
+def menu_atualizar_config(catalogo: Catalog):
     """Menu para atualizar configurações"""
-    listar_config(dados)
+    listar_config(catalogo)
     secao = input("\n📝 Seção (site/delivery/payment): ").strip()
     
     entrada = input("\n✏️ Atualizações (campo=valor): ").strip()
     
-    kwargs = {}
-    for item in entrada.split():
-        if '=' in item:
-            campo, valor = item.split('=', 1)
-            if valor.lower() == 'true':
-                valor = True
-            elif valor.lower() == 'false':
-                valor = False
-            elif valor.replace('.', '').isdigit():
-                valor = float(valor) if '.' in valor else int(valor)
-            kwargs[campo] = valor
+    kwargs = parse_atualizacoes(entrada)
     
-    if atualizar_config(dados, secao, **kwargs):
-        salvar_dados(dados)
+    if atualizar_config(catalogo, secao, **kwargs):
+        catalogo.salvar()
+
+# =============================================
+# MODO STREAM (ARQUIVOS GRANDES)
+# =============================================
+
+class _SemAlteracoes(Exception):
+    """Interrompe uma reescrita em stream que não alterou nada"""
+
+def listar_stream(colecao: str, consulta: Optional[Consulta] = None,
+                  como_json: bool = False) -> int:
+    """
+    Lista uma coleção lendo o dados.json em stream
+
+    Só um registro de cada vez fica em memória (mais os offset+limit
+    primeiros, se houver ordenação); as outras coleções não são
+    construídas. Devolve o número de registros mostrados.
+    """
+    pendentes = sobreposicao(Journal(JOURNAL_FILE).ler(), colecao)
+
+    def registros():
+        for registro in iterar_colecao(DADOS_FILE, colecao):
+            # Alterações ainda só no journal
+            registro.update(pendentes.get(registro.get('id'), {}))
+            yield registro
+
+    return mostrar_listagem(colecao, (consulta or Consulta()).executar(registros()), como_json)
+
+def atualizar_stream(colecao: str, registro_id: str, **kwargs) -> bool:
+    """
+    Atualiza um registro reescrevendo só a sua coleção em stream
+
+    O resto do dados.json é copiado byte a byte. Se nada mudar, a escrita
+    temporária é descartada e o arquivo (e o lastUpdate) fica como estava.
+    """
+    if Journal(JOURNAL_FILE).ler():
+        print("❌ O journal tem alterações pendentes; execute `admin_dados.py compact` primeiro")
+        return False
+
+    alteracoes = []
+    encontrado = False
+
+    def transformar(registros):
+        nonlocal encontrado
+        for registro in registros:
+            if not encontrado and registro.get('id') == registro_id:
+                encontrado = True
+                campos = {c: v for c, v in kwargs.items() if c in registro}
+                erros = VALIDADOR.validar_campos(colecao, registro, campos)
+                if erros:
+                    raise ErroValidacao(erros)
+                for campo, valor in kwargs.items():
+                    if campo in registro and registro[campo] != valor:
+                        alteracoes.append((campo, registro[campo], valor))
+                        registro[campo] = valor
+            yield registro
+        if not alteracoes:
+            raise _SemAlteracoes()
+
+    try:
+        reescrever(DADOS_FILE, {colecao: transformar,
+                                'lastUpdate': datetime.now().isoformat()})
+    except _SemAlteracoes:
+        if not encontrado:
+            print(f"❌ '{registro_id}' não encontrado em {colecao}!")
+            return False
+        print("ℹ️ Nenhuma alteração - dados.json mantido")
+        return True
+    except ErroValidacao as e:
+        imprimir_erros(e.erros, "Atualização rejeitada")
+        return False
+
+    _estado_arquivo.pop(DADOS_FILE, None)
+    _imprimir_alteracoes(alteracoes)
+    print(f"✅ '{registro_id}' atualizado em {DADOS_FILE}")
+    exportar_colecao_stream(DADOS_FILE, colecao)
+    if ler_indice() is not None:
+        print("ℹ️ O feed de alterações não é atualizado em stream; execute `python dados_delta.py`")
+    return True
+
+def comando_compact(args: argparse.Namespace) -> int:
+    """Executa `admin_dados.py compact`: incorpora o journal num novo snapshot"""
+    catalogo = carregar_catalogo()
+    pendentes = catalogo.journal.pendentes
+    catalogo.compactar()
+    print(f"📒 Journal compactado ({pendentes} entradas incorporadas)")
+    return 0
+
+def comando_listar(args: argparse.Namespace) -> int:
+    """Executa `admin_dados.py listar COLECAO [consulta ...] [--json]`"""
+    try:
+        consulta = parse_consulta(args.consulta, converter_valor)
+    except ErroConsulta as e:
+        print(f"❌ {e}")
+        return 2
+    if not args.db:
+        listar_stream(args.colecao, consulta, args.json)
+        return 0
+    listar(abrir_catalogo(args), args.colecao, consulta, args.json)
+    return 0
+
+def comando_atualizar(args: argparse.Namespace) -> int:
+    """Executa `admin_dados.py atualizar COLECAO ID campo=valor ...`"""
+    kwargs = parse_atualizacoes(' '.join(args.campos))
+    if not args.db:
+        return 0 if atualizar_stream(args.colecao, args.id, **kwargs) else 1
+
+    catalogo = abrir_catalogo(args)
+    try:
+        alteracoes = catalogo.atualizar(args.colecao, args.id, **kwargs)
+    except ErroValidacao as e:
+        imprimir_erros(e.erros, "Atualização rejeitada")
+        return 1
+    if alteracoes is None:
+        print(f"❌ '{args.id}' não encontrado em {args.colecao}!")
+        return 1
+    _imprimir_alteracoes(alteracoes)
+    catalogo.salvar()
+    return 0
+
+# =============================================
+# BACKEND SQLITE
+# =============================================
+
+def abrir_catalogo(args: argparse.Namespace):
+    """Catálogo sobre a base SQLite (--db) ou sobre o dados.json + journal"""
+    if args.db:
+        if not os.path.exists(args.db):
+            print(f"❌ Base {args.db} não encontrada! Crie com: admin_dados.py --db {args.db} import")
+            sys.exit(1)
+        return CatalogSQLite(args.db)
+    return carregar_catalogo(usar_journal=args.journal)
+
+def comando_import(args: argparse.Namespace) -> int:
+    """Executa `admin_dados.py --db BASE import`: dados.json -> SQLite"""
+    dados = carregar_dados()
+    conn = conectar(args.db)
+    try:
+        importar_json(conn, dados)
+    except ValueError as e:
+        print(f"❌ Erro ao importar: {e}")
+        return 1
+    finally:
+        conn.close()
+    print(f"✅ {DADOS_FILE} importado para {args.db}")
+    return 0
+
+def comando_export(args: argparse.Namespace) -> int:
+    """
+    Executa `admin_dados.py --db BASE export`: SQLite -> dados.json (e shards)
+
+    O lastUpdate vem da base; o arquivo só é reescrito se os bytes mudarem.
+    """
+    catalogo = abrir_catalogo(args)
+    dados = catalogo.documento()
+    erros = VALIDADOR.validar(dados)
+    if erros:
+        imprimir_erros(erros, f"{args.db} não respeita o schema - nada foi exportado")
+        return 1
+    conteudo = serializar(dados, SAIDA_COMPACTA)
+
+    atual = None
+    if os.path.exists(DADOS_FILE):
+        with open(DADOS_FILE, 'rb') as f:
+            atual = hash_bytes(f.read())
+    if atual == hash_bytes(conteudo):
+        print(f"ℹ️ Nenhuma alteração - {DADOS_FILE} mantido")
+    else:
+        escrever_atomico(DADOS_FILE, conteudo)
+        _estado_arquivo.pop(DADOS_FILE, None)
+        print(f"✅ {args.db} exportado para {DADOS_FILE}")
+
+    publicar(dados, shards=args.shards)
+    return 0
+
+# =============================================
+# ATUALIZAÇÃO EM LOTE (NÃO INTERATIVA)
+# =============================================
+
+def ler_atualizacoes(caminho: str, formato: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Lê o arquivo de atualizações linha a linha
+
+    Yields:
+        (linha, patch, erro) - patch é None quando a linha não pôde ser lida
+    """
+    with open(caminho, 'r', encoding='utf-8', newline='') as f:
+        if formato == 'csv':
+            for linha, row in enumerate(csv.DictReader(f), start=2):
+                # Células vazias não alteram o campo
+                yield linha, {k: v for k, v in row.items() if k and v not in (None, '')}, None
+            return
+
+        for linha, texto in enumerate(f, start=1):
+            texto = texto.strip()
+            if not texto:
+                continue
+            try:
+                patch = json.loads(texto)
+            except json.JSONDecodeError as e:
+                yield linha, None, f"JSON inválido: {e}"
+                continue
+            if not isinstance(patch, dict):
+                yield linha, None, "cada linha deve ser um objeto JSON"
+                continue
+            yield linha, patch, None
+
+def _separar_patch(patch: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Separa um patch em (colecao, id ou secao, campos já convertidos)
+
+    Raises:
+        ValueError: coleção inválida, sem chave ou sem campos
+    """
+    patch = dict(patch)
+    colecao = patch.pop('colecao', None)
+    if colecao not in COLECOES_LOTE:
+        raise ValueError(f"coleção inválida: {colecao!r}")
+
+    chave_nome = 'secao' if colecao == 'configuracoes' else 'id'
+    chave = patch.pop(chave_nome, None)
+    patch.pop('secao' if chave_nome == 'id' else 'id', None)
+    if not chave:
+        raise ValueError(f"falta '{chave_nome}'")
+
+    campos = {c: converter_valor(v) if isinstance(v, str) else v for c, v in patch.items()}
+    if not campos:
+        raise ValueError("nenhum campo para atualizar")
+    return colecao, chave, campos
+
+def aplicar_atualizacao(catalogo: Catalog, patch: Dict[str, Any]) -> int:
+    """
+    Aplica um patch {"colecao", "id" | "secao", campo: valor, ...}
+
+    Os valores em texto passam pela mesma conversão dos menus. O patch é
+    rejeitado inteiro (ValueError) se o registro ou algum campo não existir.
+
+    Returns:
+        Número de campos alterados
+    """
+    colecao, chave, campos = _separar_patch(patch)
+    if colecao == 'configuracoes':
+        registro = catalogo.config().get(chave)
+        registro = registro if isinstance(registro, dict) else None
+    else:
+        registro = catalogo.obter(colecao, chave)
+    if registro is None:
+        raise ValueError(f"'{chave}' não encontrado em {colecao}")
+
+    desconhecidos = [c for c in campos if c not in registro]
+    if desconhecidos:
+        raise ValueError(f"campos inexistentes: {', '.join(desconhecidos)}")
+
+    if colecao == 'configuracoes':
+        return len(catalogo.atualizar_config(chave, **campos))
+    return len(catalogo.atualizar(colecao, chave, **campos))
+
+def aplicar_lote(catalogo: Catalog, caminho: str,
+                 formato: str = 'jsonl') -> Tuple[int, int, List[Tuple[int, str]]]:
+    """
+    Aplica todas as atualizações do arquivo sobre o catálogo (sem salvar)
+
+    Returns:
+        (aplicadas, falhas, erros)
+    """
+    aplicadas = falhas = 0
+    erros = []
+    for linha, patch, erro in ler_atualizacoes(caminho, formato):
+        if erro is None:
+            try:
+                aplicar_atualizacao(catalogo, patch)
+                aplicadas += 1
+                continue
+            except ValueError as e:
+                erro = str(e)
+        falhas += 1
+        erros.append((linha, erro))
+    return aplicadas, falhas, erros
+
+def _aplicar_campos(colecao: str, registro: Dict[str, Any], campos: Dict[str, Any]) -> int:
+    """Valida e aplica os campos de um patch num registro lido em stream"""
+    desconhecidos = [c for c in campos if c not in registro]
+    if desconhecidos:
+        raise ValueError(f"campos inexistentes: {', '.join(desconhecidos)}")
+    if colecao != 'configuracoes':
+        erros = VALIDADOR.validar_campos(colecao, registro, campos)
+        if erros:
+            raise ErroValidacao(erros)
+    alterados = 0
+    for campo, valor in campos.items():
+        # 10 -> 10.0 também é alteração (o JSON muda)
+        if type(registro[campo]) is not type(valor) or registro[campo] != valor:
+            registro[campo] = valor
+            alterados += 1
+    return alterados
+
+def aplicar_lote_stream(caminho: str, formato: str = 'jsonl',
+                        gravar: bool = True) -> Tuple[int, int, List[Tuple[int, str]]]:
+    """
+    Aplica as atualizações do arquivo sobre o dados.json em stream
+
+    O catálogo não é carregado: os patches são agrupados por registro (só
+    eles ficam em memória) e as coleções são reescritas numa única passagem
+    com dados_stream.reescrever, que copia o resto do arquivo byte a byte.
+    Mudar o id não é suportado neste modo (verificar que o novo id é único
+    exigiria a coleção inteira). Sem alterações (ou com gravar=False) o
+    dados.json fica como estava.
+
+    Returns:
+        (aplicadas, falhas, erros) - erros ordenados por linha
+    """
+    erros = []
+    pendentes: Dict[str, Dict[str, List[Tuple[int, Dict[str, Any]]]]] = {}
+    for linha, patch, erro in ler_atualizacoes(caminho, formato):
+        if erro is None:
+            try:
+                colecao, chave, campos = _separar_patch(patch)
+                if colecao != 'configuracoes' and 'id' in campos:
+                    raise ValueError("mudar o id não é suportado com --stream")
+                pendentes.setdefault(colecao, {}).setdefault(chave, []).append((linha, campos))
+                continue
+            except ValueError as e:
+                erro = str(e)
+        erros.append((linha, erro))
+
+    aplicadas = 0
+    alteradas = set()
+
+    def aplicar(colecao: str, registro: Dict[str, Any], patches):
+        nonlocal aplicadas
+        for linha, campos in patches:
+            try:
+                if _aplicar_campos(colecao, registro, campos):
+                    alteradas.add(colecao)
+                aplicadas += 1
+            except ValueError as e:
+                erros.append((linha, str(e)))
+
+    def transformacao(colecao: str):
+        por_id = pendentes[colecao]
+
+        def transformar(registros):
+            for registro in registros:
+                aplicar(colecao, registro, por_id.pop(registro.get('id'), ()))
+                yield registro
+        return transformar
+
+    substituicoes = {c: transformacao(c) for c in pendentes if c != 'configuracoes'}
+    if 'configuracoes' in pendentes:
+        config = ler_chave(DADOS_FILE, 'configuracoes', {})
+        for secao in list(pendentes['configuracoes']):
+            if isinstance(config.get(secao), dict):
+                aplicar('configuracoes', config[secao], pendentes['configuracoes'].pop(secao))
+        substituicoes['configuracoes'] = config
+
+    if substituicoes:
+        substituicoes['lastUpdate'] = datetime.now().isoformat()
+        # Escreve ao lado e só substitui o dados.json no fim, se algo mudou
+        temporario = DADOS_FILE + '.apply.tmp'
+        try:
+            reescrever(DADOS_FILE, substituicoes, destino=temporario)
+            if gravar and alteradas:
+                os.replace(temporario, DADOS_FILE)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    for colecao, por_chave in pendentes.items():
+        for chave, patches in por_chave.items():
+            erros.extend((linha, f"'{chave}' não encontrado em {colecao}") for linha, _ in patches)
+    erros.sort(key=lambda erro: erro[0])
+
+    if gravar and alteradas:
+        _estado_arquivo.pop(DADOS_FILE, None)
+        print(f"✅ {DADOS_FILE} reescrito em stream ({', '.join(sorted(alteradas))})")
+        for colecao in sorted(alteradas):
+            exportar_colecao_stream(DADOS_FILE, colecao)
+        if ler_indice() is not None:
+            print("ℹ️ O feed de alterações não é atualizado em stream; execute `python dados_delta.py`")
+    return aplicadas, len(erros), erros
+
+def comando_apply(args: argparse.Namespace) -> int:
+    """Executa `admin_dados.py apply`: carrega uma vez, aplica tudo, salva uma vez"""
+    formato = 'csv' if args.csv or args.arquivo.lower().endswith('.csv') else 'jsonl'
+    if args.stream:
+        if args.db:
+            print("❌ --stream reescreve o dados.json; não pode ser usado com --db")
+            return 2
+        if Journal(JOURNAL_FILE).ler():
+            print("❌ O journal tem alterações pendentes; execute `admin_dados.py compact` primeiro")
+            return 1
+        catalogo = None
+    else:
+        catalogo = abrir_catalogo(args)
+
+    print(f"📦 A aplicar atualizações de {args.arquivo} ({formato})...")
+    try:
+        if catalogo is None:
+            aplicadas, falhas, erros = aplicar_lote_stream(args.arquivo, formato,
+                                                           gravar=not args.dry_run)
+        else:
+            aplicadas, falhas, erros = aplicar_lote(catalogo, args.arquivo, formato)
+    except OSError as e:
+        print(f"❌ Erro ao ler {args.arquivo}: {e}")
+        return 1
+
+    for linha, erro in erros:
+        print(f"  ❌ Linha {linha}: {erro}")
+    print(f"\n✅ {aplicadas} atualizações aplicadas, ❌ {falhas} falhas")
+
+    if catalogo is None:
+        if args.dry_run:
+            print("ℹ️ Dry-run: nada foi salvo")
+    elif aplicadas and not args.dry_run:
+        catalogo.salvar()
+    elif args.dry_run:
+        catalogo.descartar()
+        print("ℹ️ Dry-run: nada foi salvo")
+    return 1 if falhas else 0
 
 # =============================================
 # MAIN
 # =============================================
 
-def main():
+def criar_parser() -> argparse.ArgumentParser:
+    """Argumentos de linha de comando (sem comando abre o menu interativo)"""
+    parser = argparse.ArgumentParser(description="Administração do dados.json")
+    parser.add_argument('--compact', action='store_true',
+                        help="Salva o dados.json em JSON compacto (build de produção)")
+    parser.add_argument('--db', default=os.environ.get('DADOS_DB'),
+                        help="Usa uma base SQLite em vez do dados.json (ou DADOS_DB)")
+    parser.add_argument('--journal', action='store_true',
+                        default=os.environ.get('DADOS_JOURNAL') == '1',
+                        help="Regista as alterações no dados.journal em vez de reescrever "
+                             "o dados.json (ou DADOS_JOURNAL=1)")
+    sub = parser.add_subparsers(dest='comando')
+
+    apply = sub.add_parser('apply', help="Aplica atualizações em lote (JSONL ou CSV)")
+    apply.add_argument('arquivo', help="Arquivo .jsonl (um patch por linha) ou .csv")
+    apply.add_argument('--csv', action='store_true', help="Força leitura como CSV")
+    apply.add_argument('--stream', action='store_true',
+                       help="Aplica sobre o dados.json em stream, sem carregar o catálogo")
+    apply.add_argument('--dry-run', action='store_true', help="Valida e aplica sem salvar")
+    apply.set_defaults(func=comando_apply)
+
+    listar = sub.add_parser('listar', help="Lista uma coleção em stream (memória constante)")
+    listar.add_argument('colecao', choices=sorted(LISTAGENS))
+    listar.add_argument('consulta', nargs='*',
+                        help="Filtros campo=valor, campo<valor, campo~texto, palavras soltas, "
+                             "sort=-campo, limit=N, offset=N")
+    listar.add_argument('--json', action='store_true', help="Saída em JSON (para scripts)")
+    listar.set_defaults(func=comando_listar)
+
+    atualizar = sub.add_parser('atualizar',
+                               help="Atualiza um registro reescrevendo só a sua coleção")
+    atualizar.add_argument('colecao', choices=COLECOES_INDEXADAS)
+    atualizar.add_argument('id')
+    atualizar.add_argument('campos', nargs='+', help="Atualizações campo=valor")
+    atualizar.set_defaults(func=comando_atualizar)
+
+    compact = sub.add_parser('compact', help="Incorpora o journal num novo dados.json")
+    compact.set_defaults(func=comando_compact)
+
+    importar = sub.add_parser('import', help="Cria/substitui a base SQLite (--db) a partir do dados.json")
+    importar.set_defaults(func=comando_import, requer_db=True)
+
+    exportar = sub.add_parser('export', help="Regenera o dados.json a partir da base SQLite (--db)")
+    exportar.add_argument('--shards', action='store_true',
+                          help="Gera também os shards por coleção (dados/manifest.json)")
+    exportar.set_defaults(func=comando_export, requer_db=True)
+    return parser
+
+def main(argv: Optional[List[str]] = None):
     """Função principal"""
-    dados = carregar_dados()
+    global SAIDA_COMPACTA
+    args = criar_parser().parse_args(argv)
+    if args.compact:
+        SAIDA_COMPACTA = True
+    if getattr(args, 'requer_db', False) and not args.db:
+        print(f"❌ O comando '{args.comando}' precisa de --db CAMINHO")
+        sys.exit(2)
+    if args.comando:
+        sys.exit(args.func(args))
+
+    catalogo = abrir_catalogo(args)
     
     while True:
         opcao = menu_principal()
         
         if opcao == '1':
-            listar_servicos(dados)
+            menu_listar(catalogo, 'servicos')
         elif opcao == '2':
-            menu_atualizar_servico(dados)
+            menu_atualizar_servico(catalogo)
         elif opcao == '3':
-            listar_workshops(dados)
+            menu_listar(catalogo, 'workshops')
         elif opcao == '4':
-            menu_atualizar_workshop(dados)
+            menu_atualizar_workshop(catalogo)
         elif opcao == '5':
-            listar_produtos(dados)
+            menu_listar(catalogo, 'produtos')
         elif opcao == '6':
-            menu_atualizar_produto(dados)
+            menu_atualizar_produto(catalogo)
         elif opcao == '7':
-            listar_config(dados)
+            listar_config(catalogo)
         elif opcao == '8':
-            menu_atualizar_config(dados)
+            menu_atualizar_config(catalogo)
         elif opcao == '9':
             print("\n👋 Até breve!")
             break
@@ -0,0 +1,838 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BUILD_SITE.PY - Build incremental do site estático
+Monta as páginas de src/ a partir dos partials partilhados (src/partials/),
+gera as páginas do catálogo (prerender), aplica as regras de caminhos e
+duplicados do rewrite_html, troca os scripts e estilos comuns pelos pacotes
+com hash (bundle_assets), põe inline o CSS crítico (critical_css), minifica
+o HTML, troca as <img> por <picture> com as variantes das imagens
+(optimize_images) e grava tudo em dist/ com os arquivos estáticos. O grafo
+de dependências (página -> partials -> chaves do dados.json) fica no
+.build-cache.json: alterar um partial ou um produto reconstrói só as
+páginas que os usam
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from bundle_assets import Gerado, Tamanhos, empacotar, gerar_todos, recursos
+from compress_assets import comprimir, totais as totais_compressao
+from critical_css import ORCAMENTO, Folhas, Scripts, inserir as inserir_critico
+from dados_io import escrever_atomico, hash_bytes
+from optimize_images import chave as chave_imagens, otimizar, responsivas
+from precache_manifest import ErroPrecache, gerar as gerar_sw
+from prerender import Molde, Pagina, chaves as chaves_catalogo, planear, preencher
+from prune_assets import ESTILOS, SCRIPTS, Poda, analisar as analisar_poda
+from rewrite_html import Reescritor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BASE_DIR, 'src')
+PARTIALS_DIR = os.path.join(SRC_DIR, 'partials')
+DIST_DIR = os.path.join(BASE_DIR, 'dist')
+DADOS_FILE = os.path.join(BASE_DIR, 'dados.json')
+CACHE_FILE = os.path.join(BASE_DIR, '.build-cache.json')
+
+# Copiados tal como estão para dist/ (diretórios inteiros ou arquivos)
+ESTATICOS = ('css', 'js', 'assets', 'images', 'dados', 'dados.json', 'manifest.json',
+             'robots.txt', '403.html', '404.html', '500.html', '.htaccess')
+IGNORAR_ESTATICOS = ('.backup', '.tmp')
+
+# Abaixo disto não compensa arrancar processos
+MIN_PARALELO = 32
+
+def _versao() -> str:
+    """Muda quando o código do build (ou as regras do rewrite_html) muda"""
+    partes = []
+    for modulo in ('build_site.py', 'bundle_assets.py', 'compress_assets.py', 'critical_css.py',
+                   'optimize_images.py', 'precache_manifest.py', 'prerender.py', 'prune_assets.py', 'rewrite_html.py'):
+        with open(os.path.join(BASE_DIR, modulo), 'rb') as f:
+            partes.append(f.read())
+    return hash_bytes(b'\0'.join(partes))[:16]
+
+VERSAO_BUILD = _versao()
+
+class ErroBuild(Exception):
+    """Partial em falta, include circular ou valor desconhecido"""
+
+# =============================================
+# TEMPLATES
+# =============================================
+
+# <!-- include: rodape.html titulo="..." --> sozinho numa linha (a indentação
+# da linha é aplicada ao partial inteiro)
+_RE_INCLUDE = re.compile(r'^([ \t]*)<!--\s*include:\s*([\w./-]+)((?:\s+[\w-]+="[^"]*")*)\s*-->[ \t]*$', re.M)
+_RE_PARAMETRO = re.compile(r'([\w-]+)="([^"]*)"')
+# {{ titulo }} (parâmetro do include) ou {{ site.nome }} (caminho no dados.json)
+_RE_VALOR = re.compile(r'\{\{\s*([\w.-]+)\s*\}\}')
+
+def _procurar(dados: Any, chave: str, indices: Optional[Dict[int, Dict]] = None) -> Any:
+    """
+    Valor de um caminho no dados.json; nas listas a parte é a posição ou o
+    id do item (produtos.produto-1). Com `indices`, cada lista é indexada
+    por id uma vez só
+    """
+    valor = dados
+    for parte in chave.split('.'):
+        if isinstance(valor, dict) and parte in valor:
+            valor = valor[parte]
+        elif isinstance(valor, list) and parte.isdigit() and int(parte) < len(valor):
+            valor = valor[int(parte)]
+        elif isinstance(valor, list):
+            if indices is None:
+                por_id = {str(i.get('id')): i for i in valor if isinstance(i, dict)}
+            else:
+                por_id = indices.get(id(valor))
+                if por_id is None:
+                    por_id = indices[id(valor)] = {str(i.get('id')): i for i in valor if isinstance(i, dict)}
+            if parte not in por_id:
+                raise KeyError(chave)
+            valor = por_id[parte]
+        else:
+            raise KeyError(chave)
+    return valor
+
+def hash_valor(valor: Any) -> str:
+    return hash_bytes(json.dumps(valor, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+
+class Dados:
+    """dados.json lido só quando algum template precisa de um valor"""
+
+    def __init__(self, caminho: str = DADOS_FILE):
+        self.caminho = caminho
+        self._dados = None
+        self._indices: Dict[int, Dict] = {}
+
+    def conteudo(self) -> Dict:
+        if self._dados is None:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                self._dados = json.load(f)
+        return self._dados
+
+    def valor(self, chave: str) -> Any:
+        return _procurar(self.conteudo(), chave, self._indices)
+
+
+class Montador:
+    """
+    Expande includes e valores de uma página, registando do que ela depende
+
+    Os valores de um template são substituídos antes de expandir os includes
+    dele (um parâmetro pode passar um valor a um partial); os valores vindos
+    do dados.json são escapados, os parâmetros entram tal como estão.
+    """
+
+    def __init__(self, partials_dir: str = PARTIALS_DIR, dados: Optional[Dados] = None):
+        self.partials_dir = partials_dir
+        self.dados = dados or Dados()
+        self._partials: Dict[str, str] = {}
+
+    def _partial(self, nome: str) -> str:
+        if nome not in self._partials:
+            try:
+                with open(os.path.join(self.partials_dir, nome), 'r', encoding='utf-8') as f:
+                    self._partials[nome] = f.read()
+            except FileNotFoundError:
+                raise ErroBuild(f"partial não encontrado: {nome}") from None
+        return self._partials[nome]
+
+    def montar(self, texto: str, origem: str) -> Tuple[str, Set[str], Set[str]]:
+        """(texto montado, partials usados, chaves do dados.json usadas)"""
+        partials: Set[str] = set()
+        chaves: Set[str] = set()
+        return self._expandir(texto, {}, [origem], partials, chaves), partials, chaves
+
+    def _expandir(self, texto: str, parametros: Dict[str, str], pilha: List[str],
+                  partials: Set[str], chaves: Set[str]) -> str:
+        def valor(m):
+            nome = m.group(1)
+            if nome in parametros:
+                return parametros[nome]
+            try:
+                resultado = self.dados.valor(nome)
+            except (KeyError, OSError, ValueError):
+                raise ErroBuild(f"{pilha[-1]}: valor desconhecido {{{{ {nome} }}}}") from None
+            chaves.add(nome)
+            return html.escape(str(resultado), quote=True)
+
+        def incluir(m):
+            recuo, nome, atributos = m.groups()
+            if nome in pilha:
+                raise ErroBuild(f"include circular: {' -> '.join(pilha + [nome])}")
+            partials.add(nome)
+            filhos = dict(parametros, **dict(_RE_PARAMETRO.findall(atributos)))
+            conteudo = self._expandir(self._partial(nome), filhos, pilha + [nome], partials, chaves)
+            return '\n'.join(recuo + linha if linha.strip() else ''
+                             for linha in conteudo.rstrip('\n').split('\n'))
+
+        texto = _RE_VALOR.sub(valor, texto)
+        return _RE_INCLUDE.sub(incluir, texto)
+
+# =============================================
+# MINIFICAÇÃO
+# =============================================
+
+# Tags cujo conteúdo não se toca, comentários, tags (aspas podem ter ">"), texto
+_RE_TOKEN = re.compile(
+    r'''<(script|style|pre|textarea)\b(?:[^>"']|"[^"]*"|'[^']*')*>.*?</\1\s*>'''
+    r'''|<!--.*?-->'''
+    r'''|<[!/]?[a-zA-Z](?:[^>"']|"[^"]*"|'[^']*')*>'''
+    r'''|[^<]+|<''', re.S | re.I)
+_RE_NOME_TAG = re.compile(r'<[!/]?([a-zA-Z][\w-]*)')
+_RE_ABERTURA = re.compile(r'''<\w+(?:[^>"']|"[^"]*"|'[^']*')*>''')
+_RE_DENTRO_TAG = re.compile(r'''("[^"]*"|'[^']*')|\s*=\s*|\s+''')
+
+# À volta destas tags os espaços não aparecem na página
+BLOCOS = frozenset('''
+    doctype html head body title meta link script style noscript base
+    header footer main nav section article aside div p ul ol li dl dt dd
+    h1 h2 h3 h4 h5 h6 form fieldset legend table thead tbody tfoot tr td th
+    caption figure figcaption blockquote hr br pre textarea select option
+    template dialog details summary iframe video audio source picture
+'''.split())
+
+def _tag_bloco(token: str) -> bool:
+    if token.startswith('<!--'):
+        return True
+    m = _RE_NOME_TAG.match(token)
+    return bool(m) and m.group(1).lower() in BLOCOS
+
+def _compactar_tag(tag: str) -> str:
+    """Espaços dentro de uma tag (fora das aspas) reduzidos a um, sem espaços à volta do ="""
+    compacta = _RE_DENTRO_TAG.sub(lambda m: m.group(1) or ('=' if '=' in m.group() else ' '), tag)
+    return re.sub(r'\s*(/?>)$', r'\1', compacta)
+
+def _minificar_tag(token: str) -> str:
+    m = _RE_NOME_TAG.match(token)
+    nome = m.group(1).lower() if m else ''
+    if token.startswith('</') or nome not in ('script', 'style', 'pre', 'textarea'):
+        return _compactar_tag(token)
+    abertura = _RE_ABERTURA.match(token).group()
+    fecho = token.rindex('</')
+    conteudo = token[len(abertura):fecho]
+    if nome in ('script', 'style'):
+        conteudo = conteudo.strip()
+    return _compactar_tag(abertura) + conteudo + token[fecho:]
+
+def minificar_html(texto: str) -> str:
+    """
+    Remove comentários (menos os condicionais) e espaços que não contam
+
+    Sequências de espaços no texto ficam num só espaço, e desaparecem junto a
+    tags de bloco. O conteúdo de <pre> e <textarea> fica igual; o de <script>
+    e <style> só perde os espaços das pontas.
+    """
+    # Sem os comentários que vão sair, o vizinho de cada texto é o token ao lado
+    tokens = [m.group() for m in _RE_TOKEN.finditer(texto)
+              if not m.group().startswith('<!--') or m.group().startswith('<!--[if')]
+    saida = []
+    anterior = ''
+    for i, token in enumerate(tokens):
+        if token.startswith('<') and len(token) > 1:
+            saida.append(_minificar_tag(token))
+        else:
+            seguinte = tokens[i + 1] if i + 1 < len(tokens) else ''
+            compacto = re.sub(r'\s+', ' ', token)
+            if not anterior or _tag_bloco(anterior):
+                compacto = compacto.lstrip()
+            if not seguinte or _tag_bloco(seguinte):
+                compacto = compacto.rstrip()
+            if compacto:
+                saida.append(compacto)
+        anterior = token
+    return ''.join(saida)
+
+# =============================================
+# BUILD
+# =============================================
+
+def paginas(src_dir: str = SRC_DIR) -> List[str]:
+    """Templates das páginas (os .html de src/, sem os partials)"""
+    return sorted(n for n in os.listdir(src_dir) if n.endswith('.html') and not n.startswith('.'))
+
+def _hash_arquivo(caminho: str) -> str:
+    with open(caminho, 'rb') as f:
+        return hash_bytes(f.read())
+
+def _ler_estilos(dist_dir: str, gerados: Iterable[Gerado]):
+    """Texto de uma folha de estilos: o pacote em dist/ ou o arquivo do site (None se não existir)"""
+    pacotes = {g.url for g in gerados}
+
+    def ler(caminho: str) -> Optional[str]:
+        try:
+            with open(os.path.join(dist_dir if caminho in pacotes else BASE_DIR, caminho), 'r',
+                      encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    return ler
+
+_processo: Dict[str, Any] = {}
+
+def _iniciar_processo(imagens: Dict):
+    """Estado comum a todas as páginas do build, passado uma vez a cada processo"""
+    _processo['imagens'] = imagens
+
+def _montar_em_processo(tarefa: Tuple[str, str, Optional[Pagina], str, str, str, bool,
+                                      Tuple[Gerado, ...], bool, int]) -> Dict[str, Any]:
+    """
+    Trabalho de um processo do pool: monta, reescreve, troca as tags pelos
+    pacotes, põe o CSS crítico inline, minifica, põe as variantes das
+    imagens nas <img> e grava uma página; devolve
+    as dependências, o tamanho, os pedidos de JS/CSS antes/depois dos
+    pacotes, os bytes de CSS crítico e o tempo de cada fase
+
+    Cada template passa por estas fases uma vez por build e processo: as
+    páginas do catálogo são o molde dele com os itens emendados (os cartões
+    das listagens também são minificados), por muitos itens que saiam dele.
+    """
+    saida, template, pagina, src_dir, dist_dir, dados_file, minificar, gerados, critico, geracao = tarefa
+    chave = (src_dir, dados_file, geracao)
+    if _processo.get('chave') != chave:
+        # Só caminhos e duplicados: as tags comuns já vêm dos partials
+        _processo.update(chave=chave, reescritor=Reescritor(injecoes=()), templates={}, moldes={},
+                         montador=Montador(os.path.join(src_dir, 'partials'), Dados(dados_file)),
+                         tamanhos=Tamanhos(BASE_DIR, gerados), folhas=Folhas(_ler_estilos(dist_dir, gerados)),
+                         scripts=Scripts(BASE_DIR))
+    montador = _processo['montador']
+    tempos = Counter()
+    if template not in _processo['templates']:
+        inicio = time.perf_counter()
+        with open(os.path.join(src_dir, template), 'r', encoding='utf-8-sig') as f:
+            fonte = f.read()
+        texto, partials, chaves = montador.montar(fonte, template)
+        tempos['montagem'] += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        texto, _ = _processo['reescritor'].reescrever_texto(texto, template)
+        tempos['reescrita'] += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        antes = recursos(texto, _processo['tamanhos'])
+        if gerados:
+            texto, _ = empacotar(texto, gerados)
+        depois = recursos(texto, _processo['tamanhos'])
+        tempos['pacotes'] += time.perf_counter() - inicio
+
+        # As páginas do catálogo usam o do template: os contentores vazios
+        # dele são os que o prerender enche
+        extraido = None
+        if critico:
+            inicio = time.perf_counter()
+            texto, extraido = inserir_critico(texto, _processo['folhas'], _processo['scripts'], minificar)
+            tempos['crítico'] += time.perf_counter() - inicio
+
+        montado = len(texto.encode('utf-8'))
+        if minificar:
+            inicio = time.perf_counter()
+            texto = minificar_html(texto)
+            tempos['minificação'] += time.perf_counter() - inicio
+        _processo['templates'][template] = (texto, partials, chaves, hash_bytes(fonte.encode('utf-8')), montado,
+                                            {'antes': list(antes), 'depois': list(depois)},
+                                            _dependencias_critico(extraido, gerados) if critico else None)
+    texto, partials, chaves, hash_fonte, montado, pedidos, dependencias = _processo['templates'][template]
+
+    chaves = set(chaves)
+    if pagina is not None:
+        inicio = time.perf_counter()
+        if template not in _processo['moldes']:
+            _processo['moldes'][template] = Molde(texto)
+        usadas = chaves_catalogo(pagina)
+        texto = preencher(_processo['moldes'][template], saida, pagina,
+                          [montador.dados.valor(c) for c in usadas], minificar_html if minificar else None)
+        # O que os itens acrescentam ao template conta como montado
+        montado += len(texto.encode('utf-8')) - len(_processo['moldes'][template].texto.encode('utf-8'))
+        chaves.update(usadas)
+        tempos['catálogo'] += time.perf_counter() - inicio
+
+    # Depois do catálogo: os cartões também têm <img>
+    inicio = time.perf_counter()
+    texto, _ = responsivas(texto, _processo['imagens'])
+    tempos['imagens'] += time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    conteudo = texto.encode('utf-8')
+    destino = os.path.join(dist_dir, saida)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    escrever_atomico(destino, conteudo)
+    tempos['escrita'] += time.perf_counter() - inicio
+    resultado = {'nome': saida, 'fonte': hash_fonte, 'partials': sorted(partials), 'dados': sorted(chaves),
+                 'pacotes': [g.url for g in gerados], 'recursos': pedidos, 'critico': dependencias,
+                 'montado': montado, 'tamanho': len(conteudo), 'tempos': tempos}
+    if pagina is not None:
+        resultado['template'] = template
+        resultado['itens'] = list(pagina.itens)
+    return resultado
+
+def _dependencias_critico(extraido, gerados: Iterable[Gerado]) -> Dict[str, Any]:
+    """Bytes do CSS crítico e hash dos arquivos de que ele depende (os pacotes já contam pelo URL)"""
+    pacotes = {g.url for g in gerados}
+    arquivos = list(_processo['scripts'].fontes) + [c for c in _processo['folhas'].lidas if c not in pacotes]
+    memo = _processo.setdefault('hashes', {})
+    for arquivo in arquivos:
+        if arquivo not in memo:
+            memo[arquivo] = _hash_arquivo(os.path.join(BASE_DIR, arquivo))
+    return {'bytes': extraido.tamanho if extraido else 0, 'fontes': {a: memo[a] for a in sorted(arquivos)}}
+
+def ler_cache(caminho: str) -> Dict:
+    """Cache {versao, minificar, dados: {estado, chaves}, catalogo, paginas, estaticos}"""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get('versao') != VERSAO_BUILD:
+        cache = {'versao': VERSAO_BUILD, 'paginas': {}, 'estaticos': [], 'dados': {}, 'catalogo': {}}
+    return cache
+
+class _ValoresDados:
+    """Hash das chaves do dados.json usadas; sem ler o arquivo se ele não mudou"""
+
+    def __init__(self, caminho: str, anterior: Dict):
+        self.caminho = caminho
+        try:
+            st = os.stat(caminho)
+            self.estado = [st.st_size, st.st_mtime_ns]
+        except OSError:
+            self.estado = None
+        mesmo = self.estado is not None and anterior.get('estado') == self.estado
+        self.hashes: Dict[str, Optional[str]] = dict(anterior.get('chaves', {})) if mesmo else {}
+        self.dados = Dados(caminho)
+
+    def hash(self, chave: str) -> Optional[str]:
+        if chave not in self.hashes:
+            try:
+                self.hashes[chave] = hash_valor(self.dados.valor(chave))
+            except (KeyError, OSError, ValueError):
+                self.hashes[chave] = None
+        return self.hashes[chave]
+
+    def para_cache(self, usadas: Iterable[str]) -> Dict:
+        return {'estado': self.estado, 'chaves': {c: self.hash(c) for c in sorted(set(usadas))}}
+
+def _plano_catalogo(valores: _ValoresDados, anterior: Dict, templates: List[str]) -> Dict[str, Pagina]:
+    """Páginas do catálogo; sem ler o dados.json se ele e os templates não mudaram"""
+    if valores.estado is not None and anterior.get('estado') == valores.estado \
+            and anterior.get('templates') == templates:
+        return {saida: Pagina(t, c, tuple(i), d) for saida, (t, c, i, d) in anterior['paginas'].items()}
+    try:
+        return planear(valores.dados.conteudo(), templates)
+    except (OSError, ValueError):
+        return {}
+
+def _poda(src_dir: str, dados_file: str, nomes: List[str], anterior: Dict) -> Tuple[Poda, Dict]:
+    """
+    O que o prune_assets tira dos estilos e scripts, visto em todas as páginas
+
+    As páginas de src/ são montadas aqui (as do catálogo entram pelas classes
+    do prerender e do dados.json). Se nenhum template, partial, script, folha
+    ou o dados.json mudou, vale a análise do build anterior.
+    """
+    partials_dir = os.path.join(src_dir, 'partials')
+    templates = [os.path.join(src_dir, n) for n in nomes]
+    estaticos = [os.path.join(BASE_DIR, n) for n in ESTATICOS if n.endswith('.html')]
+    fontes = templates + sorted(os.path.join(partials_dir, n) for n in os.listdir(partials_dir)) \
+        + sorted(os.path.join(BASE_DIR, 'js', n) for n in os.listdir(os.path.join(BASE_DIR, 'js'))) \
+        + [os.path.join(BASE_DIR, a) for a in ESTILOS] + estaticos + [dados_file]
+    hashes = []
+    for caminho in fontes:
+        hashes.append(_hash_arquivo(caminho) if os.path.isfile(caminho) else '')
+    chave = hash_bytes('\0'.join(hashes).encode('utf-8'))
+    if anterior.get('chave') == chave:
+        poda = anterior['poda']
+        return Poda({a: tuple(map(tuple, t)) for a, t in poda['intervalos'].items()}, poda['removidos'],
+                    {a: tuple(t) for a, t in poda['tamanhos'].items()}), anterior
+
+    montador = Montador(partials_dir, Dados(dados_file))
+    paginas_ = []
+    for caminho in templates + [e for e in estaticos if os.path.isfile(e)]:
+        with open(caminho, 'r', encoding='utf-8-sig') as f:
+            texto = f.read()
+        if caminho in templates:
+            texto, _, _ = montador.montar(texto, os.path.basename(caminho))
+        paginas_.append(texto)
+    poda = analisar_poda(paginas_, BASE_DIR, extras=('prerender.py', dados_file))
+    return poda, {'chave': chave, 'poda': poda._asdict()}
+
+def copiar_estaticos(dist_dir: str, base_dir: str = BASE_DIR) -> Tuple[List[str], int]:
+    """Copia para dist/ o que mudou (tamanho ou data); devolve (todos, copiados)"""
+    todos = []
+    copiados = 0
+    for entrada in ESTATICOS:
+        origem = os.path.join(base_dir, entrada)
+        if os.path.isdir(origem):
+            arquivos = []
+            for diretorio, subdirs, nomes in os.walk(origem):
+                subdirs[:] = sorted(d for d in subdirs if not d.startswith('.'))
+                arquivos.extend(os.path.join(diretorio, n) for n in sorted(nomes))
+        elif os.path.isfile(origem):
+            arquivos = [origem]
+        else:
+            continue
+        for arquivo in arquivos:
+            if arquivo.endswith(IGNORAR_ESTATICOS):
+                continue
+            relativo = os.path.relpath(arquivo, base_dir)
+            destino = os.path.join(dist_dir, relativo)
+            todos.append(relativo)
+            st = os.stat(arquivo)
+            try:
+                atual = os.stat(destino)
+                if atual.st_size == st.st_size and atual.st_mtime_ns == st.st_mtime_ns:
+                    continue
+            except FileNotFoundError:
+                pass
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            shutil.copy2(arquivo, destino)
+            copiados += 1
+    return todos, copiados
+
+def _remover(dist_dir: str, relativos: Iterable[str]):
+    for relativo in relativos:
+        try:
+            os.remove(os.path.join(dist_dir, relativo))
+        except FileNotFoundError:
+            pass
+
+def construir(src_dir: str = SRC_DIR, dist_dir: str = DIST_DIR, dados_file: str = DADOS_FILE,
+              completo: bool = False, minificar: bool = True, jobs: Optional[int] = None,
+              cache_path: Optional[str] = CACHE_FILE, silencioso: bool = False,
+              pacotes: bool = True, critico: bool = True,
+              orcamento_critico: Optional[int] = ORCAMENTO, podar: bool = True,
+              compressao: bool = True, imagens: bool = True) -> Dict[str, Any]:
+    """
+    Constrói o site em dist_dir; só as páginas com alguma dependência alterada
+
+    Uma página é reconstruída se o template dela, algum partial que ela usa
+    (também os incluídos por outros partials), alguma chave do dados.json que
+    ela usa, algum pacote de JS/CSS, as folhas de estilos e scripts de que o
+    CSS crítico dela depende ou o próprio build mudaram, ou se a saída
+    desapareceu. No fim grava o sw.js com a lista de precache e as versões
+    .gz/.br do que mudou em dist_dir. Devolve o resumo do build (contagens,
+    bytes e tempos por fase). Levanta ErroBuild, depois de gravar tudo, se o
+    CSS crítico de alguma página passar de `orcamento_critico` bytes ou se
+    faltar alguma URL do precache.
+    """
+    inicio = time.perf_counter()
+    cache = ler_cache(cache_path) if cache_path and not completo else ler_cache('')
+    if cache.get('minificar') != minificar:
+        cache['paginas'] = {}
+    anteriores = cache['paginas']
+    os.makedirs(dist_dir, exist_ok=True)
+
+    partials_dir = os.path.join(src_dir, 'partials')
+    hash_partials = {n: _hash_arquivo(os.path.join(partials_dir, n))
+                     for n in (os.listdir(partials_dir) if os.path.isdir(partials_dir) else [])}
+    valores = _ValoresDados(dados_file, cache.get('dados', {}))
+
+    nomes = paginas(src_dir)
+
+    # O CSS e o JS sem uso saem dos pacotes
+    marca = time.perf_counter()
+    poda, cache_poda = _poda(src_dir, dados_file, nomes, cache.get('poda', {})) if pacotes and podar else (None, {})
+    tempo_poda = time.perf_counter() - marca
+
+    # Variantes das imagens que mudaram; sem imagens, o otimizar só apaga as do build anterior
+    marca = time.perf_counter()
+    mapa_imagens, cache_imagens, sem_pillow = otimizar(dist_dir, cache.get('imagens', {}), jobs,
+                                                       **({} if imagens else {'origens': ()}))
+    versao_imagens = chave_imagens(mapa_imagens)
+    tempo_imagens = time.perf_counter() - marca
+
+    # Sem pacotes, o gerar_todos só apaga os do build anterior
+    marca = time.perf_counter()
+    gerados, cache_pacotes, pacotes_gerados = gerar_todos(BASE_DIR, dist_dir, minificar, cache.get('pacotes', {}),
+                                                          **({} if pacotes else {'pacotes': ()}),
+                                                          podas=poda.intervalos if poda else None)
+    urls_pacotes = [g.url for g in gerados]
+    tempo_pacotes = time.perf_counter() - marca
+
+    catalogo = _plano_catalogo(valores, cache.get('catalogo', {}), nomes)
+    alvos: Dict[str, Tuple[str, Optional[Pagina]]] = {nome: (nome, None) for nome in nomes}
+    alvos.update((saida, (pagina.template, pagina)) for saida, pagina in catalogo.items())
+
+    geracao = time.time_ns()
+    hash_fontes: Dict[str, str] = {}
+    tarefas = []
+    novas: Dict[str, Dict] = {}
+    for saida, (template, pagina) in alvos.items():
+        entrada = anteriores.get(saida)
+        if entrada and entrada.get('pacotes') == urls_pacotes and entrada.get('imagens') == versao_imagens \
+                and _atual(entrada, pagina, os.path.join(src_dir, template), hash_fontes,
+                           os.path.join(dist_dir, saida), hash_partials, valores, critico):
+            novas[saida] = entrada
+            continue
+        tarefas.append((saida, template, pagina, src_dir, dist_dir, dados_file, minificar, tuple(gerados),
+                        critico, geracao))
+    tempos = Counter({'verificação': time.perf_counter() - inicio - tempo_pacotes - tempo_poda - tempo_imagens,
+                      'poda': tempo_poda, 'pacotes': tempo_pacotes, 'variantes': tempo_imagens})
+
+    processos = jobs or os.cpu_count() or 1
+    if len(tarefas) >= MIN_PARALELO and processos > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_iniciar_processo, initargs=(mapa_imagens,)) as pool:
+            resultados = list(pool.map(_montar_em_processo, tarefas,
+                                       chunksize=max(4, len(tarefas) // (processos * 8))))
+    else:
+        _iniciar_processo(mapa_imagens)
+        resultados = [_montar_em_processo(t) for t in tarefas]
+
+    montado = tamanho = 0
+    for resultado in resultados:
+        tempos.update(resultado.pop('tempos'))
+        montado += resultado['montado']
+        tamanho += resultado['tamanho']
+        resultado['partials'] = {n: hash_partials.get(n) for n in resultado['partials']}
+        resultado['dados'] = {c: valores.hash(c) for c in resultado['dados']}
+        resultado['imagens'] = versao_imagens
+        saida = resultado.pop('nome')
+        novas[saida] = resultado
+        if not silencioso:
+            print(f"🔨 {os.path.join(dist_dir, saida)}")
+
+    _remover(dist_dir, set(anteriores) - set(novas))
+
+    marca = time.perf_counter()
+    estaticos, copiados = copiar_estaticos(dist_dir)
+    _remover(dist_dir, set(cache.get('estaticos', [])) - set(estaticos))
+    tempos['estáticos'] = time.perf_counter() - marca
+
+    # O sw.js (que não é copiado) leva a lista de precache do que ficou em dist/
+    marca = time.perf_counter()
+    try:
+        precache, _ = gerar_sw(dist_dir)
+        erro_precache = None
+    except ErroPrecache as e:
+        precache, erro_precache = [], str(e)
+    tempos['precache'] = time.perf_counter() - marca
+
+    # Sem compressão, o comprimir só apaga os .gz/.br do build anterior
+    marca = time.perf_counter()
+    comprimidos, cache_compressao = comprimir(dist_dir, cache.get('compressao', {}), jobs,
+                                              **({} if compressao else {'extensoes': ()}))
+    tempos['compressão'] = time.perf_counter() - marca
+
+    if cache_path:
+        usadas = [c for entrada in novas.values() for c in entrada['dados']]
+        plano = {'estado': valores.estado, 'templates': nomes,
+                 'paginas': {saida: list(pagina) for saida, pagina in catalogo.items()}}
+        conteudo = {'versao': VERSAO_BUILD, 'minificar': minificar, 'dados': valores.para_cache(usadas),
+                    'catalogo': plano, 'imagens': cache_imagens, 'poda': cache_poda, 'pacotes': cache_pacotes, 'paginas': novas,
+                    'estaticos': estaticos, 'compressao': cache_compressao}
+        escrever_atomico(cache_path, json.dumps(conteudo, ensure_ascii=False, indent=1).encode('utf-8'))
+
+    if erro_precache:
+        raise ErroBuild(erro_precache)
+
+    # Conta também as páginas que não mudaram: o orçamento pode ter baixado
+    criticos = {saida: entrada['critico']['bytes'] for saida, entrada in novas.items() if entrada.get('critico')}
+    if orcamento_critico is not None:
+        acima = sorted(saida for saida, n in criticos.items() if n > orcamento_critico)
+        if acima:
+            raise ErroBuild(f"CSS crítico acima do orçamento de {orcamento_critico / 1024:.1f}KB: "
+                            + ', '.join(f"{saida} ({criticos[saida] / 1024:.1f}KB)" for saida in acima))
+
+    return {'paginas': len(alvos), 'catalogo': len(catalogo), 'reconstruidas': len(tarefas), 'estaticos': len(estaticos),
+            'copiados': copiados, 'montado': montado, 'tamanho': tamanho, 'tempos': tempos,
+            'pacotes': gerados, 'pacotes_gerados': pacotes_gerados, 'poda': poda,
+            'recursos': {saida: entrada['recursos'] for saida, entrada in novas.items()},
+            'critico': criticos, 'orcamento_critico': orcamento_critico, 'compressao': comprimidos,
+            'precache': precache, 'imagens': mapa_imagens, 'sem_pillow': sem_pillow,
+            'total': time.perf_counter() - inicio}
+
+def _atual(entrada: Dict, pagina: Optional[Pagina], fonte: str, hash_fontes: Dict[str, str], saida: str,
+           hash_partials: Dict[str, str], valores: _ValoresDados, critico: bool = True) -> bool:
+    """A saída de uma página ainda corresponde às dependências registadas?"""
+    try:
+        if os.path.getsize(saida) != entrada['tamanho']:
+            return False
+    except OSError:
+        return False
+    if entrada.get('itens') != (list(pagina.itens) if pagina is not None else None):
+        return False
+    if any(hash_partials.get(n) != h for n, h in entrada['partials'].items()):
+        return False
+    if any(valores.hash(c) != h for c, h in entrada['dados'].items()):
+        return False
+    dependencias = entrada.get('critico')
+    if (dependencias is not None) != critico:
+        return False
+    arquivos = dict(dependencias['fontes']) if dependencias else {}
+    arquivos[fonte] = entrada['fonte']
+    for arquivo, h in arquivos.items():
+        caminho = os.path.join(BASE_DIR, arquivo)
+        if caminho not in hash_fontes:
+            hash_fontes[caminho] = _hash_arquivo(caminho) if os.path.exists(caminho) else ''
+        if hash_fontes[caminho] != h:
+            return False
+    return True
+
+def imprimir_resumo(resumo: Dict[str, Any], titulo: str = 'Build'):
+    tempos = resumo['tempos']
+    fases = ', '.join(f"{fase} {tempos[fase] * 1000:.0f}ms"
+                      for fase in ('verificação', 'variantes', 'poda', 'pacotes', 'montagem', 'catálogo', 'reescrita',
+                                   'crítico', 'minificação', 'imagens', 'escrita', 'estáticos', 'precache', 'compressão')
+                      if fase in tempos)
+    print(f"🏗️  {titulo}: {resumo['reconstruidas']}/{resumo['paginas']} páginas reconstruídas "
+          f"({resumo['catalogo']} do catálogo), "
+          f"{resumo['copiados']}/{resumo['estaticos']} estáticos copiados em "
+          f"{resumo['total'] * 1000:.0f}ms ({fases})")
+    if resumo['montado']:
+        reducao = 1 - resumo['tamanho'] / resumo['montado']
+        print(f"   HTML {resumo['montado'] / 1024:.1f}KB -> {resumo['tamanho'] / 1024:.1f}KB "
+              f"({reducao:.0%} menos)")
+    if resumo['imagens'] or resumo['sem_pillow']:
+        novas = [i for i in resumo['imagens'].values() if i.tempo]
+        variantes = sum(len(i.variantes) for i in resumo['imagens'].values())
+        print(f"   🖼️  {len(resumo['imagens'])} imagens com {variantes} variantes ({len(novas)} processadas agora"
+              + (f" em {sum(i.tempo for i in novas) * 1000:.0f}ms de CPU" if novas else '') + ')'
+              + (f"; {resumo['sem_pillow']} sem variantes (pip install Pillow)" if resumo['sem_pillow'] else ''))
+    poda = resumo['poda']
+    if poda:
+        for arquivo, (antes, depois) in poda.tamanhos.items():
+            tipo = 'regras' if arquivo.endswith('.css') else 'funções'
+            print(f"   ✂️  {arquivo}: {len(poda.removidos[arquivo])} {tipo} sem uso, "
+                  f"{(antes - depois) / 1024:.1f}KB a menos")
+    for gerado in resumo['pacotes']:
+        print(f"   📦 {gerado.url}: {len(gerado.arquivos)} arquivos, "
+              f"{gerado.fontes / 1024:.1f}KB -> {gerado.tamanho / 1024:.1f}KB")
+    # Páginas com os mesmos números (todas as de produto, por exemplo) numa linha só
+    grupos: Dict[Tuple[int, int, int, int], List[str]] = defaultdict(list)
+    for saida, pedidos in sorted(resumo['recursos'].items()):
+        grupos[tuple(pedidos['antes']) + tuple(pedidos['depois'])].append(saida)
+    for (n_antes, b_antes, n_depois, b_depois), saidas in sorted(grupos.items(), key=lambda g: g[1][0]):
+        if (n_antes, b_antes) == (n_depois, b_depois):
+            continue
+        nome = saidas[0] if len(saidas) == 1 else f"{saidas[0]} (+{len(saidas) - 1})"
+        print(f"   {nome}: {n_antes} -> {n_depois} pedidos JS/CSS, "
+              f"{b_antes / 1024:.1f}KB -> {b_depois / 1024:.1f}KB")
+    if resumo['critico']:
+        grupos_critico: Dict[int, List[str]] = defaultdict(list)
+        for saida, n in sorted(resumo['critico'].items()):
+            grupos_critico[n].append(saida)
+        orcamento = resumo['orcamento_critico']
+        limite = f" (orçamento {orcamento / 1024:.1f}KB)" if orcamento is not None else ''
+        print(f"   🎨 CSS crítico inline{limite}: " + ', '.join(
+            f"{saidas[0] if len(saidas) == 1 else f'{saidas[0]} (+{len(saidas) - 1})'} {n / 1024:.1f}KB"
+            for n, saidas in sorted(grupos_critico.items(), key=lambda g: -g[0])))
+
+    if resumo['precache']:
+        print(f"   📋 sw.js: {len(resumo['precache'])} URLs em precache")
+    if resumo['compressao']:
+        original, gz, br, tempo, novos = totais_compressao(resumo['compressao'])
+        lentos = sorted((c for c in resumo['compressao'] if not c.reutilizada),
+                        key=lambda c: -(c.tempo_gzip + c.tempo_brotli))[:3]
+        print(f"   🗜️  {novos}/{len(resumo['compressao'])} arquivos comprimidos ({tempo * 1000:.0f}ms de CPU): "
+              f"{original / 1024:.1f}KB -> gz {gz / 1024:.1f}KB"
+              + (f", br {br / 1024:.1f}KB" if any(c.brotli for c in resumo['compressao']) else '')
+              + (' (mais lentos: ' + ', '.join(f"{c.arquivo} {(c.tempo_gzip + c.tempo_brotli) * 1000:.0f}ms"
+                                               for c in lentos) + ')' if lentos else ''))
+
+def grafo(cache_path: str = CACHE_FILE):
+    """Mostra, a partir do cache, que páginas dependem de cada partial e chave"""
+    cache = ler_cache(cache_path)
+    if not cache['paginas']:
+        print("⚠️  Sem grafo: corra o build primeiro")
+        return
+    dependentes: Dict[str, List[str]] = {}
+    for pagina, entrada in sorted(cache['paginas'].items()):
+        for partial in entrada['partials']:
+            dependentes.setdefault(f"partials/{partial}", []).append(pagina)
+        for chave in entrada['dados']:
+            dependentes.setdefault(f"dados.json:{chave}", []).append(pagina)
+    for dependencia, paginas_ in sorted(dependentes.items()):
+        print(f"📄 {dependencia} -> {len(paginas_)} páginas: {', '.join(paginas_)}")
+
+# =============================================
+# BENCHMARK
+# =============================================
+
+def benchmark(produtos: int = 0):
+    """
+    Build completo, sem alterações, com um partial, um template e um produto
+    alterados; com `produtos`, o catálogo é aumentado com produtos sintéticos
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'src')
+        shutil.copytree(SRC_DIR, src)
+        dist = os.path.join(tmp, 'dist')
+        cache = os.path.join(tmp, 'cache.json')
+        dados_file = os.path.join(tmp, 'dados.json')
+        with open(DADOS_FILE, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        base = dict(dados['produtos'][0])
+        for i in range(produtos):
+            dados['produtos'].append(dict(base, id=f"sintetico-{i}", nome=f"{base['nome']} {i}", preco=10 + i % 90))
+
+        def gravar_dados():
+            escrever_atomico(dados_file, json.dumps(dados, ensure_ascii=False).encode('utf-8'))
+
+        def medir(titulo):
+            imprimir_resumo(construir(src, dist, dados_file, cache_path=cache, silencioso=True), titulo)
+
+        gravar_dados()
+        medir('completo')
+        medir('sem alterações')
+        partial = sorted(os.listdir(os.path.join(src, 'partials')))[0]
+        with open(os.path.join(src, 'partials', partial), 'a', encoding='utf-8') as f:
+            f.write('<!-- alterado -->\n')
+        medir(f'partial {partial}')
+        pagina = paginas(src)[0]
+        with open(os.path.join(src, pagina), 'a', encoding='utf-8') as f:
+            f.write('<!-- alterado -->\n')
+        medir(f'página {pagina}')
+        produto = dados['produtos'][-1]
+        produto['preco'] += 1
+        gravar_dados()
+        medir(f"produto {produto['id']}")
+
+# =============================================
+# MAIN
+# =============================================
+
+def main(argv: Optional[List[str]] = None):
+    """Constrói dist/ a partir de src/"""
+    parser = argparse.ArgumentParser(description="Build incremental do site (partials + minificação)")
+    parser.add_argument('--completo', action='store_true', help="Reconstrói todas as páginas")
+    parser.add_argument('--sem-minificar', action='store_true', help="HTML montado sem minificação")
+    parser.add_argument('--sem-pacotes', action='store_true', help="Mantém os <script>/<link> originais")
+    parser.add_argument('--sem-critico', action='store_true', help="Sem CSS crítico inline (folha bloqueante)")
+    parser.add_argument('--sem-poda', action='store_true', help="Pacotes com todo o CSS e JS (também o sem uso)")
+    parser.add_argument('--sem-imagens', action='store_true', help="Sem variantes responsivas das imagens")
+    parser.add_argument('--sem-compressao', action='store_true', help="Sem as versões .gz/.br de dist/")
+    parser.add_argument('--orcamento-critico', type=float, default=ORCAMENTO / 1024,
+                        help="KB de CSS crítico por página acima dos quais o build falha (0: sem limite)")
+    parser.add_argument('--jobs', type=int, help="Processos (padrão: um por CPU)")
+    parser.add_argument('--grafo', action='store_true', help="Mostra o grafo de dependências do último build")
+    parser.add_argument('--benchmark', action='store_true', help="Tempos de build completo e incremental")
+    parser.add_argument('--produtos', type=int, default=0,
+                        help="Com --benchmark: produtos sintéticos acrescentados ao catálogo")
+    args = parser.parse_args(argv)
+
+    if args.grafo:
+        grafo()
+        return
+    if args.benchmark:
+        benchmark(args.produtos)
+        return
+    try:
+        resumo = construir(completo=args.completo, minificar=not args.sem_minificar, jobs=args.jobs,
+                           pacotes=not args.sem_pacotes, critico=not args.sem_critico,
+                           orcamento_critico=int(args.orcamento_critico * 1024) or None, podar=not args.sem_poda,
+                           compressao=not args.sem_compressao, imagens=not args.sem_imagens)
+    except ErroBuild as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    imprimir_resumo(resumo)
+
+if __name__ == '__main__':
+    main()
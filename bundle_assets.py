@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BUNDLE_ASSETS.PY - Pacotes de JS/CSS com hash do conteúdo no nome
+Concatena e minifica os scripts e a folha de estilos comuns em pacotes
+(js/app.<hash>.js, css/styles.<hash>.css) com source maps, e troca as tags
+das páginas pelo pacote. O nome muda quando o conteúdo muda, por isso os
+pacotes podem ficar em cache para sempre. Usado pelo build_site
+"""
+
+import json
+import os
+import re
+from bisect import bisect_right
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from dados_io import escrever_atomico, hash_bytes
+from rewrite_html import _Analisador, _linha_inteira, _normalizar_url, com_atributos
+
+
+class Pacote(NamedTuple):
+    nome: str
+    tipo: str                    # 'js' ou 'css'
+    arquivos: Tuple[str, ...]    # pela ordem em que as páginas os carregam
+
+# Os supabase-* são síncronos e só existem no index.html (logo a seguir ao
+# supabase-js do CDN): ficam num pacote próprio, o resto vai com defer
+PACOTES = (
+    Pacote('supabase', 'js', ('js/supabase-config.js', 'js/supabase-db.js', 'js/supabase-seed.js')),
+    Pacote('app', 'js', ('js/storage.js', 'js/ui.js', 'js/app.js', 'js/pwa-install.js')),
+    Pacote('styles', 'css', ('css/styles.css',)),
+)
+
+# Tamanho do hash no nome do arquivo
+TAMANHO_HASH = 10
+
+
+class Gerado(NamedTuple):
+    """Um pacote escrito em dist/: URL e bytes antes/depois"""
+    nome: str
+    tipo: str
+    url: str
+    arquivos: Tuple[str, ...]
+    fontes: int                  # soma dos arquivos originais
+    tamanho: int                 # pacote (sem o source map)
+
+# =============================================
+# SOURCE MAPS
+# =============================================
+
+_BASE64 = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+
+def _vlq(valor: int) -> str:
+    valor = (-valor << 1) | 1 if valor < 0 else valor << 1
+    saida = ''
+    while True:
+        digito = valor & 31
+        valor >>= 5
+        saida += _BASE64[digito | (32 if valor else 0)]
+        if not valor:
+            return saida
+
+# (linha e coluna no pacote, índice da fonte, linha e coluna na fonte)
+Segmento = Tuple[int, int, int, int, int]
+
+def mappings(segmentos: Iterable[Segmento]) -> str:
+    """Campo mappings (v3): coluna relativa ao segmento anterior da linha, o resto ao anterior"""
+    linhas: List[List[str]] = []
+    fonte_ant = linha_ant = coluna_ant = coluna_gerada = 0
+    for linha, coluna, fonte, linha_orig, coluna_orig in segmentos:
+        if len(linhas) <= linha:
+            linhas.extend([] for _ in range(linha + 1 - len(linhas)))
+            coluna_gerada = 0
+        linhas[linha].append(_vlq(coluna - coluna_gerada) + _vlq(fonte - fonte_ant)
+                             + _vlq(linha_orig - linha_ant) + _vlq(coluna_orig - coluna_ant))
+        coluna_gerada = coluna
+        fonte_ant, linha_ant, coluna_ant = fonte, linha_orig, coluna_orig
+    return ';'.join(','.join(linha) for linha in linhas)
+
+
+class _Posicoes:
+    """Linha/coluna (base 0) de offsets de um texto"""
+
+    def __init__(self, texto: str):
+        self.inicios = [0] + [m.end() for m in re.finditer('\n', texto)]
+
+    def __call__(self, offset: int) -> Tuple[int, int]:
+        linha = bisect_right(self.inicios, offset) - 1
+        return linha, offset - self.inicios[linha]
+
+
+class _Saida:
+    """Texto minificado com um segmento de mapa no início de cada trecho copiado"""
+
+    def __init__(self, texto: str):
+        self.partes: List[str] = []
+        self.segmentos: List[Tuple[int, int, int, int]] = []
+        self.linha = 0
+        self.coluna = 0
+        self._posicao = _Posicoes(texto)
+        self._seguido = -1          # offset na fonte onde acabou o último trecho
+
+    def escrever(self, texto: str, offset: Optional[int] = None):
+        if offset is not None and offset != self._seguido:
+            self.segmentos.append((self.linha, self.coluna) + self._posicao(offset))
+        if offset is not None:
+            self._seguido = offset + len(texto)
+        self.partes.append(texto)
+        quebras = texto.count('\n')
+        if quebras:
+            self.linha += quebras
+            self.coluna = len(texto) - texto.rfind('\n') - 1
+        else:
+            self.coluna += len(texto)
+
+    def texto(self) -> str:
+        return ''.join(self.partes)
+
+# =============================================
+# MINIFICAÇÃO
+# =============================================
+
+_JS_ESPACO = r'[ \t\r\n\f\v\u00a0\ufeff\u2028\u2029]+'
+_RE_JS = re.compile(
+    r'(?P<espaco>' + _JS_ESPACO + r')'
+    r'|(?P<comentario>//[^\n]*|/\*.*?\*/)'
+    r'''|(?P<texto>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")'''
+    r'|(?P<palavra>[\w$\u0080-\uffff]+)'
+    r'|(?P<outro>.)', re.S)
+_RE_REGEX_JS = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[a-z]*')
+_RE_TEMPLATE = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*(?:`|\$\{)', re.S)
+
+# Depois destas palavras uma / abre uma expressão regular, não é divisão
+PALAVRAS_REGEX = frozenset('return typeof instanceof in of new delete void throw case do else yield await'.split())
+
+# Depois destes caracteres uma / é divisão
+_ANTES_DIVISAO = frozenset(')]`\'"')
+
+# Antes/depois destes tokens uma quebra de linha não muda nada (sem ASI)
+_SEM_QUEBRA_DEPOIS = frozenset('{;,([')
+_SEM_QUEBRA_ANTES = frozenset('});,]')
+
+def _palavra(c: str) -> bool:
+    return c.isalnum() or c in '_$' or ord(c) > 0x7f
+
+def tokens_js(texto: str) -> Iterator[Tuple[str, str, int]]:
+    """
+    (tipo, token, offset) de um script, com os espaços e comentários
+
+    Tipos: 'espaco', 'comentario', 'texto', 'template' (um trecho de ` a ${
+    ou de } a `), 'regex', 'palavra' e 'outro'. As chaves de um ${ } saem
+    como 'outro'; a que o fecha vem no trecho de template seguinte.
+    """
+    anterior = ''               # último token que não é espaço nem comentário
+    chaves: List[int] = []      # profundidade de { em cada ${ } aberto
+    i = 0
+    n = len(texto)
+
+    def template(inicio: int) -> Tuple[str, str, int]:
+        m = _RE_TEMPLATE.match(texto, inicio + 1)
+        if not m:
+            raise ValueError(f"template sem fim no offset {inicio}")
+        if m.group().endswith('${'):
+            chaves.append(0)
+        return 'template', texto[inicio:m.end()], inicio
+
+    while i < n:
+        c = texto[i]
+        if c == '`' or (chaves and c == '}' and chaves[-1] == 0):
+            if c == '}':
+                chaves.pop()
+            token = template(i)
+        else:
+            token = None
+            if c == '/' and texto[i + 1:i + 2] not in ('/', '*'):
+                if not anterior or anterior in PALAVRAS_REGEX or \
+                        (not _palavra(anterior[-1]) and anterior[-1] not in _ANTES_DIVISAO):
+                    m = _RE_REGEX_JS.match(texto, i)
+                    if m:
+                        token = 'regex', m.group(), i
+            if token is None:
+                if chaves and c == '{':
+                    chaves[-1] += 1
+                elif chaves and c == '}':
+                    chaves[-1] -= 1
+                m = _RE_JS.match(texto, i)
+                token = m.lastgroup, m.group(), i
+        yield token
+        if token[0] not in ('espaco', 'comentario'):
+            anterior = token[1]
+        i += len(token[1])
+
+def minificar_js(texto: str) -> Tuple[str, List[Tuple[int, int, int, int]]]:
+    """
+    Remove comentários e espaços que não contam; devolve (texto, segmentos)
+
+    Conservador: strings, templates e expressões regulares ficam iguais, e
+    uma quebra de linha só desaparece onde a inserção automática de ponto e
+    vírgula nunca a usaria (depois de { ; , ( [ ou antes de } ) ; , ]).
+    Os nomes não são encurtados: os scripts partilham funções globais.
+    """
+    saida = _Saida(texto)
+    anterior = ''               # último token escrito
+    pendente = ''               # '', ' ' ou '\n' (espaço removido desde o anterior)
+    for tipo, token, offset in tokens_js(texto):
+        if tipo in ('espaco', 'comentario'):
+            if '\n' in token or '\u2028' in token or '\u2029' in token:
+                pendente = '\n'
+            elif not pendente:
+                pendente = ' '
+            continue
+        if pendente and anterior:
+            if pendente == '\n' and anterior[-1] not in _SEM_QUEBRA_DEPOIS and token[0] not in _SEM_QUEBRA_ANTES:
+                saida.escrever('\n')
+            elif (_palavra(anterior[-1]) and _palavra(token[0])) \
+                    or (anterior[-1] in '+-' and token[0] in '+-') \
+                    or (anterior[-1] == '/' and token[0] in '/*'):
+                saida.escrever(' ')
+        saida.escrever(token, offset)
+        anterior = token
+        pendente = ''
+    return saida.texto(), saida.segmentos
+
+
+_RE_CSS = re.compile(
+    r'(?P<espaco>\s+)'
+    r'|(?P<comentario>/\*.*?\*/)'
+    r'''|(?P<texto>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|url\(\s*[^)'"]*\))'''
+    r'|(?P<outro>[^\s/"\'u{};,>]+|.)', re.S | re.I)
+
+# Sem espaço à volta destes caracteres (o "(" fica: "and (" não é "and(")
+_CSS_SOLTOS = frozenset('{};,>')
+
+def minificar_css(texto: str) -> Tuple[str, List[Tuple[int, int, int, int]]]:
+    """Remove comentários (menos os /*! */) e espaços que não contam; devolve (texto, segmentos)"""
+    saida = _Saida(texto)
+    anterior = ''
+    pendente = False
+    for m in _RE_CSS.finditer(texto):
+        tipo = m.lastgroup
+        token = m.group()
+        if tipo == 'espaco' or (tipo == 'comentario' and not token.startswith('/*!')):
+            pendente = True
+            continue
+        if token == '}' and anterior == ';':
+            # ;} -> }
+            saida.partes[-1] = saida.partes[-1][:-1]
+            saida.coluna -= 1
+        if pendente and anterior and anterior[-1] not in _CSS_SOLTOS and anterior[-1] != ':' \
+                and token[0] not in _CSS_SOLTOS:
+            saida.escrever(' ')
+        saida.escrever(token, m.start())
+        anterior = token
+        pendente = False
+    return saida.texto().strip(), saida.segmentos
+
+# =============================================
+# PACOTES
+# =============================================
+
+# Trechos [início, fim) a tirar de cada arquivo (prune_assets)
+Podas = Dict[str, Tuple[Tuple[int, int], ...]]
+
+def apagar(texto: str, trechos: Iterable[Tuple[int, int]]) -> str:
+    """Troca os trechos por espaços (as quebras de linha ficam): nenhum offset muda"""
+    partes = []
+    atual = 0
+    for inicio, fim in sorted(trechos):
+        partes.append(texto[atual:inicio])
+        partes.append(re.sub(r'[^\n]', ' ', texto[inicio:fim]))
+        atual = fim
+    partes.append(texto[atual:])
+    return ''.join(partes)
+
+def gerar(pacote: Pacote, base_dir: str, dist_dir: str, minificar: bool = True,
+          podas: Optional[Podas] = None) -> Gerado:
+    """
+    Escreve o pacote (e o .map) em dist/; o nome leva o hash do conteúdo
+
+    Os trechos de `podas` saem antes de minificar; como viram espaços, o
+    source map continua a apontar para as linhas certas da fonte.
+    """
+    partes: List[str] = []
+    segmentos: List[Segmento] = []
+    fontes = 0
+    linha = 0
+    for indice, arquivo in enumerate(pacote.arquivos):
+        with open(os.path.join(base_dir, arquivo), 'r', encoding='utf-8-sig') as f:
+            texto = f.read()
+        fontes += len(texto.encode('utf-8'))
+        if podas and podas.get(arquivo):
+            texto = apagar(texto, podas[arquivo])
+        if minificar:
+            texto, trechos = (minificar_js if pacote.tipo == 'js' else minificar_css)(texto)
+        texto = texto.rstrip('\n')
+        if not minificar:
+            trechos = [(l, 0, l, 0) for l in range(texto.count('\n') + 1)]
+        segmentos.extend((linha + l, c, indice, lo, co) for l, c, lo, co in trechos)
+        # Cada arquivo começa numa linha nova; o ";" isola o fim de um script do seguinte
+        separador = '\n;\n' if pacote.tipo == 'js' else '\n'
+        partes.append(texto + separador)
+        linha += texto.count('\n') + separador.count('\n')
+    conteudo = ''.join(partes)
+    diretorio = os.path.dirname(pacote.arquivos[0])
+    nome = f"{pacote.nome}.{hash_bytes(conteudo.encode('utf-8'))[:TAMANHO_HASH]}.{pacote.tipo}"
+    url = f"{diretorio}/{nome}" if diretorio else nome
+    comentario = f"//# sourceMappingURL={nome}.map" if pacote.tipo == 'js' else f"/*# sourceMappingURL={nome}.map */"
+    final = (conteudo + comentario + '\n').encode('utf-8')
+    mapa = {
+        'version': 3,
+        'file': nome,
+        'sources': [os.path.relpath(a, diretorio or '.').replace(os.sep, '/') for a in pacote.arquivos],
+        'names': [],
+        'mappings': mappings(segmentos),
+    }
+    destino = os.path.join(dist_dir, url)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    if not os.path.exists(destino) or os.path.getsize(destino) != len(final):
+        escrever_atomico(destino, final)
+        escrever_atomico(destino + '.map', json.dumps(mapa, separators=(',', ':')).encode('utf-8'))
+    return Gerado(pacote.nome, pacote.tipo, url, pacote.arquivos, fontes, len(final))
+
+def gerar_todos(base_dir: str, dist_dir: str, minificar: bool, anterior: Dict,
+                pacotes: Iterable[Pacote] = PACOTES, podas: Optional[Podas] = None) -> Tuple[List[Gerado], Dict, int]:
+    """
+    Gera os pacotes cujas fontes mudaram; devolve (pacotes, cache, gerados)
+
+    O cache guarda o hash das fontes de cada pacote (e dos trechos podados):
+    sem alterações (e com o arquivo ainda em dist/) nada é lido além das
+    fontes. Os pacotes antigos que deixaram de ser usados são apagados.
+    """
+    resultado: List[Gerado] = []
+    cache: Dict[str, Dict] = {}
+    gerados = 0
+    for pacote in pacotes:
+        try:
+            hashes = {}
+            for arquivo in pacote.arquivos:
+                with open(os.path.join(base_dir, arquivo), 'rb') as f:
+                    hashes[arquivo] = hash_bytes(f.read())
+        except FileNotFoundError:
+            continue
+        podado = hash_bytes(json.dumps([podas.get(a, ()) for a in pacote.arquivos]).encode('utf-8')) \
+            if podas else ''
+        entrada = anterior.get(pacote.nome)
+        if entrada and entrada['fontes'] == hashes and entrada['minificar'] == minificar \
+                and entrada.get('podado', '') == podado \
+                and os.path.exists(os.path.join(dist_dir, entrada['gerado'][2])):
+            gerado = Gerado(*entrada['gerado'][:3], tuple(entrada['gerado'][3]), *entrada['gerado'][4:])
+        else:
+            gerado = gerar(pacote, base_dir, dist_dir, minificar, podas)
+            gerados += 1
+        resultado.append(gerado)
+        cache[pacote.nome] = {'fontes': hashes, 'minificar': minificar, 'podado': podado, 'gerado': list(gerado)}
+    atuais = {g.url for g in resultado}
+    for entrada in anterior.values():
+        url = entrada['gerado'][2]
+        if url not in atuais:
+            for caminho in (url, url + '.map'):
+                try:
+                    os.remove(os.path.join(dist_dir, caminho))
+                except FileNotFoundError:
+                    pass
+    return resultado, cache, gerados
+
+# =============================================
+# PÁGINAS
+# =============================================
+
+_RE_ENTRE = re.compile(r'(?:\s|<!--.*?-->)*', re.S)
+
+def _recurso(elemento) -> Optional[Tuple[str, str]]:
+    """('js'|'css', URL) de um <script src> ou <link rel=stylesheet>"""
+    if elemento.tipo != 'abre':
+        return None
+    if elemento.tag == 'script' and elemento.attrs.get('src'):
+        return 'js', elemento.attrs['src']
+    if elemento.tag == 'link' and elemento.attrs.get('rel', '').lower() == 'stylesheet' and elemento.attrs.get('href'):
+        return 'css', elemento.attrs['href']
+    return None
+
+def _modo(elemento) -> Tuple[str, ...]:
+    return tuple(sorted(a for a in ('defer', 'async', 'type', 'media', 'nomodule') if a in elemento.attrs))
+
+def empacotar(texto: str, gerados: Iterable[Gerado]) -> Tuple[str, Counter]:
+    """
+    Troca por um pacote cada sequência completa das tags dele na página
+
+    As tags têm de estar pela ordem do pacote, com os mesmos atributos de
+    carregamento (defer, async...) e só espaços ou comentários entre elas;
+    senão a página fica como está (mudaria a ordem de execução).
+    """
+    elementos = [e for e in _Analisador(texto).elementos if e.tipo != 'comentario']
+    recursos = [(e, _recurso(e)) for e in elementos]
+    posicoes = {}
+    for i, (_, recurso) in enumerate(recursos):
+        if recurso:
+            posicoes[(recurso[0], _normalizar_url(recurso[1]))] = i
+    alteracoes: List[Tuple[int, int, str]] = []
+    contagem: Counter = Counter()
+    for gerado in gerados:
+        indices = [posicoes.get((gerado.tipo, arquivo)) for arquivo in gerado.arquivos]
+        if None in indices:
+            continue
+        tags = [recursos[i][0] for i in indices]
+        seguidas = all(b.inicio >= a.fecho and _RE_ENTRE.fullmatch(texto, a.fecho, b.inicio)
+                       for a, b in zip(tags, tags[1:]))
+        if not seguidas or len({_modo(t) for t in tags}) > 1:
+            contagem[f"{gerado.nome}: tags fora de ordem ou com modos diferentes"] += 1
+            continue
+        atributo = 'src' if gerado.tipo == 'js' else 'href'
+        alteracoes.append((tags[0].inicio, tags[0].fim,
+                           com_atributos(texto[tags[0].inicio:tags[0].fim], ((atributo, gerado.url),))))
+        for tag in tags[1:]:
+            alteracoes.append(_linha_inteira(texto, tag.inicio, tag.fecho) + ('',))
+        contagem[gerado.nome] += 1
+    partes = []
+    atual = 0
+    for inicio, fim, novo in sorted(alteracoes, key=lambda a: a[0]):
+        partes.append(texto[atual:inicio])
+        partes.append(novo)
+        atual = fim
+    partes.append(texto[atual:])
+    return ''.join(partes), contagem
+
+def recursos(texto: str, tamanho: Callable[[str], Optional[int]]) -> Tuple[int, int]:
+    """(pedidos de JS/CSS, bytes dos locais) de uma página; `tamanho(url)` dá None se não for local"""
+    pedidos = total = 0
+    for elemento in _Analisador(texto).elementos:
+        recurso = _recurso(elemento)
+        if recurso is None:
+            continue
+        pedidos += 1
+        total += tamanho(recurso[1]) or 0
+    return pedidos, total
+
+
+class Tamanhos:
+    """Bytes de um URL de JS/CSS local (pacote gerado ou arquivo do site); None se for externo"""
+
+    def __init__(self, base_dir: str, gerados: Iterable[Gerado]):
+        self.base_dir = base_dir
+        self._tamanhos: Dict[str, Optional[int]] = {g.url: g.tamanho for g in gerados}
+
+    def __call__(self, url: str) -> Optional[int]:
+        caminho = _normalizar_url(url)
+        if urlsplit(url).netloc and caminho == url.strip():
+            return None               # outro domínio (CDN)
+        if caminho not in self._tamanhos:
+            try:
+                self._tamanhos[caminho] = os.path.getsize(os.path.join(self.base_dir, caminho))
+            except OSError:
+                self._tamanhos[caminho] = None
+        return self._tamanhos[caminho]
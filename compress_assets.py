@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+COMPRESS_ASSETS.PY - Versões .gz e .br dos arquivos de dist/
+Comprime no nível máximo, em paralelo, cada arquivo de texto publicado
+(HTML, CSS, JS, JSON, SVG...) e grava o resultado ao lado dele, para o
+nginx servir com gzip_static/brotli_static em vez de comprimir a cada
+pedido. Só volta a comprimir os arquivos cujo conteúdo mudou. Usado pelo
+build_site no fim do build; sozinho, mostra a taxa e o tempo por arquivo
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from dados_io import escrever_atomico, hash_bytes
+
+try:
+    import brotli
+except ImportError:  # pip install brotli; sem ele só há .gz
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(BASE_DIR, 'dist')
+CACHE_FILE = os.path.join(BASE_DIR, '.compress-cache.json')
+
+# Os mesmos tipos do gzip_types do nginx.conf
+EXTENSOES = ('.html', '.css', '.js', '.mjs', '.json', '.map', '.svg', '.xml', '.txt', '.webmanifest')
+
+# Abaixo disto (o gzip_min_length do nginx.conf) o cabeçalho come o ganho
+MIN_BYTES = 1024
+
+NIVEL_GZIP = 9
+QUALIDADE_BROTLI = 11
+
+# Comprimir no nível máximo é caro: compensa arrancar processos cedo
+MIN_PARALELO = 4
+
+SUFIXOS = ('.gz', '.br')
+
+# =============================================
+# COMPRESSÃO
+# =============================================
+
+class Compressao(NamedTuple):
+    """Um arquivo de dist/; gzip/brotli são os bytes de cada versão (None: não compensa)"""
+    arquivo: str
+    tamanho: int
+    gzip: Optional[int]
+    brotli: Optional[int]
+    tempo_gzip: float
+    tempo_brotli: float
+    reutilizada: bool = False
+
+def _gravar(caminho: str, dados: Optional[bytes], st: os.stat_result):
+    """Grava (ou apaga, se dados é None) uma versão comprimida, com a data do original"""
+    if dados is None:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        return
+    escrever_atomico(caminho, dados)
+    # O nginx usa a data do .gz/.br no Last-Modified: tem de ser a do original
+    os.utime(caminho, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+def _comprimir_em_processo(tarefa) -> Tuple[str, str, int, Optional[int], Optional[int], float, float, bool]:
+    """Comprime um arquivo se o hash mudou; devolve (relativo, hash, tamanho, gz, br, tempos, comprimido)"""
+    dist_dir, relativo, anterior, nivel, qualidade = tarefa
+    caminho = os.path.join(dist_dir, relativo)
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    atual = hash_bytes(dados)
+    if anterior and anterior[2] == atual \
+            and all((n is None) != os.path.exists(caminho + sufixo) for n, sufixo in zip(anterior[3:5], SUFIXOS)):
+        # Mesmo conteúdo gravado de novo: as versões só precisam da nova data
+        st = os.stat(caminho)
+        for n, sufixo in zip(anterior[3:5], SUFIXOS):
+            if n is not None:
+                os.utime(caminho + sufixo, ns=(st.st_atime_ns, st.st_mtime_ns))
+        return relativo, atual, len(dados), anterior[3], anterior[4], anterior[5], anterior[6], False
+
+    st = os.stat(caminho)
+    marca = time.perf_counter()
+    gz = gzip.compress(dados, compresslevel=nivel, mtime=0)
+    tempo_gzip = time.perf_counter() - marca
+    gz = gz if len(gz) < len(dados) else None
+    _gravar(caminho + '.gz', gz, st)
+
+    br = None
+    tempo_brotli = 0.0
+    if brotli is not None and qualidade is not None:
+        marca = time.perf_counter()
+        br = brotli.compress(dados, mode=brotli.MODE_TEXT, quality=qualidade)
+        tempo_brotli = time.perf_counter() - marca
+        br = br if len(br) < len(dados) else None
+    _gravar(caminho + '.br', br, st)
+    return (relativo, atual, len(dados), len(gz) if gz else None, len(br) if br else None,
+            tempo_gzip, tempo_brotli, True)
+
+def compressiveis(dist_dir: str, extensoes: Tuple[str, ...] = EXTENSOES) -> List[str]:
+    """Arquivos de dist_dir (relativos) que vale a pena comprimir"""
+    arquivos = []
+    for diretorio, subdirs, nomes in os.walk(dist_dir):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith('.'))
+        for nome in sorted(nomes):
+            caminho = os.path.join(diretorio, nome)
+            if nome.endswith(extensoes) and not nome.startswith('.') and os.path.getsize(caminho) >= MIN_BYTES:
+                arquivos.append(os.path.relpath(caminho, dist_dir))
+    return arquivos
+
+def _orfaos(dist_dir: str, atuais: Iterable[str], anterior: Dict) -> List[str]:
+    """
+    Versões comprimidas sem original atual: as que o cache conhece e as de
+    arquivos de texto que já não existem (um .tar.gz publicado fica)
+    """
+    atuais = set(atuais)
+    orfaos = [r + s for r in anterior if r not in atuais for s in SUFIXOS]
+    for diretorio, subdirs, nomes in os.walk(dist_dir):
+        subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+        for nome in nomes:
+            original, sufixo = os.path.splitext(nome)
+            if sufixo in SUFIXOS and original.endswith(EXTENSOES) \
+                    and not os.path.exists(os.path.join(diretorio, original)):
+                orfaos.append(os.path.relpath(os.path.join(diretorio, nome), dist_dir))
+    return orfaos
+
+def comprimir(dist_dir: str, anterior: Dict, jobs: Optional[int] = None, nivel: int = NIVEL_GZIP,
+              qualidade: Optional[int] = QUALIDADE_BROTLI,
+              extensoes: Tuple[str, ...] = EXTENSOES) -> Tuple[List[Compressao], Dict]:
+    """
+    Grava os .gz/.br que faltam ou estão desatualizados; devolve (arquivos, cache)
+
+    O cache guarda, por arquivo, tamanho, data e hash do original e o
+    tamanho de cada versão: com tamanho e data iguais (e as versões ainda
+    lá) o arquivo nem é lido; com o mesmo hash não é comprimido. Outro
+    nível ou o brotli instalado/desinstalado obrigam a comprimir tudo.
+    As versões de arquivos que deixaram de existir são apagadas; com
+    `extensoes=()` apagam-se todas.
+    """
+    qualidade = qualidade if brotli is not None else None
+    entradas = anterior.get('arquivos', {}) if anterior.get('niveis') == [nivel, qualidade] else {}
+    atuais = compressiveis(dist_dir, extensoes) if extensoes else []
+
+    resultado: Dict[str, Compressao] = {}
+    cache: Dict[str, list] = {}
+    tarefas = []
+    for relativo in atuais:
+        st = os.stat(os.path.join(dist_dir, relativo))
+        entrada = entradas.get(relativo)
+        if entrada and entrada[0] == st.st_size and entrada[1] == st.st_mtime_ns \
+                and all((n is None) != os.path.exists(os.path.join(dist_dir, relativo + s))
+                        for n, s in zip(entrada[3:5], SUFIXOS)):
+            cache[relativo] = entrada
+            resultado[relativo] = Compressao(relativo, entrada[0], *entrada[3:7], reutilizada=True)
+            continue
+        tarefas.append((st.st_size, (dist_dir, relativo, entrada, nivel, qualidade)))
+    # Os maiores primeiro: nenhum processo fica com um arquivo grande no fim
+    tarefas = [t for _, t in sorted(tarefas, key=lambda t: -t[0])]
+
+    if len(tarefas) >= MIN_PARALELO and (jobs or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            feitos = list(pool.map(_comprimir_em_processo, tarefas))
+    else:
+        feitos = [_comprimir_em_processo(t) for t in tarefas]
+
+    for relativo, atual, tamanho, gz, br, tempo_gzip, tempo_brotli, comprimido in feitos:
+        st = os.stat(os.path.join(dist_dir, relativo))
+        cache[relativo] = [st.st_size, st.st_mtime_ns, atual, gz, br, tempo_gzip, tempo_brotli]
+        resultado[relativo] = Compressao(relativo, tamanho, gz, br, tempo_gzip, tempo_brotli,
+                                         reutilizada=not comprimido)
+
+    for relativo in _orfaos(dist_dir, atuais, anterior.get('arquivos', {})):
+        try:
+            os.remove(os.path.join(dist_dir, relativo))
+        except FileNotFoundError:
+            pass
+    return [resultado[r] for r in atuais], {'niveis': [nivel, qualidade], 'arquivos': cache} if atuais else {}
+
+def config_nginx(com_brotli: bool = brotli is not None) -> str:
+    """Diretivas do nginx que servem as versões gravadas por comprimir()"""
+    linhas = ["# Versões .gz/.br gravadas pelo compress_assets.py ao lado de cada arquivo",
+              "gzip_static on;"]
+    if com_brotli:
+        linhas.append("brotli_static on;   # módulo ngx_brotli")
+    return '\n'.join(linhas) + '\n'
+
+# =============================================
+# RELATÓRIO
+# =============================================
+
+def _taxa(comprimido: Optional[int], tamanho: int) -> str:
+    return f"{comprimido / 1024:.1f}KB ({1 - comprimido / tamanho:.0%})" if comprimido else '-'
+
+def totais(arquivos: Iterable[Compressao]) -> Tuple[int, int, int, float, int]:
+    """(bytes originais, bytes .gz, bytes .br, segundos de CPU, comprimidos agora)"""
+    original = gz = br = 0
+    tempo = 0.0
+    novos = 0
+    for c in arquivos:
+        original += c.tamanho
+        gz += c.gzip or c.tamanho
+        br += c.brotli or c.gzip or c.tamanho
+        if not c.reutilizada:
+            tempo += c.tempo_gzip + c.tempo_brotli
+            novos += 1
+    return original, gz, br, tempo, novos
+
+def imprimir(arquivos: List[Compressao], todos: bool = False):
+    """Taxa e tempo por arquivo (com `todos`, também os que não mudaram) e o total"""
+    for c in sorted(arquivos, key=lambda c: -c.tamanho):
+        if c.reutilizada and not todos:
+            continue
+        marca = '  ' if c.reutilizada else '🗜️ '
+        print(f"{marca} {c.arquivo}: {c.tamanho / 1024:.1f}KB -> gz {_taxa(c.gzip, c.tamanho)} "
+              f"{c.tempo_gzip * 1000:.0f}ms, br {_taxa(c.brotli, c.tamanho)} {c.tempo_brotli * 1000:.0f}ms")
+    original, gz, br, tempo, novos = totais(arquivos)
+    if not original:
+        print("⚠️  Nada a comprimir")
+        return
+    print(f"\n📦 {len(arquivos)} arquivos ({novos} comprimidos agora, {tempo * 1000:.0f}ms de CPU): "
+          f"{original / 1024:.1f}KB -> gz {gz / 1024:.1f}KB ({1 - gz / original:.0%})"
+          + (f", br {br / 1024:.1f}KB ({1 - br / original:.0%})" if brotli is not None else ''))
+    if brotli is None:
+        print("⚠️  Sem o módulo brotli (pip install brotli): só foram gravados os .gz")
+
+def comparar_niveis(dist_dir: str):
+    """Bytes e tempo do dist/ inteiro em cada nível do gzip e do brotli (nada é gravado)"""
+    dados = []
+    for relativo in compressiveis(dist_dir):
+        with open(os.path.join(dist_dir, relativo), 'rb') as f:
+            dados.append(f.read())
+    original = sum(len(d) for d in dados)
+    print(f"📊 {len(dados)} arquivos, {original / 1024:.1f}KB")
+    niveis = [('gzip', n, lambda d, n=n: gzip.compress(d, compresslevel=n, mtime=0)) for n in range(1, 10)]
+    if brotli is not None:
+        niveis += [('brotli', q, lambda d, q=q: brotli.compress(d, mode=brotli.MODE_TEXT, quality=q))
+                   for q in range(0, 12)]
+    for formato, nivel, funcao in niveis:
+        marca = time.perf_counter()
+        total = sum(min(len(funcao(d)), len(d)) for d in dados)
+        print(f"   {formato} {nivel:2d}: {total / 1024:8.1f}KB ({1 - total / original:.1%}) "
+              f"em {(time.perf_counter() - marca) * 1000:.0f}ms")
+
+# =============================================
+# MAIN
+# =============================================
+
+def _ler_cache(caminho: str) -> Dict:
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def main(argv: Optional[List[str]] = None):
+    """Comprime dist/ (ou outro diretório) e mostra taxa e tempo por arquivo"""
+    parser = argparse.ArgumentParser(description="Versões .gz/.br dos arquivos publicados")
+    parser.add_argument('diretorio', nargs='?', default=DIST_DIR, help="Padrão: dist/")
+    parser.add_argument('--jobs', type=int, help="Processos (padrão: um por CPU)")
+    parser.add_argument('--nivel-gzip', type=int, default=NIVEL_GZIP, choices=range(1, 10), metavar='1-9')
+    parser.add_argument('--qualidade-brotli', type=int, default=QUALIDADE_BROTLI, choices=range(0, 12),
+                        metavar='0-11')
+    parser.add_argument('--todos', action='store_true', help="Lista também os arquivos que não mudaram")
+    parser.add_argument('--sem-cache', action='store_true', help="Comprime tudo de novo")
+    parser.add_argument('--niveis', action='store_true', help="Compara os níveis (bytes x tempo), sem gravar")
+    parser.add_argument('--nginx', action='store_true', help="Mostra as diretivas do nginx")
+    args = parser.parse_args(argv)
+
+    if args.nginx:
+        print(config_nginx(), end='')
+        return
+    if args.niveis:
+        comparar_niveis(args.diretorio)
+        return
+    anterior = {} if args.sem_cache else _ler_cache(CACHE_FILE).get(os.path.abspath(args.diretorio), {})
+    arquivos, cache = comprimir(args.diretorio, anterior, args.jobs, args.nivel_gzip, args.qualidade_brotli)
+    conteudo = _ler_cache(CACHE_FILE)
+    conteudo[os.path.abspath(args.diretorio)] = cache
+    escrever_atomico(CACHE_FILE, json.dumps(conteudo, separators=(',', ':')).encode('utf-8'))
+    imprimir(arquivos, args.todos)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,742 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CRITICAL_CSS.PY - CSS crítico de cada página
+Separa da folha de estilos as regras que estilizam o que aparece sem
+scroll (cabeçalho e primeiros blocos do <main>, mais as classes que o
+ui.js/app.js põem nesses blocos) e coloca-as inline no <head>; a folha
+completa passa a carregar sem bloquear a renderização. Usado pelo
+build_site; sozinho, mostra os bytes de CSS crítico de cada página
+"""
+
+import argparse
+import glob
+import json
+import os
+import posixpath
+import re
+import sys
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from bundle_assets import minificar_css
+from rewrite_html import _Analisador, _normalizar_url, com_atributos
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Blocos do <main> que contam como visíveis sem scroll (o page-header das
+# listagens é baixo: a grelha logo a seguir também aparece)
+DOBRA = 2
+
+# Acima disto o build falha: comprimido (~5KB), o CSS inline tem de caber
+# com o HTML nos primeiros 14KB da resposta (a primeira janela do TCP)
+ORCAMENTO = 20 * 1024
+
+# Scripts que criam elementos ou mudam classes depois de a página abrir
+SCRIPTS_CLASSES = ('js/ui.js', 'js/app.js')
+
+# Só acontecem depois de a página aparecer: não contam para o CSS crítico
+INTERACAO = frozenset({'hover', 'focus', 'focus-visible', 'focus-within', 'active', 'visited', 'target'})
+
+# At-rules com regras dentro (as outras, como @keyframes, são um bloco só)
+AGRUPADORES = ('@media', '@supports', '@container', '@layer', '@document')
+
+# Vazios por natureza, não à espera de um script
+CAMPOS = frozenset({'textarea', 'select', 'iframe', 'canvas', 'video', 'audio', 'object'})
+
+VAZIOS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+                    'source', 'track', 'wbr'})
+
+# =============================================
+# FOLHA DE ESTILOS
+# =============================================
+
+class Regra(NamedTuple):
+    prelude: str                             # seletores, ou a linha do @
+    corpo: Optional[str]                     # declarações; None num @import/@charset
+    filhas: Optional[Tuple['Regra', ...]]    # @media/@supports: as regras de dentro
+    inicio: int = 0                          # [inicio, fim) no texto da folha
+    fim: int = 0
+
+Token = Tuple[str, int]
+
+_RE_TOKEN_CSS = re.compile(r'''/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[{};]|[^{};/"']+|/''', re.S)
+_RE_URL = re.compile(r'''url\(\s*(["']?)([^"')]+)\1\s*\)''')
+
+def _bloco(tokens: List[Token], i: int) -> Tuple[List[Regra], int]:
+    regras: List[Regra] = []
+    prelude: List[Token] = []
+    while i < len(tokens):
+        token, offset = tokens[i]
+        i += 1
+        if token == '}':
+            break
+        inicio = next((o + len(t) - len(t.lstrip()) for t, o in prelude if t.strip()), offset)
+        if token == ';':
+            linha = ''.join(t for t, _ in prelude).strip()
+            if linha:
+                regras.append(Regra(linha, None, None, inicio, offset + 1))
+            prelude = []
+        elif token == '{':
+            cabeca = ' '.join(''.join(t for t, _ in prelude).split())
+            prelude = []
+            if cabeca.lower().startswith(AGRUPADORES):
+                filhas, i = _bloco(tokens, i)
+                regras.append(Regra(cabeca, '', tuple(filhas), inicio, _fim(tokens, i)))
+            else:
+                corpo, i = _corpo(tokens, i)
+                regras.append(Regra(cabeca, corpo, None, inicio, _fim(tokens, i)))
+        else:
+            prelude.append((token, offset))
+    return regras, i
+
+def _fim(tokens: List[Token], i: int) -> int:
+    """Offset a seguir à } que acabou de fechar um bloco (tokens[i - 1])"""
+    return tokens[i - 1][1] + 1
+
+def _corpo(tokens: List[Token], i: int) -> Tuple[str, int]:
+    """Texto até à } do bloco (com os blocos de dentro, como os passos de um @keyframes)"""
+    nivel = 0
+    partes = []
+    while i < len(tokens):
+        token, _ = tokens[i]
+        i += 1
+        if token == '{':
+            nivel += 1
+        elif token == '}':
+            if nivel == 0:
+                break
+            nivel -= 1
+        partes.append(token)
+    return ''.join(partes).strip(), i
+
+def analisar_css(texto: str, diretorio: str = '') -> List[Regra]:
+    """
+    Regras de uma folha de estilos, sem os comentários
+
+    Os url() relativos passam a ser relativos à raiz do site (a folha estava
+    em `diretorio`), porque inline contam a partir da página.
+    """
+    def rebase(m: re.Match) -> str:
+        url = m.group(2).strip()
+        if urlsplit(url).scheme or url.startswith(('/', '#')):
+            return m.group()
+        return f"url({m.group(1)}{posixpath.normpath(posixpath.join(diretorio, url))}{m.group(1)})"
+
+    tokens = [(m.group(), m.start()) for m in _RE_TOKEN_CSS.finditer(texto) if not m.group().startswith('/*')]
+    regras, _ = _bloco(tokens, 0)
+    if not diretorio:
+        return regras
+    return _com_urls(regras, rebase)
+
+def _com_urls(regras: Iterable[Regra], rebase: Callable[[re.Match], str]) -> List[Regra]:
+    saida = []
+    for regra in regras:
+        if regra.filhas is not None:
+            regra = regra._replace(filhas=tuple(_com_urls(regra.filhas, rebase)))
+        elif regra.corpo:
+            regra = regra._replace(corpo=_RE_URL.sub(rebase, regra.corpo))
+        saida.append(regra)
+    return saida
+
+def texto_css(regras: Iterable[Regra]) -> str:
+    partes = []
+    for regra in regras:
+        if regra.filhas is not None:
+            partes.append(f"{regra.prelude} {{\n{texto_css(regra.filhas)}}}\n")
+        elif regra.corpo is None:
+            partes.append(f"{regra.prelude};\n")
+        else:
+            partes.append(f"{regra.prelude} {{ {regra.corpo} }}\n")
+    return ''.join(partes)
+
+def contar(regras: Iterable[Regra]) -> int:
+    return sum(contar(r.filhas) if r.filhas is not None else 1 for r in regras)
+
+# =============================================
+# SELETORES
+# =============================================
+
+class Composto(NamedTuple):
+    combinador: str              # ' ', '>', '+' ou '~' com o anterior ('' no primeiro)
+    tag: str                     # '' = qualquer
+    ids: Tuple[str, ...]
+    classes: Tuple[str, ...]
+    atributos: Tuple[str, ...]   # só conta se o atributo existe
+
+_RE_SIMPLES = re.compile(r'''
+    (?P<comb>\s*[>+~]\s*|\s+)
+  | (?P<tag>[a-zA-Z][\w-]*|\*)
+  | \#(?P<id>(?:[\w-]|\\.)+)
+  | \.(?P<classe>(?:[\w-]|\\.)+)
+  | \[\s*(?P<atributo>[\w-]+)[^\]]*\]
+  | ::?(?P<pseudo>[\w-]+)(?:\((?:[^()]|\([^()]*\))*\))?
+''', re.X)
+
+def _sem_escapes(nome: str) -> str:
+    return re.sub(r'\\(.)', r'\1', nome)
+
+def dividir(seletores: str) -> List[str]:
+    """Lista de seletores separados por vírgulas (fora de parênteses e colchetes)"""
+    partes = []
+    nivel = 0
+    atual = 0
+    for i, c in enumerate(seletores):
+        if c in '([':
+            nivel += 1
+        elif c in ')]':
+            nivel -= 1
+        elif c == ',' and nivel == 0:
+            partes.append(seletores[atual:i].strip())
+            atual = i + 1
+    partes.append(seletores[atual:].strip())
+    return [p for p in partes if p]
+
+def compostos(seletor: str, pintura: bool = False) -> Optional[List[Composto]]:
+    """
+    Seletor partido nos compostos; None se não o souber ler (conta como usado)
+
+    Pseudo-classes e pseudo-elementos não restringem nada (::before existe
+    se o elemento existir, :first-child não se verifica); :root é o <html>.
+    Com `pintura`, as de INTERACAO dão [] (nunca na primeira pintura).
+    """
+    partes: List[Composto] = []
+    combinador = ''
+    tag = ''
+    ids: List[str] = []
+    classes: List[str] = []
+    atributos: List[str] = []
+    vazio = True
+    posicao = 0
+    seletor = seletor.strip()
+    while posicao < len(seletor):
+        m = _RE_SIMPLES.match(seletor, posicao)
+        if not m:
+            return None
+        posicao = m.end()
+        if m.group('comb') is not None:
+            if not vazio:
+                partes.append(Composto(combinador, tag, tuple(ids), tuple(classes), tuple(atributos)))
+                tag, ids, classes, atributos, vazio = '', [], [], [], True
+            combinador = m.group('comb').strip() or ' '
+            continue
+        vazio = False
+        if m.group('tag'):
+            tag = '' if m.group('tag') == '*' else m.group('tag').lower()
+        elif m.group('id'):
+            ids.append(_sem_escapes(m.group('id')))
+        elif m.group('classe'):
+            classes.append(_sem_escapes(m.group('classe')))
+        elif m.group('atributo'):
+            atributos.append(m.group('atributo').lower())
+        elif m.group('pseudo').lower() == 'root':
+            tag = 'html'
+        elif pintura and m.group('pseudo').lower() in INTERACAO and not m.group().startswith('::'):
+            return []
+    if not vazio or not partes:
+        partes.append(Composto(combinador if partes else '', tag, tuple(ids), tuple(classes), tuple(atributos)))
+    return partes
+
+# =============================================
+# CLASSES DOS SCRIPTS
+# =============================================
+
+class ClassesJS(NamedTuple):
+    marcacao: FrozenSet[str]     # class="..." dos elementos criados
+    prefixos: Tuple[str, ...]    # `toast-${tipo}` -> 'toast-'
+    estados: FrozenSet[str]      # classList.add/toggle em elementos que já existem
+
+_RE_LITERAL = re.compile(r'''(["'`])((?:\\.|(?!\1).)*?)\1''', re.S)
+_RE_ATRIBUTO_CLASSE = re.compile(r'''\bclass\s*=\s*\\?(["'])''')
+_RE_CLASS_NAME = re.compile(r'''\.className\s*=\s*([^;\n]+)''')
+_RE_CLASS_LIST = re.compile(r'''\.classList\.(?:add|toggle|replace)\s*\(([^)]*)\)''')
+_RE_NOME_CLASSE = re.compile(r'-?[_a-zA-Z][\w-]*')
+
+def _expressao(texto: str, inicio: int) -> int:
+    """Fim do ${...} que começa em `inicio` (a seguir ao ${)"""
+    nivel = 1
+    i = inicio
+    while i < len(texto) and nivel:
+        if texto[i] == '{':
+            nivel += 1
+        elif texto[i] == '}':
+            nivel -= 1
+        i += 1
+    return i
+
+def _valor(texto: str, inicio: int, aspas: str) -> Tuple[List[str], List[str]]:
+    """(nomes, expressões ${}) de um valor até às `aspas`; o nome colado a um ${ fica com '*' no fim"""
+    nomes: List[str] = []
+    expressoes: List[str] = []
+    trecho = []
+    i = inicio
+    while i < len(texto) and texto[i] != aspas and texto[i] != '\n':
+        if texto.startswith('${', i):
+            fim = _expressao(texto, i + 2)
+            expressoes.append(texto[i + 2:fim - 1])
+            antes = ''.join(trecho).replace('\\', '')
+            palavras = antes.split()
+            if palavras and not antes[-1:].isspace():
+                palavras[-1] += '*'
+            nomes.extend(palavras)
+            trecho = []
+            i = fim
+            continue
+        trecho.append(texto[i])
+        i += 1
+    nomes.extend(''.join(trecho).replace('\\', '').split())
+    return nomes, expressoes
+
+def _literais(expressao: str) -> List[str]:
+    """Nomes de classe nos literais de uma expressão JS (`a ? 'x' : 'y'`)"""
+    nomes = []
+    for m in _RE_LITERAL.finditer(expressao):
+        if m.group(1) == '`':
+            palavras, internas = _valor(m.group(2), 0, '`')
+            nomes.extend(palavras)
+            for interna in internas:
+                nomes.extend(_literais(interna))
+        else:
+            nomes.extend(m.group(2).split())
+    return nomes
+
+def _classes(texto: str) -> ClassesJS:
+    """Classes que um trecho de JS põe nos elementos"""
+    marcacao: Set[str] = set()
+    estados: Set[str] = set()
+    for m in _RE_ATRIBUTO_CLASSE.finditer(texto):
+        nomes, expressoes = _valor(texto, m.end(), m.group(1))
+        marcacao.update(nomes)
+        for expressao in expressoes:
+            marcacao.update(_literais(expressao))
+    for m in _RE_CLASS_NAME.finditer(texto):
+        marcacao.update(_literais(m.group(1)))
+    for m in _RE_CLASS_LIST.finditer(texto):
+        estados.update(_literais(m.group(1)))
+    validos = {n for n in marcacao | estados if _RE_NOME_CLASSE.fullmatch(n.rstrip('*'))}
+    return ClassesJS(frozenset(n for n in validos & marcacao if not n.endswith('*')),
+                     tuple(sorted(n[:-1] for n in validos if n.endswith('*'))),
+                     frozenset(n for n in validos & estados if not n.endswith('*')))
+
+# function nome( no início da linha: as funções globais que as páginas chamam
+_RE_FUNCAO = re.compile(r'^(?:async\s+)?function\s*\*?\s*([\w$]+)\s*\(', re.M)
+_RE_CHAMADA = re.compile(r'([\w$]+)\s*\(')
+
+class Scripts:
+    """
+    Classes que os scripts põem nos elementos da página
+
+    Um contentor (pelo id) recebe o que criam as funções que o procuram
+    (getElementById('x'), querySelector('#x')...) e as que elas chamam; as
+    classes de estado (classList.add/toggle) podem aparecer em qualquer
+    elemento.
+    """
+
+    def __init__(self, base_dir: str = BASE_DIR, arquivos: Iterable[str] = SCRIPTS_CLASSES):
+        self.funcoes: Dict[str, str] = {}     # nome -> código (o de fora das funções fica em '')
+        self.fontes: List[str] = []
+        globais = []
+        for arquivo in arquivos:
+            try:
+                with open(os.path.join(base_dir, arquivo), 'r', encoding='utf-8') as f:
+                    texto = f.read()
+            except FileNotFoundError:
+                continue
+            self.fontes.append(arquivo)
+            inicios = list(_RE_FUNCAO.finditer(texto))
+            globais.append(texto[:inicios[0].start()] if inicios else texto)
+            for m, seguinte in zip(inicios, inicios[1:] + [None]):
+                self.funcoes[m.group(1)] = texto[m.start():seguinte.start() if seguinte else len(texto)]
+        self.funcoes[''] = '\n'.join(globais)
+        self.estados = frozenset().union(*(_classes(codigo).estados for codigo in self.funcoes.values()))
+        self._contentores: Dict[str, Optional[ClassesJS]] = {}
+
+    def _alcancaveis(self, nomes: Iterable[str]) -> Set[str]:
+        vistas: Set[str] = set()
+        pendentes = list(nomes)
+        while pendentes:
+            nome = pendentes.pop()
+            if nome in vistas:
+                continue
+            vistas.add(nome)
+            pendentes.extend(m.group(1) for m in _RE_CHAMADA.finditer(self.funcoes[nome])
+                             if m.group(1) in self.funcoes and m.group(1) not in vistas)
+        return vistas
+
+    def contentor(self, id: str) -> Optional[ClassesJS]:
+        """Classes do que os scripts criam dentro do #id; None se nenhum script o procura"""
+        if id not in self._contentores:
+            referencia = re.compile(r'["\'`]#?' + re.escape(id) + r'["\'`]')
+            usam = [nome for nome, codigo in self.funcoes.items() if referencia.search(codigo)]
+            if not usam:
+                self._contentores[id] = None
+            else:
+                codigo = '\n'.join(self.funcoes[n] for n in sorted(self._alcancaveis(usam)))
+                self._contentores[id] = _classes(codigo)._replace(estados=self.estados)
+        return self._contentores[id]
+
+# =============================================
+# PÁGINA
+# =============================================
+
+class No:
+    """Elemento da página; os virtuais são o que um script pode criar dentro de um contentor vazio"""
+
+    __slots__ = ('tag', 'id', 'classes', 'atributos', 'pai', 'anterior', 'js')
+
+    def __init__(self, tag: str, attrs: Dict[str, str], pai: Optional['No'], anterior: Optional['No'],
+                 js: Optional[ClassesJS] = None):
+        self.tag = tag
+        self.id = attrs.get('id', '')
+        self.classes = frozenset(attrs.get('class', '').split())
+        self.atributos = frozenset(attrs)
+        self.pai = pai
+        self.anterior = anterior
+        self.js = js              # virtual: as classes que os scripts lhe podem dar
+
+    @property
+    def virtual(self) -> bool:
+        return self.js is not None
+
+_RE_VAZIO = re.compile(r'(?:\s|<!--.*?-->)*', re.S)
+
+def dobra(texto: str, scripts: Scripts, blocos: int = DOBRA) -> List[No]:
+    """
+    Elementos visíveis sem scroll: o <body> até ao fim do n.º `blocos` filho do <main>
+
+    Um elemento do <main> com id, sem nada dentro e que algum script procura
+    é preenchido por ele: ganha um filho virtual (os do cabeçalho, como o mini carrinho,
+    só se enchem depois de um clique). Sem <main>, conta a página toda.
+    """
+    nos: List[No] = []
+    pilha: List[Tuple[No, object, List[No]]] = []    # (nó, elemento de abertura, filhos)
+    no_body = False
+    main: Optional[No] = None
+    no_main = False
+    for elemento in _Analisador(texto).elementos:
+        if elemento.tipo == 'abre':
+            tag = elemento.tag
+            if tag == 'body':
+                no_body = True
+            pai, _, filhos = pilha[-1] if pilha else (None, None, [])
+            if main is not None and pai is main and len(filhos) >= blocos:
+                break
+            no = No(tag, elemento.attrs, pai, filhos[-1] if filhos else None)
+            filhos.append(no)
+            if no_body or tag == 'html':
+                nos.append(no)
+            if tag == 'main' and main is None:
+                main = no
+                no_main = True
+            if tag not in VAZIOS and tag not in ('script', 'style'):
+                pilha.append((no, elemento, []))
+        elif elemento.tipo == 'fecha':
+            for i in range(len(pilha) - 1, -1, -1):
+                if pilha[i][0].tag == elemento.tag:
+                    no, abertura, filhos = pilha[i]
+                    if not filhos and no.id and no_main and no.tag not in CAMPOS \
+                            and _RE_VAZIO.fullmatch(texto, abertura.fim, elemento.inicio):
+                        js = scripts.contentor(no.id)
+                        if js is not None:
+                            nos.append(No('', {}, no, None, js))
+                    del pilha[i:]
+                    no_main = no_main and no is not main
+                    break
+    return nos
+
+def _classe_js(classe: str, js: ClassesJS) -> bool:
+    return classe in js.marcacao or classe in js.estados or classe.startswith(js.prefixos)
+
+def _casa_composto(composto: Composto, no: No, estados: FrozenSet[str]) -> bool:
+    if no.js is not None:
+        return not composto.ids and all(_classe_js(c, no.js) for c in composto.classes)
+    if composto.tag and composto.tag != no.tag:
+        return False
+    if any(i != no.id for i in composto.ids):
+        return False
+    if any(a not in no.atributos for a in composto.atributos):
+        return False
+    return all(c in no.classes or c in estados for c in composto.classes)
+
+def _vizinhos(no: No, combinador: str) -> Iterable[No]:
+    """Onde procurar o composto anterior (um virtual pode estar dentro/ao lado de outro)"""
+    if no.virtual:
+        yield no
+    if combinador in ('>', ' '):
+        pai = no.pai
+        while pai is not None:
+            yield pai
+            if combinador == '>':
+                break
+            pai = pai.pai
+    else:
+        irmao = no.anterior
+        while irmao is not None:
+            yield irmao
+            if combinador == '+':
+                break
+            irmao = irmao.anterior
+
+def _casa(partes: List[Composto], i: int, no: No, estados: FrozenSet[str]) -> bool:
+    if not _casa_composto(partes[i], no, estados):
+        return False
+    if i == 0:
+        return True
+    return any(_casa(partes, i - 1, outro, estados) for outro in _vizinhos(no, partes[i].combinador))
+
+class _Usados:
+    """Que seletores apanham algum elemento da dobra (com memória por seletor)"""
+
+    def __init__(self, nos: List[No], estados: FrozenSet[str]):
+        self.nos = nos
+        self.estados = estados
+        self.tags = {n.tag for n in nos}
+        self.ids = {n.id for n in nos}
+        self.classes = set().union(*(n.classes for n in nos)) | estados
+        self.virtuais = [n.js for n in nos if n.js is not None]
+        self._memo: Dict[str, bool] = {}
+
+    def _possivel(self, composto: Composto) -> bool:
+        """Descarta depressa: cada tag/id/classe exigida existe em algum elemento?"""
+        if not composto.ids and any(all(_classe_js(c, js) for c in composto.classes) for js in self.virtuais):
+            return True
+        return ((not composto.tag or composto.tag in self.tags)
+                and all(i in self.ids for i in composto.ids)
+                and all(c in self.classes for c in composto.classes))
+
+    def __call__(self, seletor: str) -> bool:
+        if seletor not in self._memo:
+            partes = compostos(seletor, pintura=True)
+            if partes is None:
+                usado = True
+            elif not partes or not all(self._possivel(p) for p in partes):
+                usado = False
+            else:
+                usado = any(_casa(partes, len(partes) - 1, no, self.estados) for no in self.nos)
+            self._memo[seletor] = usado
+        return self._memo[seletor]
+
+# =============================================
+# EXTRAÇÃO
+# =============================================
+
+class Critico(NamedTuple):
+    css: str
+    regras: int        # regras copiadas
+    total: int         # regras da folha
+
+    @property
+    def tamanho(self) -> int:
+        return len(self.css.encode('utf-8'))
+
+_RE_ANIMACAO = re.compile(r'animation(?:-name)?\s*:\s*([^;]+)', re.I)
+_RE_FONTE = re.compile(r'font(?:-family)?\s*:\s*([^;]+)', re.I)
+
+def _nome_at(prelude: str) -> str:
+    partes = prelude.split(None, 1)
+    return partes[1].strip(' "\'') if len(partes) > 1 else ''
+
+def filtrar(regras: Iterable[Regra], usado: Callable[[str], bool], nomes: Set[str],
+            copiadas: List[Regra], outras: bool = False) -> List[Regra]:
+    """
+    Regras com algum seletor `usado` (só com esses seletores), e os
+    @keyframes/@font-face com o nome em `nomes`; as copiadas vão para
+    `copiadas`. As outras at-rules (@import, @page...) só com `outras`.
+    """
+    saida = []
+    for regra in regras:
+        if regra.filhas is not None:
+            filhas = filtrar(regra.filhas, usado, nomes, copiadas, outras)
+            if filhas:
+                saida.append(regra._replace(filhas=tuple(filhas)))
+        elif regra.prelude.startswith('@'):
+            tipo = regra.prelude.split(None, 1)[0].lower()
+            if tipo.endswith('keyframes'):
+                if _nome_at(regra.prelude) in nomes:
+                    saida.append(regra)
+            elif tipo == '@font-face' and regra.corpo:
+                familia = _RE_FONTE.search(regra.corpo)
+                if familia and familia.group(1).strip(' "\'').lower() in nomes:
+                    saida.append(regra)
+            elif tipo == '@charset' or outras:
+                saida.append(regra)
+        else:
+            seletores = [s for s in dividir(regra.prelude) if usado(s)]
+            if seletores:
+                copia = regra._replace(prelude=', '.join(seletores))
+                saida.append(copia)
+                copiadas.append(copia)
+    return saida
+
+def referidos(regras: Iterable[Regra]) -> Set[str]:
+    """Nomes de animações e famílias de fontes (minúsculas) que as regras usam"""
+    nomes: Set[str] = set()
+    for regra in regras:
+        for m in _RE_ANIMACAO.finditer(regra.corpo or ''):
+            nomes.update(m.group(1).replace(',', ' ').split())
+        for m in _RE_FONTE.finditer(regra.corpo or ''):
+            nomes.update(f.strip(' "\'').lower() for f in m.group(1).split(','))
+    return nomes
+
+def extrair(regras: List[Regra], nos: List[No], scripts: Scripts, minificar: bool = True) -> Critico:
+    """Regras (só com os seletores que apanham algum elemento) que a dobra precisa"""
+    usado = _Usados(nos, scripts.estados)
+    copiadas: List[Regra] = []
+    filtrar(regras, usado, set(), copiadas)
+    # @keyframes e @font-face das regras copiadas; @import bloqueia como um
+    # <link>, por isso vai com a folha completa
+    nomes = referidos(copiadas)
+    copiadas = []
+    criticas = filtrar(regras, usado, nomes, copiadas)
+    css = texto_css(criticas)
+    if minificar:
+        css, _ = minificar_css(css)
+    return Critico(css, len(copiadas), contar(regras))
+
+class Folhas:
+    """Folhas de estilos já lidas, por URL; `ler(url)` dá o texto ou None se não for local"""
+
+    def __init__(self, ler: Callable[[str], Optional[str]]):
+        self.ler = ler
+        self.lidas: List[str] = []
+        self._regras: Dict[str, Optional[List[Regra]]] = {}
+
+    def __call__(self, url: str) -> Optional[List[Regra]]:
+        caminho = _normalizar_url(url)
+        if caminho not in self._regras:
+            texto = None if urlsplit(caminho).netloc else self.ler(caminho)
+            if texto is not None:
+                self.lidas.append(caminho)
+            self._regras[caminho] = None if texto is None else analisar_css(texto, posixpath.dirname(caminho))
+        return self._regras[caminho]
+
+def _bloqueante(elemento) -> Optional[str]:
+    """href de um <link rel=stylesheet> que bloqueia a renderização (sem media de impressão)"""
+    attrs = elemento.attrs
+    if elemento.tipo != 'abre' or elemento.tag != 'link' or attrs.get('rel', '').lower() != 'stylesheet':
+        return None
+    if attrs.get('media', 'all').strip().lower() not in ('all', 'screen', ''):
+        return None
+    return attrs.get('href') or None
+
+def folhas_da_pagina(texto: str, folhas: Folhas, assincronas: bool = False) -> List[Tuple[object, List[Regra]]]:
+    """(elemento <link>, regras) das folhas locais; `assincronas` conta também os preload as=style"""
+    encontradas = []
+    vistas = set()
+    for elemento in _Analisador(texto).elementos:
+        href = _bloqueante(elemento)
+        if href is None and assincronas and elemento.tipo == 'abre' and elemento.tag == 'link' \
+                and elemento.attrs.get('rel', '').lower() == 'preload' and elemento.attrs.get('as') == 'style':
+            href = elemento.attrs.get('href')
+        # O <noscript> repete o <link> do preload
+        if not href or _normalizar_url(href) in vistas:
+            continue
+        regras = folhas(href)
+        if regras is not None:
+            vistas.add(_normalizar_url(href))
+            encontradas.append((elemento, regras))
+    return encontradas
+
+def inserir(texto: str, folhas: Folhas, scripts: Scripts, minificar: bool = True,
+            blocos: int = DOBRA) -> Tuple[str, Optional[Critico]]:
+    """
+    Põe o CSS crítico num <style> no lugar do primeiro <link rel=stylesheet> local
+
+    Cada <link> local passa a preload que vira stylesheet quando chega (com
+    um <noscript> para quem não corre JS). Devolve (texto, crítico), ou o
+    texto igual e None se a página não tiver folhas locais.
+    """
+    encontradas = folhas_da_pagina(texto, folhas)
+    if not encontradas:
+        return texto, None
+    nos = dobra(texto, scripts, blocos)
+    partes: List[Critico] = [extrair(regras, nos, scripts, minificar) for _, regras in encontradas]
+    critico = Critico(''.join(p.css for p in partes), sum(p.regras for p in partes), sum(p.total for p in partes))
+    saida = []
+    atual = 0
+    for i, (elemento, _) in enumerate(encontradas):
+        tag = texto[elemento.inicio:elemento.fim]
+        assincrona = com_atributos(tag, (('rel', 'preload'), ('as', 'style'),
+                                         ('onload', "this.onload=null;this.rel='stylesheet'")))
+        saida.append(texto[atual:elemento.inicio])
+        if i == 0:
+            saida.append(f"<style>{critico.css}</style>")
+        saida.append(f"{assincrona}<noscript>{tag}</noscript>")
+        atual = elemento.fim
+    saida.append(texto[atual:])
+    return ''.join(saida), critico
+
+# =============================================
+# RELATÓRIO
+# =============================================
+
+def _ler_junto_de(pagina: str) -> Callable[[str], Optional[str]]:
+    """Lê os URLs a partir da pasta da página (ou do <base href> dela)"""
+    with open(pagina, 'r', encoding='utf-8') as f:
+        base = re.search(r'''<base\s[^>]*href\s*=\s*["']([^"']*)''', f.read(), re.I)
+    raiz = os.path.normpath(os.path.join(os.path.dirname(pagina), base.group(1) if base else ''))
+
+    def ler(caminho: str) -> Optional[str]:
+        try:
+            with open(os.path.join(raiz, caminho), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    return ler
+
+def relatorio(paginas: Iterable[str], scripts: Scripts, blocos: int = DOBRA) -> Dict[str, Dict[str, int]]:
+    """{página: {critico, folhas, regras, total}} (bytes do CSS crítico minificado e das folhas)"""
+    resultado = {}
+    for pagina in paginas:
+        folhas = Folhas(_ler_junto_de(pagina))
+        with open(pagina, 'r', encoding='utf-8') as f:
+            texto = f.read()
+        encontradas = folhas_da_pagina(texto, folhas, assincronas=True)
+        if not encontradas:
+            continue
+        nos = dobra(texto, scripts, blocos)
+        partes = [extrair(regras, nos, scripts) for _, regras in encontradas]
+        resultado[pagina] = {
+            'critico': sum(p.tamanho for p in partes),
+            'folhas': sum(len(minificar_css(texto_css(r))[0].encode('utf-8')) for _, r in encontradas),
+            'regras': sum(p.regras for p in partes),
+            'total': sum(p.total for p in partes),
+        }
+    return resultado
+
+def _expandir(caminhos: Iterable[str]) -> List[str]:
+    paginas = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            paginas.extend(sorted(glob.glob(os.path.join(caminho, '**', '*.html'), recursive=True)))
+        else:
+            paginas.append(caminho)
+    return paginas
+
+def main(argv: Optional[List[str]] = None):
+    """Bytes de CSS crítico de cada página; sai com código 1 se alguma passar do orçamento"""
+    parser = argparse.ArgumentParser(description="CSS crítico por página (o que a dobra precisa)")
+    parser.add_argument('caminhos', nargs='*', default=[os.path.join(BASE_DIR, 'dist')],
+                        help="Páginas ou pastas (padrão: dist/)")
+    parser.add_argument('--orcamento', type=float, default=ORCAMENTO / 1024, help="KB de CSS inline por página")
+    parser.add_argument('--blocos', type=int, default=DOBRA, help="Blocos do <main> visíveis sem scroll")
+    parser.add_argument('--json', action='store_true', help="Resultado em JSON")
+    args = parser.parse_args(argv)
+
+    resultado = relatorio(_expandir(args.caminhos), Scripts(), args.blocos)
+    limite = args.orcamento * 1024
+    acima = sorted(p for p, r in resultado.items() if r['critico'] > limite)
+    if args.json:
+        json.dump(resultado, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for pagina, r in resultado.items():
+            marca = '❌' if pagina in acima else '🎨'
+            print(f"{marca} {os.path.relpath(pagina)}: {r['critico'] / 1024:.1f}KB crítico de "
+                  f"{r['folhas'] / 1024:.1f}KB ({r['regras']}/{r['total']} regras)")
+        print(f"\n{len(resultado)} páginas, {len(acima)} acima de {args.orcamento:.0f}KB")
+    if acima:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
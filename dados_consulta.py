@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DADOS_CONSULTA.PY - Consultas sobre as coleções do dados.json
+Sintaxe das listagens do admin_dados.py: filtros campo<op>valor, palavras
+soltas (texto sem acentos em nome/titulo/descricao), sort=, limit= e offset=
+"""
+
+import heapq
+import re
+import unicodedata
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Operadores por ordem de reconhecimento (os de dois caracteres primeiro)
+OPERADORES = ('<=', '>=', '!=', '=', '<', '>', '~')
+
+# Campos onde as palavras soltas são procuradas
+CAMPOS_TEXTO = ('nome', 'titulo', 'descricao')
+
+# Parâmetros que não são filtros
+PARAMETROS = ('sort', 'limit', 'offset')
+
+_RE_TERMO = re.compile(r'^([A-Za-z_][\w.]*)(%s)(.*)$' % '|'.join(re.escape(op) for op in OPERADORES))
+
+class ErroConsulta(ValueError):
+    """Consulta mal escrita"""
+
+class Condicao(NamedTuple):
+    campo: str
+    op: str
+    valor: Any
+
+def normalizar(texto: Any) -> str:
+    """Texto sem acentos e sem maiúsculas, para comparar ('Pincéis' -> 'pinceis')"""
+    if not isinstance(texto, str):
+        return ''
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+def _comparar(op: str, atual: Any, valor: Any) -> bool:
+    if op == '=':
+        return atual == valor
+    if op == '!=':
+        return atual != valor
+    if op == '~':
+        return normalizar(valor) in normalizar(atual)
+    if atual is None or isinstance(atual, bool) != isinstance(valor, bool):
+        return False
+    try:
+        if op == '<':
+            return atual < valor
+        if op == '<=':
+            return atual <= valor
+        if op == '>':
+            return atual > valor
+        return atual >= valor
+    except TypeError:
+        return False  # texto comparado com número
+
+def _chave_valor(valor: Any) -> Tuple:
+    """Valores de tipos diferentes ordenam-se por grupo; ausentes ficam no fim"""
+    if valor is None:
+        return (3,)
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return (0, valor)
+    if isinstance(valor, str):
+        return (1, normalizar(valor), valor)
+    return (2, str(valor))
+
+class _ChaveOrdem:
+    """Chave de ordenação com direção própria para cada campo"""
+
+    __slots__ = ('valores', 'direcoes')
+
+    def __init__(self, valores: List[Tuple], direcoes: List[bool]):
+        self.valores = valores
+        self.direcoes = direcoes
+
+    # heapq compara tuplos (chave, ordem, item): sem __eq__ os empates não
+    # chegariam à ordem de chegada e o resultado deixaria de ser estável
+    def __eq__(self, outra: object) -> bool:
+        return isinstance(outra, _ChaveOrdem) and self.valores == outra.valores
+
+    __hash__ = None
+
+    def __lt__(self, outra: '_ChaveOrdem') -> bool:
+        for a, b, desc in zip(self.valores, outra.valores, self.direcoes):
+            if a != b:
+                # Ausentes ficam no fim também em ordem descendente
+                if a[0] == 3 or b[0] == 3:
+                    return b[0] == 3
+                return a > b if desc else a < b
+        return False
+
+class Consulta:
+    """
+    Consulta já interpretada
+
+    executar() é preguiçosa: sem ordenação os registros saem à medida que
+    são lidos; com ordenação e limit só os primeiros offset+limit ficam em
+    memória (heap), e sem limit a ordenação precisa de todos.
+    """
+
+    def __init__(self, condicoes: Optional[List[Condicao]] = None,
+                 palavras: Optional[List[str]] = None,
+                 ordenar: Optional[List[Tuple[str, bool]]] = None,
+                 limite: Optional[int] = None, deslocamento: int = 0):
+        self.condicoes = condicoes or []
+        self.palavras = palavras or []
+        self.ordenar = ordenar or []
+        self.limite = limite
+        self.deslocamento = deslocamento
+
+    def __bool__(self) -> bool:
+        return bool(self.condicoes or self.palavras or self.ordenar
+                    or self.limite is not None or self.deslocamento)
+
+    def igualdades(self, campos: Iterable[str]) -> Dict[str, Any]:
+        """Condições campo=valor sobre `campos` (para usar índices)"""
+        campos = set(campos)
+        return {c.campo: c.valor for c in self.condicoes if c.op == '=' and c.campo in campos}
+
+    def aceita(self, registro: Dict[str, Any]) -> bool:
+        for condicao in self.condicoes:
+            if not _comparar(condicao.op, registro.get(condicao.campo), condicao.valor):
+                return False
+        if self.palavras:
+            texto = ' '.join(normalizar(registro.get(c)) for c in CAMPOS_TEXTO)
+            return all(p in texto for p in self.palavras)
+        return True
+
+    def _chave(self, registro: Dict[str, Any]) -> _ChaveOrdem:
+        return _ChaveOrdem([_chave_valor(registro.get(campo)) for campo, _ in self.ordenar],
+                           [desc for _, desc in self.ordenar])
+
+    def executar(self, registros: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Filtra, ordena e pagina `registros`"""
+        filtrados = (r for r in registros if self.aceita(r))
+        fim = None if self.limite is None else self.deslocamento + self.limite
+        if self.ordenar:
+            if fim is None:
+                filtrados = iter(sorted(filtrados, key=self._chave))
+            else:
+                filtrados = iter(heapq.nsmallest(fim, filtrados, key=self._chave))
+        return islice(filtrados, self.deslocamento, fim)
+
+def _inteiro(parametro: str, valor: str) -> int:
+    try:
+        numero = int(valor)
+    except ValueError:
+        numero = -1
+    if numero < 0:
+        raise ErroConsulta(f"{parametro} deve ser um inteiro >= 0, não '{valor}'")
+    return numero
+
+def parse_consulta(termos: List[str], converter: Callable[[str], Any] = str) -> Consulta:
+    """
+    Interpreta os termos de uma listagem
+
+    Exemplos: categoria=Base stock<5 em_promocao=true, nome~pincel,
+    batom matte (palavras soltas), sort=-preco,nome, limit=20 offset=40.
+    Os valores passam por `converter` (o mesmo dos menus), exceto em ~.
+    """
+    consulta = Consulta()
+    for termo in termos:
+        encontrado = _RE_TERMO.match(termo)
+        if not encontrado:
+            palavra = normalizar(termo)
+            if palavra:
+                consulta.palavras.append(palavra)
+            continue
+        campo, op, valor = encontrado.groups()
+        if campo in PARAMETROS:
+            if op != '=':
+                raise ErroConsulta(f"use {campo}=valor")
+            if campo == 'sort':
+                for parte in filter(None, valor.split(',')):
+                    desc = parte.startswith('-')
+                    consulta.ordenar.append((parte.lstrip('+-'), desc))
+            elif campo == 'limit':
+                consulta.limite = _inteiro(campo, valor)
+            else:
+                consulta.deslocamento = _inteiro(campo, valor)
+            continue
+        if op != '~':
+            valor = converter(valor)
+        consulta.condicoes.append(Condicao(campo, op, valor))
+    return consulta
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DADOS_DELTA.PY - Feed de alterações entre versões publicadas do dados.json
+Guarda as últimas N versões em dados/delta/<versao>.json e, para cada uma,
+um JSON Patch (RFC 6902) até à versão atual; o dados/delta/index.json indica
+ao front-end qual patch baixar a partir da versão que já tem
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import sys
+import time
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional
+
+from dados_io import escrever_atomico, hash_conteudo, serializar
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DADOS_FILE = os.path.join(BASE_DIR, 'dados.json')
+
+# Diretório do feed e URL pública correspondente (dentro de /dados/, ver nginx.conf)
+DELTA_DIR = os.path.join(BASE_DIR, 'dados', 'delta')
+DELTA_URL = 'dados/delta'
+INDICE_NOME = 'index.json'
+
+# Versões publicadas mantidas (e portanto patches por publicação: N - 1)
+MANTER_VERSOES = 10
+
+# Mesmo tamanho de hash dos shards (dados_shards.TAMANHO_HASH)
+TAMANHO_HASH = 12
+
+# =============================================
+# JSON PATCH (RFC 6902)
+# =============================================
+
+def _token(chave: Any) -> str:
+    """Escapa um segmento de JSON Pointer (RFC 6901)"""
+    return str(chave).replace('~', '~0').replace('/', '~1')
+
+# Um único encoder: json.dumps com argumentos cria um novo a cada chamada
+_ENCODER = json.JSONEncoder(ensure_ascii=False, check_circular=False)
+_serial = _ENCODER.encode
+
+def _igual(antigo: Any, novo: Any) -> bool:
+    """
+    Igualdade estrita de JSON
+
+    O == do Python considera 0 == False e [1] == [True]; para contentores só
+    se confirma pela serialização quando o == já deu verdadeiro.
+    """
+    if type(antigo) is not type(novo) or antigo != novo:
+        return False
+    if isinstance(antigo, (dict, list)):
+        return _serial(antigo) == _serial(novo)
+    return True
+
+def _chave_item(item: Any, serial: str) -> str:
+    """Identidade de um elemento de lista para o alinhamento"""
+    if isinstance(item, dict) and 'id' in item:
+        chave = item['id']
+        return f"id:{type(chave).__name__}:{chave}"
+    return serial
+
+def _diff(antigo: Any, novo: Any, caminho: str, ops: List[Dict[str, Any]]):
+    if isinstance(antigo, dict) and isinstance(novo, dict):
+        _diff_objeto(antigo, novo, caminho, ops)
+    elif isinstance(antigo, list) and isinstance(novo, list):
+        _diff_lista(antigo, novo, caminho, ops)
+    elif not _igual(antigo, novo):
+        ops.append({'op': 'replace', 'path': caminho, 'value': novo})
+
+def _diff_objeto(antigo: Dict[str, Any], novo: Dict[str, Any], caminho: str,
+                 ops: List[Dict[str, Any]]):
+    for chave in antigo:
+        if chave not in novo:
+            ops.append({'op': 'remove', 'path': f"{caminho}/{_token(chave)}"})
+    for chave, valor in novo.items():
+        if chave not in antigo:
+            ops.append({'op': 'add', 'path': f"{caminho}/{_token(chave)}", 'value': valor})
+        elif not _igual(antigo[chave], valor):
+            _diff(antigo[chave], valor, f"{caminho}/{_token(chave)}", ops)
+
+def _diff_lista(antigo: List[Any], novo: List[Any], caminho: str, ops: List[Dict[str, Any]]):
+    """
+    Diff de arrays alinhando os elementos pelo id (ou pelo valor)
+
+    Cada elemento é serializado uma vez; prefixo e sufixo iguais são
+    descartados antes do alinhamento, que assim só trabalha na zona alterada.
+    Os blocos são emitidos do fim para o início: os índices de um bloco não
+    dependem das inserções e remoções dos blocos seguintes, já aplicadas.
+    """
+    serial_antigo = [_serial(x) for x in antigo]
+    serial_novo = [_serial(x) for x in novo]
+    n, m = len(antigo), len(novo)
+    inicio = 0
+    while inicio < n and inicio < m and serial_antigo[inicio] == serial_novo[inicio]:
+        inicio += 1
+    fim = 0
+    while (fim < n - inicio and fim < m - inicio
+           and serial_antigo[n - 1 - fim] == serial_novo[m - 1 - fim]):
+        fim += 1
+
+    chaves_antigo = [_chave_item(antigo[i], serial_antigo[i]) for i in range(inicio, n - fim)]
+    chaves_novo = [_chave_item(novo[j], serial_novo[j]) for j in range(inicio, m - fim)]
+    if chaves_antigo == chaves_novo:
+        blocos = [('equal', 0, len(chaves_antigo), 0, len(chaves_novo))]
+    else:
+        blocos = SequenceMatcher(None, chaves_antigo, chaves_novo, autojunk=False).get_opcodes()
+
+    for tag, i1, i2, j1, j2 in reversed(blocos):
+        if tag == 'equal' or (tag == 'replace' and i2 - i1 == j2 - j1):
+            for k in range(i2 - i1):
+                i, j = inicio + i1 + k, inicio + j1 + k
+                if serial_antigo[i] != serial_novo[j]:
+                    _diff(antigo[i], novo[j], f"{caminho}/{i}", ops)
+            continue
+        base = inicio + i1
+        for _ in range(i2 - i1):
+            ops.append({'op': 'remove', 'path': f"{caminho}/{base}"})
+        for k in range(j2 - j1):
+            ops.append({'op': 'add', 'path': f"{caminho}/{base + k}", 'value': novo[inicio + j1 + k]})
+
+def gerar_patch(antigo: Any, novo: Any) -> List[Dict[str, Any]]:
+    """JSON Patch (RFC 6902) que transforma `antigo` em `novo`"""
+    ops: List[Dict[str, Any]] = []
+    _diff(antigo, novo, '', ops)
+    return ops
+
+def _ponteiro(caminho: str) -> List[str]:
+    if not caminho:
+        return []
+    return [t.replace('~1', '/').replace('~0', '~') for t in caminho[1:].split('/')]
+
+def aplicar_patch(documento: Any, ops: List[Dict[str, Any]]) -> Any:
+    """
+    Aplica um JSON Patch (add, remove, replace) e devolve o documento
+
+    Altera `documento` no lugar; só um patch sobre a raiz devolve outro objeto.
+    """
+    for op in ops:
+        tokens = _ponteiro(op['path'])
+        if not tokens:
+            if op['op'] == 'remove':
+                raise ValueError("Não é possível remover a raiz do documento")
+            documento = op['value']
+            continue
+        pai = documento
+        for token in tokens[:-1]:
+            pai = pai[int(token)] if isinstance(pai, list) else pai[token]
+        ultimo = tokens[-1]
+        if isinstance(pai, list):
+            indice = len(pai) if ultimo == '-' else int(ultimo)
+            if op['op'] == 'add':
+                pai.insert(indice, op['value'])
+            elif op['op'] == 'remove':
+                del pai[indice]
+            elif op['op'] == 'replace':
+                pai[indice] = op['value']
+            else:
+                raise ValueError(f"Operação não suportada: {op['op']}")
+        else:
+            if op['op'] in ('add', 'replace'):
+                if op['op'] == 'replace' and ultimo not in pai:
+                    raise KeyError(op['path'])
+                pai[ultimo] = op['value']
+            elif op['op'] == 'remove':
+                del pai[ultimo]
+            else:
+                raise ValueError(f"Operação não suportada: {op['op']}")
+    return documento
+
+# =============================================
+# PUBLICAÇÃO
+# =============================================
+
+def versao_documento(dados: Dict[str, Any]) -> str:
+    """Versão publicada: hash do conteúdo (ignora o lastUpdate)"""
+    return hash_conteudo(dados)[:TAMANHO_HASH]
+
+def _nome_versao(versao: str) -> str:
+    return f"{versao}.json"
+
+def _nome_patch(de: str, para: str) -> str:
+    return f"{de}.{para}.patch.json"
+
+def caminho_indice(diretorio: str = DELTA_DIR) -> str:
+    return os.path.join(diretorio, INDICE_NOME)
+
+def ler_indice(diretorio: str = DELTA_DIR) -> Optional[Dict[str, Any]]:
+    """Lê o índice atual (None se o feed ainda não foi publicado)"""
+    try:
+        with open(caminho_indice(diretorio), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _limpar_obsoletos(diretorio: str, manter: List[Dict[str, Any]]):
+    """Remove versões e patches que não constam do índice atual nem do anterior"""
+    em_uso = set()
+    for indice in manter:
+        if not indice:
+            continue
+        em_uso.add(os.path.basename(indice['url']))
+        em_uso.update(_nome_versao(v) for v in indice.get('historico', []))
+        em_uso.update(os.path.basename(p['url']) for p in indice.get('patches', {}).values())
+    padrao = re.compile(r'^[0-9a-f]{%d}(\.[0-9a-f]{%d}\.patch)?\.json$' % (TAMANHO_HASH, TAMANHO_HASH))
+    for nome in os.listdir(diretorio):
+        if padrao.match(nome) and nome not in em_uso:
+            os.remove(os.path.join(diretorio, nome))
+
+def publicar_delta(dados: Dict[str, Any], diretorio: str = DELTA_DIR,
+                   manter: int = MANTER_VERSOES, verbose: bool = True) -> bool:
+    """
+    Publica a versão atual do documento no feed
+
+    Grava o snapshot da versão, um patch de cada uma das versões anteriores
+    mantidas até ela e o índice. Um patch que não fica menor que o snapshot
+    não é publicado (o cliente baixa o documento inteiro). Devolve False se
+    esta versão já era a atual.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    anterior = ler_indice(diretorio) or {}
+    versao = versao_documento(dados)
+    if anterior.get('version') == versao:
+        if verbose:
+            print("🔁 Feed de alterações já atualizado")
+        return False
+
+    snapshot = serializar(dados, compacto=True)
+    caminho_snapshot = os.path.join(diretorio, _nome_versao(versao))
+    if not os.path.exists(caminho_snapshot):
+        escrever_atomico(caminho_snapshot, snapshot)
+
+    historico = [v for v in anterior.get('historico', []) if v != versao]
+    historico = historico[-(manter - 1):] if manter > 1 else []
+    indice = {
+        'version': versao,
+        'lastUpdate': dados.get('lastUpdate'),
+        'url': f"{DELTA_URL}/{_nome_versao(versao)}",
+        'bytes': len(snapshot),
+        'historico': historico + [versao],
+        'patches': {},
+    }
+    for antiga in historico:
+        try:
+            with open(os.path.join(diretorio, _nome_versao(antiga)), 'rb') as f:
+                documento_antigo = json.loads(f.read())
+        except FileNotFoundError:
+            continue
+        ops = gerar_patch(documento_antigo, dados)
+        conteudo = serializar(ops, compacto=True)
+        if len(conteudo) >= len(snapshot):
+            continue
+        nome = _nome_patch(antiga, versao)
+        escrever_atomico(os.path.join(diretorio, nome), conteudo)
+        indice['patches'][antiga] = {'url': f"{DELTA_URL}/{nome}", 'bytes': len(conteudo),
+                                     'ops': len(ops)}
+
+    # O índice é escrito por último: nunca aponta para um arquivo que ainda não existe
+    escrever_atomico(caminho_indice(diretorio),
+                     json.dumps(indice, indent=2, ensure_ascii=False).encode('utf-8'))
+    _limpar_obsoletos(diretorio, [indice, anterior])
+    if verbose:
+        tamanhos = [p['bytes'] for p in indice['patches'].values()]
+        resumo = f", patches de {min(tamanhos)}-{max(tamanhos)} bytes" if tamanhos else ""
+        print(f"🔁 Versão {versao} publicada no feed ({len(indice['patches'])} patches{resumo})")
+    return True
+
+# =============================================
+# BENCHMARK
+# =============================================
+
+def _catalogo_sintetico(total: int, rnd: random.Random) -> Dict[str, Any]:
+    categorias = ['Base', 'Batom', 'Sombra', 'Pincel', 'Skincare', 'Kit']
+    return {
+        'version': '1.0.0',
+        'lastUpdate': '2026-01-01T00:00:00',
+        'site': {'nome': 'Yamar', 'email': 'geral@yamar.pt'},
+        'produtos': [{
+            'id': f"produto-{i}",
+            'nome': f"Produto {i}",
+            'descricao': f"Descrição do produto {i} para maquilhagem profissional",
+            'categoria': rnd.choice(categorias),
+            'preco': round(rnd.uniform(5, 150), 2),
+            'stock': rnd.randint(0, 100),
+            'disponivel': True,
+            'destaque': rnd.random() < 0.05,
+            'imagem': f"images/produtos/produto-{i}.jpg",
+        } for i in range(total)],
+    }
+
+def _publicacao_tipica(dados: Dict[str, Any], rnd: random.Random) -> Dict[str, Any]:
+    """Uma publicação: ~0,5% dos preços/stocks alterados, alguns itens novos e removidos"""
+    novo = json.loads(json.dumps(dados))
+    produtos = novo['produtos']
+    for _ in range(max(1, len(produtos) // 200)):
+        p = rnd.choice(produtos)
+        p['preco'] = round(p['preco'] * rnd.uniform(0.8, 1.2), 2)
+        p['stock'] = rnd.randint(0, 100)
+    for _ in range(max(1, len(produtos) // 1000)):
+        del produtos[rnd.randrange(len(produtos))]
+    proximo = len(dados['produtos']) + rnd.randint(0, 10 ** 6)
+    for k in range(max(1, len(produtos) // 1000)):
+        produtos.insert(rnd.randrange(len(produtos) + 1), dict(produtos[0], id=f"produto-n{proximo + k}"))
+    novo['lastUpdate'] = '2026-01-02T00:00:00'
+    return novo
+
+def benchmark(tamanhos: List[int], semente: int = 42):
+    """Tamanho dos patches e tempo de geração em catálogos sintéticos"""
+    print(f"{'itens':>8} {'ops':>6} {'completo':>12} {'patch':>10} {'gzip compl.':>12} "
+          f"{'gzip patch':>11} {'diff':>9} {'aplicar':>9}")
+    for total in tamanhos:
+        rnd = random.Random(semente)
+        antigo = _catalogo_sintetico(total, rnd)
+        novo = _publicacao_tipica(antigo, rnd)
+
+        inicio = time.perf_counter()
+        ops = gerar_patch(antigo, novo)
+        t_diff = time.perf_counter() - inicio
+
+        copia = json.loads(json.dumps(antigo))
+        inicio = time.perf_counter()
+        resultado = aplicar_patch(copia, ops)
+        t_aplicar = time.perf_counter() - inicio
+        if resultado != novo:
+            raise AssertionError(f"Patch inválido para {total} itens")
+
+        completo = serializar(novo, compacto=True)
+        patch = serializar(ops, compacto=True)
+        print(f"{total:>8} {len(ops):>6} {len(completo):>12} {len(patch):>10} "
+              f"{len(gzip.compress(completo)):>12} {len(gzip.compress(patch)):>11} "
+              f"{t_diff * 1000:>7.1f}ms {t_aplicar * 1000:>7.1f}ms")
+
+# =============================================
+# MAIN
+# =============================================
+
+def main(argv: Optional[List[str]] = None):
+    """Publica a versão atual do dados.json no feed (ou corre o benchmark)"""
+    parser = argparse.ArgumentParser(description="Feed de alterações (JSON Patch) do dados.json")
+    parser.add_argument('--dados', default=DADOS_FILE, help="Arquivo de origem")
+    parser.add_argument('--dir', default=DELTA_DIR, help="Diretório de saída do feed")
+    parser.add_argument('--manter', type=int, default=MANTER_VERSOES,
+                        help=f"Versões mantidas (padrão: {MANTER_VERSOES})")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Mede tamanho e tempo dos patches em catálogos sintéticos")
+    parser.add_argument('--tamanhos', default='1000,10000,100000',
+                        help="Tamanhos dos catálogos do benchmark (separados por vírgula)")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark([int(t) for t in args.tamanhos.split(',')])
+        return
+
+    try:
+        with open(args.dados, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Erro ao ler {args.dados}: {e}")
+        sys.exit(1)
+
+    publicar_delta(dados, args.dir, args.manter)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DADOS_IO.PY - Escrita segura e serialização do dados.json
+Escrita atômica (temp + fsync + rename) e hash de conteúdo para detetar alterações
+"""
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator
+
+# Campos que mudam a cada gravação e não contam como alteração de conteúdo
+CAMPOS_VOLATEIS = ('lastUpdate',)
+
+def serializar(dados: Any, compacto: bool = False) -> bytes:
+    """Serializa em JSON UTF-8 (indentado para leitura ou compacto para produção)"""
+    if compacto:
+        texto = json.dumps(dados, ensure_ascii=False, separators=(',', ':'))
+    else:
+        texto = json.dumps(dados, indent=2, ensure_ascii=False)
+    return texto.encode('utf-8')
+
+def hash_bytes(conteudo: bytes) -> str:
+    """SHA-256 hexadecimal de um conteúdo"""
+    return hashlib.sha256(conteudo).hexdigest()
+
+def hash_conteudo(dados: Dict[str, Any]) -> str:
+    """
+    Hash canónico do documento, independente da formatação e da ordem das
+    chaves, ignorando os campos voláteis (lastUpdate)
+    """
+    estavel = {k: v for k, v in dados.items() if k not in CAMPOS_VOLATEIS}
+    texto = json.dumps(estavel, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hash_bytes(texto.encode('utf-8'))
+
+@contextmanager
+def escrita_atomica(caminho: str) -> Iterator[BinaryIO]:
+    """
+    Abre um arquivo para escrita atômica (modo binário)
+
+    O conteúdo vai para um temporário no mesmo diretório, é sincronizado no
+    disco (fsync) e só substitui o destino com os.replace se o bloco terminar
+    sem exceção. Um leitor concorrente vê sempre a versão antiga inteira ou
+    a nova inteira.
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    try:
+        modo = stat.S_IMODE(os.stat(caminho).st_mode)
+    except FileNotFoundError:
+        # mkstemp cria com 0600; o servidor web precisa de ler o arquivo
+        umask = os.umask(0)
+        os.umask(umask)
+        modo = 0o666 & ~umask
+
+    fd, temporario = tempfile.mkstemp(dir=diretorio, prefix='.' + os.path.basename(caminho) + '.',
+                                      suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temporario, modo)
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except FileNotFoundError:
+            pass
+        raise
+
+    # Garante que o rename também sobreviva a uma queda (POSIX)
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(diretorio, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def escrever_atomico(caminho: str, conteudo: bytes):
+    """Escreve um arquivo inteiro de forma atômica (ver escrita_atomica)"""
+    with escrita_atomica(caminho) as f:
+        f.write(conteudo)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DADOS_JOURNAL.PY - Journal append-only das alterações do catálogo
+Cada alteração é uma linha JSON acrescentada ao dados.journal; o dados.json
+só é reescrito no checkpoint (compactação), que volta a deixar o journal vazio
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Tuple
+
+from dados_io import escrever_atomico
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOURNAL_FILE = os.path.join(BASE_DIR, 'dados.journal')
+
+# Número de entradas pendentes a partir do qual salvar() faz checkpoint
+CHECKPOINT_A_CADA = 1000
+
+
+class ErroJournal(ValueError):
+    """Entrada corrompida no meio do journal"""
+
+
+class Journal:
+    """
+    Journal de alterações campo a campo
+
+    Entrada: {"seq", "op": "set", "colecao", "id", "campo", "antigo", "novo"}.
+    Reaplicar uma entrada é idempotente (define o campo com o valor novo), por
+    isso uma queda entre gravar o snapshot e limpar o journal não causa dano.
+    """
+
+    def __init__(self, caminho: str = JOURNAL_FILE, fsync: bool = True):
+        self.caminho = caminho
+        self.fsync = fsync
+        self.seq = 0
+        self.pendentes = 0
+
+    def ler(self) -> List[Dict[str, Any]]:
+        """
+        Lê as entradas posteriores ao último checkpoint
+
+        Uma última linha incompleta (queda a meio de um append) é descartada
+        e removida do arquivo, para não corromper o append seguinte.
+        """
+        entradas = []
+        try:
+            with open(self.caminho, 'rb') as f:
+                conteudo = f.read()
+        except FileNotFoundError:
+            return entradas
+
+        linhas = conteudo.split(b'\n')
+        if linhas[-1]:
+            print(f"⚠️ Última entrada incompleta do journal descartada ({len(linhas[-1])} bytes)")
+            with open(self.caminho, 'r+b') as f:
+                f.truncate(len(conteudo) - len(linhas[-1]))
+
+        for numero, linha in enumerate(linhas[:-1], start=1):
+            if not linha.strip():
+                continue
+            try:
+                entrada = json.loads(linha)
+            except json.JSONDecodeError as e:
+                raise ErroJournal(f"{self.caminho}:{numero}: {e}") from None
+            self.seq = max(self.seq, entrada.get('seq', 0))
+            if entrada.get('op') == 'checkpoint':
+                entradas = []
+            else:
+                entradas.append(entrada)
+        self.pendentes = len(entradas)
+        return entradas
+
+    def registrar(self, lote: List[Tuple[str, str, List[Tuple[str, Any, Any]]]]):
+        """
+        Acrescenta as alterações de um lote numa única escrita (um fsync)
+
+        Args:
+            lote: [(colecao, id, [(campo, antigo, novo), ...]), ...]; campos
+                que ficaram com o mesmo valor não geram entrada
+        """
+        linhas = []
+        for colecao, registro_id, alteracoes in lote:
+            for campo, antigo, novo in alteracoes:
+                if antigo == novo and type(antigo) is type(novo):
+                    continue
+                self.seq += 1
+                linhas.append(json.dumps({
+                    'seq': self.seq, 'op': 'set', 'colecao': colecao, 'id': registro_id,
+                    'campo': campo, 'antigo': antigo, 'novo': novo,
+                }, ensure_ascii=False))
+        if not linhas:
+            return
+        with open(self.caminho, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(linhas) + '\n')
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.pendentes += len(linhas)
+
+    def checkpoint(self):
+        """Marca que o snapshot já contém todas as entradas (journal fica vazio)"""
+        if self.pendentes == 0 and not os.path.exists(self.caminho):
+            return
+        linha = json.dumps({'seq': self.seq, 'op': 'checkpoint'}) + '\n'
+        escrever_atomico(self.caminho, linha.encode('utf-8'))
+        self.pendentes = 0
+
+def sobreposicao(entradas: List[Dict[str, Any]], colecao: str) -> Dict[str, Dict[str, Any]]:
+    """Valores pendentes de uma coleção: id -> {campo: valor novo}"""
+    resultado: Dict[str, Dict[str, Any]] = {}
+    for entrada in entradas:
+        if entrada['colecao'] == colecao:
+            resultado.setdefault(entrada['id'], {})[entrada['campo']] = entrada['novo']
+    return resultado
+
+def agrupar(entradas: List[Dict[str, Any]]) -> Iterator[Tuple[str, str, Dict[str, Any], Dict[str, Any]]]:
+    """
+    Agrupa entradas consecutivas do mesmo registro
+
+    Yields:
+        (colecao, id, {campo: novo}, {campo: antigo})
+    """
+    atual = None
+    novos, antigos = {}, {}
+    for entrada in entradas:
+        chave = (entrada['colecao'], entrada['id'])
+        if chave != atual and atual is not None:
+            yield atual[0], atual[1], novos, antigos
+            novos, antigos = {}, {}
+        atual = chave
+        novos[entrada['campo']] = entrada['novo']
+        antigos.setdefault(entrada['campo'], entrada['antigo'])
+    if atual is not None:
+        yield atual[0], atual[1], novos, antigos
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DADOS_SHARDS.PY - Exporta o dados.json em shards por coleção
+Cada chave de topo vai para dados/<chave>.<hash>.json e o dados/manifest.json
+indica ao front-end a URL e a versão de cada uma
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional
+
+from dados_io import escrever_atomico, escrita_atomica, hash_bytes, serializar
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DADOS_FILE = os.path.join(BASE_DIR, 'dados.json')
+
+# Diretório dos shards e URL pública correspondente
+SHARDS_DIR = os.path.join(BASE_DIR, 'dados')
+SHARDS_URL = 'dados'
+MANIFEST_NOME = 'manifest.json'
+
+# Caracteres do hash no nome do arquivo (48 bits chegam para distinguir versões)
+TAMANHO_HASH = 12
+
+# Chaves escalares (version, lastUpdate) ficam no próprio manifest
+def _e_shard(valor: Any) -> bool:
+    return isinstance(valor, (dict, list))
+
+def _nome_shard(chave: str, versao: str) -> str:
+    return f"{chave}.{versao}.json"
+
+def caminho_manifest(diretorio: str = SHARDS_DIR) -> str:
+    return os.path.join(diretorio, MANIFEST_NOME)
+
+def ler_manifest(diretorio: str = SHARDS_DIR) -> Optional[Dict[str, Any]]:
+    """Lê o manifest atual (None se os shards ainda não foram exportados)"""
+    try:
+        with open(caminho_manifest(diretorio), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _escrever_manifest(manifest: Dict[str, Any], diretorio: str):
+    # O manifest é escrito por último: nunca aponta para um shard que ainda não existe
+    conteudo = json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8')
+    escrever_atomico(caminho_manifest(diretorio), conteudo)
+
+def _limpar_obsoletos(diretorio: str, manter: List[Dict[str, Any]]):
+    """
+    Remove shards que não constam do manifest atual nem do anterior
+
+    Os do anterior ficam mais uma versão, para os clientes que leram o
+    manifest antigo conseguirem terminar de baixar os shards.
+    """
+    em_uso = set()
+    for manifest in manter:
+        for info in (manifest or {}).get('shards', {}).values():
+            em_uso.add(os.path.basename(info['url']))
+    padrao = re.compile(r'^[\w-]+\.[0-9a-f]{%d}\.json$' % TAMANHO_HASH)
+    for nome in os.listdir(diretorio):
+        if padrao.match(nome) and nome not in em_uso:
+            os.remove(os.path.join(diretorio, nome))
+
+def _entrada(chave: str, versao: str, tamanho: int) -> Dict[str, Any]:
+    return {
+        'url': f"{SHARDS_URL}/{_nome_shard(chave, versao)}",
+        'version': versao,
+        'bytes': tamanho,
+    }
+
+def exportar_shards(dados: Dict[str, Any], diretorio: str = SHARDS_DIR,
+                    verbose: bool = True) -> List[str]:
+    """
+    Escreve um shard compacto por chave de topo e atualiza o manifest
+
+    Shards cujo conteúdo não mudou já existem com o mesmo hash e não são
+    reescritos. Devolve a lista das chaves cujo shard mudou.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    anterior = ler_manifest(diretorio) or {}
+    anteriores = anterior.get('shards', {})
+
+    manifest = {k: v for k, v in dados.items() if not _e_shard(v)}
+    manifest['shards'] = {}
+    alteradas = []
+    for chave, valor in dados.items():
+        if not _e_shard(valor):
+            continue
+        conteudo = serializar(valor, compacto=True)
+        versao = hash_bytes(conteudo)[:TAMANHO_HASH]
+        caminho = os.path.join(diretorio, _nome_shard(chave, versao))
+        if not os.path.exists(caminho):
+            escrever_atomico(caminho, conteudo)
+        if anteriores.get(chave, {}).get('version') != versao:
+            alteradas.append(chave)
+        manifest['shards'][chave] = _entrada(chave, versao, len(conteudo))
+
+    removidas = set(anteriores) - set(manifest['shards'])
+    if alteradas or removidas or any(anterior.get(k) != v for k, v in manifest.items()
+                                     if k != 'shards'):
+        _escrever_manifest(manifest, diretorio)
+        _limpar_obsoletos(diretorio, [manifest, anterior])
+
+    if verbose:
+        if alteradas:
+            print(f"🧩 Shards regenerados: {', '.join(alteradas)}")
+        else:
+            print("🧩 Shards já atualizados")
+    return alteradas
+
+def exportar_colecao_stream(caminho_dados: str, chave: str,
+                            diretorio: str = SHARDS_DIR, verbose: bool = True) -> bool:
+    """
+    Regenera o shard de uma única chave lendo o dados.json em stream
+
+    Não faz nada se os shards ainda não foram exportados. Usado depois de
+    `admin_dados.py atualizar`, que também não carrega o documento inteiro.
+    O hash é calculado enquanto os itens são escritos.
+    """
+    from dados_stream import LeitorStream
+
+    manifest = ler_manifest(diretorio)
+    if manifest is None:
+        return False
+
+    hasher = hashlib.sha256()
+    temporario = os.path.join(diretorio, f".{chave}.novo.json")
+    tamanho = 0
+    lastUpdate = None
+    with open(caminho_dados, 'rb') as f, escrita_atomica(temporario) as saida:
+        def escrever(parte: bytes):
+            nonlocal tamanho
+            hasher.update(parte)
+            saida.write(parte)
+            tamanho += len(parte)
+
+        leitor = LeitorStream(f)
+        for atual in leitor.chaves():
+            if atual == 'lastUpdate':
+                lastUpdate = leitor.valor()
+            elif atual == chave and not leitor.e_array():
+                # Objetos de topo (configuracoes, site) são pequenos
+                escrever(serializar(leitor.valor(), compacto=True))
+            elif atual == chave:
+                # Mesma serialização de serializar(compacto=True), item a item
+                escrever(b'[')
+                for i, item in enumerate(leitor.itens()):
+                    if i:
+                        escrever(b',')
+                    escrever(json.dumps(item, ensure_ascii=False,
+                                        separators=(',', ':')).encode('utf-8'))
+                escrever(b']')
+
+    versao = hasher.hexdigest()[:TAMANHO_HASH]
+    destino = os.path.join(diretorio, _nome_shard(chave, versao))
+    if os.path.exists(destino):
+        os.remove(temporario)
+    else:
+        os.replace(temporario, destino)
+
+    anterior = json.loads(json.dumps(manifest))
+    alterada = manifest['shards'].get(chave, {}).get('version') != versao
+    manifest['shards'][chave] = _entrada(chave, versao, tamanho)
+    if lastUpdate is not None:
+        manifest['lastUpdate'] = lastUpdate
+    if manifest != anterior:
+        _escrever_manifest(manifest, diretorio)
+        _limpar_obsoletos(diretorio, [manifest, anterior])
+    if verbose and alterada:
+        print(f"🧩 Shard regenerado: {chave}")
+    return alterada
+
+# =============================================
+# MAIN
+# =============================================
+
+def main(argv: Optional[List[str]] = None):
+    """Exporta (ou atualiza) os shards a partir do dados.json"""
+    parser = argparse.ArgumentParser(description="Exporta o dados.json em shards por coleção")
+    parser.add_argument('--dados', default=DADOS_FILE, help="Arquivo de origem")
+    parser.add_argument('--dir', default=SHARDS_DIR, help="Diretório de saída dos shards")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.dados, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Erro ao ler {args.dados}: {e}")
+        sys.exit(1)
+
+    exportar_shards(dados, args.dir)
+    manifest = ler_manifest(args.dir)
+    total = sum(info['bytes'] for info in manifest['shards'].values())
+    print(f"✅ {len(manifest['shards'])} shards ({total} bytes) em {args.dir}")
+
+if __name__ == '__main__':
+    main()
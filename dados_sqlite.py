@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DADOS_SQLITE.PY - Backend SQLite opcional para o admin_dados.py
+Tabelas espelham o supabase-schema.sql; cada registro guarda o JSON original
+(coluna doc) e as colunas do schema são geradas a partir dele, com os mesmos
+índices. O dados.json (e os shards) são exportados a partir da base.
+"""
+
+import json
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dados_consulta import CAMPOS_TEXTO, Consulta, ErroConsulta, normalizar
+from dados_schema import VALIDADOR, ErroValidacao, imprimir_erros
+
+# =============================================
+# SCHEMA
+# =============================================
+
+# chave do dados.json -> (tabela, colunas {nome: (tipo, campo no JSON)}, colunas indexadas)
+# Nomes e índices seguem o supabase-schema.sql; campos que no dados.json têm
+# outro nome estão mapeados explicitamente (posts.imagem_capa <- imagem, ...)
+TABELAS = {
+    'servicos': ('servicos', {
+        'tipo': ('TEXT', 'tipo'),
+        'titulo': ('TEXT', 'titulo'),
+        'descricao': ('TEXT', 'descricao'),
+        'preco': ('REAL', 'preco'),
+        'duracao': ('TEXT', 'duracao'),
+        'categoria': ('TEXT', 'categoria'),
+        'imagem': ('TEXT', 'imagem'),
+        'destaque': ('INTEGER', 'destaque'),
+        'disponivel': ('INTEGER', 'disponivel'),
+    }, ('categoria', 'destaque', 'disponivel')),
+    'produtos': ('produtos', {
+        'nome': ('TEXT', 'nome'),
+        'marca': ('TEXT', 'marca'),
+        'descricao': ('TEXT', 'descricao'),
+        'preco': ('REAL', 'preco'),
+        'preco_original': ('REAL', 'preco_original'),
+        'categoria': ('TEXT', 'categoria'),
+        'imagem': ('TEXT', 'imagem'),
+        'stock': ('INTEGER', 'stock'),
+        'disponivel': ('INTEGER', 'disponivel'),
+        'destaque': ('INTEGER', 'destaque'),
+        'tags': ('TEXT', 'tags'),
+        'avaliacoes': ('TEXT', 'avaliacoes'),
+    }, ('categoria', 'disponivel', 'destaque', 'stock')),
+    'workshops': ('workshops', {
+        'titulo': ('TEXT', 'titulo'),
+        'descricao': ('TEXT', 'descricao'),
+        'preco': ('REAL', 'preco'),
+        'duracao': ('TEXT', 'duracao'),
+        'vagas': ('INTEGER', 'vagas'),
+        'vagas_ocupadas': ('INTEGER', 'vagas_ocupadas'),
+        'nivel': ('TEXT', 'nivel'),
+        'proxima_data': ('TEXT', 'proxima_data'),
+        'imagem': ('TEXT', 'imagem'),
+        'inclui': ('TEXT', 'inclui'),
+        'disponivel': ('INTEGER', 'disponivel'),
+    }, ('proxima_data', 'disponivel', 'nivel')),
+    'eventos': ('eventos', {
+        'titulo': ('TEXT', 'titulo'),
+        'descricao': ('TEXT', 'descricao'),
+        'tipo': ('TEXT', 'tipo'),
+        'data': ('TEXT', 'data'),
+        'local': ('TEXT', 'local'),
+        'imagem': ('TEXT', 'imagem'),
+        'galeria': ('TEXT', 'galeria'),
+        'destaque': ('INTEGER', 'destaque'),
+        'publicado': ('INTEGER', 'publicado'),
+    }, ('data', 'tipo', 'destaque', 'publicado')),
+    'blog': ('posts', {
+        'titulo': ('TEXT', 'titulo'),
+        'subtitulo': ('TEXT', 'resumo'),
+        'conteudo': ('TEXT', 'conteudo'),
+        'autor': ('TEXT', 'autor'),
+        'categoria': ('TEXT', 'categoria'),
+        'tags': ('TEXT', 'tags'),
+        'imagem_capa': ('TEXT', 'imagem'),
+        'imagens': ('TEXT', 'imagens'),
+        'publicado': ('INTEGER', 'publicado'),
+        'destaque': ('INTEGER', 'destaque'),
+        'visualizacoes': ('INTEGER', 'visualizacoes'),
+        'published_at': ('TEXT', 'data'),
+    }, ('categoria', 'publicado', 'destaque', 'created_at DESC')),
+}
+
+def _ddl() -> str:
+    """Gera o DDL das tabelas, índices e triggers de updated_at"""
+    partes = ["""
+CREATE TABLE IF NOT EXISTS documento (
+  chave TEXT PRIMARY KEY,
+  posicao INTEGER NOT NULL,
+  valor TEXT
+);
+CREATE TABLE IF NOT EXISTS configuracoes (
+  chave TEXT PRIMARY KEY,
+  valor TEXT NOT NULL,
+  descricao TEXT,
+  posicao INTEGER NOT NULL,
+  updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TRIGGER IF NOT EXISTS update_configuracoes_updated_at AFTER UPDATE OF valor ON configuracoes
+  BEGIN UPDATE configuracoes SET updated_at = CURRENT_TIMESTAMP WHERE chave = NEW.chave; END;
+"""]
+    for tabela, colunas, indices in TABELAS.values():
+        geradas = ',\n'.join(
+            f"  {nome} {tipo} GENERATED ALWAYS AS (json_extract(doc, '$.{campo}')) VIRTUAL"
+            for nome, (tipo, campo) in colunas.items())
+        partes.append(f"""
+CREATE TABLE IF NOT EXISTS {tabela} (
+  id TEXT PRIMARY KEY NOT NULL,
+  doc TEXT NOT NULL,
+  posicao INTEGER NOT NULL,
+{geradas},
+  created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+  updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_{tabela}_posicao ON {tabela}(posicao);
+CREATE TRIGGER IF NOT EXISTS update_{tabela}_updated_at AFTER UPDATE OF doc ON {tabela}
+  BEGIN UPDATE {tabela} SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id; END;
+""")
+        for indice in indices:
+            coluna = indice.split()[0]
+            partes.append(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_{coluna} ON {tabela}({indice});\n")
+    return ''.join(partes)
+
+def conectar(caminho: str) -> sqlite3.Connection:
+    """Abre a base em modo WAL (leituras não bloqueiam durante as escritas)"""
+    conn = sqlite3.connect(caminho)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA busy_timeout=5000')
+    conn.executescript(_ddl())
+    return conn
+
+def _dump(valor: Any) -> str:
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
+
+# =============================================
+# IMPORTAÇÃO / EXPORTAÇÃO
+# =============================================
+
+def importar_json(conn: sqlite3.Connection, dados: Dict[str, Any]):
+    """Substitui o conteúdo da base pelo documento dados.json"""
+    with conn:
+        conn.execute('DELETE FROM documento')
+        conn.execute('DELETE FROM configuracoes')
+        for tabela, _, _ in TABELAS.values():
+            conn.execute(f'DELETE FROM {tabela}')
+
+        for posicao, (chave, valor) in enumerate(dados.items()):
+            if chave in TABELAS and isinstance(valor, list):
+                tabela = TABELAS[chave][0]
+                ids = set()
+                for i, registro in enumerate(valor):
+                    registro_id = registro.get('id') if isinstance(registro, dict) else None
+                    if registro_id is None or registro_id in ids:
+                        raise ValueError(f"{chave}[{i}]: id ausente ou duplicado ({registro_id!r})")
+                    ids.add(registro_id)
+                conn.executemany(f'INSERT INTO {tabela} (id, doc, posicao) VALUES (?, ?, ?)',
+                                 ((r['id'], _dump(r), i) for i, r in enumerate(valor)))
+                conn.execute('INSERT INTO documento (chave, posicao, valor) VALUES (?, ?, NULL)',
+                             (chave, posicao))
+            elif chave == 'configuracoes' and isinstance(valor, dict):
+                conn.executemany('INSERT INTO configuracoes (chave, valor, posicao) VALUES (?, ?, ?)',
+                                 ((k, _dump(v), i) for i, (k, v) in enumerate(valor.items())))
+                conn.execute('INSERT INTO documento (chave, posicao, valor) VALUES (?, ?, NULL)',
+                             (chave, posicao))
+            else:
+                conn.execute('INSERT INTO documento (chave, posicao, valor) VALUES (?, ?, ?)',
+                             (chave, posicao, _dump(valor)))
+
+def _iterar_tabela(conn: sqlite3.Connection, tabela: str) -> Iterator[Dict[str, Any]]:
+    for (doc,) in conn.execute(f'SELECT doc FROM {tabela} ORDER BY posicao'):
+        yield json.loads(doc)
+
+def _ler_configuracoes(conn: sqlite3.Connection) -> Dict[str, Any]:
+    return {chave: json.loads(valor) for chave, valor in
+            conn.execute('SELECT chave, valor FROM configuracoes ORDER BY posicao')}
+
+def exportar_documento(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Reconstrói o documento dados.json, com as chaves na ordem original"""
+    dados = {}
+    for chave, valor in conn.execute('SELECT chave, valor FROM documento ORDER BY posicao'):
+        if chave in TABELAS and valor is None:
+            dados[chave] = list(_iterar_tabela(conn, TABELAS[chave][0]))
+        elif chave == 'configuracoes' and valor is None:
+            dados[chave] = _ler_configuracoes(conn)
+        else:
+            dados[chave] = json.loads(valor)
+    return dados
+
+# Chaves lidas pelo Validador.validar_referencias
+_CHAVES_REFERENCIAS = ('servicos', 'galeria', 'promocoes')
+
+def _documento_referencias(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Só as chaves que as referências cruzadas usam (sem montar o documento todo)"""
+    dados = {}
+    marcadores = ', '.join('?' * len(_CHAVES_REFERENCIAS))
+    for chave, valor in conn.execute(f'SELECT chave, valor FROM documento WHERE chave IN ({marcadores})',
+                                     _CHAVES_REFERENCIAS):
+        if chave in TABELAS and valor is None:
+            dados[chave] = list(_iterar_tabela(conn, TABELAS[chave][0]))
+        else:
+            dados[chave] = json.loads(valor)
+    return dados
+
+# =============================================
+# CATÁLOGO SOBRE SQLITE
+# =============================================
+
+# Nomes de campo aceites em json_extract nas consultas
+_RE_CAMPO = re.compile(r'^[A-Za-z_][\w.]*$')
+
+class CatalogSQLite:
+    """
+    Mesma interface do Catalog do admin_dados.py, sobre uma base SQLite
+
+    Cada atualização é um UPDATE de uma linha; as alterações só ficam
+    visíveis a outros processos depois de salvar() (commit), o que permite
+    agrupar um lote inteiro numa única transação.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.conn = conectar(caminho)
+        # Comparação de texto sem acentos das consultas (dados_consulta.normalizar)
+        self.conn.create_function('sem_acentos', 1, normalizar, deterministic=True)
+        self._alterado = False
+
+    def _tabela(self, colecao: str) -> Tuple[str, Dict[str, Tuple[str, str]]]:
+        if colecao not in TABELAS:
+            raise KeyError(f"Coleção '{colecao}' não existe na base")
+        tabela, colunas, _ = TABELAS[colecao]
+        return tabela, colunas
+
+    def colecao(self, colecao: str) -> List[Dict]:
+        """Lista completa de uma coleção, na ordem do arquivo"""
+        return list(_iterar_tabela(self.conn, self._tabela(colecao)[0]))
+
+    def obter(self, colecao: str, registro_id: str) -> Optional[Dict]:
+        """Obtém um registro pela chave primária"""
+        tabela, _ = self._tabela(colecao)
+        linha = self.conn.execute(f'SELECT doc FROM {tabela} WHERE id = ?', (registro_id,)).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def filtrar(self, colecao: str, **filtros) -> List[Dict]:
+        """Lista os registros cujas colunas têm os valores pedidos (usa os índices)"""
+        tabela, colunas = self._tabela(colecao)
+        condicoes, valores = [], []
+        for campo, valor in filtros.items():
+            if campo not in colunas:
+                raise KeyError(f"Campo '{campo}' não é uma coluna de '{tabela}'")
+            condicoes.append(f'{campo} = ?')
+            valores.append(int(valor) if isinstance(valor, bool) else valor)
+        where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ''
+        return [json.loads(doc) for (doc,) in
+                self.conn.execute(f'SELECT doc FROM {tabela}{where} ORDER BY posicao', valores)]
+
+    def consultar(self, colecao: str, consulta: Consulta) -> Iterator[Dict]:
+        """
+        Executa uma consulta inteiramente em SQL (WHERE, ORDER BY, LIMIT)
+
+        Campos com coluna gerada usam a coluna (e o índice, se existir); os
+        outros são lidos com json_extract. Os registros são lidos do cursor
+        à medida que são consumidos.
+        """
+        tabela, colunas = self._tabela(colecao)
+        por_campo = {campo: coluna for coluna, (_, campo) in colunas.items()}
+        valores: List[Any] = []
+
+        def expressao(campo: str) -> str:
+            if campo in por_campo:
+                return por_campo[campo]
+            if not _RE_CAMPO.match(campo):
+                raise ErroConsulta(f"Campo inválido: {campo!r}")
+            return f"json_extract(doc, '$.{campo}')"
+
+        condicoes = []
+        for condicao in consulta.condicoes:
+            expr = expressao(condicao.campo)
+            valor = condicao.valor
+            if condicao.op == '~':
+                condicoes.append(f'instr(sem_acentos({expr}), ?) > 0')
+                valores.append(normalizar(valor))
+                continue
+            valor = int(valor) if isinstance(valor, bool) else valor
+            if condicao.op in ('=', '!='):
+                condicoes.append(f"{expr} {'IS' if condicao.op == '=' else 'IS NOT'} ?")
+            else:
+                # Como em Python: texto e número não se comparam
+                grupo = "'text'" if isinstance(valor, str) else "'integer', 'real'"
+                condicoes.append(f'typeof({expr}) IN ({grupo}) AND {expr} {condicao.op} ?')
+            valores.append(valor)
+
+        if consulta.palavras:
+            texto = " || ' ' || ".join(f"sem_acentos(json_extract(doc, '$.{c}'))" for c in CAMPOS_TEXTO)
+            for palavra in consulta.palavras:
+                condicoes.append(f'instr({texto}, ?) > 0')
+                valores.append(palavra)
+
+        ordem = []
+        for campo, desc in consulta.ordenar:
+            expr = expressao(campo)
+            direcao = ' DESC' if desc else ''
+            grupo = f"CASE typeof({expr}) WHEN 'integer' THEN 0 WHEN 'real' THEN 0 WHEN 'text' THEN 1 ELSE 2 END"
+            ordem.append(f'({expr} IS NULL), {grupo}{direcao}, sem_acentos({expr}){direcao}, {expr}{direcao}')
+        ordem.append('posicao')
+
+        where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ''
+        limite = -1 if consulta.limite is None else consulta.limite
+        sql = f"SELECT doc FROM {tabela}{where} ORDER BY {', '.join(ordem)} LIMIT ? OFFSET ?"
+        for (doc,) in self.conn.execute(sql, valores + [limite, consulta.deslocamento]):
+            yield json.loads(doc)
+
+    def atualizar(self, colecao: str, registro_id: str,
+                  **kwargs) -> Optional[List[Tuple[str, Any, Any]]]:
+        """
+        Atualiza campos existentes de um registro (UPDATE de uma linha)
+
+        Returns:
+            Lista de (campo, valor_antigo, valor_novo) ou None se o id não existir
+
+        Raises:
+            ErroValidacao: algum valor não respeita o schema ou o novo id já existe
+        """
+        registro = self.obter(colecao, registro_id)
+        if registro is None:
+            return None
+        campos = {campo: valor for campo, valor in kwargs.items() if campo in registro}
+        erros = VALIDADOR.validar_campos(colecao, registro, campos)
+        tabela, _ = self._tabela(colecao)
+        novo_id = campos.get('id', registro_id)
+        if novo_id != registro_id and self.conn.execute(
+                f'SELECT 1 FROM {tabela} WHERE id = ?', (novo_id,)).fetchone():
+            erros.append(f"id '{novo_id}' já existe em {colecao}")
+        if erros:
+            raise ErroValidacao(erros)
+        alteracoes = []
+        for campo, valor in campos.items():
+            alteracoes.append((campo, registro[campo], valor))
+            registro[campo] = valor
+        if alteracoes:
+            self.conn.execute(f'UPDATE {tabela} SET id = ?, doc = ? WHERE id = ?',
+                              (novo_id, _dump(registro), registro_id))
+            self._alterado = True
+        return alteracoes
+
+    def config(self) -> Dict[str, Any]:
+        """Seções de configuracoes"""
+        return _ler_configuracoes(self.conn)
+
+    def atualizar_config(self, secao: str,
+                         **kwargs) -> Optional[List[Tuple[str, Any, Any]]]:
+        """Atualiza campos existentes de uma seção de configuracoes"""
+        linha = self.conn.execute('SELECT valor FROM configuracoes WHERE chave = ?', (secao,)).fetchone()
+        valor_secao = json.loads(linha[0]) if linha else None
+        if not isinstance(valor_secao, dict):
+            return None
+        alteracoes = []
+        for campo, valor in kwargs.items():
+            if campo in valor_secao:
+                alteracoes.append((campo, valor_secao[campo], valor))
+                valor_secao[campo] = valor
+        if alteracoes:
+            self.conn.execute('UPDATE configuracoes SET valor = ? WHERE chave = ?',
+                              (_dump(valor_secao), secao))
+            self._alterado = True
+        return alteracoes
+
+    def salvar(self) -> bool:
+        """
+        Confirma as alterações pendentes (commit) e avança o lastUpdate
+
+        As referências cruzadas (categorias da galeria, códigos de promoção)
+        são verificadas antes do commit, como no Catalog; se falharem a
+        transação é desfeita (rollback) e nada é gravado.
+        """
+        if not self._alterado:
+            self.conn.commit()
+            print("ℹ️ Nenhuma alteração - base mantida")
+            return False
+        erros = VALIDADOR.validar_referencias(_documento_referencias(self.conn))
+        if erros:
+            imprimir_erros(erros, "Referências inválidas - nada foi salvo")
+            self.descartar()
+            return False
+        agora = datetime.now().isoformat()
+        self.conn.execute("UPDATE documento SET valor = ? WHERE chave = 'lastUpdate'", (_dump(agora),))
+        self.conn.commit()
+        self._alterado = False
+        print(f"✅ Dados salvos com sucesso em {self.caminho}")
+        print(f"📅 Última atualização: {agora}")
+        return True
+
+    def descartar(self):
+        """Desfaz as alterações ainda não confirmadas (rollback)"""
+        self.conn.rollback()
+        self._alterado = False
+
+    def documento(self) -> Dict[str, Any]:
+        """Documento completo no formato do dados.json"""
+        return exportar_documento(self.conn)
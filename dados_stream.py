@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DADOS_STREAM.PY - Leitura e escrita incremental do dados.json
+Percorre o documento em blocos, sem construir as coleções que não interessam
+"""
+
+import codecs
+import json
+import re
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from dados_io import escrita_atomica
+
+# Tamanho do bloco lido do disco (a memória de pico é ~ bloco + maior registro)
+TAMANHO_BLOCO = 1 << 16
+
+# Maior registro aceite; evita ler o arquivo inteiro para a memória se estiver corrompido
+LIMITE_REGISTRO = 64 * 1024 * 1024
+
+_DECODER = json.JSONDecoder()
+
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_RE_STRING_COMPLETA = re.compile(_STRING)
+_RE_SEM_ESTRUTURA = re.compile(rb'(?:[^"\[\]{}]+|' + _STRING + rb')*')
+_RE_FIM_ESCALAR = re.compile(rb'[,}\]\s]')
+_RE_NAO_ESPACO = re.compile(rb'\S')
+_RE_NAO_ESPACO_TEXTO = re.compile(r'\S')
+_ABRE = frozenset(b'{[')
+
+# Substituição de uma chave: valor novo ou função que transforma os itens da coleção
+Substituicao = Union[Any, Callable[[Iterator[Any]], Iterable[Any]]]
+
+
+class ErroStream(ValueError):
+    """JSON inválido ou com estrutura inesperada"""
+
+
+class _Descartar:
+    """Destino que ignora os bytes (para saltar valores sem os guardar)"""
+
+    @staticmethod
+    def write(_dados):
+        pass
+
+
+class LeitorStream:
+    """
+    Leitor por eventos do objeto de topo do dados.json
+
+    Uso:
+        leitor = LeitorStream(f)
+        for chave in leitor.chaves():
+            if chave == 'produtos':
+                for produto in leitor.itens():
+                    ...
+            # valores não consumidos são saltados sem serem construídos
+
+    Só o registro corrente e um bloco de leitura ficam em memória.
+    """
+
+    def __init__(self, f: BinaryIO, tamanho_bloco: int = TAMANHO_BLOCO):
+        self._f = f
+        self._bloco = tamanho_bloco
+        self._buf = b''
+        self._pos = 0
+        self._base = 0          # offset absoluto de _buf[0] no arquivo
+        self._marca = None      # início do valor em construção (não pode ser descartado)
+        self._eof = False
+        self._consumido = True
+
+    # ---------------------------------------------
+    # Buffer
+    # ---------------------------------------------
+
+    @property
+    def offset(self) -> int:
+        """Offset absoluto (em bytes) da posição corrente"""
+        return self._base + self._pos
+
+    def _encher(self, destino=None) -> int:
+        """
+        Lê mais um bloco, descartando o que já foi consumido
+
+        Com `destino`, os bytes desde a marca são enviados para ele antes de
+        serem descartados. Devolve quantos bytes foram descartados do início
+        do buffer (para corrigir índices locais) ou -1 no fim do arquivo.
+        """
+        if self._eof:
+            return -1
+        corte = self._pos if self._marca is None else self._marca
+        if destino is not None and self._marca is not None:
+            destino.write(self._buf[self._marca:self._pos])
+            self._marca = corte = self._pos
+        bloco = self._f.read(self._bloco)
+        if not bloco:
+            self._eof = True
+            return -1
+        self._buf = self._buf[corte:] + bloco
+        self._base += corte
+        self._pos -= corte
+        if self._marca is not None:
+            self._marca -= corte
+        return corte
+
+    def _proximo_nao_espaco(self) -> Optional[int]:
+        """Avança sobre espaços e devolve o byte seguinte (sem consumir)"""
+        while True:
+            m = _RE_NAO_ESPACO.search(self._buf, self._pos)
+            if m:
+                self._pos = m.start()
+                return self._buf[self._pos]
+            self._pos = len(self._buf)
+            if self._encher() < 0:
+                return None
+
+    def _esperar(self, caracteres: bytes) -> int:
+        c = self._proximo_nao_espaco()
+        if c is None or c not in caracteres:
+            encontrado = 'EOF' if c is None else repr(chr(c))
+            raise ErroStream(f"esperado um de {caracteres.decode()!r} no byte {self.offset}, "
+                             f"encontrado {encontrado}")
+        self._pos += 1
+        return c
+
+    def _percorrer_valor(self, destino=None) -> Optional[bytes]:
+        """
+        Avança até ao fim do próximo valor JSON
+
+        Sem `destino` devolve os bytes do valor; com `destino` envia-os para
+        lá à medida que avança (memória constante) e devolve None.
+        """
+        c = self._proximo_nao_espaco()
+        if c is None:
+            raise ErroStream("fim inesperado do arquivo")
+        self._marca = i = self._pos
+        buf = self._buf
+
+        def mais() -> int:
+            nonlocal buf
+            self._pos = i
+            corte = self._encher(destino)
+            buf = self._buf
+            return corte
+
+        if c in _ABRE:  # objeto ou array
+            profundidade = 1
+            i += 1
+            while True:
+                # Salta de uma vez tudo o que não é [ ] { } (strings inteiras incluídas)
+                i = _RE_SEM_ESTRUTURA.match(buf, i).end()
+                if i < len(buf) and buf[i] != 0x22:
+                    profundidade += 1 if buf[i] in _ABRE else -1
+                    i += 1
+                    if profundidade == 0:
+                        break
+                    continue
+                # Fim do buffer ou string incompleta: precisa de mais dados
+                corte = mais()
+                if corte < 0:
+                    raise ErroStream("fim inesperado do arquivo dentro de um valor")
+                i -= corte
+        elif c == 0x22:  # string
+            while True:
+                m = _RE_STRING_COMPLETA.match(buf, i)
+                if m is not None:
+                    i = m.end()
+                    break
+                corte = mais()
+                if corte < 0:
+                    raise ErroStream("fim inesperado do arquivo dentro de uma string")
+                i -= corte
+        else:  # número, true, false, null
+            while True:
+                m = _RE_FIM_ESCALAR.search(buf, i)
+                if m is not None:
+                    i = m.start()
+                    break
+                i = len(buf)
+                corte = mais()
+                if corte < 0:
+                    break
+                i -= corte
+
+        inicio, self._pos, self._marca = self._marca, i, None
+        if destino is not None:
+            destino.write(buf[inicio:i])
+            return None
+        return buf[inicio:i]
+
+    # ---------------------------------------------
+    # Eventos
+    # ---------------------------------------------
+
+    def chaves(self) -> Iterator[str]:
+        """Percorre as chaves do objeto de topo; salta os valores não consumidos"""
+        self._esperar(b'{')
+        if self._proximo_nao_espaco() == 0x7D:
+            self._pos += 1
+            return
+        while True:
+            chave = json.loads(self._percorrer_valor())
+            self._esperar(b':')
+            self._proximo_nao_espaco()
+            self._consumido = False
+            yield chave
+            if not self._consumido:
+                self.pular()
+            if self._esperar(b',}') == 0x7D:
+                return
+
+    def e_array(self) -> bool:
+        """O valor da chave corrente é um array (percorrível com itens())"""
+        return self._proximo_nao_espaco() == 0x5B
+
+    def valor(self) -> Any:
+        """Constrói e devolve o valor da chave corrente"""
+        self._consumido = True
+        return json.loads(self._percorrer_valor())
+
+    def pular(self):
+        """Salta o valor da chave corrente sem o construir"""
+        self._consumido = True
+        self._percorrer_valor(_Descartar)
+
+    def copiar(self, destino: BinaryIO):
+        """Copia os bytes do valor corrente, sem o interpretar"""
+        self._consumido = True
+        self._percorrer_valor(destino)
+
+    def itens(self) -> Iterator[Any]:
+        """Percorre os elementos do array da chave corrente, um de cada vez"""
+        return (item for item, _ in self.itens_brutos())
+
+    def itens_brutos(self) -> Iterator[Tuple[Any, str]]:
+        """
+        Como itens(), mas devolve também o texto original de cada elemento
+
+        Os elementos são decodificados diretamente pelo scanner C do módulo
+        json sobre uma janela de texto; só o elemento corrente e um bloco
+        ficam em memória.
+        """
+        self._consumido = True
+        self._esperar(b'[')
+        decodificador = codecs.getincrementaldecoder('utf-8')()
+        texto = decodificador.decode(self._buf[self._pos:])
+        lidos = self._base + len(self._buf)
+        i = 0
+        primeiro = True
+
+        def mais() -> bool:
+            nonlocal texto, i, lidos
+            if self._eof:
+                return False
+            bloco = self._f.read(self._bloco)
+            if not bloco:
+                self._eof = True
+                return False
+            lidos += len(bloco)
+            texto = texto[i:] + decodificador.decode(bloco)
+            i = 0
+            return True
+
+        def proximo_nao_espaco() -> str:
+            nonlocal i
+            while True:
+                m = _RE_NAO_ESPACO_TEXTO.search(texto, i)
+                if m:
+                    i = m.start()
+                    return texto[i]
+                i = len(texto)
+                if not mais():
+                    raise ErroStream("fim inesperado do arquivo dentro de um array")
+
+        while True:
+            c = proximo_nao_espaco()
+            if primeiro and c == ']':
+                i += 1
+                break
+            primeiro = False
+            try:
+                item, fim = _DECODER.raw_decode(texto, i)
+            except json.JSONDecodeError as e:
+                if len(texto) - i > LIMITE_REGISTRO or not mais():
+                    raise ErroStream(f"registro inválido perto do byte {lidos}: {e}") from None
+                continue
+            if type(item) in (int, float) and (fim == len(texto) or texto[fim] not in ',] \t\r\n') \
+                    and mais():
+                continue  # o número pode continuar no bloco seguinte
+            yield item, texto[i:fim]
+            i = fim
+            c = proximo_nao_espaco()
+            i += 1
+            if c == ']':
+                break
+            if c != ',':
+                raise ErroStream(f"esperado ',' ou ']' perto do byte {lidos}, encontrado {c!r}")
+
+        # Volta ao modo binário, com offsets absolutos corretos para o resto do arquivo
+        resto = texto[i:].encode('utf-8') + decodificador.getstate()[0]
+        self._buf, self._pos, self._base = resto, 0, lidos - len(resto)
+
+
+# =============================================
+# LEITURA
+# =============================================
+
+def iterar_colecao(caminho: str, colecao: str) -> Iterator[Any]:
+    """
+    Percorre os itens de uma coleção de topo (produtos, blog, galeria, ...)
+    sem construir as restantes; coleções ausentes não produzem itens
+    """
+    with open(caminho, 'rb') as f:
+        leitor = LeitorStream(f)
+        for chave in leitor.chaves():
+            if chave == colecao:
+                yield from leitor.itens()
+                return
+
+def ler_chave(caminho: str, chave: str, padrao: Any = None) -> Any:
+    """Constrói apenas o valor de uma chave de topo (site, configuracoes, ...)"""
+    with open(caminho, 'rb') as f:
+        leitor = LeitorStream(f)
+        for atual in leitor.chaves():
+            if atual == chave:
+                return leitor.valor()
+    return padrao
+
+
+# =============================================
+# ESCRITA
+# =============================================
+
+def _indentar(texto: str, prefixo: str) -> str:
+    return texto.replace('\n', '\n' + prefixo)
+
+def _escrever_valor(destino: BinaryIO, valor: Any, compacto: bool):
+    if compacto:
+        texto = json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
+    else:
+        texto = _indentar(json.dumps(valor, indent=2, ensure_ascii=False), '  ')
+    destino.write(texto.encode('utf-8'))
+
+class _Origem:
+    """
+    Acompanha o último item lido para reaproveitar o texto original
+
+    Se a transformação devolve o mesmo objeto que acabou de ler e o conteúdo
+    não mudou, o texto original é copiado em vez de ser serializado de novo.
+    """
+
+    def __init__(self, brutos: Iterator[Tuple[Any, str]]):
+        self._brutos = brutos
+        self._item = self._texto = None
+
+    def __iter__(self) -> Iterator[Any]:
+        for self._item, self._texto in self._brutos:
+            yield self._item
+
+    def texto_original(self, item: Any) -> Optional[str]:
+        if item is not self._item:
+            return None
+        # O item pode ter sido alterado no próprio objeto: confirma pelo conteúdo
+        if not _identicos(_DECODER.decode(self._texto), item):
+            return None
+        return self._texto
+
+def _identicos(a: Any, b: Any) -> bool:
+    """
+    Igualdade que também compara tipos e ordem das chaves
+
+    10 == 10.0 e True == 1 em Python, mas serializam de forma diferente;
+    o texto original só pode ser reaproveitado se o JSON sair igual.
+    """
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return (list(a) == list(b)
+                and all(_identicos(valor, b[chave]) for chave, valor in a.items()))
+    if isinstance(a, list):
+        return len(a) == len(b) and all(map(_identicos, a, b))
+    return a == b
+
+def _escrever_itens(destino: BinaryIO, itens: Iterable[Any], compacto: bool,
+                    origem: Optional[_Origem] = None):
+    """Escreve um array item a item, no mesmo formato de json.dump(indent=2)"""
+    vazio = True
+    for item in itens:
+        original = origem.texto_original(item) if origem is not None else None
+        if compacto:
+            destino.write(b'[' if vazio else b',')
+            texto = original or json.dumps(item, ensure_ascii=False, separators=(',', ':'))
+        else:
+            destino.write(b'[\n    ' if vazio else b',\n    ')
+            texto = original or _indentar(json.dumps(item, indent=2, ensure_ascii=False), '    ')
+        destino.write(texto.encode('utf-8'))
+        vazio = False
+    if vazio:
+        destino.write(b'[]')
+    else:
+        destino.write(b']' if compacto else b'\n  ]')
+
+def _copiar_intervalo(origem: BinaryIO, destino: BinaryIO, inicio: int,
+                      fim: Optional[int] = None):
+    """Copia os bytes [inicio, fim) da origem (até ao fim se fim for None)"""
+    origem.seek(inicio)
+    restante = fim - inicio if fim is not None else None
+    while restante is None or restante > 0:
+        bloco = origem.read(TAMANHO_BLOCO if restante is None else min(TAMANHO_BLOCO, restante))
+        if not bloco:
+            break
+        destino.write(bloco)
+        if restante is not None:
+            restante -= len(bloco)
+
+def reescrever(caminho: str, substituicoes: Dict[str, Substituicao],
+               destino: Optional[str] = None):
+    """
+    Reescreve chaves de topo copiando o resto do arquivo byte a byte
+
+    Args:
+        substituicoes: chave -> valor novo, ou chave -> função que recebe o
+            iterador dos itens atuais e devolve os itens novos (processados
+            um a um, sem carregar a coleção)
+        destino: arquivo de saída (por omissão substitui `caminho` de forma atômica)
+
+    A função devolve a coleção completa: tem de consumir o iterador até ao
+    fim (itens que não quer alterar são devolvidos tal como vêm). Parar antes
+    (islice, takewhile, return antecipado) levanta ErroStream e o arquivo
+    não é alterado, em vez de truncar a coleção.
+
+    Chaves ausentes no arquivo não são criadas. O formato (indentado ou
+    compacto) de cada valor reescrito segue o do original.
+    """
+    with open(caminho, 'rb') as f, open(caminho, 'rb') as copia, \
+            escrita_atomica(destino or caminho) as saida:
+        leitor = LeitorStream(f)
+        copiado_ate = 0
+        for chave in leitor.chaves():
+            if chave not in substituicoes:
+                continue
+            inicio = leitor.offset
+            _copiar_intervalo(copia, saida, copiado_ate, inicio)
+            # Formato compacto se o valor abre sem quebra de linha no original
+            copia.seek(inicio)
+            compacto = b'\n' not in copia.read(2)
+
+            novo = substituicoes[chave]
+            if callable(novo):
+                brutos = leitor.itens_brutos()
+                origem = _Origem(brutos)
+                _escrever_itens(saida, novo(iter(origem)), compacto, origem)
+                if next(brutos, None) is not None:
+                    raise ErroStream(f"a transformação de '{chave}' não consumiu todos os itens "
+                                     f"(a função tem de devolver a coleção completa)")
+            else:
+                leitor.pular()
+                _escrever_valor(saida, novo, compacto)
+            copiado_ate = leitor.offset
+        _copiar_intervalo(copia, saida, copiado_ate)
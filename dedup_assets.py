@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DEDUP_ASSETS.PY - Um só caminho para cada asset repetido
+Agrupa os assets do repositório (imagens, ícones, fontes) com o mesmo
+conteúdo: bytes iguais (sha256, só dos que têm um tamanho repetido) ou, com
+o Pillow, os mesmos pixels noutra codificação. Um arquivo vazio com o nome
+de outro no outro esquema (icon-192.png ao lado de icon-192x192.png) entra
+no grupo dele. Cada grupo fica com um caminho canônico, as referências no
+HTML, CSS, JS, manifest.json, sw.js e dados.json passam para ele numa só
+passagem paralela e as cópias são apagadas. O resumo mostra os bytes e as
+entradas de cache poupados. Generaliza a regra de caminhos do rewrite_html
+(ex-fix_image_paths), que só conhecia os dois logos
+"""
+
+import argparse
+import os
+import posixpath
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+from dados_io import escrever_atomico, hash_bytes
+from fix_mojibake import BASE_DIR, percorrer
+from rewrite_html import DOMINIOS
+
+try:
+    from PIL import Image
+except ImportError:  # pip install Pillow (só para os mesmos pixels noutra codificação)
+    Image = None
+
+DADOS_FILE = os.path.join(BASE_DIR, 'dados.json')
+
+ASSETS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico',
+          '.woff', '.woff2', '.ttf', '.otf', '.pdf', '.mp4', '.webm')
+RASTER = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif')
+
+# Onde as referências são reescritas; no código Python só são apontadas
+REFERENCIAS = ('.html', '.css', '.js', '.json')
+SO_AVISO = ('.py',)
+# O dados.json é gravado pelo admin_dados (validação, shards e feed de alterações)
+IGNORAR = ('dados.json', 'package.json', 'package-lock.json')
+
+# O canônico de cada grupo: primeiro o que tem conteúdo, depois por esta
+# ordem de pastas, o arquivo mais pequeno e o caminho mais curto
+PREFERIDOS = ('assets/images', 'assets')
+
+# Abaixo disto não compensa arrancar processos
+MIN_PARALELO = 32
+
+# icon-192x192.png e icon-192.png são o mesmo ícone nos dois esquemas de nomes
+_RE_LADOS = re.compile(r'-(\d+)x\1(?=\.[^./]+$)')
+
+_EXTENSOES = '|'.join(e.lstrip('.') for e in ASSETS)
+# Caminho (ou URL do site) que acaba numa extensão de asset; a query e o
+# fragmento ficam de fora e não mudam
+_RE_REF = re.compile(r'(?<![\w@./%~:-])(?:(?:https?:)?//[\w.-]+)?[\w@./%~-]*\.(?:' + _EXTENSOES + r')(?![\w-]|\.\w)', re.I)
+
+class Copia(NamedTuple):
+    caminho: str
+    tamanho: int
+    motivo: str   # 'bytes', 'pixels' ou 'vazio'
+
+class Grupo(NamedTuple):
+    canonico: str
+    tamanho: int
+    copias: Tuple[Copia, ...]
+
+class Resultado(NamedTuple):
+    grupos: List[Grupo]
+    referencias: Counter            # asset -> referências antes da reescrita
+    trocas: Dict[str, int]          # arquivo -> referências reescritas
+    avisos: List[Tuple[str, str]]   # (arquivo, asset) em código Python
+    tempo: float
+
+# =============================================
+# GRUPOS
+# =============================================
+
+def listar(raiz: str = BASE_DIR) -> Dict[str, int]:
+    """{caminho relativo (com /): tamanho} de todos os assets da árvore"""
+    return {os.path.relpath(c, raiz).replace(os.sep, '/'): os.path.getsize(c)
+            for c in percorrer(raiz, ASSETS)}
+
+def _hash_arquivo(caminho: str) -> str:
+    with open(caminho, 'rb') as f:
+        return hash_bytes(f.read())
+
+def _pixels(caminho: str) -> Optional[str]:
+    """Hash dos pixels (RGBA) de uma imagem; None se o Pillow não a abrir"""
+    try:
+        with Image.open(caminho) as imagem:
+            imagem = imagem.convert('RGBA')
+            return hash_bytes(f"{imagem.width}x{imagem.height}".encode('ascii') + imagem.tobytes())
+    except (OSError, ValueError):
+        return None
+
+def _dimensoes(caminho: str) -> Optional[Tuple[int, int]]:
+    """Só lê o cabeçalho"""
+    try:
+        with Image.open(caminho) as imagem:
+            return imagem.size
+    except (OSError, ValueError):
+        return None
+
+def _raiz(pais: Dict[str, str], c: str) -> str:
+    while pais.setdefault(c, c) != c:
+        pais[c] = pais[pais[c]]
+        c = pais[c]
+    return c
+
+def _unir(pais: Dict[str, str], a: str, b: str):
+    pais[_raiz(pais, a)] = _raiz(pais, b)
+
+def _preferencia(caminho: str) -> int:
+    for i, pasta in enumerate(PREFERIDOS):
+        if caminho.startswith(pasta + '/'):
+            return i
+    return len(PREFERIDOS)
+
+def agrupar(assets: Dict[str, int], raiz: str = BASE_DIR, pixels: bool = True) -> List[Grupo]:
+    """
+    Grupos de assets com o mesmo conteúdo. Só se calcula o hash dos
+    arquivos com um tamanho repetido e só se descodificam as imagens com
+    as mesmas dimensões de outra (pixels=False, ou sem Pillow: só bytes)
+    """
+    pais: Dict[str, str] = {}
+    hashes: Dict[str, str] = {}
+
+    por_tamanho: Dict[int, List[str]] = {}
+    for caminho, tamanho in assets.items():
+        if tamanho:
+            por_tamanho.setdefault(tamanho, []).append(caminho)
+    for caminhos in por_tamanho.values():
+        if len(caminhos) < 2:
+            continue
+        primeiro: Dict[str, str] = {}
+        for caminho in caminhos:
+            hashes[caminho] = _hash_arquivo(os.path.join(raiz, caminho))
+            _unir(pais, caminho, primeiro.setdefault(hashes[caminho], caminho))
+
+    if pixels and Image is not None:
+        por_dimensao: Dict[Tuple[int, int], List[str]] = {}
+        for caminho, tamanho in assets.items():
+            if tamanho and caminho.lower().endswith(RASTER):
+                dimensoes = _dimensoes(os.path.join(raiz, caminho))
+                if dimensoes:
+                    por_dimensao.setdefault(dimensoes, []).append(caminho)
+        for caminhos in por_dimensao.values():
+            if len({_raiz(pais, c) for c in caminhos}) < 2:
+                continue
+            primeiro = {}
+            for caminho in caminhos:
+                digest = _pixels(os.path.join(raiz, caminho))
+                if digest:
+                    _unir(pais, caminho, primeiro.setdefault(digest, caminho))
+
+    # Vazios com o nome de outro (noutro esquema): marcadores do arquivo que faltou copiar
+    cheios = {_RE_LADOS.sub(r'-\1', c): c for c, t in sorted(assets.items()) if t}
+    for caminho, tamanho in assets.items():
+        if not tamanho:
+            outro = cheios.get(_RE_LADOS.sub(r'-\1', caminho))
+            if outro:
+                _unir(pais, caminho, outro)
+
+    membros: Dict[str, List[str]] = {}
+    for caminho in pais:
+        membros.setdefault(_raiz(pais, caminho), []).append(caminho)
+    grupos = []
+    for caminhos in membros.values():
+        if len(caminhos) < 2:
+            continue
+        canonico = min(caminhos, key=lambda c: (not assets[c], _preferencia(c), assets[c], len(c), c))
+        copias = []
+        for caminho in sorted(caminhos):
+            if caminho == canonico:
+                continue
+            if not assets[caminho]:
+                motivo = 'vazio'
+            elif caminho in hashes and hashes[caminho] == hashes.get(canonico):
+                motivo = 'bytes'
+            else:
+                motivo = 'pixels'
+            copias.append(Copia(caminho, assets[caminho], motivo))
+        grupos.append(Grupo(canonico, assets[canonico], tuple(copias)))
+    return sorted(grupos, key=lambda g: g.canonico)
+
+def mapa(grupos: Iterable[Grupo]) -> Dict[str, str]:
+    """{caminho: canônico} de todos os membros (o canônico aponta para si)"""
+    destinos = {}
+    for grupo in grupos:
+        destinos[grupo.canonico] = grupo.canonico
+        for copia in grupo.copias:
+            destinos[copia.caminho] = grupo.canonico
+    return destinos
+
+# =============================================
+# REFERÊNCIAS
+# =============================================
+
+def _base(arquivo: str) -> str:
+    """
+    Pasta a partir da qual os caminhos relativos de um arquivo resolvem. As
+    páginas vão todas para a raiz do site (as do catálogo com <base href="../">)
+    e os scripts e o dados.json resolvem a partir da página; o CSS, da folha
+    """
+    return posixpath.dirname(arquivo) if arquivo.endswith('.css') else ''
+
+def resolver(ref: str, base: str = '') -> Optional[str]:
+    """Caminho na árvore de uma referência, ou None se for de outro site/fora dela"""
+    partes = urlsplit(ref)
+    if partes.netloc and partes.netloc not in DOMINIOS:
+        return None
+    caminho = unquote(partes.path)
+    if caminho.startswith('/'):
+        caminho = caminho.lstrip('/')
+    else:
+        caminho = posixpath.join(base, caminho)
+    caminho = posixpath.normpath(caminho)
+    return None if caminho.startswith('..') else caminho
+
+def _trocar(ref: str, destino: str, base: str) -> str:
+    """A referência a apontar para `destino`, no mesmo estilo (URL, absoluta ou relativa)"""
+    partes = urlsplit(ref)
+    if partes.netloc or partes.path.startswith('/'):
+        return urlunsplit(partes._replace(path='/' + destino))
+    relativo = posixpath.relpath(destino, base or '.')
+    return './' + relativo if partes.path.startswith('./') else relativo
+
+def reescrever(texto: str, base: str, destinos: Dict[str, str],
+               referencias: Optional[Counter] = None) -> Tuple[str, int]:
+    """(texto com as referências às cópias trocadas pelas do canônico, trocas)"""
+    trocas = 0
+
+    def trocar(m: 're.Match') -> str:
+        nonlocal trocas
+        ref = m.group(0)
+        caminho = resolver(ref, base)
+        destino = destinos.get(caminho)
+        if destino is None:
+            return ref
+        if referencias is not None:
+            referencias[caminho] += 1
+        if destino == caminho:
+            return ref
+        trocas += 1
+        return _trocar(ref, destino, base)
+
+    return _RE_REF.sub(trocar, texto), trocas
+
+def _reescrever_em_processo(tarefa: Tuple[str, str, Dict[str, str], bool]) -> Tuple[str, Optional[str], int, Counter]:
+    """(arquivo, texto novo ou None, trocas, referências); não grava"""
+    caminho, arquivo, destinos, gravavel = tarefa
+    with open(caminho, 'r', encoding='utf-8', errors='surrogateescape') as f:
+        texto = f.read()
+    referencias: Counter = Counter()
+    novo, trocas = reescrever(texto, _base(arquivo), destinos, referencias)
+    return arquivo, (novo if trocas and gravavel else None), trocas, referencias
+
+def _reescrever_valores(valor: Any, destinos: Dict[str, str], referencias: Counter) -> Tuple[Any, int]:
+    """Troca as referências em todas as strings de um documento JSON"""
+    if isinstance(valor, str):
+        return reescrever(valor, '', destinos, referencias)
+    total = 0
+    if isinstance(valor, dict):
+        for chave in valor:
+            valor[chave], trocas = _reescrever_valores(valor[chave], destinos, referencias)
+            total += trocas
+    elif isinstance(valor, list):
+        for i, item in enumerate(valor):
+            valor[i], trocas = _reescrever_valores(item, destinos, referencias)
+            total += trocas
+    return valor, total
+
+# =============================================
+# DEDUPLICAÇÃO
+# =============================================
+
+def deduplicar(gravar: bool = True, jobs: Optional[int] = None, pixels: bool = True,
+               raiz: str = BASE_DIR, dados_file: Optional[str] = DADOS_FILE) -> Optional[Resultado]:
+    """
+    Agrupa, reescreve as referências e apaga as cópias. As cópias só são
+    apagadas depois de todas as referências gravadas; se o dados.json não
+    puder ser gravado (inválido), ficam todas e devolve None. O dados.json
+    passa pelo admin_dados (dados_file=None: fica de fora)
+    """
+    inicio = time.perf_counter()
+    grupos = agrupar(listar(raiz), raiz, pixels)
+    destinos = mapa(grupos)
+
+    tarefas = []
+    for caminho in percorrer(raiz, REFERENCIAS + SO_AVISO):
+        if os.path.basename(caminho) in IGNORAR:
+            continue
+        arquivo = os.path.relpath(caminho, raiz).replace(os.sep, '/')
+        tarefas.append((caminho, arquivo, destinos, not arquivo.endswith(SO_AVISO)))
+    if not destinos:
+        tarefas = []
+    if len(tarefas) >= MIN_PARALELO and (jobs or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            resultados = list(pool.map(_reescrever_em_processo, tarefas, chunksize=16))
+    else:
+        resultados = [_reescrever_em_processo(t) for t in tarefas]
+
+    referencias: Counter = Counter()
+    trocas: Dict[str, int] = {}
+    avisos = []
+    novos = []
+    for arquivo, novo, n, refs in resultados:
+        if arquivo.endswith(SO_AVISO):
+            avisos.extend((arquivo, c) for c in sorted(refs) if destinos[c] != c)
+            continue
+        referencias.update(refs)
+        if not n:
+            continue
+        trocas[arquivo] = n
+        novos.append((arquivo, novo))
+
+    dados = None
+    if destinos and dados_file and os.path.exists(dados_file):
+        from admin_dados import carregar_dados, salvar_dados
+        dados, n = _reescrever_valores(carregar_dados(), destinos, referencias)
+        if n:
+            trocas['dados.json'] = n
+        else:
+            dados = None
+
+    if gravar and grupos:
+        for arquivo, novo in novos:
+            escrever_atomico(os.path.join(raiz, arquivo), novo.encode('utf-8', errors='surrogateescape'))
+        if dados is not None and not salvar_dados(dados):
+            print("❌ dados.json não gravado: as cópias ficam até as referências dele serem corrigidas")
+            return None
+        for grupo in grupos:
+            for copia in grupo.copias:
+                caminho = os.path.join(raiz, copia.caminho)
+                os.remove(caminho)
+                pasta = os.path.dirname(caminho)
+                if pasta != raiz and not os.listdir(pasta):
+                    os.rmdir(pasta)
+    return Resultado(grupos, referencias, trocas, avisos, time.perf_counter() - inicio)
+
+def poupanca(resultado: Resultado) -> Tuple[int, int, int]:
+    """
+    (bytes a menos no repositório, entradas de cache e bytes a menos para
+    quem visita o site todo sem cache): antes, cada caminho referenciado de
+    um grupo era um pedido e uma entrada de cache; depois, só o canônico
+    """
+    repositorio = entradas = visita = 0
+    for grupo in resultado.grupos:
+        repositorio += sum(c.tamanho for c in grupo.copias)
+        usados = [c for c in grupo.copias if resultado.referencias[c.caminho]]
+        canonico = resultado.referencias[grupo.canonico]
+        if usados or canonico:
+            entradas += len(usados) + (1 if canonico else 0) - 1
+            visita += sum(c.tamanho for c in usados) + (grupo.tamanho if canonico else 0) - grupo.tamanho
+    return repositorio, entradas, visita
+
+# =============================================
+# MAIN
+# =============================================
+
+MOTIVOS = {'bytes': 'bytes iguais', 'pixels': 'mesmos pixels', 'vazio': 'vazio, mesmo nome'}
+
+def imprimir(resultado: Resultado, gravar: bool):
+    for grupo in resultado.grupos:
+        print(f"🔗 {grupo.canonico} ({grupo.tamanho / 1024:.1f}KB, {resultado.referencias[grupo.canonico]} referências)")
+        for copia in grupo.copias:
+            print(f"   = {copia.caminho} ({MOTIVOS[copia.motivo]}, {copia.tamanho / 1024:.1f}KB, "
+                  f"{resultado.referencias[copia.caminho]} referências)")
+    verbo = 'reescritas' if gravar else 'a reescrever'
+    for arquivo, n in sorted(resultado.trocas.items()):
+        print(f"✏️  {arquivo}: {n} referências {verbo}")
+    for arquivo, caminho in resultado.avisos:
+        print(f"⚠️  {arquivo}: cita {caminho} (código Python: troque à mão)")
+    repositorio, entradas, visita = poupanca(resultado)
+    copias = sum(len(g.copias) for g in resultado.grupos)
+    print(f"\n💾 {len(resultado.grupos)} grupos, {copias} cópias {'apagadas' if gravar else 'a apagar'}: "
+          f"{repositorio / 1024:.1f}KB a menos no repositório ({resultado.tempo * 1000:.0f}ms)")
+    # Negativo quando uma cópia vazia (um ícone que não carregava) passa ao arquivo com conteúdo
+    print(f"   Para quem visita o site todo sem cache: {entradas} pedidos/entradas de cache a menos, "
+          f"{abs(visita) / 1024:.1f}KB {'a menos' if visita >= 0 else 'a mais (cópias vazias)'}")
+
+def main(argv: Optional[List[str]] = None):
+    """Agrupa os assets repetidos e troca as referências pelo caminho canônico"""
+    parser = argparse.ArgumentParser(description="Assets repetidos com um só caminho")
+    parser.add_argument('--dry-run', action='store_true', help="Mostra os grupos e as trocas sem gravar nem apagar")
+    parser.add_argument('--jobs', type=int, help="Processos (padrão: um por CPU)")
+    parser.add_argument('--sem-pixels', action='store_true', help="Só bytes iguais (não descodifica imagens)")
+    args = parser.parse_args(argv)
+
+    resultado = deduplicar(not args.dry_run, args.jobs, not args.sem_pixels)
+    if resultado is None:
+        raise SystemExit(1)
+    if Image is None and not args.sem_pixels:
+        print("ℹ️  Sem Pillow: só os assets com bytes iguais (pip install Pillow para comparar pixels)")
+    imprimir(resultado, not args.dry_run)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,747 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FIX_MOJIBAKE.PY - Correção de mojibake numa única passagem
+Junta os mapas dos antigos scripts fix_* (fix_mojibake_manual, fix_final,
+fix_lupa, fix_admin, fix_admin_v2, fix_utf8; ficam em bench/ só para o
+--benchmark) numa tabela de regras: cada arquivo é lido uma vez, corrigido
+numa passagem e gravado uma vez (só se mudou). O UTF-8 lido como CP1252 é
+decodificado trecho a trecho; as regras ficam só para os casos em que a
+leitura errada perdeu bytes
+"""
+
+import argparse
+import glob
+import importlib
+import io
+import json
+import os
+import random
+import re
+import runpy
+import shutil
+import sys
+import tempfile
+import time
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from dados_io import escrever_atomico, hash_bytes
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(BASE_DIR, '.mojibake-cache.json')
+
+# Onde estão as páginas: as da raiz e os templates e partials do build_site
+PAGINAS_DIRS = (BASE_DIR, os.path.join(BASE_DIR, 'src'), os.path.join(BASE_DIR, 'src', 'partials'))
+
+# Scripts fix_* antigos, só como referência do --benchmark
+BENCH_DIR = os.path.join(BASE_DIR, 'bench')
+
+# Tipos de arquivo percorridos com --arvore
+EXTENSOES = ('.html', '.js', '.css', '.md', '.json')
+IGNORAR_DIRS = ('node_modules', '__pycache__', 'dist')
+
+# Abaixo disto não compensa arrancar processos
+MIN_PARALELO = 32
+
+# Arquivos a que se aplicavam os scripts com lista própria
+ADMIN = frozenset({'admin.html'})
+PAGINAS_UTF8 = frozenset({
+    'blog.html', 'carrinho.html', 'conta.html', 'contacto.html', 'evento.html',
+    'eventos.html', 'workshop.html', 'workshops.html', 'post.html', 'servicos.html',
+    'servico.html', 'produtos.html', 'produto.html', 'portfolio.html', 'sobre.html',
+})
+
+# (script de origem, arquivos (None = todos os .html), [(errado, certo), ...])
+# pela ordem em que os scripts corriam; dentro de cada mapa a ordem é a do script.
+# Só ficam as correções com bytes perdidos: UTF-8 lido como CP1252 com os bytes
+# todos presentes é revertido por decodificar(), sem mapa
+MAPAS = (
+    ('fix_mojibake_manual.py', None, (
+        # O NBSP (A0) ou o 8D/9D final viraram espaço
+        ("Ã ", "à"), ("â€ ", "”"), ("ðŸ” ", "🔍"), ("INÃ CIO", "INÍCIO"),
+    )),
+    ('fix_final.py', None, (
+        # ðŸ perdido: restaram só os dois últimos caracteres
+        ("”\u008d", "🔍"), ("›’", "🛒"), ("–¼", "▼"),
+    )),
+    # fix_lupa.py também trocava "🔍 " por "🔍", o que apagava espaços legítimos
+    # depois de lupas já corretas; o caso com espaço está em "ðŸ” " acima
+    ('fix_lupa.py', None, (
+        ("ðŸ”", "🔍"),
+    )),
+    ('fix_admin.py', ADMIN, (
+        ("“Š", "📊"), ("“…", "📅"), ("“¦", "📦"), ("Ž“", "🎓"), ("› ï¸ ", "🛍️"),
+        ("“ ", "📝"), ("Ž‰", "🎉"), ("‘¥", "👥"), ("âœ‰ï¸ ", "✉️"), ("▼ï¸ ", "🖼️"),
+        ("“ˆ", "📈"), ("› ", "🛍️"),
+    )),
+    ('fix_admin_v2.py', ADMIN, (
+        ("› ï¸  Produtos", "🛍️ Produtos"), ("“  Blog", "📝 Blog"),
+        ("âœ‰ï¸  Mensagens", "✉️ Mensagens"), ("▼ï¸  Gestão", "🖼️ Gestão"),
+        ("âš™ï¸  Definições", "⚙️ Definições"), ("âš™ï¸ ", "⚙️"),
+    )),
+    ('fix_utf8.py', PAGINAS_UTF8, (
+        # Caracteres já perdidos (U+FFFD): corrigidos pela palavra inteira
+        ("tend�ncias", "tendências"), ("In�cio", "Início"), ("Servi�os", "Serviços"),
+        ("SERVI�OS", "SERVIÇOS"), ("IN�CIO", "INÍCIO"), ("PORTF�LIO", "PORTFÓLIO"),
+        ("Navega��o", "Navegação"), ("Seguran�a", "Segurança"),
+        ("Informa��es", "Informações"), ("Marca��o", "Marcação"), ("Or�amento", "Orçamento"),
+        ("�ltimas", "últimas"), ("publica��es", "publicações"), ("real�ar", "realçar"),
+        ("Formul�rio", "Formulário"), ("D�vidas", "Dúvidas"),
+        ("lan�amentos", "lançamentos"), ("t�cnicas", "técnicas"), ("n�veis", "níveis"),
+        ("Forma��o", "Formação"),
+        ("Gr�tis", "Grátis"), ("�rea", "Área"), ("Sess�o", "Sessão"),
+        ("Defini��es", "Definições"), ("Coment�rios", "Comentários"), ("Conte�do", "Conteúdo"),
+        ("Descri��o", "Descrição"), ("Pre�o", "Preço"), ("M�nimo", "Mínimo"),
+        ("Marca��es", "Marcações"), ("Altera��es", "Alterações"),
+        ("Observa��es", "Observações"), ("dispon�vel", "disponível"),
+        ("dispon�veis", "disponíveis"), ("sess�es", "sessões"),
+        ("fotogr�ficas", "fotográficas"), ("Localiza��o", "Localização"), ("Regi�o", "Região"),
+        ("Est�dio", "Estúdio"), ("circunvala��o", "circunvalação"), ("m�ximo", "máximo"),
+        ("�teis", "úteis"), ("J�", "Já"), ("profiss�o", "profissão"), ("�ltimo", "último"),
+        ("�nico", "único"),
+        ("�", "©"),
+    )),
+)
+
+
+class Regra(NamedTuple):
+    errado: str
+    certo: str
+    origem: str
+    arquivos: Optional[FrozenSet[str]] = None  # None = todos os .html
+
+    def aplica_a(self, nome: str) -> bool:
+        # Os scripts só corriam sobre páginas: num .md ou .js o mesmo texto
+        # pode ser um exemplo ("Ã " num guia de encoding), não mojibake
+        if self.arquivos is None:
+            return nome.endswith('.html')
+        return nome in self.arquivos
+
+
+def lido_como_cp1252(b: int) -> str:
+    """Caractere em que o byte b se torna quando lido como CP1252"""
+    try:
+        return bytes([b]).decode('cp1252')
+    except UnicodeDecodeError:
+        return chr(b)  # 81, 8D, 8F, 90, 9D: indefinidos no CP1252, ficam controles C1
+
+# Caractere lido -> byte original (como caractere Latin-1, para str.translate).
+# Os controles C1 também vêm de leituras em Latin-1 em vez de CP1252
+PARA_BYTE = {ord(lido_como_cp1252(b)): chr(b) for b in range(0x80, 0x100)}
+PARA_BYTE.update({c: chr(c) for c in range(0x80, 0xA0)})
+
+def _classe_de(codigos: Iterable[int]) -> str:
+    return '[' + ''.join(re.escape(chr(c)) for c in sorted(codigos)) + ']'
+
+_CONTINUACAO = _classe_de(c for c, b in PARA_BYTE.items() if 0x80 <= ord(b) < 0xC0)
+
+# Segmento suspeito: um byte inicial de UTF-8 (C2-F4, lido como Â..ô) seguido
+# de um byte de continuação e de mais caracteres reversíveis. Exigir logo a
+# continuação descarta depressa o texto acentuado normal ("ção")
+_SEGMENTO = re.compile('[\u00c2-\u00f4]' + _CONTINUACAO + _classe_de(PARA_BYTE) + '*')
+
+# Sequências UTF-8 válidas (sem overlongs nem surrogates)
+_SEQUENCIA_UTF8 = re.compile(
+    b'[\xc2-\xdf][\x80-\xbf]|\xe0[\xa0-\xbf][\x80-\xbf]|[\xe1-\xec\xee\xef][\x80-\xbf]{2}'
+    b'|\xed[\x80-\x9f][\x80-\xbf]|\xf0[\x90-\xbf][\x80-\xbf]{2}'
+    b'|[\xf1-\xf3][\x80-\xbf]{3}|\xf4[\x80-\x8f][\x80-\xbf]{2}')
+
+DECODIFICACAO = 'UTF-8 lido como CP1252'
+
+# Onde cai o que o site escreve: Latin-1 e Latin Extended-A (letras
+# acentuadas, «», ©) e a pontuação geral (’ “ ” — …)
+_BLOCOS_PLAUSIVEIS = ((0x00A0, 0x017F), (0x2000, 0x206F))
+# Seletores de variação: o FE0F de "⚙️" e "✉️" vem logo depois do símbolo
+_SELETORES = range(0xFE00, 0xFE10)
+
+def plausivel(caractere: str, antes: str = '', depois: str = '') -> bool:
+    """
+    Se `caractere`, reconstruído de uma sequência UTF-8, é o que o texto
+    teria antes de lido como CP1252
+
+    Texto correto também forma sequências válidas ("É”" são os bytes C9 94,
+    "ɔ"): fora dos blocos acima só valem símbolos (€, →, ▼, emojis), e não
+    entre duas letras. Letras de outros alfabetos, marcas combinantes,
+    caracteres da direita para a esquerda e controles ficam como estão.
+    """
+    codigo = ord(caractere)
+    if any(inicio <= codigo <= fim for inicio, fim in _BLOCOS_PLAUSIVEIS):
+        return True
+    if codigo in _SELETORES:
+        return bool(antes) and unicodedata.category(antes)[0] == 'S'
+    if unicodedata.category(caractere)[0] != 'S':
+        return False
+    if unicodedata.bidirectional(caractere) in ('R', 'AL', 'AN'):
+        return False
+    return not (antes.isalpha() and depois.isalpha())
+
+# Pseudo-regras da decodificação (uma por sequência), para as estatísticas
+_REGRAS_DECODIFICACAO: Dict[str, Regra] = {}
+
+def _decodificar_segmento(segmento: str, contagem: Counter, antes: str = '', depois: str = '') -> str:
+    """
+    Reverte as sequências UTF-8 completas e plausíveis de um segmento; o
+    resto fica igual. `antes` e `depois` são os vizinhos do segmento no texto
+    """
+    # Cada caractere do segmento é um byte: offsets em bytes = offsets no texto
+    brutos = segmento.translate(PARA_BYTE).encode('latin-1')
+    partes = []
+    fim = 0
+    for sequencia in _SEQUENCIA_UTF8.finditer(brutos):
+        i, j = sequencia.span()
+        certo = sequencia.group().decode('utf-8')
+        anterior = partes[-1][-1:] if partes and i == fim else (segmento[i - 1] if i else antes)
+        seguinte = segmento[j] if j < len(segmento) else depois
+        if not plausivel(certo, anterior, seguinte):
+            continue
+        errado = segmento[i:j]
+        regra = _REGRAS_DECODIFICACAO.get(errado)
+        if regra is None:
+            regra = Regra(errado, certo, DECODIFICACAO)
+            _REGRAS_DECODIFICACAO[errado] = regra
+        partes.append(segmento[fim:i])
+        partes.append(regra.certo)
+        contagem[regra] += 1
+        fim = j
+    if not partes:
+        return segmento
+    partes.append(segmento[fim:])
+    return ''.join(partes)
+
+def decodificar(texto: str, contagem: Optional[Counter] = None,
+                antes: str = '', depois: str = '') -> Tuple[str, Counter]:
+    """
+    Reverte o UTF-8 que foi lido como CP1252 (ou Latin-1), segmento a segmento
+
+    Ao contrário de texto.encode('latin1').decode('utf-8') no arquivo inteiro,
+    que falha se um único caractere não for reversível, cada segmento de
+    caracteres suspeitos é tratado sozinho e, dentro dele, só as sequências
+    UTF-8 completas que dão um caractere plausível são revertidas. Texto
+    correto fica como está. Um segmento que continue suspeito depois de
+    revertido (codificado duas vezes, "Ãƒ£") é revertido de novo; cada volta
+    encurta-o, por isso o custo continua linear. `antes` e `depois` são os
+    vizinhos de `texto`, quando é um trecho de outro.
+    """
+    contagem = Counter() if contagem is None else contagem
+    partes = []
+    fim = 0
+    for encontrado in _SEGMENTO.finditer(texto):
+        original = encontrado.group()
+        inicio = encontrado.start()
+        # O vizinho da esquerda já pode ter sido revertido
+        esquerda = partes[-1][-1:] if partes and inicio == fim else (texto[inicio - 1] if inicio else antes)
+        direita = texto[encontrado.end()] if encontrado.end() < len(texto) else depois
+        segmento = _decodificar_segmento(original, contagem, esquerda, direita)
+        if segmento != original and _SEGMENTO.search(segmento):
+            segmento = decodificar(segmento, contagem, esquerda, direita)[0]
+        if segmento != original:
+            partes.append(texto[fim:inicio])
+            partes.append(segmento)
+            fim = encontrado.end()
+    if not partes:
+        return texto, contagem
+    partes.append(texto[fim:])
+    return ''.join(partes), contagem
+
+
+def _ancora(texto: str) -> int:
+    """Posição do primeiro caractere não ASCII (todo mojibake tem um)"""
+    for i, c in enumerate(texto):
+        if ord(c) > 127:
+            return i
+    raise ValueError(f"Regra sem caracteres não ASCII: {texto!r}")
+
+def _escopo(a: Optional[FrozenSet[str]], b: Optional[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a & b
+
+def compor_regras(mapas=MAPAS) -> List[Regra]:
+    """
+    Junta os mapas numa única tabela equivalente a aplicá-los em sequência
+
+    Nos scripts, uma regra podia apanhar o resultado de outra anterior (o
+    fix_admin procura "▼ï¸ ", que só existe depois de "â–¼" virar "▼", e
+    o fix_final procura "–¼", que vem de "â€“¼"). Numa passagem isso não acontece, por isso
+    cada regra ganha variantes com o texto errado das anteriores no lugar
+    do resultado delas. Regras com o mesmo texto errado e correções
+    diferentes para os mesmos arquivos são um erro.
+    """
+    # A decodificação corre antes das regras: cada regra procura o texto
+    # como fica depois dela ("âœ‰ï¸ " -> "✉ï¸ ")
+    base = [Regra(decodificar(errado)[0], certo, origem, arquivos)
+            for origem, arquivos, pares in mapas
+            for errado, certo in pares]
+    base = [regra for regra in base if regra.errado != regra.certo]
+
+    regras: List[Regra] = []
+    for i, regra in enumerate(base):
+        # (variante, regras anteriores ainda disponíveis); cada composição
+        # recua na sequência, por isso o processo termina
+        variantes = [(regra, i)]
+        vistos = {regra.errado}
+        for variante, limite in variantes:
+            for j in range(limite - 1, -1, -1):
+                anterior = base[j]
+                if anterior.certo not in variante.errado:
+                    continue
+                arquivos = _escopo(variante.arquivos, anterior.arquivos)
+                errado = variante.errado.replace(anterior.certo, anterior.errado)
+                if arquivos == frozenset() or errado in vistos:
+                    continue
+                vistos.add(errado)
+                variantes.append((Regra(errado, regra.certo, f"{regra.origem} (após {anterior.origem})",
+                                        arquivos), j))
+        regras.extend(variante for variante, _ in variantes)
+
+    por_texto: Dict[str, Regra] = {}
+    unicas = []
+    for regra in regras:
+        _ancora(regra.errado)
+        outra = por_texto.get(regra.errado)
+        if outra is None:
+            por_texto[regra.errado] = regra
+            unicas.append(regra)
+            continue
+        sobrepostas = (outra.arquivos is None or regra.arquivos is None
+                       or outra.arquivos & regra.arquivos)
+        if outra.certo != regra.certo and sobrepostas:
+            raise ValueError(f"{regra.errado!r}: {outra.origem} corrige para {outra.certo!r}, "
+                             f"{regra.origem} para {regra.certo!r}")
+        if outra.certo != regra.certo:
+            unicas.append(regra)
+    return unicas
+
+REGRAS = compor_regras()
+
+# Sobe quando muda o que a decodificação aceita ou onde as regras se aplicam
+VERSAO_REPARADOR = 2
+
+# Muda sempre que as regras mudam: invalida o cache das execuções anteriores
+VERSAO_REGRAS = hash_bytes(repr([VERSAO_REPARADOR] + [(r.errado, r.certo, sorted(r.arquivos or ()))
+                                                      for r in REGRAS]).encode('utf-8'))[:16]
+
+# Código num .md (blocos ``` ou ~~~ e `trechos`): os exemplos de mojibake
+# dos guias ("â†’" -> "→") são para ficar
+_CODIGO_MARKDOWN = re.compile(r'^ {0,3}(`{3,}|~{3,}).*?(?:^ {0,3}\1|\Z)|(`+)[^`].*?\2', re.M | re.S)
+
+
+class Reparador:
+    """
+    Decodifica os trechos reversíveis e aplica as regras numa única passagem,
+    da esquerda para a direita
+
+    Todas as regras do arquivo formam uma única expressão regular (alternativas
+    por ordem: início mais à esquerda, depois a mais longa). O prefixo ASCII de
+    cada regra (o "IN" de "INÃ CIO", o "Servi" de "Servi�os") vai para um
+    lookbehind, por isso a expressão só para nas âncoras, os caracteres não
+    ASCII, em vez de testar as regras em cada letra do texto. Só quando um
+    prefixo se sobrepõe à correção anterior as regras da âncora são testadas
+    uma a uma.
+    """
+
+    def __init__(self, regras: Iterable[Regra] = None):
+        self.regras = list(REGRAS if regras is None else regras)
+        self._indices: Dict[Tuple[int, ...], Tuple[re.Pattern, Dict[str, list], Dict[str, list]]] = {}
+
+    def _indice(self, nome: str) -> Tuple[re.Pattern, Dict[str, list], Dict[str, list]]:
+        """
+        Expressão das regras do arquivo e as regras candidatas, por texto a
+        partir da âncora e por âncora: [(tamanho do prefixo, regra)]
+        """
+        chave = tuple(i for i, r in enumerate(self.regras) if r.aplica_a(nome))
+        indice = self._indices.get(chave)
+        if indice is None:
+            candidatas = sorted(((_ancora(self.regras[i].errado), self.regras[i]) for i in chave),
+                                key=lambda c: (-c[0], -len(c[1].errado)))
+            alternativas = []
+            por_resto: Dict[str, list] = {}
+            por_ancora: Dict[str, list] = {}
+            for k, regra in candidatas:
+                resto = regra.errado[k:]
+                # A âncora vem primeiro e sem grupos de captura: só assim o re
+                # salta o texto que não começa por nenhuma âncora
+                atras = f'(?<={re.escape(regra.errado[:k + 1])})' if k else ''
+                alternativas.append(re.escape(resto[0]) + atras + re.escape(resto[1:]))
+                por_resto.setdefault(resto, []).append((k, regra))
+                por_ancora.setdefault(resto[0], []).append((k, regra))
+            padrao = re.compile('|'.join(alternativas)) if alternativas else re.compile(r'(?!)')
+            indice = self._indices[chave] = (padrao, por_resto, por_ancora)
+        return indice
+
+    def reparar_texto(self, texto: str, nome: str = '') -> Tuple[str, Counter]:
+        """Devolve (texto corrigido, contagem por regra)"""
+        if nome.endswith('.md'):
+            return self._reparar_markdown(texto, nome)
+        texto, contagem = decodificar(texto)
+        return self._aplicar_regras(texto, nome, contagem)
+
+    def _reparar_markdown(self, texto: str, nome: str) -> Tuple[str, Counter]:
+        """Só o texto corrido: blocos e trechos de código ficam como estão"""
+        contagem: Counter = Counter()
+        partes = []
+        fim = 0
+        for codigo in _CODIGO_MARKDOWN.finditer(texto):
+            partes.append(self._aplicar_regras(decodificar(texto[fim:codigo.start()], contagem)[0],
+                                               nome, contagem)[0])
+            partes.append(codigo.group())
+            fim = codigo.end()
+        partes.append(self._aplicar_regras(decodificar(texto[fim:], contagem)[0], nome, contagem)[0])
+        return ''.join(partes), contagem
+
+    def _aplicar_regras(self, texto: str, nome: str, contagem: Counter) -> Tuple[str, Counter]:
+        padrao, por_resto, por_ancora = self._indice(nome)
+        aplicadas = 0
+        partes = []
+        fim = 0
+        procurar = padrao.search
+        encontrado = procurar(texto)
+        while encontrado:
+            p = encontrado.start()
+            regra = None
+            for k, candidata in por_resto[encontrado.group()]:
+                if p - k >= fim and texto.startswith(candidata.errado, p - k):
+                    regra = candidata
+                    break
+            else:
+                # O prefixo ASCII já foi consumido pela correção anterior:
+                # vale a melhor regra desta âncora que ainda caiba
+                for k, candidata in por_ancora[texto[p]]:
+                    if p - k >= fim and texto.startswith(candidata.errado, p - k):
+                        regra = candidata
+                        break
+            if regra is None:
+                encontrado = procurar(texto, p + 1)
+                continue
+            partes.append(texto[fim:p - k])
+            partes.append(regra.certo)
+            fim = p - k + len(regra.errado)
+            contagem[regra] += 1
+            aplicadas += 1
+            encontrado = procurar(texto, fim)
+        if not aplicadas:
+            return texto, contagem
+        partes.append(texto[fim:])
+        return ''.join(partes), contagem
+
+    def reparar_bytes(self, original: bytes, nome: str = '') -> Tuple[bytes, Counter]:
+        """Como reparar_texto, sobre o conteúdo em UTF-8 de um arquivo"""
+        # surrogateescape: bytes inválidos passam intactos em vez de abortar
+        texto = original.decode('utf-8', 'surrogateescape')
+        corrigido, contagem = self.reparar_texto(texto, nome)
+        if not contagem:
+            return original, contagem
+        return corrigido.encode('utf-8', 'surrogateescape'), contagem
+
+    def reparar_arquivo(self, caminho: str, gravar: bool = True) -> Counter:
+        """Lê, corrige e (se mudou) grava o arquivo uma única vez"""
+        with open(caminho, 'rb') as f:
+            original = f.read()
+        corrigido, contagem = self.reparar_bytes(original, os.path.basename(caminho))
+        if contagem and gravar:
+            escrever_atomico(caminho, corrigido)
+        return contagem
+
+# =============================================
+# RELATÓRIO
+# =============================================
+
+def arquivos_html(caminhos: Iterable[str]) -> List[str]:
+    """Expande diretórios e padrões glob em arquivos .html (ordenados)"""
+    encontrados = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            encontrados.extend(glob.glob(os.path.join(caminho, '*.html')))
+        elif glob.has_magic(caminho):
+            encontrados.extend(glob.glob(caminho))
+        else:
+            encontrados.append(caminho)
+    return sorted(set(encontrados))
+
+def reparar(caminhos: Iterable[str], gravar: bool = True,
+            reparador: Optional[Reparador] = None) -> Counter:
+    """Corrige os arquivos e mostra o resultado de cada um; devolve o total por regra"""
+    reparador = reparador or Reparador()
+    total: Counter = Counter()
+    for caminho in caminhos:
+        try:
+            contagem = reparador.reparar_arquivo(caminho, gravar)
+        except OSError as e:
+            print(f"❌ {caminho}: {e}")
+            continue
+        if contagem:
+            verbo = 'corrigido' if gravar else 'a corrigir'
+            print(f"✅ {caminho}: {sum(contagem.values())} substituições ({verbo})")
+        total.update(contagem)
+    return total
+
+def imprimir_estatisticas(total: Counter):
+    if not total:
+        print("✨ Nenhum mojibake encontrado")
+        return
+    print(f"\n📊 Regras aplicadas ({sum(total.values())} substituições):")
+    for regra, n in total.most_common():
+        print(f"   {n:>6}  {regra.errado!r} -> {regra.certo!r}  [{regra.origem}]")
+
+# =============================================
+# ÁRVORE INTEIRA (paralelo + cache)
+# =============================================
+
+_reparador_processo: Optional[Reparador] = None
+
+def _reparar_em_processo(tarefa: Tuple[str, Optional[str], bool]) -> Tuple[str, str, Counter]:
+    """
+    Trabalho de um processo do pool: (caminho, hash em cache, gravar) ->
+    (caminho, hash do conteúdo final, contagem). Um hash igual ao do cache
+    dispensa a correção (o arquivo só mudou de data).
+    """
+    global _reparador_processo
+    if _reparador_processo is None:
+        _reparador_processo = Reparador()
+    caminho, hash_anterior, gravar = tarefa
+    with open(caminho, 'rb') as f:
+        original = f.read()
+    atual = hash_bytes(original)
+    if atual == hash_anterior:
+        return caminho, atual, Counter()
+    corrigido, contagem = _reparador_processo.reparar_bytes(original, os.path.basename(caminho))
+    if contagem and gravar:
+        escrever_atomico(caminho, corrigido)
+        atual = hash_bytes(corrigido)
+    return caminho, atual, contagem
+
+def percorrer(raiz: str, extensoes: Tuple[str, ...] = EXTENSOES) -> Iterable[str]:
+    """Arquivos de texto da árvore (sem diretórios ocultos, node_modules, ...)"""
+    for diretorio, subdirs, nomes in os.walk(raiz):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith('.') and d not in IGNORAR_DIRS)
+        for nome in sorted(nomes):
+            if nome.endswith(extensoes) and not nome.startswith('.'):
+                yield os.path.join(diretorio, nome)
+
+def ler_cache(caminho: str = CACHE_FILE) -> Dict:
+    """Cache {versao, gravado, arquivos: {caminho: [tamanho, mtime_ns, sha256]}}"""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get('versao') != VERSAO_REGRAS:
+        # Regras diferentes: tudo tem de ser verificado de novo
+        cache = {'versao': VERSAO_REGRAS, 'gravado': 0, 'arquivos': {}}
+    return cache
+
+def reparar_arvore(raizes: Iterable[str], gravar: bool = True, jobs: Optional[int] = None,
+                   cache_path: Optional[str] = CACHE_FILE) -> Counter:
+    """
+    Corrige todos os arquivos de texto das árvores, em paralelo
+
+    Um arquivo só é lido se o tamanho ou a data mudaram desde a última
+    execução, e só é corrigido se o hash do conteúdo também mudou (ou se
+    as regras mudaram). Datas iguais ou posteriores ao momento em que o
+    cache foi gravado não são de confiança (o arquivo pode ter mudado no
+    mesmo instante) e obrigam a comparar o hash.
+    """
+    inicio = time.perf_counter()
+    cache = ler_cache(cache_path) if cache_path else {'arquivos': {}, 'gravado': 0}
+    entradas = cache['arquivos']
+    gravado = cache['gravado']
+    novas: Dict[str, list] = {}
+
+    tarefas = []
+    estados = {}
+    total_arquivos = 0
+    for raiz in raizes:
+        for caminho in percorrer(raiz):
+            total_arquivos += 1
+            chave = os.path.abspath(caminho)
+            try:
+                st = os.stat(caminho)
+            except OSError as e:
+                print(f"❌ {caminho}: {e}")
+                continue
+            entrada = entradas.get(chave)
+            if (entrada and entrada[0] == st.st_size and entrada[1] == st.st_mtime_ns
+                    and st.st_mtime_ns < gravado):
+                novas[chave] = entrada
+                continue
+            estados[caminho] = chave
+            tarefas.append((caminho, entrada[2] if entrada else None, gravar))
+
+    total: Counter = Counter()
+    corrigidos = 0
+    if len(tarefas) >= MIN_PARALELO and (jobs or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            resultados = list(pool.map(_reparar_em_processo, tarefas, chunksize=16))
+    else:
+        resultados = [_reparar_em_processo(t) for t in tarefas]
+
+    marca = time.time_ns()
+    for caminho, digest, contagem in resultados:
+        if contagem:
+            corrigidos += 1
+            verbo = 'corrigido' if gravar else 'a corrigir'
+            print(f"✅ {caminho}: {sum(contagem.values())} substituições ({verbo})")
+            total.update(contagem)
+            if not gravar:
+                continue  # continua por corrigir: fica fora do cache
+        st = os.stat(caminho)
+        novas[estados[caminho]] = [st.st_size, st.st_mtime_ns, digest]
+
+    if cache_path and gravar:
+        conteudo = {'versao': VERSAO_REGRAS, 'gravado': marca, 'arquivos': novas}
+        escrever_atomico(cache_path, json.dumps(conteudo, separators=(',', ':')).encode('utf-8'))
+
+    print(f"📂 {total_arquivos} arquivos: {total_arquivos - len(tarefas)} inalterados (cache), "
+          f"{len(tarefas)} lidos, {corrigidos} com mojibake "
+          f"({(time.perf_counter() - inicio) * 1000:.0f}ms)")
+    return total
+
+# =============================================
+# BENCHMARK
+# =============================================
+
+# Scripts antigos (em bench/) pela ordem em que corriam (função, arquivos (None = todos))
+SCRIPTS_ANTIGOS = (
+    ('fix_encoding', 'fix_encoding', None),
+    ('fix_mojibake_manual', 'fix_mojibake', None),
+    ('fix_final', 'fix_final', None),
+    ('fix_lupa', 'fix_lupa', None),
+    ('fix_admin', 'fix_admin', ADMIN),
+    ('fix_admin_v2', 'fix_admin_v2', ADMIN),
+)
+
+def _scripts_antigos(diretorio: str):
+    """Corre os fix_* um a um sobre os .html de `diretorio`, como antes"""
+    nomes = sorted(n for n in os.listdir(diretorio) if n.endswith('.html'))
+    atual = os.getcwd()
+    with redirect_stdout(io.StringIO()):
+        for modulo, funcao, arquivos in SCRIPTS_ANTIGOS:
+            corrigir = getattr(importlib.import_module(modulo), funcao)
+            for nome in nomes:
+                if arquivos is None or nome in arquivos:
+                    corrigir(os.path.join(diretorio, nome))
+        # fix_utf8.py não tem função: corre sobre a sua lista no diretório atual
+        try:
+            os.chdir(diretorio)
+            runpy.run_path(os.path.join(BENCH_DIR, 'fix_utf8.py'))
+        finally:
+            os.chdir(atual)
+
+def _corpus_sintetico(diretorio: str, megabytes: int, semente: int = 42):
+    """
+    Páginas HTML com texto acentuado e mojibake espalhado: palavras e
+    símbolos em UTF-8 lidos como CP1252 e os casos com bytes perdidos dos mapas
+    """
+    rnd = random.Random(semente)
+    palavras = ('maquilhagem', 'noiva', 'sessão', 'preço', 'serviços', 'formação', 'pincéis',
+                'workshop', 'técnicas', 'disponível', 'marcação', 'estúdio', 'início', 'à',
+                'produto', 'evento', 'última', 'coleção', 'opções', 'contacto', 'grátis')
+    simbolos = ('€', '→', '“', '”', '…', '–', '©', '🛒', '🔍', '💄', '📅', 'ÇÃO', 'Á')
+    erros = [''.join(lido_como_cp1252(b) if b > 0x7F else chr(b) for b in texto.encode('utf-8'))
+             for texto in palavras + simbolos if not texto.isascii()]
+    erros += [errado for _, arquivos, pares in MAPAS if arquivos is None for errado, _ in pares]
+    tamanho = 256 * 1024
+    for n in range(max(1, megabytes * 1024 * 1024 // tamanho)):
+        partes = ['<!DOCTYPE html>\n<html lang="pt">\n<body>\n']
+        escrito = 0
+        while escrito < tamanho:
+            linha = ' '.join(rnd.choice(palavras) for _ in range(12))
+            if rnd.random() < 0.3:
+                linha += ' ' + rnd.choice(erros) + rnd.choice(palavras)
+            linha = f'<p class="texto">{linha}</p>\n'
+            partes.append(linha)
+            escrito += len(linha)
+        partes.append('</body>\n</html>\n')
+        with open(os.path.join(diretorio, f'pagina-{n:04d}.html'), 'w', encoding='utf-8') as f:
+            f.write(''.join(partes))
+
+def _comparar(nome: str, origem: str):
+    """Tempo dos scripts antigos em sequência vs passagem única sobre cópias de `origem`"""
+    with tempfile.TemporaryDirectory() as tmp:
+        antigo = os.path.join(tmp, 'antigo')
+        novo = os.path.join(tmp, 'novo')
+        shutil.copytree(origem, antigo)
+        shutil.copytree(origem, novo)
+        nomes = sorted(n for n in os.listdir(origem) if n.endswith('.html'))
+        volume = sum(os.path.getsize(os.path.join(origem, n)) for n in nomes)
+
+        inicio = time.perf_counter()
+        _scripts_antigos(antigo)
+        t_antigo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        total = Counter()
+        reparador = Reparador()
+        for n in nomes:
+            total.update(reparador.reparar_arquivo(os.path.join(novo, n)))
+        t_novo = time.perf_counter() - inicio
+
+        restante_antigo = _mojibake_restante(antigo, nomes)
+        restante_novo = _mojibake_restante(novo, nomes)
+
+    print(f"{nome:<12} {len(nomes):>6} {volume / 1024 / 1024:>8.1f}MB {sum(total.values()):>9} "
+          f"{t_antigo * 1000:>9.0f}ms {t_novo * 1000:>9.0f}ms {t_antigo / t_novo:>7.1f}x "
+          f"{restante_antigo:>9} {restante_novo:>9}")
+
+def _mojibake_restante(diretorio: str, nomes: List[str]) -> int:
+    """UTF-8 duplamente codificado (completo ou truncado) que ficou por corrigir"""
+    from scan_mojibake import escanear
+    return sum(1 for n in nomes for ocorrencia in escanear(os.path.join(diretorio, n))
+               if ocorrencia['tipo'] in ('duplo', 'truncado'))
+
+def benchmark(megabytes: int):
+    """Scripts fix_* em sequência vs passagem única (páginas do site e corpus sintético)"""
+    for diretorio in (BASE_DIR, BENCH_DIR):
+        if diretorio not in sys.path:
+            sys.path.insert(0, diretorio)
+    print(f"{'conjunto':<12} {'html':>6} {'volume':>10} {'correções':>9} {'scripts':>11} "
+          f"{'1 passagem':>11} {'ganho':>8} {'resta (scripts / 1 passagem)':>19}")
+    with tempfile.TemporaryDirectory() as paginas:
+        for caminho in arquivos_html(PAGINAS_DIRS):
+            shutil.copy2(caminho, paginas)
+        _comparar('site', paginas)
+    with tempfile.TemporaryDirectory() as sintetico:
+        _corpus_sintetico(sintetico, megabytes)
+        _comparar('sintético', sintetico)
+    print("\nresta: UTF-8 duplamente codificado que ficou nos arquivos (scan_mojibake.py)")
+
+# =============================================
+# MAIN
+# =============================================
+
+def main(argv: Optional[List[str]] = None):
+    """Corrige o mojibake dos .html indicados (padrão: as páginas e partials do site)"""
+    parser = argparse.ArgumentParser(description="Correção de mojibake numa única passagem")
+    parser.add_argument('caminhos', nargs='*', help="Arquivos, diretórios ou padrões (padrão: páginas da raiz e de src/)")
+    parser.add_argument('--dry-run', action='store_true', help="Só mostra o que seria corrigido")
+    parser.add_argument('--arvore', action='store_true',
+                        help=f"Percorre os diretórios recursivamente ({', '.join(EXTENSOES)}) "
+                             "em paralelo, saltando o que não mudou desde a última vez")
+    parser.add_argument('--jobs', type=int, help="Processos com --arvore (padrão: um por CPU)")
+    parser.add_argument('--sem-cache', action='store_true', help="Com --arvore, verifica tudo")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Compara com os scripts fix_* corridos em sequência")
+    parser.add_argument('--mb', type=int, default=32,
+                        help="Tamanho do corpus sintético do benchmark (padrão: 32)")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.mb)
+        return
+
+    if args.arvore:
+        total = reparar_arvore(args.caminhos or [BASE_DIR], gravar=not args.dry_run,
+                               jobs=args.jobs, cache_path=None if args.sem_cache else CACHE_FILE)
+    else:
+        caminhos = arquivos_html(args.caminhos or PAGINAS_DIRS)
+        total = reparar(caminhos, gravar=not args.dry_run)
+    imprimir_estatisticas(total)
+
+if __name__ == '__main__':
+    main()
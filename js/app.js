@@ -337,20 +337,20 @@ function applySiteSettings() {
       const isImg = el.tagName === 'IMG';
       const tester = new Image();
       tester.onload = function() {
-        if (isImg) el.src = src; else el.style.backgroundImage = `url('${src}')`;
+        if (isImg) setImageSource(el, src); else el.style.backgroundImage = `url('${src}')`;
         el.style.display = 'block';
         console.log('✅ Imagem pré-carregada aplicada:', src);
       };
       tester.onerror = function() {
         console.warn('⚠️ Falha ao pré-carregar imagem:', src, '— aplicando fallback', fallback);
-        if (isImg) el.src = fallback; else el.style.backgroundImage = `url('${fallback}')`;
+        if (isImg) setImageSource(el, fallback); else el.style.backgroundImage = `url('${fallback}')`;
         el.style.display = 'block';
       };
       tester.src = src;
     } catch (e) {
       console.warn('Erro em applyImageSafe:', e);
       try {
-        if (el.tagName === 'IMG') el.src = fallback;
+        if (el.tagName === 'IMG') setImageSource(el, fallback);
         else el.style.backgroundImage = `url('${fallback}')`;
       } catch (er) { /* ignore */ }
     }
@@ -771,14 +771,33 @@ function adminCompleteBooking(bookingId) {
 // FUNÇÕES DE CARREGAMENTO DE PÁGINAS
 // ============================================
 
+/**
+ * Id do item de uma página de detalhe: ?id= no template ou data-id no <body>
+ * das páginas pré-geradas pelo build (produto/<id>.html)
+ */
+function getPageItemId() {
+  const urlParams = new URLSearchParams(window.location.search);
+  return urlParams.get("id") || document.body.dataset.id || null;
+}
+
+/**
+ * A página já veio preenchida pelo build? Sem dados locais para o item
+ * (ou para a listagem), o conteúdo estático fica como está
+ */
+function isPrerendered(container) {
+  return container
+    ? container.hasAttribute("data-prerender")
+    : Boolean(document.body.dataset.id);
+}
+
 function loadHomeContent() {
   // Carregar imagem do perfil das configurações
   const settings = getSiteSettings();
   const welcomeAvatar = document.getElementById("welcomeAvatar");
   if (welcomeAvatar && settings.welcomeAvatarUrl) {
     const welcomeUrl = getImageUrl({ imagemUrl: settings.welcomeAvatarUrl }, 'assets/images/placeholder.jpg');
-    welcomeAvatar.src = welcomeUrl;
-    welcomeAvatar.onerror = function() { this.onerror = null; this.src = 'assets/images/placeholder.jpg'; };
+    setImageSource(welcomeAvatar, welcomeUrl);
+    welcomeAvatar.onerror = function() { this.onerror = null; setImageSource(this, 'assets/images/placeholder.jpg'); };
   }
 
   // Carregar serviços
@@ -866,13 +885,13 @@ function loadServicesPage() {
   const container = document.getElementById("servicesContainer");
   if (container) {
     const services = getActiveServices();
+    if (services.length === 0 && isPrerendered(container)) return;
     container.innerHTML = services.map((s) => renderServiceCard(s)).join("");
   }
 }
 
 function loadServiceDetail() {
-  const urlParams = new URLSearchParams(window.location.search);
-  const id = urlParams.get("id");
+  const id = getPageItemId();
 
   if (!id) {
     window.location.href = "servicos.html";
@@ -881,6 +900,7 @@ function loadServiceDetail() {
 
   const service = getServiceById(id);
   if (!service) {
+    if (isPrerendered()) return;
     showToast("Serviço não encontrado", "error");
     window.location.href = "servicos.html";
     return;
@@ -917,13 +937,13 @@ function loadWorkshopsPage() {
   const container = document.getElementById("workshopsContainer");
   if (container) {
     const workshops = getActiveWorkshops();
+    if (workshops.length === 0 && isPrerendered(container)) return;
     container.innerHTML = workshops.map((w) => renderWorkshopCard(w)).join("");
   }
 }
 
 function loadWorkshopDetail() {
-  const urlParams = new URLSearchParams(window.location.search);
-  const id = urlParams.get("id");
+  const id = getPageItemId();
 
   if (!id) {
     window.location.href = "workshops.html";
@@ -932,6 +952,7 @@ function loadWorkshopDetail() {
 
   const workshop = getWorkshopById(id);
   if (!workshop) {
+    if (isPrerendered()) return;
     showToast("Workshop não encontrado", "error");
     window.location.href = "workshops.html";
     return;
@@ -973,6 +994,7 @@ function loadEventsPage() {
   const container = document.getElementById("eventsContainer");
   if (container) {
     const events = getUpcomingEvents();
+    if (events.length === 0 && isPrerendered(container)) return;
     if (events.length === 0) {
       container.innerHTML =
         '<p class="no-items">Não há eventos agendados de momento.</p>';
@@ -989,6 +1011,7 @@ function loadProductsPage() {
 
   if (container) {
     let products = getActiveProducts();
+    if (products.length === 0 && isPrerendered(container)) return;
 
     // Preencher filtro de categorias
     if (categoryFilter && categoryFilter.options.length <= 1) {
@@ -1022,8 +1045,7 @@ function loadProductsPage() {
 }
 
 function loadProductDetail() {
-  const urlParams = new URLSearchParams(window.location.search);
-  const id = urlParams.get("id");
+  const id = getPageItemId();
 
   if (!id) {
     window.location.href = "produtos.html";
@@ -1032,6 +1054,7 @@ function loadProductDetail() {
 
   const product = getProductById(id);
   if (!product) {
+    if (isPrerendered()) return;
     showToast("Produto não encontrado", "error");
     window.location.href = "produtos.html";
     return;
@@ -1066,13 +1089,13 @@ function loadBlogPage() {
   const container = document.getElementById("postsContainer");
   if (container) {
     const posts = getActivePosts();
+    if (posts.length === 0 && isPrerendered(container)) return;
     container.innerHTML = posts.map((p) => renderEditorialPostCard(p)).join("");
   }
 }
 
 function loadPostDetail() {
-  const urlParams = new URLSearchParams(window.location.search);
-  const id = urlParams.get("id");
+  const id = getPageItemId();
 
   if (!id) {
     window.location.href = "blog.html";
@@ -1081,6 +1104,7 @@ function loadPostDetail() {
 
   const post = getPostById(id);
   if (!post) {
+    if (isPrerendered()) return;
     showToast("Post não encontrado", "error");
     window.location.href = "blog.html";
     return;
@@ -2612,8 +2636,7 @@ function checkout() {
 // ============================================
 
 function loadEventDetail() {
-  const urlParams = new URLSearchParams(window.location.search);
-  const id = urlParams.get("id");
+  const id = getPageItemId();
 
   if (!id) {
     window.location.href = "eventos.html";
@@ -2622,6 +2645,7 @@ function loadEventDetail() {
 
   const event = getEventById(id);
   if (!event) {
+    if (isPrerendered()) return;
     showToast("Evento não encontrado", "error");
     window.location.href = "eventos.html";
     return;
@@ -2,6 +2,7 @@
  * STORAGE.JS - Camada de persistência localStorage + JSON
  * Gerencia todos os dados do site: usuários, produtos, serviços, eventos, workshops, posts, marcações e configurações
  * SINCRONIZAÇÃO: Lê dados centralizados de dados.json com cache-busting para garantir atualização mobile
+ * INCREMENTAL: Com o feed de alterações ou os shards publicados, baixa só o que mudou (ver dados_delta.py)
  */
 
 // ============================================
@@ -15,29 +16,245 @@ let dadosCache = null;
 let ultimaAtualizacao = null;
 
 /**
- * Fetch dos dados.json com cache-busting
- * Força o navegador mobile a baixar versão mais recente
+ * Publicação incremental: feed de alterações (dados_delta.py) e shards por
+ * coleção (dados_shards.py). O índice do feed e o manifest mudam a cada
+ * publicação; patches, snapshots e shards têm o hash no nome e ficam em
+ * cache permanente (ver nginx.conf)
  */
-async function fetchDadosJSON() {
+const DADOS_DELTA_INDEX_URL = 'dados/delta/index.json';
+const DADOS_MANIFEST_URL = 'dados/manifest.json';
+const DADOS_PUBLICADOS_KEY = 'dadosPublicados';
+
+const NO_CACHE_HEADERS = {
+  'Cache-Control': 'no-cache, no-store, must-revalidate',
+  'Pragma': 'no-cache',
+  'Expires': '0'
+};
+
+/**
+ * GET de um JSON; null se não existir (feed ou shards não publicados)
+ * @param {boolean} semCache - Arquivos que mudam a cada publicação
+ */
+async function buscarJSON(url, semCache = false) {
+  const response = semCache
+    ? await fetch(`${url}?t=${new Date().getTime()}`, { method: 'GET', headers: NO_CACHE_HEADERS })
+    : await fetch(url);
+
+  if (response.status === 404) {
+    return null;
+  }
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+  return await response.json();
+}
+
+/**
+ * Cópia local da última versão publicada: { version, shards, dados }
+ * version é a versão do feed (null se desconhecida); shards, a versão de
+ * cada coleção no manifest
+ */
+function lerDadosPublicados() {
   try {
-    // Cache-busting: adiciona timestamp para forçar download
-    const timestamp = new Date().getTime();
-    const url = `dados.json?t=${timestamp}`;
-    
-    const response = await fetch(url, {
-      method: 'GET',
-      headers: {
-        'Cache-Control': 'no-cache, no-store, must-revalidate',
-        'Pragma': 'no-cache',
-        'Expires': '0'
+    const local = JSON.parse(localStorage.getItem(DADOS_PUBLICADOS_KEY) || 'null');
+    return local && local.dados ? local : null;
+  } catch (error) {
+    // Cópia local inválida: baixa de novo
+    return null;
+  }
+}
+
+function guardarDadosPublicados(registro) {
+  try {
+    localStorage.setItem(DADOS_PUBLICADOS_KEY, JSON.stringify(registro));
+  } catch (error) {
+    // Quota do localStorage excedida: continua sem cópia local
+    console.warn('⚠️ Cópia local dos dados não guardada:', error);
+  }
+}
+
+/**
+ * Segmentos de um JSON Pointer (RFC 6901)
+ */
+function tokensPonteiro(caminho) {
+  if (!caminho) return [];
+  return caminho.slice(1).split('/').map((t) => t.replace(/~1/g, '/').replace(/~0/g, '~'));
+}
+
+/**
+ * Aplica um JSON Patch (RFC 6902: add, remove, replace) como o
+ * aplicar_patch do dados_delta.py. Altera o documento no lugar; só um
+ * patch sobre a raiz devolve outro objeto
+ */
+function aplicarPatch(documento, ops) {
+  for (const op of ops) {
+    const tokens = tokensPonteiro(op.path);
+    if (tokens.length === 0) {
+      if (op.op === 'remove') {
+        throw new Error('Não é possível remover a raiz do documento');
       }
+      documento = op.value;
+      continue;
+    }
+
+    let pai = documento;
+    tokens.slice(0, -1).forEach((token) => {
+      pai = Array.isArray(pai) ? pai[Number(token)] : pai[token];
     });
-    
-    if (!response.ok) {
-      throw new Error(`HTTP error! status: ${response.status}`);
+    const ultimo = tokens[tokens.length - 1];
+
+    if (Array.isArray(pai)) {
+      const indice = ultimo === '-' ? pai.length : Number(ultimo);
+      if (op.op === 'add') {
+        pai.splice(indice, 0, op.value);
+      } else if (op.op === 'remove') {
+        pai.splice(indice, 1);
+      } else if (op.op === 'replace') {
+        pai[indice] = op.value;
+      } else {
+        throw new Error(`Operação não suportada: ${op.op}`);
+      }
+    } else if (op.op === 'add' || op.op === 'replace') {
+      if (op.op === 'replace' && !(ultimo in pai)) {
+        throw new Error(`Caminho inexistente: ${op.path}`);
+      }
+      pai[ultimo] = op.value;
+    } else if (op.op === 'remove') {
+      delete pai[ultimo];
+    } else {
+      throw new Error(`Operação não suportada: ${op.op}`);
+    }
+  }
+  return documento;
+}
+
+/**
+ * Monta o documento a partir do manifest, baixando só os shards cuja
+ * versão é diferente da cópia local
+ */
+async function montarDeShards(manifest, local) {
+  const dados = {};
+  const shards = {};
+  Object.entries(manifest).forEach(([chave, valor]) => {
+    if (chave !== 'shards') dados[chave] = valor;
+  });
+
+  const entradas = Object.entries(manifest.shards || {});
+  const valores = await Promise.all(entradas.map(async ([chave, info]) => {
+    if (local && local.shards && local.shards[chave] === info.version && chave in local.dados) {
+      return local.dados[chave];
+    }
+    const valor = await buscarJSON(info.url);
+    if (valor === null) {
+      throw new Error(`Shard em falta: ${info.url}`);
+    }
+    return valor;
+  }));
+  entradas.forEach(([chave, info], i) => {
+    dados[chave] = valores[i];
+    shards[chave] = info.version;
+  });
+  return { dados, shards };
+}
+
+/**
+ * Obtém a versão publicada mais recente baixando o mínimo possível
+ *
+ * 1. Feed de alterações: se a cópia local já é a versão atual nada mais é
+ *    baixado; se há patch a partir dela, baixa e aplica só o patch
+ * 2. Shards: com cópia local (ou sem feed), baixa só as coleções cuja
+ *    versão mudou
+ * 3. Snapshot da versão atual do feed
+ * Devolve null se nada disto estiver publicado (usa-se o dados.json)
+ */
+async function fetchDadosPublicados() {
+  let local = lerDadosPublicados();
+  const indice = await buscarJSON(DADOS_DELTA_INDEX_URL, true).catch(() => null);
+
+  if (indice && local && local.version) {
+    if (local.version === indice.version) {
+      return local.dados;
+    }
+    const patch = indice.patches && indice.patches[local.version];
+    if (patch) {
+      try {
+        const ops = await buscarJSON(patch.url);
+        const dados = aplicarPatch(local.dados, ops);
+        // Coleções alteradas pelo patch deixam de corresponder ao shard guardado
+        const alteradas = ops.map((op) => tokensPonteiro(op.path)[0]);
+        const shards = alteradas.includes(undefined) ? {} : { ...local.shards };
+        alteradas.forEach((chave) => delete shards[chave]);
+        guardarDadosPublicados({ version: indice.version, shards, dados });
+        console.log(`🔁 Patch aplicado: ${local.version} → ${indice.version} (${ops.length} operações)`);
+        return dados;
+      } catch (error) {
+        console.warn('⚠️ Patch não aplicado, a baixar a versão completa:', error);
+        // O patch pode ter ficado a meio: recomeça da cópia guardada
+        local = lerDadosPublicados();
+      }
+    }
+  }
+
+  // Sem cópia local não há shards a reaproveitar: o snapshot é um só pedido
+  let registro = null;
+  const manifest = local || !indice
+    ? await buscarJSON(DADOS_MANIFEST_URL, true).catch(() => null)
+    : null;
+  if (manifest && manifest.shards) {
+    const { dados, shards } = await montarDeShards(manifest, local);
+    // Manifest e índice são da mesma publicação se o lastUpdate coincide
+    const version = indice && indice.lastUpdate === manifest.lastUpdate ? indice.version : null;
+    registro = { version, shards, dados };
+  } else if (indice) {
+    const dados = await buscarJSON(indice.url);
+    if (dados) {
+      registro = { version: indice.version, shards: {}, dados };
+    }
+  }
+
+  if (!registro) {
+    return null;
+  }
+  guardarDadosPublicados(registro);
+  return registro.dados;
+}
+
+/**
+ * Fetch do dados.json completo com cache-busting
+ */
+async function fetchDadosCompleto() {
+  // Cache-busting: adiciona timestamp para forçar download
+  const timestamp = new Date().getTime();
+  const url = `dados.json?t=${timestamp}`;
+
+  const response = await fetch(url, {
+    method: 'GET',
+    headers: NO_CACHE_HEADERS
+  });
+
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  return await response.json();
+}
+
+/**
+ * Fetch dos dados com cache-busting
+ * Força o navegador mobile a baixar versão mais recente; com o feed ou os
+ * shards publicados baixa só o que mudou desde a cópia local
+ */
+async function fetchDadosJSON() {
+  try {
+    let dados = null;
+    try {
+      dados = await fetchDadosPublicados();
+    } catch (error) {
+      console.warn('⚠️ Publicação incremental indisponível, a usar dados.json:', error);
+    }
+    if (!dados) {
+      dados = await fetchDadosCompleto();
     }
-    
-    const dados = await response.json();
     
     // Atualiza cache local
     dadosCache = dados;
@@ -64,6 +64,24 @@ function getImageUrl(item, fallback = 'assets/images/placeholder.jpg') {
 }
 
 
+/**
+ * Troca a imagem de um <img>. O build põe as imagens dentro de <picture>
+ * com variantes (srcset e <source> AVIF/WebP) que o browser prefere ao src;
+ * sem as retirar, a imagem nova nunca aparecia
+ * @param {HTMLImageElement} img - Elemento <img>
+ * @param {string} src - URL da imagem nova
+ */
+function setImageSource(img, src) {
+  if (img.getAttribute('src') === src) return;
+  const picture = img.parentElement;
+  if (picture && picture.tagName === 'PICTURE') {
+    picture.querySelectorAll('source').forEach(source => source.remove());
+  }
+  img.removeAttribute('srcset');
+  img.removeAttribute('sizes');
+  img.src = src;
+}
+
 /**
  * Aplica imagem com fallback em elementos
  * @param {string} selector - Seletor CSS
@@ -73,7 +91,7 @@ function applyImageWithFallback(selector, imageUrl) {
   const elements = document.querySelectorAll(selector);
   elements.forEach(el => {
     if (el.tagName === 'IMG') {
-      el.src = imageUrl;
+      setImageSource(el, imageUrl);
       // Fallback se imagem falhar ao carregar
             el.onerror = function() {
                 this.onerror = null; // Previne loop infinito
@@ -99,13 +117,13 @@ function applyImageSafe(target, src, fallback = 'assets/images/placeholder.jpg')
         const tester = new Image();
         tester.onload = function() {
             try {
-                if (isImg) el.src = src; else el.style.backgroundImage = `url('${src}')`;
+                if (isImg) setImageSource(el, src); else el.style.backgroundImage = `url('${src}')`;
                 el.style.display = 'block';
             } catch (e) { /* ignore */ }
         };
         tester.onerror = function() {
             try {
-                if (isImg) el.src = fallback; else el.style.backgroundImage = `url('${fallback}')`;
+                if (isImg) setImageSource(el, fallback); else el.style.backgroundImage = `url('${fallback}')`;
                 el.style.display = 'block';
             } catch (e) { /* ignore */ }
         };
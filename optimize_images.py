@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OPTIMIZE_IMAGES.PY - Variantes responsivas, ícones e placeholders das imagens
+Cada imagem de assets/images/ e images/ ganha versões AVIF, WebP e JPEG (PNG
+se tiver transparência) nas larguras padrão, em paralelo, e as <img> das
+páginas passam a ter srcset/sizes (dentro de um <picture>). Só as imagens
+novas ou alteradas (pelo hash) são processadas de novo. Gera também todos
+os ícones do manifest.json a partir de uma só imagem e grava no dados.json,
+ao lado de cada `imagem`, um placeholder minúsculo (LQIP) em data URI.
+Usado pelo build_site (variantes e srcset); os ícones e os placeholders
+mudam arquivos do repositório e só saem pela linha de comando.
+Precisa do Pillow (pip install Pillow); sem ele as imagens ficam como estão
+"""
+
+import argparse
+import base64
+import html
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from dados_io import escrever_atomico, hash_bytes
+from prerender import url_imagem
+from rewrite_html import _Analisador, _normalizar_url, com_atributos
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # pip install Pillow
+    Image = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(BASE_DIR, 'dist')
+DADOS_FILE = os.path.join(BASE_DIR, 'dados.json')
+MANIFEST_FILE = os.path.join(BASE_DIR, 'manifest.json')
+CACHE_FILE = os.path.join(BASE_DIR, '.images-cache.json')
+
+# Onde estão as imagens originais (copiadas tal como estão para dist/)
+ORIGENS = ('assets/images', 'images')
+EXTENSOES = ('.png', '.jpg', '.jpeg', '.webp')
+
+# As variantes vão para dist/<VARIANTES>/<caminho da original>-<largura>.<hash>.<formato>
+VARIANTES = 'variantes'
+LARGURAS = (320, 640, 960, 1280, 1920)
+TAMANHO_HASH = 10
+
+# (formato, tipo MIME, formato do Pillow, opções); pela ordem de preferência
+# no <picture>. O último é o da própria <img> (PNG se houver transparência)
+FORMATOS = (
+    ('avif', 'image/avif', 'AVIF', {'quality': 55}),
+    # method 6 leva 100x mais tempo nas transparentes para uns 5% a menos
+    ('webp', 'image/webp', 'WEBP', {'quality': 78, 'method': 4}),
+)
+FORMATO_OPACO = ('jpg', 'image/jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True})
+FORMATO_ALFA = ('png', 'image/png', 'PNG', {'optimize': True})
+
+# Placeholder: WebP desta largura em data URI (uns 100-300 bytes)
+LQIP_LARGURA = 16
+LQIP_QUALIDADE = 30
+
+# Ícones do manifest.json: todos saem desta imagem (com margem nos maskable,
+# para caberem no círculo da zona segura)
+ICONE_FONTE = 'assets/images/logo.png'
+MARGEM_MASKABLE = 0.1
+
+# sizes por classe ou id da <img> (as de largura fixa no CSS); sem entrada,
+# vale a largura em px do style inline ou TAMANHO_PADRAO
+TAMANHOS = {
+    'welcome-avatar': '150px',
+    'footer-avatar': '100px',
+}
+TAMANHO_PADRAO = '100vw'
+
+# Cada imagem já é pesada: compensa arrancar processos cedo
+MIN_PARALELO = 2
+
+_RE_IMG = re.compile(r'<img\b[^>]*>', re.I)
+_RE_SRC = re.compile(r'\ssrc\s*=\s*(["\']?)([^"\'\s>]*)\1', re.I)
+_RE_SRCSET = re.compile(r'\ssrcset\s*=', re.I)
+_RE_PX = re.compile(r'(?:^|;)\s*(width|height)\s*:\s*(\d+(?:\.\d+)?)px', re.I)
+
+# =============================================
+# VARIANTES
+# =============================================
+
+class Variante(NamedTuple):
+    formato: str
+    largura: int
+    arquivo: str                # relativo a dist/
+    tamanho: int
+
+class Imagem(NamedTuple):
+    """Uma imagem original, o que foi gerado dela e quanto tempo levou"""
+    origem: str                 # relativo à raiz (e a dist/)
+    largura: int
+    altura: int
+    alfa: bool
+    variantes: Tuple[Variante, ...]
+    lqip: str
+    tamanho: int
+    tempo: float = 0.0
+
+def larguras(largura: int) -> List[int]:
+    """Larguras padrão menores que a original, mais a própria (até à maior padrão)"""
+    maior = min(largura, LARGURAS[-1])
+    return [w for w in LARGURAS if w < maior] + [maior]
+
+def formatos(alfa: bool) -> List[Tuple[str, str, str, Dict[str, Any]]]:
+    """Formatos a gerar (sem os que o Pillow instalado não escreve)"""
+    disponiveis = [f for f in FORMATOS if features.check(f[0])]
+    return disponiveis + [FORMATO_ALFA if alfa else FORMATO_OPACO]
+
+def tipo(formato: str) -> str:
+    for f in FORMATOS + (FORMATO_OPACO, FORMATO_ALFA):
+        if f[0] == formato:
+            return f[1]
+    raise KeyError(formato)
+
+def nome_variante(origem: str, largura: int, digest: str, formato: str) -> str:
+    """dist/variantes/assets/images/capa-640.<hash>.webp: o hash muda com a original (cache de 1 ano)"""
+    raiz = os.path.splitext(origem)[0]
+    return f"{VARIANTES}/{raiz}-{largura}.{digest[:TAMANHO_HASH]}.{formato}"
+
+def _abrir(caminho: str):
+    """Imagem orientada pelo EXIF, em RGB ou RGBA; devolve (imagem, alfa)"""
+    with Image.open(caminho) as original:
+        imagem = ImageOps.exif_transpose(original)
+        imagem.load()
+    alfa = imagem.mode in ('RGBA', 'LA', 'PA') or (imagem.mode == 'P' and 'transparency' in imagem.info)
+    return imagem.convert('RGBA' if alfa else 'RGB'), alfa
+
+def _codificar(imagem, formato_pil: str, opcoes: Dict[str, Any]) -> bytes:
+    saida = io.BytesIO()
+    imagem.save(saida, formato_pil, **opcoes)
+    return saida.getvalue()
+
+def lqip(imagem) -> str:
+    """Placeholder desfocado pelo próprio tamanho, em data URI"""
+    altura = max(1, round(imagem.height * LQIP_LARGURA / imagem.width))
+    pequena = imagem.resize((LQIP_LARGURA, altura), Image.Resampling.BOX)
+    dados = _codificar(pequena, 'WEBP', {'quality': LQIP_QUALIDADE})
+    return 'data:image/webp;base64,' + base64.b64encode(dados).decode('ascii')
+
+def _processar_em_processo(tarefa: Tuple[str, str, str, str]) -> Imagem:
+    """Gera as variantes e o placeholder de uma imagem"""
+    base_dir, dist_dir, origem, digest = tarefa
+    inicio = time.perf_counter()
+    tamanho = os.path.getsize(os.path.join(base_dir, origem))
+    try:
+        imagem, alfa = _abrir(os.path.join(base_dir, origem))
+    except OSError as e:
+        # Arquivo que o Pillow não lê: fica sem variantes até mudar
+        print(f"⚠️  {origem}: {e}")
+        return Imagem(origem, 0, 0, False, (), '', tamanho, time.perf_counter() - inicio)
+    variantes = []
+    for largura in larguras(imagem.width):
+        copia = imagem if largura == imagem.width else \
+            imagem.resize((largura, max(1, round(imagem.height * largura / imagem.width))), Image.Resampling.LANCZOS)
+        for formato, _, formato_pil, opcoes in formatos(alfa):
+            # Na largura original, o próprio arquivo serve de variante do formato dele
+            if largura == imagem.width and formato in (FORMATO_OPACO[0], FORMATO_ALFA[0]):
+                continue
+            dados = _codificar(copia, formato_pil, opcoes)
+            arquivo = nome_variante(origem, largura, digest, formato)
+            destino = os.path.join(dist_dir, arquivo)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            escrever_atomico(destino, dados)
+            variantes.append(Variante(formato, largura, arquivo, len(dados)))
+    return Imagem(origem, imagem.width, imagem.height, alfa, tuple(variantes), lqip(imagem), tamanho,
+                  time.perf_counter() - inicio)
+
+def originais(base_dir: str = BASE_DIR, origens: Iterable[str] = ORIGENS) -> List[str]:
+    """Imagens a otimizar (relativas à raiz), sem as vazias nem os ícones"""
+    encontradas = []
+    for origem in origens:
+        for diretorio, subdirs, nomes in os.walk(os.path.join(base_dir, origem)):
+            subdirs[:] = sorted(d for d in subdirs if not d.startswith('.'))
+            for nome in sorted(nomes):
+                caminho = os.path.join(diretorio, nome)
+                if nome.lower().endswith(EXTENSOES) and not nome.startswith('icon-') \
+                        and os.path.getsize(caminho) > 0:
+                    encontradas.append(os.path.relpath(caminho, base_dir).replace(os.sep, '/'))
+    return encontradas
+
+def _de_cache(entrada: Dict) -> Imagem:
+    return Imagem(entrada['origem'], entrada['largura'], entrada['altura'], entrada['alfa'],
+                  tuple(Variante(*v) for v in entrada['variantes']), entrada['lqip'], entrada['tamanho'])
+
+def otimizar(dist_dir: str, anterior: Dict, jobs: Optional[int] = None,
+             base_dir: str = BASE_DIR, origens: Iterable[str] = ORIGENS) -> Tuple[Dict[str, Imagem], Dict, int]:
+    """
+    Gera as variantes que faltam; devolve ({origem: Imagem}, cache, sem Pillow)
+
+    Uma imagem com o mesmo tamanho e data (ou, se mudaram, o mesmo hash) e
+    com as variantes ainda em dist_dir não volta a ser processada. As
+    variantes de imagens que mudaram ou desapareceram são apagadas. Sem o
+    Pillow só valem as do cache; as outras contam em `sem Pillow`.
+    """
+    entradas = anterior.get('imagens', {})
+    imagens: Dict[str, Imagem] = {}
+    cache: Dict[str, Dict] = {}
+    tarefas = []
+    sem_pillow = 0
+    for origem in originais(base_dir, origens):
+        caminho = os.path.join(base_dir, origem)
+        st = os.stat(caminho)
+        entrada = entradas.get(origem)
+        presentes = entrada and all(os.path.exists(os.path.join(dist_dir, v[2])) for v in entrada['variantes'])
+        if presentes and (entrada['tamanho'], entrada['mtime']) == (st.st_size, st.st_mtime_ns):
+            digest = entrada['hash']
+        else:
+            with open(caminho, 'rb') as f:
+                digest = hash_bytes(f.read())
+        if presentes and entrada['hash'] == digest:
+            cache[origem] = dict(entrada, mtime=st.st_mtime_ns)
+            imagens[origem] = _de_cache(entrada)
+        elif Image is None:
+            sem_pillow += 1
+        else:
+            tarefas.append((base_dir, dist_dir, origem, digest))
+            cache[origem] = {'hash': digest, 'mtime': st.st_mtime_ns}
+
+    if len(tarefas) >= MIN_PARALELO and (jobs or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            feitas = list(pool.map(_processar_em_processo, tarefas))
+    else:
+        feitas = [_processar_em_processo(t) for t in tarefas]
+    for imagem in feitas:
+        imagens[imagem.origem] = imagem
+        cache[imagem.origem].update(origem=imagem.origem, largura=imagem.largura, altura=imagem.altura,
+                                    alfa=imagem.alfa, variantes=[list(v) for v in imagem.variantes],
+                                    lqip=imagem.lqip, tamanho=imagem.tamanho)
+
+    _apagar_antigas(dist_dir, {v.arquivo for i in imagens.values() for v in i.variantes})
+    return imagens, {'imagens': cache} if cache else {}, sem_pillow
+
+def _apagar_antigas(dist_dir: str, atuais: Iterable[str]):
+    """Apaga de dist/variantes/ o que não é variante de nenhuma imagem atual"""
+    atuais = set(atuais)
+    raiz = os.path.join(dist_dir, VARIANTES)
+    for diretorio, subdirs, nomes in os.walk(raiz, topdown=False):
+        for nome in nomes:
+            caminho = os.path.join(diretorio, nome)
+            relativo = os.path.relpath(caminho, dist_dir).replace(os.sep, '/')
+            # As versões .gz/.br do compress_assets vão com o original
+            if relativo not in atuais and not nome.endswith(('.gz', '.br')):
+                os.remove(caminho)
+        if diretorio != raiz and not os.listdir(diretorio):
+            os.rmdir(diretorio)
+
+def chave(imagens: Dict[str, Imagem]) -> str:
+    """Muda quando alguma variante muda (as páginas com <img> têm de ser refeitas)"""
+    return hash_bytes(json.dumps(sorted((i.origem, i.largura, [v.arquivo for v in i.variantes])
+                                        for i in imagens.values())).encode('utf-8'))
+
+# =============================================
+# <IMG> -> <PICTURE>
+# =============================================
+
+def tamanho(attrs: Dict[str, str], imagem: Imagem) -> str:
+    """sizes de uma <img>: o atributo, a tabela TAMANHOS ou a largura em px do style"""
+    if attrs.get('sizes'):
+        return attrs['sizes']
+    for nome in attrs.get('class', '').split() + [attrs.get('id', '')]:
+        if nome in TAMANHOS:
+            return TAMANHOS[nome]
+    medidas = {m.group(1).lower(): float(m.group(2)) for m in _RE_PX.finditer(attrs.get('style', ''))}
+    if 'width' in medidas:
+        return f"{round(medidas['width'])}px"
+    if 'height' in medidas:
+        return f"{round(medidas['height'] * imagem.largura / imagem.altura)}px"
+    return TAMANHO_PADRAO
+
+def _srcset(prefixo: str, variantes: Iterable[Variante], extra: Optional[Tuple[str, int]] = None) -> str:
+    candidatos = [(prefixo + v.arquivo, v.largura) for v in sorted(variantes, key=lambda v: v.largura)]
+    if extra:
+        candidatos.append(extra)
+    return ', '.join(f"{url} {largura}w" for url, largura in candidatos)
+
+def picture(tag: str, attrs: Dict[str, str], imagem: Imagem) -> str:
+    """<picture> com um <source> por formato moderno e a <img> com srcset do formato dela"""
+    src = attrs['src']
+    normal = _normalizar_url(src)
+    prefixo = src[:len(src) - len(normal)] if src.endswith(normal) else ''
+    sizes = tamanho(attrs, imagem)
+    proprio = FORMATO_ALFA[0] if imagem.alfa else FORMATO_OPACO[0]
+    fontes = []
+    for formato, mime, _, _ in FORMATOS:
+        variantes = [v for v in imagem.variantes if v.formato == formato]
+        if variantes:
+            fontes.append(f'<source type="{mime}" srcset="{_srcset(prefixo, variantes)}" sizes="{sizes}">')
+    atributos = [('srcset', _srcset(prefixo, [v for v in imagem.variantes if v.formato == proprio],
+                                    (src, imagem.largura))),
+                 ('sizes', sizes)]
+    # O placeholder aparece por baixo enquanto a imagem carrega (nas transparentes ficaria à vista)
+    if imagem.lqip and not imagem.alfa and attrs.get('loading') == 'lazy' and 'background' not in attrs.get('style', ''):
+        estilo = attrs.get('style', '').strip().rstrip(';')
+        atributos.append(('style', (estilo + '; ' if estilo else '')
+                          + f"background: url({imagem.lqip}) center / cover no-repeat"))
+    return '<picture>' + ''.join(fontes) + com_atributos(tag, tuple(atributos)) + '</picture>'
+
+def _dentro(texto: str, posicao: int, tag: str) -> bool:
+    """A posição está dentro de um <tag> ainda aberto?"""
+    return texto.rfind(f'<{tag}', 0, posicao) > texto.rfind(f'</{tag}>', 0, posicao)
+
+def responsivas(texto: str, imagens: Dict[str, Imagem]) -> Tuple[str, int]:
+    """
+    As <img> de imagens com variantes trocadas por <picture>; devolve (texto, trocadas)
+
+    Corre em todas as páginas do catálogo: as tags são procuradas com uma
+    expressão regular e só as candidatas são analisadas. Ficam as que já
+    têm srcset ou já estão num <picture> e as de dentro de <script>.
+    """
+    if not imagens:
+        return texto, 0
+    partes = []
+    atual = 0
+    for m in _RE_IMG.finditer(texto):
+        src = _RE_SRC.search(m.group())
+        imagem = imagens.get(_normalizar_url(html.unescape(src.group(2)))) if src else None
+        if imagem is None or not imagem.variantes or _RE_SRCSET.search(m.group()) \
+                or _dentro(texto, m.start(), 'picture') or _dentro(texto, m.start(), 'script'):
+            continue
+        partes.append(texto[atual:m.start()])
+        partes.append(picture(m.group(), _Analisador(m.group()).elementos[0].attrs, imagem))
+        atual = m.end()
+    return ''.join(partes) + texto[atual:], len(partes) // 2
+
+# =============================================
+# ÍCONES
+# =============================================
+
+def gerar_icones(base_dir: str = BASE_DIR, fonte: str = ICONE_FONTE,
+                 manifest_file: str = MANIFEST_FILE) -> List[Tuple[str, int, bool]]:
+    """Grava cada ícone do manifest.json a partir de `fonte`; devolve [(src, lado, gravado)]"""
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    imagem, _ = _abrir(os.path.join(base_dir, fonte))
+    imagem = imagem.convert('RGBA')
+    feitos = []
+    for icone in manifest.get('icons', []):
+        lado = int(icone['sizes'].split('x')[0])
+        margem = round(lado * MARGEM_MASKABLE) if 'maskable' in icone.get('purpose', '') else 0
+        interior = lado - 2 * margem
+        copia = imagem.copy()
+        copia.thumbnail((interior, interior), Image.Resampling.LANCZOS)
+        tela = Image.new('RGBA', (lado, lado), (0, 0, 0, 0))
+        tela.paste(copia, ((lado - copia.width) // 2, (lado - copia.height) // 2), copia)
+        dados = _codificar(tela, 'PNG', {'optimize': True})
+        destino = os.path.join(base_dir, icone['src'])
+        try:
+            with open(destino, 'rb') as f:
+                igual = f.read() == dados
+        except FileNotFoundError:
+            igual = False
+        if not igual:
+            escrever_atomico(destino, dados)
+        feitos.append((icone['src'], lado, not igual))
+    return feitos
+
+# =============================================
+# PLACEHOLDERS NO DADOS.JSON
+# =============================================
+
+def _url(valor: str) -> str:
+    return _normalizar_url(url_imagem({'imagem': valor}, ''))
+
+def com_lqip(dados: Dict[str, Any], imagens: Dict[str, Imagem], campo: str = 'imagem') -> int:
+    """
+    Põe `<campo>Lqip` ao lado de cada `<campo>` das coleções (e da galeria)
+    cuja imagem tem placeholder; tira os que já não têm. Devolve as alterações.
+    """
+    alteracoes = 0
+    destino = campo + 'Lqip'
+    for colecao in dados.values():
+        if not isinstance(colecao, list):
+            continue
+        for item in colecao:
+            if not isinstance(item, dict) or not isinstance(item.get(campo), str):
+                continue
+            imagem = imagens.get(_normalizar_url(item[campo])) or imagens.get(_url(item[campo]))
+            valor = imagem.lqip if imagem else None
+            if item.get(destino) != valor:
+                if valor is None:
+                    del item[destino]
+                else:
+                    item[destino] = valor
+                alteracoes += 1
+    return alteracoes
+
+# =============================================
+# MAIN
+# =============================================
+
+def _ler_cache(caminho: str) -> Dict:
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def imprimir(imagens: Dict[str, Imagem], sem_pillow: int = 0):
+    """Bytes da original e das variantes de cada imagem processada agora, e o total"""
+    novas = [i for i in imagens.values() if i.tempo]
+    for imagem in sorted(novas, key=lambda i: -i.tamanho):
+        por_formato = {}
+        for v in imagem.variantes:
+            por_formato.setdefault(v.formato, []).append(v)
+        maiores = ', '.join(f"{f} {max(vs, key=lambda v: v.largura).tamanho / 1024:.1f}KB"
+                            for f, vs in por_formato.items())
+        print(f"🖼️  {imagem.origem} ({imagem.largura}x{imagem.altura}, {imagem.tamanho / 1024:.1f}KB): "
+              f"{len(imagem.variantes)} variantes em {imagem.tempo * 1000:.0f}ms; maior de cada formato: {maiores}")
+    print(f"\n📷 {len(imagens)} imagens ({len(novas)} processadas agora)")
+    if sem_pillow:
+        print(f"⚠️  {sem_pillow} imagens sem variantes: instale o Pillow (pip install Pillow)")
+
+def main(argv: Optional[List[str]] = None):
+    """Variantes em dist/ e, com --icones/--lqip, os ícones e os placeholders"""
+    parser = argparse.ArgumentParser(description="Variantes responsivas, ícones e placeholders das imagens")
+    parser.add_argument('diretorio', nargs='?', default=DIST_DIR, help="Onde gravar as variantes (padrão: dist/)")
+    parser.add_argument('--jobs', type=int, help="Processos (padrão: um por CPU)")
+    parser.add_argument('--icones', action='store_true', help=f"Gera os ícones do manifest.json a partir de {ICONE_FONTE}")
+    parser.add_argument('--lqip', action='store_true', help="Grava os placeholders no dados.json")
+    parser.add_argument('--sem-cache', action='store_true', help="Processa todas as imagens de novo")
+    args = parser.parse_args(argv)
+
+    if Image is None:
+        print("❌ Pillow não instalado (pip install Pillow)")
+        raise SystemExit(1)
+    if args.icones:
+        for src, lado, gravado in gerar_icones():
+            print(f"{'✅' if gravado else '➖'} {src} ({lado}x{lado})")
+
+    conteudo = _ler_cache(CACHE_FILE)
+    chave_dir = os.path.abspath(args.diretorio)
+    imagens, cache, sem_pillow = otimizar(args.diretorio, {} if args.sem_cache else conteudo.get(chave_dir, {}),
+                                          args.jobs)
+    conteudo[chave_dir] = cache
+    escrever_atomico(CACHE_FILE, json.dumps(conteudo, separators=(',', ':')).encode('utf-8'))
+    imprimir(imagens, sem_pillow)
+
+    if args.lqip:
+        # Grava pelo admin_dados: validação, shards e feed de alterações
+        from admin_dados import carregar_dados, salvar_dados
+        dados = carregar_dados()
+        alteracoes = com_lqip(dados, imagens)
+        if alteracoes:
+            salvar_dados(dados)
+        print(f"🔲 {alteracoes} placeholders alterados no dados.json")
+
+if __name__ == '__main__':
+    main()
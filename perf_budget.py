@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PERF_BUDGET.PY - Orçamento de desempenho de cada página
+Monta o grafo de recursos de cada página de um site gerado: scripts,
+folhas (e o que elas importam: @import e fontes), imagens (o src original,
+o mesmo com ou sem as variantes do Pillow), manifest e os JSON que os
+scripts buscam (dados.json). Calcula os pedidos, os bytes (transferidos:
+o .gz ao lado, se existir), os bytes que bloqueiam a renderização e a
+profundidade do caminho crítico, e compara com os limites de
+orcamento-desempenho.json. Sai com código 1 se alguma página passar do
+orçamento. Escreve o relatório em JSON e uma tabela Markdown
+"""
+
+import argparse
+import fnmatch
+import gzip
+import json
+import math
+import os
+import posixpath
+import re
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+from compress_assets import EXTENSOES as COMPRIMIVEIS, NIVEL_GZIP
+from dados_io import escrever_atomico
+from rewrite_html import DOMINIOS, _Analisador
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(BASE_DIR, 'dist')
+ORCAMENTO_FILE = os.path.join(BASE_DIR, 'orcamento-desempenho.json')
+
+# Métricas com limite no orçamento
+METRICAS = ('pedidos', 'transferencia', 'bloqueantes', 'pedidos_bloqueantes', 'profundidade', 'origens')
+
+# Folga do orçamento gravado com --atualizar (sobre a medida atual)
+MARGEM = 0.1
+
+# Origens que um recurso externo usa por sua vez (sem rede não se vê): o CSS
+# do Google Fonts baixa as fontes do fonts.gstatic.com
+ORIGENS_INDIRETAS = {'fonts.googleapis.com': ('fonts.gstatic.com',)}
+
+# <link rel=preload as=...> -> tipo do recurso
+PRELOADS = {'style': 'estilo', 'script': 'script', 'font': 'fonte', 'image': 'imagem', 'fetch': 'dados'}
+
+_RE_IMPORT = re.compile(r'''@import\s+(?:url\(\s*)?(?:'([^']+)'|"([^"]+)"|([^'")\s;]+))''', re.I)
+_RE_FONT_FACE = re.compile(r'@font-face\s*\{([^}]*)\}', re.I)
+_RE_URL = re.compile(r'''url\(\s*['"]?([^'")]+)['"]?\s*\)''', re.I)
+# Literais de JSON num script: fetch('dados.json?t=' + ...), 'dados/manifest.json'
+_RE_JSON = re.compile(r'''['"`]((?:\.?/)?[\w./-]+\.json)(?=[?'"`])''')
+
+class Recurso(NamedTuple):
+    url: str                      # caminho no site ('/js/app.js') ou URL externo
+    tipo: str                     # documento, script, estilo, fonte, imagem, dados, manifesto
+    externo: bool
+    bytes: Optional[int]          # None: externo (tamanho desconhecido sem rede)
+    transferencia: Optional[int]  # o .gz (ou gzip calculado) nos comprimíveis
+    bloqueante: bool
+    profundidade: int             # 1 = a página; cada nível é mais uma ida ao servidor
+    pai: Optional[str]
+
+class Medida(NamedTuple):
+    pagina: str
+    recursos: List[Recurso]
+    preconexoes: List[str]
+
+    def metricas(self) -> Dict[str, int]:
+        bloqueantes = [r for r in self.recursos if r.bloqueante and r.tipo != 'documento']
+        criticos = [r for r in self.recursos if r.bloqueante]
+        return {
+            'pedidos': len(self.recursos),
+            'bytes': sum(r.bytes or 0 for r in self.recursos),
+            'transferencia': sum(r.transferencia or 0 for r in self.recursos),
+            'bloqueantes': sum(r.transferencia or 0 for r in bloqueantes),
+            'pedidos_bloqueantes': len(bloqueantes),
+            'profundidade': max(r.profundidade for r in criticos),
+            'origens': len(self.origens()),
+        }
+
+    def origens(self) -> List[str]:
+        return list(dict.fromkeys(urlsplit(r.url).netloc for r in self.recursos if r.externo))
+
+    def notas(self) -> Dict[str, List[str]]:
+        """Arquivos do site que faltam (404) e preconnects sem uso ou em falta"""
+        usadas = self.origens()
+        indiretas = [i for o in usadas for i in ORIGENS_INDIRETAS.get(o, ())]
+        return {
+            'faltam': [r.url for r in self.recursos if not r.externo and r.bytes is None],
+            'preconexoes_sem_uso': [o for o in self.preconexoes if o not in usadas + indiretas],
+            'origens_sem_preconexao': [o for o in usadas if o not in self.preconexoes],
+        }
+
+# =============================================
+# TAMANHOS
+# =============================================
+
+class Tamanhos:
+    """Bytes e bytes transferidos de cada arquivo do site (calculados uma vez)"""
+
+    def __init__(self, site_dir: str):
+        self.site_dir = site_dir
+        self._cache: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+
+    def __call__(self, caminho: str) -> Tuple[Optional[int], Optional[int]]:
+        if caminho not in self._cache:
+            arquivo = os.path.join(self.site_dir, caminho)
+            try:
+                tamanho = os.path.getsize(arquivo)
+            except OSError:
+                self._cache[caminho] = (None, None)
+                return self._cache[caminho]
+            transferencia = tamanho
+            if caminho.endswith(COMPRIMIVEIS):
+                try:
+                    transferencia = os.path.getsize(arquivo + '.gz')
+                except OSError:
+                    with open(arquivo, 'rb') as f:
+                        transferencia = len(gzip.compress(f.read(), NIVEL_GZIP))
+                transferencia = min(transferencia, tamanho)
+            self._cache[caminho] = (tamanho, transferencia)
+        return self._cache[caminho]
+
+    def texto(self, caminho: str) -> str:
+        try:
+            with open(os.path.join(self.site_dir, caminho), 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()
+        except OSError:
+            return ''
+
+# =============================================
+# GRAFO
+# =============================================
+
+def _local(url: str) -> Optional[str]:
+    """Arquivo do site servido num URL absoluto ('/css/a.css'), ou None se for de outro site"""
+    partes = urlsplit(url)
+    if partes.scheme not in ('', 'http', 'https') or (partes.netloc and partes.netloc not in DOMINIOS):
+        return None
+    caminho = unquote(partes.path).lstrip('/')
+    return caminho + 'index.html' if not caminho or caminho.endswith('/') else caminho
+
+class _Grafo:
+    """Recursos de uma página, sem repetidos (o segundo pedido vem da cache)"""
+
+    def __init__(self, tamanhos: Tamanhos):
+        self.tamanhos = tamanhos
+        self.recursos: List[Recurso] = []
+        self._vistos = set()
+
+    def adicionar(self, url: str, tipo: str, bloqueante: bool, profundidade: int,
+                  pai: Optional[str]) -> Optional[Recurso]:
+        if url.startswith('data:') or url in self._vistos:
+            return None
+        self._vistos.add(url)
+        caminho = _local(url)
+        if caminho is None:
+            recurso = Recurso(url, tipo, True, None, None, bloqueante, profundidade, pai)
+        else:
+            tamanho, transferencia = self.tamanhos(caminho)
+            recurso = Recurso('/' + caminho, tipo, False, tamanho, transferencia, bloqueante, profundidade, pai)
+        self.recursos.append(recurso)
+        return recurso
+
+def _folha(grafo: _Grafo, folha: Recurso, texto: str, base: str):
+    """@import (bloqueia se a folha bloqueia) e fontes de uma folha"""
+    for m in _RE_IMPORT.finditer(texto):
+        filho = grafo.adicionar(urljoin(base, next(g for g in m.groups() if g)), 'estilo', folha.bloqueante, folha.profundidade + 1, folha.url)
+        if filho and not filho.externo:
+            _folha(grafo, filho, grafo.tamanhos.texto(filho.url.lstrip('/')), filho.url)
+    for bloco in _RE_FONT_FACE.finditer(texto):
+        for m in _RE_URL.finditer(bloco.group(1)):
+            grafo.adicionar(urljoin(base, m.group(1)), 'fonte', False, folha.profundidade + 1, folha.url)
+
+def _script(grafo: _Grafo, script: Recurso, pagina_url: str, site_dir: str):
+    """JSON que o script busca (os que existem no site)"""
+    for m in _RE_JSON.finditer(grafo.tamanhos.texto(script.url.lstrip('/'))):
+        url = urljoin(pagina_url, m.group(1))
+        caminho = _local(url)
+        if caminho and os.path.isfile(os.path.join(site_dir, caminho)):
+            grafo.adicionar(url, 'dados', False, script.profundidade + 1, script.url)
+
+def medir(site_dir: str, pagina: str, tamanhos: Optional[Tamanhos] = None) -> Medida:
+    """
+    Grafo de recursos de uma página. Bloqueiam a renderização as folhas
+    (sem media="print") e os <script src> sem async/defer/module, também os
+    do fim do <body>: os deferidos só correm depois deles. O conteúdo de
+    <noscript> não conta; as imagens de fundo do CSS também não (dependem
+    de as regras se aplicarem). Cada <img> conta pelo src: as variantes
+    AVIF/WebP só existem se o build correu com o Pillow, e o orçamento não
+    pode depender disso
+    """
+    tamanhos = tamanhos or Tamanhos(site_dir)
+    grafo = _Grafo(tamanhos)
+    url_pagina = '/' + pagina
+    documento = grafo.adicionar(url_pagina, 'documento', True, 1, None)
+    texto = tamanhos.texto(pagina)
+    analisador = _Analisador(texto)
+    base = url_pagina
+    preconexoes = []
+    noscript = 0
+    folhas: List[Tuple[Recurso, Optional[str]]] = []
+    scripts: List[Recurso] = []
+
+    for elemento in analisador.elementos:
+        if elemento.tag == 'noscript':
+            noscript += 1 if elemento.tipo == 'abre' else -1 if elemento.tipo == 'fecha' else 0
+            continue
+        if elemento.tipo != 'abre' or noscript > 0:
+            continue
+        attrs = elemento.attrs
+        tag = elemento.tag
+        if tag == 'base' and attrs.get('href'):
+            base = urljoin(url_pagina, attrs['href'])
+        elif tag == 'script' and attrs.get('src'):
+            bloqueante = not ({'async', 'defer'} & set(attrs)) and attrs.get('type') != 'module'
+            recurso = grafo.adicionar(urljoin(base, attrs['src']), 'script', bloqueante, 2, documento.url)
+            if recurso and not recurso.externo:
+                scripts.append(recurso)
+        elif tag == 'style':
+            fim = texto.find('</style', elemento.fim)
+            folhas.append((documento, texto[elemento.fim:fim if fim >= 0 else len(texto)]))
+        elif tag == 'link' and attrs.get('href'):
+            rels = attrs.get('rel', '').lower().split()
+            url = urljoin(base, attrs['href'])
+            if 'stylesheet' in rels:
+                bloqueante = attrs.get('media', 'all') not in ('print', 'none') and 'disabled' not in attrs
+                recurso = grafo.adicionar(url, 'estilo', bloqueante, 2, documento.url)
+            elif 'preload' in rels or 'modulepreload' in rels:
+                recurso = grafo.adicionar(url, PRELOADS.get(attrs.get('as', ''), 'script'), False, 2, documento.url)
+            elif 'manifest' in rels:
+                recurso = grafo.adicionar(url, 'manifesto', False, 2, documento.url)
+            else:
+                if 'preconnect' in rels or 'dns-prefetch' in rels:
+                    preconexoes.append(urlsplit(url).netloc)
+                continue
+            if recurso and recurso.tipo == 'estilo' and not recurso.externo:
+                folhas.append((recurso, None))
+            elif recurso and recurso.tipo == 'script' and not recurso.externo:
+                scripts.append(recurso)
+        elif tag == 'img' and attrs.get('src'):
+            grafo.adicionar(urljoin(base, attrs['src']), 'imagem', False, 2, documento.url)
+
+    for folha, inline in folhas:
+        conteudo = inline if inline is not None else tamanhos.texto(folha.url.lstrip('/'))
+        _folha(grafo, folha, conteudo, folha.url if inline is None else base)
+    for script in scripts:
+        _script(grafo, script, base, site_dir)
+    return Medida(pagina, grafo.recursos, list(dict.fromkeys(preconexoes)))
+
+def paginas(site_dir: str) -> List[str]:
+    """Todas as páginas HTML do site (caminhos com /)"""
+    encontradas = []
+    for diretorio, subdirs, nomes in os.walk(site_dir):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith('.'))
+        for nome in sorted(nomes):
+            if nome.endswith('.html'):
+                encontradas.append(os.path.relpath(os.path.join(diretorio, nome), site_dir).replace(os.sep, '/'))
+    return encontradas
+
+# =============================================
+# ORÇAMENTO
+# =============================================
+
+def ler_orcamento(caminho: str = ORCAMENTO_FILE) -> Dict:
+    """{padrao: {métrica: limite}, paginas: {nome ou padrão glob: {métrica: limite}}}"""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'padrao': {}, 'paginas': {}}
+
+def limites(orcamento: Dict, pagina: str) -> Dict[str, int]:
+    """Limites de uma página: o padrão, por cima a entrada exata ou o primeiro glob que casa"""
+    por_pagina = orcamento.get('paginas', {})
+    proprios = por_pagina.get(pagina)
+    if proprios is None:
+        proprios = next((v for k, v in por_pagina.items() if fnmatch.fnmatchcase(pagina, k)), {})
+    return {**orcamento.get('padrao', {}), **proprios}
+
+def excessos(metricas: Dict[str, int], limite: Dict[str, int]) -> List[str]:
+    return [m for m in METRICAS if m in limite and metricas[m] > limite[m]]
+
+def _com_margem(metrica: str, valor: int) -> int:
+    if metrica in ('pedidos', 'pedidos_bloqueantes', 'profundidade', 'origens'):
+        return valor
+    return int(math.ceil(valor * (1 + MARGEM) / 1024)) * 1024   # KB inteiros
+
+def novo_orcamento(relatorio: Dict[str, Dict]) -> Dict:
+    """
+    Orçamento a partir das medidas atuais (com MARGEM nos bytes). As
+    páginas do catálogo (produto/*.html, ...) ficam num glob por pasta, com
+    o maior valor de cada métrica; o padrão é o maior de todas
+    """
+    por_pagina: Dict[str, Dict[str, int]] = {}
+    for pagina, dados in relatorio.items():
+        pasta = posixpath.dirname(pagina)
+        chave = f"{pasta}/*.html" if pasta else pagina
+        atual = por_pagina.setdefault(chave, {})
+        for metrica in METRICAS:
+            atual[metrica] = max(atual.get(metrica, 0), dados['metricas'][metrica])
+    # Páginas novas, ainda sem entrada: o maior valor de todas
+    padrao = {m: max(metricas[m] for metricas in por_pagina.values()) for m in METRICAS}
+    return {'padrao': {m: _com_margem(m, v) for m, v in padrao.items()},
+            'paginas': {k: {m: _com_margem(m, metricas[m]) for m in METRICAS} for k, metricas in sorted(por_pagina.items())}}
+
+# =============================================
+# RELATÓRIO
+# =============================================
+
+def relatorio(site_dir: str, orcamento: Dict, nomes: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+    """{página: {metricas, limites, excessos, preconexoes, recursos}}"""
+    tamanhos = Tamanhos(site_dir)
+    resultado = {}
+    for pagina in (nomes or paginas(site_dir)):
+        medida = medir(site_dir, pagina, tamanhos)
+        metricas = medida.metricas()
+        limite = limites(orcamento, pagina)
+        resultado[pagina] = {
+            'metricas': metricas,
+            'limites': limite,
+            'excessos': excessos(metricas, limite),
+            'preconexoes': medida.preconexoes,
+            'notas': medida.notas(),
+            'recursos': [r._asdict() for r in medida.recursos],
+        }
+    return resultado
+
+def _kb(valor: int) -> str:
+    return f"{valor / 1024:.1f}KB"
+
+def markdown(relatorio: Dict[str, Dict]) -> str:
+    """Tabela com uma linha por página (valor / limite, ❌ acima do limite)"""
+    colunas = (('pedidos', 'Pedidos', str), ('transferencia', 'Transferência', _kb),
+               ('bloqueantes', 'Bloqueantes', _kb), ('pedidos_bloqueantes', 'Pedidos bloqueantes', str),
+               ('profundidade', 'Caminho crítico', str), ('origens', 'Outras origens', str))
+    linhas = ['| Página | ' + ' | '.join(titulo for _, titulo, _ in colunas) + ' | Estado |',
+              '|---|' + '---:|' * len(colunas) + ':---:|']
+    for pagina, dados in relatorio.items():
+        celulas = []
+        for metrica, _, formato in colunas:
+            valor = formato(dados['metricas'][metrica])
+            limite = dados['limites'].get(metrica)
+            if limite is not None:
+                valor += f" / {formato(limite)}" + (' ❌' if metrica in dados['excessos'] else '')
+            celulas.append(valor)
+        estado = '❌' if dados['excessos'] else ('✅' if dados['limites'] else '➖')
+        linhas.append(f"| {pagina} | " + ' | '.join(celulas) + f" | {estado} |")
+    titulos = {'faltam': 'não existe', 'preconexoes_sem_uso': 'preconnect sem uso',
+               'origens_sem_preconexao': 'origem sem preconnect'}
+    notas = [f"- {pagina}: {titulos[tipo]}: {', '.join(valores)}"
+             for pagina, dados in relatorio.items() for tipo, valores in dados['notas'].items() if valores]
+    if notas:
+        linhas += ['', '**Notas**', ''] + notas
+    return '\n'.join(linhas) + '\n'
+
+def _gravar(destino: str, conteudo: str):
+    if destino == '-':
+        sys.stdout.write(conteudo)
+    else:
+        escrever_atomico(destino, conteudo.encode('utf-8'))
+
+def main(argv: Optional[List[str]] = None):
+    """Mede as páginas de um site gerado e compara com o orçamento"""
+    parser = argparse.ArgumentParser(description="Orçamento de desempenho por página")
+    parser.add_argument('diretorio', nargs='?', default=DIST_DIR, help="Site gerado (padrão: dist/)")
+    parser.add_argument('--orcamento', default=ORCAMENTO_FILE, help="Arquivo com os limites")
+    parser.add_argument('--json', metavar='ARQUIVO', help="Grava o relatório completo em JSON ('-': saída padrão)")
+    parser.add_argument('--markdown', metavar='ARQUIVO', default='-', help="Tabela Markdown (padrão: saída padrão)")
+    parser.add_argument('--atualizar', action='store_true',
+                        help=f"Grava o orçamento a partir das medidas atuais (+{MARGEM * 100:.0f}%% nos bytes)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.diretorio):
+        print(f"❌ {args.diretorio} não existe (python build_site.py)")
+        raise SystemExit(1)
+    if args.atualizar:
+        medidas = relatorio(args.diretorio, {})
+        escrever_atomico(args.orcamento, (json.dumps(novo_orcamento(medidas), ensure_ascii=False, indent=2)
+                                          + '\n').encode('utf-8'))
+        print(f"✅ Orçamento de {len(medidas)} páginas gravado em {args.orcamento}")
+        return
+
+    dados = relatorio(args.diretorio, ler_orcamento(args.orcamento))
+    if args.json:
+        _gravar(args.json, json.dumps(dados, ensure_ascii=False, indent=2) + '\n')
+    if args.markdown != '-' or args.json != '-':
+        _gravar(args.markdown, markdown(dados))
+    acima = {p: d['excessos'] for p, d in dados.items() if d['excessos']}
+    # Com o relatório na saída padrão, o resumo vai para a de erros
+    saida = sys.stderr if '-' in (args.json, args.markdown) else sys.stdout
+    for pagina, metricas in acima.items():
+        print(f"❌ {pagina}: {', '.join(metricas)} acima do orçamento", file=saida)
+    print(f"{'❌' if acima else '✅'} {len(dados)} páginas, {len(acima)} acima do orçamento", file=saida)
+    if acima:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRECACHE_MANIFEST.PY - Lista de precache do service worker com revisões
+Junta as páginas que ficam disponíveis offline, os scripts e folhas que
+elas carregam (os pacotes com hash, se existirem) e os ícones do
+manifest.json, calcula a revisão de cada URL a partir do conteúdo e grava
+a lista no sw.js, entre os marcadores <precache-manifest>. O sw.js instala
+cada lista numa cache própria (a versão da lista no nome) e só volta a
+baixar as URLs cuja revisão mudou. Usado pelo build_site para gravar
+dist/sw.js; sozinho, confere a lista publicada com os arquivos
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from dados_io import escrever_atomico, hash_bytes
+from rewrite_html import _Analisador
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(BASE_DIR, 'dist')
+SW_FILE = os.path.join(BASE_DIR, 'sw.js')
+
+# Páginas disponíveis offline ('/' é a index.html)
+PAGINAS = ('index.html', 'sobre.html', 'servicos.html', 'workshops.html', 'produtos.html',
+           'contacto.html', 'blog.html', 'portfolio.html')
+
+# Além do que as páginas carregam
+EXTRAS = ('manifest.json', 'assets/images/icon-192x192.png', 'assets/images/icon-512x512.png')
+
+# <link rel> cujo href a página baixa logo
+RELS = ('stylesheet', 'preload', 'modulepreload', 'manifest')
+
+TAMANHO_REVISAO = 12
+
+_RE_MANIFESTO = re.compile(r'(// <precache-manifest>[^\n]*\n).*?(// </precache-manifest>)', re.S)
+
+_RE_ENTRADA = re.compile(r'url: ("(?:[^"\\]|\\.)*"), revision: "([0-9a-f]*)"')
+
+class ErroPrecache(Exception):
+    """URL da lista de precache sem arquivo (um 404 falha a instalação inteira)"""
+
+class Entrada(NamedTuple):
+    url: str
+    revisao: str
+    arquivo: str
+
+# =============================================
+# LISTA
+# =============================================
+
+def _caminho(url: str) -> str:
+    """Arquivo (relativo ao site) servido numa URL"""
+    caminho = urlsplit(url).path.lstrip('/')
+    return caminho + 'index.html' if not caminho or caminho.endswith('/') else caminho
+
+def carregados(texto: str, pagina: str) -> List[str]:
+    """URLs locais dos scripts, folhas, preloads e manifest de uma página"""
+    urls = []
+    for elemento in _Analisador(texto).elementos:
+        if elemento.tipo != 'abre':
+            continue
+        attrs = elemento.attrs
+        if elemento.tag == 'script':
+            href = attrs.get('src')
+        elif elemento.tag == 'link' and attrs.get('rel', '').lower() in RELS:
+            href = attrs.get('href')
+        else:
+            continue
+        if not href:
+            continue
+        url = urljoin('/' + pagina, href.strip())
+        partes = urlsplit(url)
+        if not partes.netloc and not partes.scheme:
+            urls.append(partes.path)
+    return urls
+
+def listar(site_dir: str, paginas: Iterable[str] = PAGINAS, extras: Iterable[str] = EXTRAS) -> List[str]:
+    """URLs a pôr em precache, sem repetidas, pela ordem em que aparecem"""
+    urls = ['/']
+    for pagina in paginas:
+        urls.append('/' + pagina)
+        try:
+            with open(os.path.join(site_dir, pagina), 'r', encoding='utf-8-sig') as f:
+                urls.extend(carregados(f.read(), pagina))
+        except FileNotFoundError:
+            pass  # fica na lista: o manifesto() diz que falta
+    urls.extend('/' + extra for extra in extras)
+    return list(dict.fromkeys(posixpath.normpath(u) if u != '/' else u for u in urls))
+
+def manifesto(site_dir: str, urls: Iterable[str]) -> List[Entrada]:
+    """Revisão de cada URL (hash do conteúdo); levanta ErroPrecache se faltar algum arquivo"""
+    entradas = []
+    faltam = []
+    for url in urls:
+        arquivo = _caminho(url)
+        try:
+            with open(os.path.join(site_dir, arquivo), 'rb') as f:
+                entradas.append(Entrada(url, hash_bytes(f.read())[:TAMANHO_REVISAO], arquivo))
+        except FileNotFoundError:
+            faltam.append(url)
+    if faltam:
+        raise ErroPrecache(f"URLs do precache sem arquivo em {site_dir}: {', '.join(faltam)}")
+    return entradas
+
+# =============================================
+# SW.JS
+# =============================================
+
+def versao(entradas: Iterable[Entrada]) -> str:
+    """Nome da cache do sw.js: muda com qualquer URL ou revisão da lista"""
+    return hash_bytes(''.join(f"{e.url} {e.revisao}\n" for e in entradas).encode('utf-8'))[:TAMANHO_REVISAO]
+
+def para_js(entradas: Iterable[Entrada]) -> str:
+    entradas = list(entradas)
+    linhas = [f"  {{ url: {json.dumps(e.url)}, revision: {json.dumps(e.revisao)} }}" for e in entradas]
+    return ('const PRECACHE_MANIFEST = [\n' + ',\n'.join(linhas) + '\n];\n'
+            f'const PRECACHE_VERSION = {json.dumps(versao(entradas))};\n')
+
+def inserir(sw: str, entradas: Iterable[Entrada]) -> str:
+    """O sw.js com a lista entre os marcadores <precache-manifest>"""
+    if not _RE_MANIFESTO.search(sw):
+        raise ErroPrecache("sw.js sem os marcadores // <precache-manifest> ... // </precache-manifest>")
+    bloco = para_js(entradas)
+    return _RE_MANIFESTO.sub(lambda m: m.group(1) + bloco + m.group(2), sw, count=1)
+
+def gerar(site_dir: str, origem: str = SW_FILE, destino: Optional[str] = None) -> Tuple[List[Entrada], bool]:
+    """
+    Grava em `destino` (padrão: site_dir/sw.js) o sw.js de `origem` com a
+    lista de precache de site_dir; devolve (entradas, gravado). O arquivo
+    só é reescrito se mudou: outro sw.js faz os browsers instalarem de novo.
+    """
+    destino = destino or os.path.join(site_dir, 'sw.js')
+    entradas = manifesto(site_dir, listar(site_dir))
+    with open(origem, 'r', encoding='utf-8') as f:
+        conteudo = inserir(f.read(), entradas).encode('utf-8')
+    try:
+        with open(destino, 'rb') as f:
+            if f.read() == conteudo:
+                return entradas, False
+    except FileNotFoundError:
+        pass
+    escrever_atomico(destino, conteudo)
+    return entradas, True
+
+def publicado(sw: str) -> Dict[str, str]:
+    """{url: revisão} da lista gravada num sw.js"""
+    m = _RE_MANIFESTO.search(sw)
+    if not m:
+        return {}
+    return {json.loads(url): revisao for url, revisao in _RE_ENTRADA.findall(m.group(0))}
+
+# =============================================
+# MAIN
+# =============================================
+
+def main(argv: Optional[List[str]] = None):
+    """Confere (ou grava) a lista de precache do sw.js de um site gerado"""
+    parser = argparse.ArgumentParser(description="Lista de precache do service worker")
+    parser.add_argument('diretorio', nargs='?', default=DIST_DIR, help="Site gerado (padrão: dist/)")
+    parser.add_argument('--gravar', action='store_true', help=f"Grava o sw.js do diretório a partir de {SW_FILE}")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.gravar:
+            entradas, gravado = gerar(args.diretorio)
+            print(f"{'✅' if gravado else '➖'} {len(entradas)} URLs em precache "
+                  f"({'sw.js gravado' if gravado else 'sw.js sem alterações'})")
+            return
+        entradas = manifesto(args.diretorio, listar(args.diretorio))
+    except ErroPrecache as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    try:
+        with open(os.path.join(args.diretorio, 'sw.js'), 'r', encoding='utf-8') as f:
+            revisoes = publicado(f.read())
+    except FileNotFoundError:
+        revisoes = {}
+    desatualizadas = 0
+    for entrada in entradas:
+        atual = revisoes.get(entrada.url)
+        estado = '✅' if atual == entrada.revisao else ('🆕' if atual is None else '🔄')
+        desatualizadas += estado != '✅'
+        tamanho = os.path.getsize(os.path.join(args.diretorio, entrada.arquivo))
+        print(f"{estado} {entrada.url} {entrada.revisao} ({tamanho / 1024:.1f}KB)")
+    sobras = sorted(set(revisoes) - {e.url for e in entradas})
+    for url in sobras:
+        print(f"🗑️  {url} (na lista publicada, já não é usado)")
+    total = sum(os.path.getsize(os.path.join(args.diretorio, e.arquivo)) for e in entradas)
+    print(f"\n📋 {len(entradas)} URLs, {total / 1024:.1f}KB em precache; "
+          f"{desatualizadas + len(sobras)} diferenças com o sw.js publicado")
+    if desatualizadas or sobras:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRERENDER.PY - Páginas do catálogo geradas a partir do dados.json
+Cada serviço, workshop, evento, produto e post visível ganha uma página
+estática (dist/produto/<id>.html, ...) feita a partir do template de detalhe
+de src/, e as listagens (produtos.html, ...) saem já com os cartões. O JS
+continua a carregar e atualiza a página por cima (hidratação); sem dados no
+navegador, o conteúdo estático fica. Usado pelo build_site, que guarda os
+itens de cada página no grafo de dependências
+"""
+
+import html
+import re
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+from rewrite_html import _Analisador, com_atributos
+
+SUFIXO_TITULO = ' - Yemar Makeup Artist'
+PLACEHOLDER = 'assets/images/placeholder.jpg'
+MESES = ('JAN', 'FEV', 'MAR', 'ABR', 'MAI', 'JUN', 'JUL', 'AGO', 'SET', 'OUT', 'NOV', 'DEZ')
+
+# Só estes ids dão nome de arquivo (os outros itens ficam no template com ?id=)
+_RE_ID = re.compile(r'^[\w.-]+$')
+
+# Elementos sem fecho (só os atributos podem mudar)
+VAZIOS = frozenset({'img', 'input', 'meta', 'link', 'br', 'hr', 'source', 'base'})
+
+
+class Alteracao(NamedTuple):
+    conteudo: Optional[str] = None              # HTML interno novo (None = mantém)
+    atributos: Tuple[Tuple[str, str], ...] = ()  # substituídos ou acrescentados
+    inicio: str = ''                            # HTML logo a seguir à tag de abertura
+
+
+class Colecao(NamedTuple):
+    chave: str                                  # coleção no dados.json
+    template: str                               # página de detalhe em src/
+    pasta: str                                  # dist/<pasta>/<id>.html
+    listagem: str                               # página com os cartões
+    contentor: str                              # id do elemento dos cartões
+    cartao: Callable[[Dict], str]
+    detalhe: Callable[[Dict], Dict[str, Alteracao]]
+
+    def saida(self, item_id: str) -> str:
+        return f"{self.pasta}/{item_id}.html"
+
+
+class Pagina(NamedTuple):
+    """Uma página do catálogo: de que template sai e que itens mostra"""
+    template: str
+    colecao: str
+    itens: Tuple[str, ...]
+    detalhe: bool
+
+# =============================================
+# FORMATAÇÃO (igual à do ui.js)
+# =============================================
+
+def _texto(valor: Any) -> str:
+    return html.escape('' if valor is None else str(valor), quote=True)
+
+def _numero(valor: Any) -> str:
+    """Número como o JS o escreve num template (150.0 -> 150)"""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return '' if valor is None else str(valor)
+
+def _preco(valor: Any) -> str:
+    return f"{_numero(valor)}€"
+
+def _paragrafos(valor: Any) -> str:
+    """Texto simples com as quebras de linha em <br>"""
+    return _texto(valor).replace('\n', '<br>')
+
+def _truncar(valor: Any, maximo: int) -> str:
+    texto = '' if valor is None else str(valor)
+    if len(texto) <= maximo:
+        return _texto(texto)
+    return _texto(texto[:maximo].strip() + '...')
+
+def _data(valor: Any) -> Optional[date]:
+    try:
+        return date.fromisoformat(str(valor)[:10])
+    except ValueError:
+        return None
+
+def _formatar_data(valor: Any) -> str:
+    dia = _data(valor)
+    return dia.strftime('%d/%m/%Y') if dia else ''
+
+def url_imagem(item: Dict, padrao: str = PLACEHOLDER) -> str:
+    """Mesma normalização do getImageUrl do ui.js"""
+    imagem = item.get('imagemUrl') or item.get('imagem')
+    if not imagem or not isinstance(imagem, str):
+        return padrao
+    if imagem.startswith(('http://', 'https://')):
+        return imagem
+    if imagem.startswith('./'):
+        imagem = imagem[2:]
+    if imagem.startswith(('assets/', '/assets/')):
+        return imagem
+    if imagem.startswith('images/'):
+        return f"assets/{imagem}"
+    if '/' not in imagem:
+        return f"assets/images/{imagem}"
+    return imagem
+
+def _img(item: Dict, padrao: str, alt: Any) -> str:
+    return (f'<img src="{_texto(url_imagem(item, padrao))}" alt="{_texto(alt)}" loading="lazy" '
+            f'onerror="this.onerror=null;this.src=\'{PLACEHOLDER}\';">')
+
+def _imagem_detalhe(item: Dict, padrao: str, alt: Any) -> Alteracao:
+    return Alteracao(atributos=(('src', url_imagem(item, padrao)), ('alt', '' if alt is None else str(alt)),
+                                ('onerror', f"this.onerror=null;this.src='{PLACEHOLDER}';")))
+
+def _link(pasta: str, item: Dict) -> str:
+    return f"{pasta}/{quote(str(item['id']))}.html"
+
+def _nome(item: Dict) -> Any:
+    return item.get('nome') or item.get('titulo')
+
+# =============================================
+# CARTÕES E DETALHES POR COLEÇÃO
+# =============================================
+
+def cartao_servico(s: Dict) -> str:
+    return f'''
+        <article class="card service-card">
+            <div class="card-image">
+                {_img(s, 'assets/images/servico-default.jpg', _nome(s))}
+                <span class="card-category">{_texto(s.get('categoria') or 'SERVIÇO')}</span>
+            </div>
+            <div class="card-content">
+                <h3 class="card-title">{_texto(_nome(s))}</h3>
+                <p class="card-excerpt">{_truncar(s.get('descricao'), 100)}</p>
+                <div class="card-meta">
+                    <span class="card-price">{_preco(s.get('preco'))}</span>
+                    <span class="card-duration">{_texto(s.get('duracao'))}</span>
+                </div>
+                <a href="{_link('servico', s)}" class="btn btn-outline">Ver Detalhes</a>
+            </div>
+        </article>
+    '''
+
+def detalhe_servico(s: Dict) -> Dict[str, Alteracao]:
+    return {
+        '#serviceImage': _imagem_detalhe(s, 'assets/images/servico-default.jpg', _nome(s)),
+        '#serviceCategory': Alteracao(_texto(s.get('categoria') or 'SERVIÇO')),
+        '#serviceTitle': Alteracao(_texto(_nome(s))),
+        '#servicePrice': Alteracao(_preco(s.get('preco'))),
+        '#serviceDuration': Alteracao(_texto(s.get('duracao'))),
+        '#serviceDescription': Alteracao(_paragrafos(s.get('descricao'))),
+    }
+
+def cartao_workshop(w: Dict) -> str:
+    return f'''
+        <article class="card workshop-card">
+            <div class="card-image">
+                {_img(w, 'assets/images/workshop-default.jpg', w.get('titulo'))}
+                <span class="card-category">{_texto(w.get('modalidade') or 'WORKSHOP')}</span>
+            </div>
+            <div class="card-content">
+                <h3 class="card-title">{_texto(w.get('titulo'))}</h3>
+                <p class="card-excerpt">{_truncar(w.get('descricao'), 100)}</p>
+                <div class="card-meta">
+                    <span class="card-price">{_preco(w.get('preco'))}</span>
+                    <span class="card-duration">{_texto(w.get('duracao'))}</span>
+                </div>
+                <a href="{_link('workshop', w)}" class="btn btn-primary">Marque Já</a>
+            </div>
+        </article>
+    '''
+
+def detalhe_workshop(w: Dict) -> Dict[str, Alteracao]:
+    alteracoes = {
+        '#workshopImage': _imagem_detalhe(w, 'assets/images/workshop-default.jpg', w.get('titulo')),
+        '#workshopModality': Alteracao(_texto(w.get('modalidade') or 'WORKSHOP')),
+        '#workshopTitle': Alteracao(_texto(w.get('titulo'))),
+        '#workshopPrice': Alteracao(_preco(w.get('preco'))),
+        '#workshopDuration': Alteracao(_texto(w.get('duracao'))),
+        '#workshopVagas': Alteracao(f"{_numero(w.get('vagas'))} vagas"),
+        '#workshopDescription': Alteracao(_paragrafos(w.get('descricao'))),
+    }
+    if w.get('observacoes'):
+        alteracoes['#workshopNotes'] = Alteracao(_paragrafos(w['observacoes']))
+    return alteracoes
+
+def cartao_evento(e: Dict) -> str:
+    dia = _data(e.get('data'))
+    preco = e.get('preco') or 0
+    botao = f"Inscrever-se - {_preco(preco)}" if preco > 0 else 'Inscrever-se Grátis'
+    return f'''
+        <article class="card event-card">
+            <div class="card-image">
+                {_img(e, 'assets/images/evento-default.jpg', e.get('titulo'))}
+                <div class="event-date-badge">
+                    <span class="day">{dia.day if dia else ''}</span>
+                    <span class="month">{MESES[dia.month - 1] if dia else ''}</span>
+                </div>
+            </div>
+            <div class="card-content">
+                <h3 class="card-title">{_texto(e.get('titulo'))}</h3>
+                <div class="event-info">
+                    <p><strong>Data:</strong> {_formatar_data(e.get('data'))}</p>
+                    <p><strong>Local:</strong> {_texto(e.get('local'))}</p>
+                    <p><strong>Vagas:</strong> {_numero(e.get('vagas'))}</p>
+                </div>
+                <p class="card-excerpt">{_truncar(e.get('descricao'), 80)}</p>
+                <button class="btn btn-primary" onclick="openEventBookingModal('{_texto(e['id'])}')">
+                    {botao}
+                </button>
+            </div>
+        </article>
+    '''
+
+def detalhe_evento(e: Dict) -> Dict[str, Alteracao]:
+    preco = e.get('preco') or 0
+    hora = e.get('horario') or (str(e.get('data', ''))[11:16])
+    return {
+        '#eventImage': _imagem_detalhe(e, 'assets/images/evento-default.jpg', e.get('titulo')),
+        '#eventTitle': Alteracao(_texto(e.get('titulo'))),
+        '#eventDate': Alteracao(_formatar_data(e.get('data'))),
+        '#eventTime': Alteracao(_texto(hora)),
+        '#eventLocation': Alteracao(_texto(e.get('local'))),
+        '#eventSpots': Alteracao(_numero(e.get('vagas'))),
+        '#eventPrice': Alteracao(_preco(preco) if preco > 0 else 'Gratuito'),
+        '#eventDescription': Alteracao(_paragrafos(e.get('descricao'))),
+    }
+
+def cartao_produto(p: Dict) -> str:
+    return f'''
+        <article class="card product-card">
+            <div class="card-image">
+                {_img(p, 'assets/images/produto-default.jpg', p.get('nome'))}
+                <span class="card-category">{_texto(p.get('categoria'))}</span>
+            </div>
+            <div class="card-content">
+                <h3 class="card-title">{_texto(p.get('nome'))}</h3>
+                <p class="card-price-large">{_preco(p.get('preco'))}</p>
+                <div class="card-actions">
+                    <a href="{_link('produto', p)}" class="btn btn-outline btn-sm">Ver Detalhes</a>
+                    <button class="btn btn-primary btn-sm" onclick="addProductToCart('{_texto(p['id'])}')">Adicionar</button>
+                </div>
+            </div>
+        </article>
+    '''
+
+def detalhe_produto(p: Dict) -> Dict[str, Alteracao]:
+    alteracoes = {
+        '#productImage': _imagem_detalhe(p, 'assets/images/produto-default.jpg', p.get('nome')),
+        '#productCategory': Alteracao(_texto(p.get('categoria'))),
+        '#productTitle': Alteracao(_texto(p.get('nome'))),
+        '#productPrice': Alteracao(_preco(p.get('preco'))),
+        '#productDescription': Alteracao(_paragrafos(p.get('descricao'))),
+    }
+    if p.get('stock') is not None:
+        alteracoes['#productStock'] = Alteracao(f"Stock: {_numero(p['stock'])}")
+    return alteracoes
+
+def _data_post(post: Dict) -> Any:
+    return post.get('dataPublicacao') or post.get('data')
+
+def cartao_post(post: Dict) -> str:
+    return f'''
+        <article class="editorial-card">
+            <div class="editorial-header">
+                <span class="editorial-category">{_texto(post.get('categoria'))}</span>
+                <h3 class="editorial-title">{_texto(post.get('titulo'))}</h3>
+                <p class="editorial-date">Posted on {_formatar_data(_data_post(post))}</p>
+            </div>
+            <div class="editorial-image">
+                <a href="{_link('post', post)}">
+                    {_img(post, 'assets/images/blog-default.jpg', post.get('titulo'))}
+                </a>
+            </div>
+            <div class="editorial-content">
+                <p class="editorial-excerpt">{_texto(post.get('excerpt') or post.get('resumo'))}</p>
+                <a href="{_link('post', post)}" class="btn-continue">CONTINUE READING</a>
+            </div>
+            <div class="editorial-actions">
+                <span class="action-comments">💬 {len(post.get('comentarios') or [])} COMMENTS</span>
+                <div class="action-share">
+                    <a href="#" class="share-icon" title="Facebook">f</a>
+                    <a href="#" class="share-icon" title="Twitter">t</a>
+                    <a href="#" class="share-icon" title="Pinterest">p</a>
+                </div>
+                <span class="action-likes" onclick="handleLikePost('{_texto(post['id'])}')">❤ {_numero(post.get('likes') or 0)}</span>
+            </div>
+        </article>
+    '''
+
+def detalhe_post(post: Dict) -> Dict[str, Alteracao]:
+    # O conteúdo dos posts já é HTML (o app.js também o insere como está)
+    return {
+        '#postCategory': Alteracao(_texto(post.get('categoria'))),
+        '#postTitle': Alteracao(_texto(post.get('titulo'))),
+        '#postDate': Alteracao(f"Posted on {_formatar_data(_data_post(post))}"),
+        '#postImage': _imagem_detalhe(post, 'assets/images/blog-default.jpg', post.get('titulo')),
+        '#postContent': Alteracao(str(post.get('conteudo') or '').replace('\n', '<br>')),
+        '#likesCount': Alteracao(_numero(post.get('likes') or 0)),
+        '#commentsTitle': Alteracao(f"Comentários ({len(post.get('comentarios') or [])})"),
+    }
+
+
+COLECOES = (
+    Colecao('servicos', 'servico.html', 'servico', 'servicos.html', 'servicesContainer',
+            cartao_servico, detalhe_servico),
+    Colecao('workshops', 'workshop.html', 'workshop', 'workshops.html', 'workshopsContainer',
+            cartao_workshop, detalhe_workshop),
+    Colecao('eventos', 'evento.html', 'evento', 'eventos.html', 'eventsContainer',
+            cartao_evento, detalhe_evento),
+    Colecao('produtos', 'produto.html', 'produto', 'produtos.html', 'productsContainer',
+            cartao_produto, detalhe_produto),
+    Colecao('blog', 'post.html', 'post', 'blog.html', 'postsContainer',
+            cartao_post, detalhe_post),
+)
+POR_CHAVE = {c.chave: c for c in COLECOES}
+
+# =============================================
+# PLANO
+# =============================================
+
+def visivel(item: Dict) -> bool:
+    """O item aparece no site? (ativo no storage.js, disponivel/publicado no dados.json)"""
+    for campo in ('ativo', 'disponivel', 'publicado'):
+        if campo in item:
+            return bool(item[campo])
+    return True
+
+def itens_visiveis(dados: Dict, colecao: Colecao) -> Iterator[Dict]:
+    for item in dados.get(colecao.chave) or []:
+        if isinstance(item, dict) and _RE_ID.match(str(item.get('id', ''))) and visivel(item):
+            yield item
+
+def planear(dados: Dict, templates: List[str]) -> Dict[str, Pagina]:
+    """
+    Páginas do catálogo: uma listagem por coleção e um detalhe por item visível
+
+    Uma página depende só dos itens que mostra (as chaves <colecao>.<id> do
+    dados.json) e da lista deles: alterar um produto volta a gerar a página
+    dele e as listagens onde ele aparece.
+    """
+    plano: Dict[str, Pagina] = {}
+    for colecao in COLECOES:
+        itens = [str(item['id']) for item in itens_visiveis(dados, colecao)]
+        if colecao.listagem in templates:
+            plano[colecao.listagem] = Pagina(colecao.listagem, colecao.chave, tuple(itens), False)
+        if colecao.template in templates:
+            for item_id in itens:
+                plano[colecao.saida(item_id)] = Pagina(colecao.template, colecao.chave, (item_id,), True)
+    return plano
+
+def chaves(pagina: Pagina) -> List[str]:
+    """Chaves do dados.json de que a página depende (para o grafo do build)"""
+    return [f"{pagina.colecao}.{item_id}" for item_id in pagina.itens]
+
+# =============================================
+# PREENCHIMENTO
+# =============================================
+
+_RE_SELETOR = re.compile(r'^(?:#([\w-]+)|(\w+)(?:\[([\w-]+)=([\w-]+)\])?)$')
+_RE_FRAGMENTO = re.compile(r'''\shref\s*=\s*["'](?=#)''')
+
+def _casa(seletor: Tuple[Optional[str], ...], tag: str, attrs: Dict[str, str]) -> bool:
+    id_, nome, atributo, valor = seletor
+    if id_:
+        return attrs.get('id') == id_
+    return tag == nome and (atributo is None or attrs.get(atributo, '').lower() == valor)
+
+def _fecho(elementos: List, i: int) -> Optional[int]:
+    """Índice do fecho do elemento i (conta os elementos iguais aninhados)"""
+    tag = elementos[i].tag
+    nivel = 0
+    for j in range(i + 1, len(elementos)):
+        elemento = elementos[j]
+        if elemento.tag != tag:
+            continue
+        if elemento.tipo == 'abre':
+            nivel += 1
+        elif elemento.tipo == 'fecha':
+            if nivel == 0:
+                return j
+            nivel -= 1
+    return None
+
+class Molde:
+    """
+    Página montada analisada uma vez; cada item do catálogo só emenda texto
+    nas posições já conhecidas (um template de detalhe serve todos os itens)
+    """
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self.elementos = _Analisador(texto).elementos
+        self._posicoes: Dict[str, Optional[Tuple[int, int, Optional[int]]]] = {}
+        # Posição do "#" de cada href="#..." (o <base> do detalhe mudava-lhes o destino)
+        self.fragmentos = [m.end() for m in _RE_FRAGMENTO.finditer(texto)]
+
+    def _posicao(self, seletor: str) -> Optional[Tuple[int, int, Optional[int]]]:
+        """(início e fim da tag de abertura, início do fecho) do primeiro elemento que casa"""
+        if seletor not in self._posicoes:
+            partes = _RE_SELETOR.match(seletor).groups()
+            self._posicoes[seletor] = None
+            for i, elemento in enumerate(self.elementos):
+                if elemento.tipo == 'abre' and _casa(partes, elemento.tag, elemento.attrs):
+                    j = _fecho(self.elementos, i) if elemento.tag not in VAZIOS else None
+                    fecho = self.elementos[j].inicio if j is not None else None
+                    self._posicoes[seletor] = (elemento.inicio, elemento.fim, fecho)
+                    break
+        return self._posicoes[seletor]
+
+    def aplicar(self, alteracoes: Dict[str, Alteracao], fragmento: str = '') -> str:
+        """Texto com as alterações; `fragmento` entra antes do # dos href="#..." """
+        emendas: List[Tuple[int, int, str]] = []
+        substituidos: List[Tuple[int, int]] = []
+        for seletor, alteracao in alteracoes.items():
+            posicao = self._posicao(seletor)
+            if posicao is None:
+                continue
+            inicio, fim, fecho = posicao
+            abertura = com_atributos(self.texto[inicio:fim], alteracao.atributos) + alteracao.inicio
+            emendas.append((inicio, fim, abertura))
+            if alteracao.conteudo is not None and fecho is not None:
+                emendas.append((fim, fecho, alteracao.conteudo))
+                substituidos.append((fim, fecho))
+        if fragmento:
+            emendas.extend((p, p, fragmento) for p in self.fragmentos
+                           if not any(fim <= p < fecho for fim, fecho in substituidos))
+        partes = []
+        atual = 0
+        for inicio, fim, novo in sorted(emendas, key=lambda e: e[0]):
+            partes.append(self.texto[atual:inicio])
+            partes.append(novo)
+            atual = fim
+        partes.append(self.texto[atual:])
+        return ''.join(partes)
+
+def preencher(molde: Molde, saida: str, pagina: Pagina, itens: List[Dict],
+              compactar: Optional[Callable[[str], str]] = None) -> str:
+    """
+    Página do catálogo: o molde (template de src/ já montado) com os itens
+
+    Na listagem, os cartões entram no contentor (passados por `compactar`,
+    se indicado). No detalhe, o <base href="../"> mantém os caminhos
+    relativos do template (CSS, JS, links, fetch do dados.json) a apontar
+    para a raiz, e os links "#..." passam a incluir a própria página; o
+    data-id no <body> diz ao app.js que item hidratar quando não há ?id=.
+    """
+    colecao = POR_CHAVE[pagina.colecao]
+    if not pagina.detalhe:
+        cartoes = ''.join(colecao.cartao(item) for item in itens)
+        if compactar:
+            cartoes = compactar(cartoes)
+        return molde.aplicar({f"#{colecao.contentor}": Alteracao(cartoes, (('data-prerender', ''),))})
+
+    item = itens[0]
+    alteracoes = colecao.detalhe(item)
+    alteracoes['head'] = Alteracao(inicio='<base href="../">')
+    alteracoes['body'] = Alteracao(atributos=(('data-id', str(item['id'])),))
+    alteracoes['title'] = Alteracao(_texto(_nome(item)) + SUFIXO_TITULO)
+    descricao = item.get('resumo') or item.get('descricao')
+    if descricao:
+        alteracoes['meta[name=description]'] = Alteracao(atributos=(('content', str(descricao)[:160]),))
+    return molde.aplicar(alteracoes, saida)
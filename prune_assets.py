@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRUNE_ASSETS.PY - CSS e JS que nenhuma página usa
+Junta as tags, classes e ids de todas as páginas com as classes que os
+scripts constroem, e tira do css/styles.css as regras que não apanham
+nada; monta o grafo de chamadas das funções globais do app.js, ui.js e
+storage.js a partir do que as páginas executam (scripts inline, onclick...)
+e tira as funções a que nada chega. Usado pelo build_site nos pacotes;
+sozinho, mostra o relatório (ou grava as versões podadas)
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from bundle_assets import tokens_js
+from critical_css import Regra, _classes, analisar_css, compostos, filtrar, referidos
+from rewrite_html import _Analisador
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# O que é podado
+ESTILOS = ('css/styles.css',)
+SCRIPTS = ('js/storage.js', 'js/ui.js', 'js/app.js')
+
+# Além das páginas: o que pode pôr classes ou chamadas no HTML (os cartões
+# do prerender, o conteúdo dos posts no dados.json)
+EXTRAS = ('prerender.py', 'dados.json')
+
+Intervalo = Tuple[int, int]
+
+# =============================================
+# USO
+# =============================================
+
+_RE_PALAVRA = re.compile(r'[\w$-]+')
+_RE_EVENTO = re.compile(r'''\bon[a-z]+\s*=\s*\\?["']([^"'\\]*)''', re.I)
+
+class Uso:
+    """Tags, ids e classes que podem existir em alguma página, e o código que as páginas executam"""
+
+    def __init__(self):
+        self.tags: Set[str] = {'html', 'body'}
+        self.nomes: Set[str] = set()       # ids, classes e palavras das strings dos scripts
+        self.prefixos: Set[str] = set()    # `toast-${tipo}` -> 'toast-'
+        self.entradas: List[str] = []      # scripts inline, onclick="..." e href="javascript:..."
+
+    def pagina(self, texto: str):
+        analisador = _Analisador(texto)
+        for elemento in analisador.elementos:
+            if elemento.tipo != 'abre':
+                continue
+            self.tags.add(elemento.tag)
+            attrs = elemento.attrs
+            self.nomes.update(attrs.get('class', '').split())
+            if attrs.get('id'):
+                self.nomes.add(attrs['id'])
+            for nome, valor in attrs.items():
+                if nome.startswith('on') or valor.lower().startswith('javascript:'):
+                    self.entradas.append(valor)
+            if elemento.tag == 'script' and not attrs.get('src') and elemento.fecho > elemento.fim:
+                codigo = texto[elemento.fim:texto.rfind('<', elemento.fim, elemento.fecho)]
+                self.entradas.append(codigo)
+                if 'json' not in attrs.get('type', ''):
+                    self.script(codigo)
+
+    def script(self, texto: str):
+        """Palavras das strings e templates de um script (classes, ids e tags que ele cria)"""
+        for tipo, token, _ in tokens_js(texto):
+            if tipo in ('texto', 'template'):
+                self.nomes.update(_RE_PALAVRA.findall(token))
+        self.prefixos.update(_classes(texto).prefixos)
+
+    def extra(self, texto: str):
+        classes = _classes(texto)
+        self.nomes.update(classes.marcacao | classes.estados)
+        self.prefixos.update(classes.prefixos)
+        self.entradas.extend(m.group(1) for m in _RE_EVENTO.finditer(texto))
+
+    def __call__(self, seletor: str) -> bool:
+        """O seletor pode apanhar algum elemento? (cada tag/id/classe existe em algum lado)"""
+        partes = compostos(seletor)
+        if partes is None:
+            return True
+        prefixos = tuple(self.prefixos)
+        for parte in partes:
+            if parte.tag and parte.tag not in self.tags and parte.tag not in self.nomes:
+                return False
+            for nome in parte.ids + parte.classes:
+                if nome not in self.nomes and not nome.startswith(prefixos):
+                    return False
+        return True
+
+# =============================================
+# CSS
+# =============================================
+
+def _nao_copiadas(regras: Iterable[Regra], mantidas: Set[int]) -> List[Regra]:
+    """Regras (ou @media inteiros) que ficaram fora, pelo offset de início"""
+    fora = []
+    for regra in regras:
+        if regra.inicio not in mantidas:
+            fora.append(regra)
+        elif regra.filhas is not None:
+            fora.extend(_nao_copiadas(regra.filhas, mantidas))
+    return fora
+
+def _inicios(regras: Iterable[Regra]) -> Set[int]:
+    inicios = set()
+    for regra in regras:
+        inicios.add(regra.inicio)
+        if regra.filhas is not None:
+            inicios |= _inicios(regra.filhas)
+    return inicios
+
+def podar_css(texto: str, uso: Uso) -> Tuple[List[Intervalo], List[str]]:
+    """(trechos a tirar, preludes das regras tiradas); uma regra fica se algum dos seletores for usado"""
+    regras = analisar_css(texto)
+    copiadas: List[Regra] = []
+    filtrar(regras, uso, set(), copiadas, outras=True)
+    mantidas = filtrar(regras, uso, referidos(copiadas), [], outras=True)
+    fora = _nao_copiadas(regras, _inicios(mantidas))
+    return [(r.inicio, r.fim) for r in fora], [r.prelude for r in fora]
+
+# =============================================
+# JS
+# =============================================
+
+class Funcao(NamedTuple):
+    nome: str
+    inicio: int          # com o comentário logo acima
+    fim: int
+
+_RE_IDENTIFICADOR = re.compile(r'[A-Za-z_$][\w$]*')
+
+# Antes de uma declaração (e não de uma expressão) de função
+_INICIO_INSTRUCAO = frozenset({'', ';', '}'})
+
+def funcoes_js(texto: str) -> Tuple[List[Funcao], List[Intervalo]]:
+    """
+    Funções declaradas no nível de topo, e os trechos de código fora delas
+
+    `async function nome(...) { ... }` conta; expressões (`x = function`,
+    `(function () {})()`) ficam no código de fora.
+    """
+    tokens = list(tokens_js(texto))
+    funcoes: List[Funcao] = []
+    nivel = parenteses = 0
+    anterior = ''
+    i = 0
+    while i < len(tokens):
+        tipo, token, offset = tokens[i]
+        if tipo in ('espaco', 'comentario'):
+            i += 1
+            continue
+        declaracao = (nivel == 0 and parenteses == 0 and anterior in _INICIO_INSTRUCAO
+                      and (token == 'function' or (token == 'async' and _seguinte(tokens, i) == 'function')))
+        if declaracao:
+            j = i + 1 if token == 'function' else _indice_seguinte(tokens, i) + 1
+            nome = _seguinte(tokens, j - 1, ignorar='*')
+            nome = nome if _RE_IDENTIFICADOR.fullmatch(nome) else ''
+            corpo = _abre_corpo(tokens, j)
+            fim = _fecha(tokens, corpo) if corpo is not None else None
+            if nome and fim is not None:
+                funcoes.append(Funcao(nome, _comentario_acima(tokens, i), tokens[fim][2] + 1))
+                anterior = '}'
+                i = fim + 1
+                continue
+        if token in '{}' and tipo == 'outro':
+            nivel += 1 if token == '{' else -1
+        elif token in '()' and tipo == 'outro':
+            parenteses += 1 if token == '(' else -1
+        anterior = token
+        i += 1
+    fora: List[Intervalo] = []
+    atual = 0
+    for funcao in funcoes:
+        fora.append((atual, funcao.inicio))
+        atual = funcao.fim
+    fora.append((atual, len(texto)))
+    return funcoes, fora
+
+def _indice_seguinte(tokens, i: int, ignorar: str = '') -> int:
+    i += 1
+    while i < len(tokens) and (tokens[i][0] in ('espaco', 'comentario') or tokens[i][1] == ignorar):
+        i += 1
+    return i
+
+def _seguinte(tokens, i: int, ignorar: str = '') -> str:
+    """O próximo token depois de tokens[i] (sem espaços, comentários nem `ignorar`)"""
+    j = _indice_seguinte(tokens, i, ignorar)
+    return tokens[j][1] if j < len(tokens) else ''
+
+def _abre_corpo(tokens, i: int) -> Optional[int]:
+    """Índice do { do corpo: o primeiro fora dos parênteses dos parâmetros"""
+    parenteses = 0
+    while i < len(tokens):
+        tipo, token, _ = tokens[i]
+        if tipo == 'outro':
+            if token == '(':
+                parenteses += 1
+            elif token == ')':
+                parenteses -= 1
+            elif token == '{' and parenteses == 0:
+                return i
+        i += 1
+    return None
+
+def _fecha(tokens, i: int) -> Optional[int]:
+    nivel = 0
+    while i < len(tokens):
+        tipo, token, _ = tokens[i]
+        if tipo == 'outro' and token in '{}':
+            nivel += 1 if token == '{' else -1
+            if nivel == 0:
+                return i
+        i += 1
+    return None
+
+def _comentario_acima(tokens, i: int) -> int:
+    """Início da declaração, com os comentários encostados a ela (sem linha em branco no meio)"""
+    inicio = tokens[i][2]
+    j = i - 1
+    while j >= 0 and tokens[j][0] in ('espaco', 'comentario'):
+        tipo, token, offset = tokens[j]
+        if tipo == 'espaco' and token.count('\n') > 1:
+            break
+        if tipo == 'comentario':
+            inicio = offset
+        j -= 1
+    return inicio
+
+def _referencias(texto: str) -> Set[str]:
+    """Identificadores de um trecho, também os de dentro das strings (onclick="f()" num template)"""
+    return set(_RE_IDENTIFICADOR.findall(texto))
+
+class Grafo(NamedTuple):
+    funcoes: Dict[str, List[Funcao]]         # arquivo -> funções declaradas
+    chamadas: Dict[Tuple[str, int], Set[str]]  # (arquivo, início) -> nomes que a função refere
+    vivas: Set[Tuple[str, int]]              # (arquivo, início) das funções alcançáveis
+
+def grafo_js(textos: Dict[str, str], raizes: Iterable[str]) -> Grafo:
+    """
+    Funções alcançáveis a partir das `raizes` (código que corre sempre)
+
+    O código fora das funções de cada arquivo também é raiz. Um nome
+    declarado duas vezes no mesmo arquivo só vale na última (a declaração
+    de baixo substitui a de cima no script inteiro).
+    """
+    funcoes: Dict[str, List[Funcao]] = {}
+    chamadas: Dict[Tuple[str, int], Set[str]] = {}
+    por_nome: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    pendentes: List[str] = []
+    for raiz in raizes:
+        pendentes.extend(_referencias(raiz))
+    for arquivo, texto in textos.items():
+        declaradas, fora = funcoes_js(texto)
+        funcoes[arquivo] = declaradas
+        ultimas = {f.nome: f for f in declaradas}
+        for funcao in declaradas:
+            chave = (arquivo, funcao.inicio)
+            chamadas[chave] = _referencias(texto[funcao.inicio:funcao.fim]) - {funcao.nome}
+            if ultimas[funcao.nome] is funcao:
+                por_nome[funcao.nome].append(chave)
+        for inicio, fim in fora:
+            pendentes.extend(_referencias(texto[inicio:fim]))
+    vivas: Set[Tuple[str, int]] = set()
+    vistos: Set[str] = set()
+    while pendentes:
+        nome = pendentes.pop()
+        if nome in vistos:
+            continue
+        vistos.add(nome)
+        for chave in por_nome.get(nome, ()):
+            vivas.add(chave)
+            pendentes.extend(chamadas[chave] - vistos)
+    return Grafo(funcoes, chamadas, vivas)
+
+# =============================================
+# PODA
+# =============================================
+
+class Poda(NamedTuple):
+    intervalos: Dict[str, Tuple[Intervalo, ...]]   # arquivo -> trechos a tirar
+    removidos: Dict[str, List[str]]                # arquivo -> regras (preludes) ou funções tiradas
+    tamanhos: Dict[str, Tuple[int, int]]           # arquivo -> (bytes antes, bytes depois)
+
+def _ler(base_dir: str, arquivo: str) -> Optional[str]:
+    try:
+        with open(os.path.join(base_dir, arquivo), 'r', encoding='utf-8-sig') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def aplicar(texto: str, intervalos: Iterable[Intervalo]) -> str:
+    """Tira os trechos do texto (o build usa o apagar do bundle_assets, que mantém os offsets)"""
+    partes = []
+    atual = 0
+    for inicio, fim in sorted(intervalos):
+        partes.append(texto[atual:inicio])
+        atual = fim
+    partes.append(texto[atual:])
+    return ''.join(partes)
+
+def analisar(paginas: Iterable[str], base_dir: str = BASE_DIR, estilos: Iterable[str] = ESTILOS,
+             scripts: Iterable[str] = SCRIPTS, extras: Iterable[str] = EXTRAS) -> Poda:
+    """
+    O que tirar dos `estilos` e `scripts` dado o texto de todas as páginas
+
+    Todos os .js de js/ contam para as classes e, os que não são podados,
+    como código que corre sempre.
+    """
+    uso = Uso()
+    for texto in paginas:
+        uso.pagina(texto)
+    for arquivo in extras:
+        texto = _ler(base_dir, arquivo)
+        if texto is not None:
+            uso.extra(texto)
+    scripts = list(scripts)
+    podados: Dict[str, str] = {}
+    raizes = list(uso.entradas)
+    for caminho in sorted(glob.glob(os.path.join(base_dir, 'js', '*.js'))):
+        arquivo = os.path.relpath(caminho, base_dir).replace(os.sep, '/')
+        texto = _ler(base_dir, arquivo)
+        uso.script(texto)
+        if arquivo in scripts:
+            podados[arquivo] = texto
+        else:
+            raizes.append(texto)
+
+    intervalos: Dict[str, Tuple[Intervalo, ...]] = {}
+    removidos: Dict[str, List[str]] = {}
+    tamanhos: Dict[str, Tuple[int, int]] = {}
+
+    def registar(arquivo: str, texto: str, trechos: List[Intervalo], nomes: List[str]):
+        intervalos[arquivo] = tuple(trechos)
+        removidos[arquivo] = nomes
+        depois = aplicar(texto, trechos)
+        tamanhos[arquivo] = (len(texto.encode('utf-8')), len(depois.encode('utf-8')))
+
+    for arquivo in estilos:
+        texto = _ler(base_dir, arquivo)
+        if texto is not None:
+            registar(arquivo, texto, *podar_css(texto, uso))
+
+    grafo = grafo_js(podados, raizes)
+    for arquivo, texto in podados.items():
+        mortas = [f for f in grafo.funcoes[arquivo] if (arquivo, f.inicio) not in grafo.vivas]
+        registar(arquivo, texto, [(f.inicio, f.fim) for f in mortas], [f.nome for f in mortas])
+    return Poda(intervalos, removidos, tamanhos)
+
+def esquecidos(base_dir: str = BASE_DIR) -> List[Tuple[str, int]]:
+    """Cópias antigas (.backup) ao lado dos estilos e scripts; o build não as publica"""
+    arquivos = []
+    for pasta in ('css', 'js'):
+        for caminho in sorted(glob.glob(os.path.join(base_dir, pasta, '*.backup'))):
+            arquivos.append((os.path.relpath(caminho, base_dir), os.path.getsize(caminho)))
+    return arquivos
+
+# =============================================
+# RELATÓRIO
+# =============================================
+
+def _paginas(caminhos: Iterable[str]) -> List[str]:
+    textos = []
+    for caminho in caminhos:
+        arquivos = sorted(glob.glob(os.path.join(caminho, '**', '*.html'), recursive=True)) \
+            if os.path.isdir(caminho) else [caminho]
+        for arquivo in arquivos:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                textos.append(f.read())
+    return textos
+
+def imprimir(poda: Poda, detalhes: bool = False):
+    total_antes = total_depois = 0
+    for arquivo, (antes, depois) in poda.tamanhos.items():
+        total_antes += antes
+        total_depois += depois
+        tipo = 'regras' if arquivo.endswith('.css') else 'funções'
+        print(f"✂️  {arquivo}: {len(poda.removidos[arquivo])} {tipo} sem uso, "
+              f"{antes / 1024:.1f}KB -> {depois / 1024:.1f}KB ({(antes - depois) / 1024:.1f}KB a menos)")
+        if detalhes:
+            for nome in poda.removidos[arquivo]:
+                print(f"     - {nome}")
+    if total_antes:
+        print(f"\n{(total_antes - total_depois) / 1024:.1f}KB de {total_antes / 1024:.1f}KB sem uso "
+              f"({1 - total_depois / total_antes:.0%})")
+    for arquivo, tamanho in esquecidos():
+        print(f"⚠️  {arquivo}: {tamanho / 1024:.1f}KB de cópia antiga (não é publicada)")
+
+def main(argv: Optional[List[str]] = None):
+    """Relatório da poda a partir das páginas geradas (ou grava as versões podadas)"""
+    parser = argparse.ArgumentParser(description="CSS e JS sem uso nas páginas do site")
+    parser.add_argument('caminhos', nargs='*', default=[os.path.join(BASE_DIR, 'dist')],
+                        help="Páginas ou pastas com as páginas (padrão: dist/)")
+    parser.add_argument('--detalhes', action='store_true', help="Lista cada regra e função tirada")
+    parser.add_argument('--json', action='store_true', help="Relatório em JSON")
+    parser.add_argument('--saida', help="Grava aqui as versões podadas (css/styles.css, js/app.js...)")
+    args = parser.parse_args(argv)
+
+    paginas = _paginas(args.caminhos)
+    if not paginas:
+        print("⚠️  Nenhuma página: corra o build primeiro (ou indique as páginas)")
+        raise SystemExit(1)
+    poda = analisar(paginas)
+    if args.json:
+        json.dump({arquivo: {'removidos': poda.removidos[arquivo], 'antes': antes, 'depois': depois}
+                   for arquivo, (antes, depois) in poda.tamanhos.items()},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        imprimir(poda, args.detalhes)
+    if args.saida:
+        for arquivo, trechos in poda.intervalos.items():
+            destino = os.path.join(args.saida, arquivo)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            with open(destino, 'w', encoding='utf-8') as f:
+                f.write(aplicar(_ler(BASE_DIR, arquivo), trechos))
+        print(f"💾 Versões podadas em {args.saida}")
+
+if __name__ == '__main__':
+    main()
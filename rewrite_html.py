@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+REWRITE_HTML.PY - Reescrita das páginas HTML numa única passagem
+Substitui add_pwa_tags, add_security_scripts, fix_duplicates e fix_image_paths:
+cada página é lida e analisada uma vez, as regras (injeção de tags, remoção de
+duplicados e caminhos) são aplicadas sobre os mesmos elementos e a página é
+gravada uma vez, só se mudou. Cada bloco injetado leva um comentário marcador,
+por isso correr de novo não muda nada
+"""
+
+import argparse
+import html
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from dados_io import escrever_atomico
+from fix_mojibake import BASE_DIR, arquivos_html
+
+# Páginas do site (a lista do add_pwa_tags). O add_security_scripts saltava
+# admin.html e index.html só por já terem sido atualizados à mão
+PAGINAS_SITE = frozenset({
+    'index.html', 'servicos.html', 'servico.html', 'workshops.html', 'workshop.html',
+    'eventos.html', 'evento.html', 'produtos.html', 'produto.html', 'blog.html',
+    'post.html', 'conta.html', 'contacto.html', 'sobre.html', 'carrinho.html',
+    'admin.html', 'portfolio.html',
+})
+
+# Páginas de teste: as regras sem lista própria não lhes tocam
+IGNORAR_PAGINAS = frozenset({'test-pwa.html'})
+
+# Domínios do próprio site (URLs absolutos que também são reescritos)
+DOMINIOS = ('yemarmakeup.pt', 'www.yemarmakeup.pt')
+
+# Atributos com um URL (srcset tem vários)
+ATRIBUTOS_URL = ('src', 'href', 'content', 'poster', 'data-src', 'action')
+
+# <link rel> que só pode existir uma vez por página (por sizes)
+LINKS_UNICOS = ('manifest', 'canonical', 'apple-touch-icon')
+
+# Abaixo disto não compensa arrancar processos
+MIN_PARALELO = 32
+
+
+class Injecao(NamedTuple):
+    marcador: str                          # texto do comentário que abre o bloco
+    local: str                             # 'head' ou 'body': entra antes do fecho
+    linhas: Tuple[str, ...]
+    origem: str
+    paginas: Optional[FrozenSet[str]] = None  # None = todas (menos as de teste)
+
+    def aplica_a(self, nome: str) -> bool:
+        return nome in self.paginas if self.paginas is not None else nome not in IGNORAR_PAGINAS
+
+class Caminho(NamedTuple):
+    de: str
+    para: str
+    origem: str
+    paginas: Optional[FrozenSet[str]] = None
+
+    def aplica_a(self, nome: str) -> bool:
+        return nome in self.paginas if self.paginas is not None else nome not in IGNORAR_PAGINAS
+
+
+# Pela ordem em que os blocos ficam quando entram no mesmo sítio
+INJECOES = (
+    Injecao('PWA Meta Tags', 'head', (
+        '<meta name="theme-color" content="#c9a227">',
+        '<meta name="apple-mobile-web-app-capable" content="yes">',
+        '<meta name="apple-mobile-web-app-status-bar-style" content="black-translucent">',
+        '<meta name="apple-mobile-web-app-title" content="Yemar Makeup">',
+        '<link rel="manifest" href="/manifest.json">',
+        '<link rel="apple-touch-icon" href="/assets/images/icon-192x192.png">',
+    ), 'add_pwa_tags.py', PAGINAS_SITE),
+    Injecao('Sistema de Segurança', 'head', (
+        '<script src="js/security.js" defer></script>',
+        '<script src="js/secure-render.js" defer></script>',
+    ), 'add_security_scripts.py', PAGINAS_SITE),
+    Injecao('PWA Install Script', 'body', (
+        '<script src="/js/pwa-install.js"></script>',
+    ), 'add_pwa_tags.py', PAGINAS_SITE),
+)
+
+# Caminhos comparados por segmentos: "assets/images/logo.png" não volta a
+# casar com "images/logo.png" (o replace do fix_image_paths dava assets/assets/...)
+CAMINHOS = (
+    Caminho('images/logo.png', 'assets/images/logo.png', 'fix_image_paths.py'),
+    Caminho('images/logo_name.png', 'assets/images/logo.png', 'fix_image_paths.py'),
+)
+
+# Os duplicados são sempre removidos (o fix_duplicates só existia para
+# desfazer injeções repetidas, que os marcadores já evitam)
+ORIGEM_DUPLICADOS = 'fix_duplicates.py'
+
+# =============================================
+# ANÁLISE
+# =============================================
+
+class Elemento:
+    """Tag de abertura, fecho ou comentário, com a posição no texto"""
+
+    __slots__ = ('tipo', 'tag', 'attrs', 'inicio', 'fim', 'fecho')
+
+    def __init__(self, tipo: str, tag: str, attrs: Dict[str, str], inicio: int, fim: int):
+        self.tipo = tipo          # 'abre', 'fecha' ou 'comentario'
+        self.tag = tag            # no comentário: o texto
+        self.attrs = attrs
+        self.inicio = inicio
+        self.fim = fim
+        self.fecho = fim          # <script>: fim do </script> correspondente
+
+
+class _Analisador(HTMLParser):
+    """Lista os elementos de uma página (o conteúdo de <script>/<style> é texto)"""
+
+    def __init__(self, texto: str):
+        super().__init__(convert_charrefs=True)
+        self.texto = texto
+        self.linhas = [0] + [m.end() for m in re.finditer('\n', texto)]
+        self.elementos: List[Elemento] = []
+        self._script: Optional[Elemento] = None
+        self.feed(texto)
+        self.close()
+
+    def _offset(self) -> int:
+        linha, coluna = self.getpos()
+        return self.linhas[linha - 1] + coluna
+
+    def _abre(self, tag, attrs) -> Elemento:
+        inicio = self._offset()
+        valores = {nome: valor or '' for nome, valor in attrs}
+        elemento = Elemento('abre', tag, valores, inicio, inicio + len(self.get_starttag_text()))
+        self.elementos.append(elemento)
+        return elemento
+
+    def handle_starttag(self, tag, attrs):
+        elemento = self._abre(tag, attrs)
+        if tag == 'script':
+            self._script = elemento
+
+    def handle_startendtag(self, tag, attrs):
+        self._abre(tag, attrs)
+
+    def handle_endtag(self, tag):
+        inicio = self._offset()
+        fim = self.texto.find('>', inicio) + 1 or len(self.texto)
+        self.elementos.append(Elemento('fecha', tag, {}, inicio, fim))
+        if tag == 'script' and self._script is not None:
+            self._script.fecho = fim
+            self._script = None
+
+    def handle_comment(self, data):
+        inicio = self._offset()
+        self.elementos.append(Elemento('comentario', data.strip(), {}, inicio, inicio + len(data) + 7))
+
+
+def _normalizar_url(url: str) -> str:
+    """URL do site sem ./ nem / iniciais, para comparar"""
+    partes = urlsplit(url.strip())
+    if partes.netloc and partes.netloc not in DOMINIOS:
+        return url.strip()
+    return re.sub(r'^(?:\./|/)+', '', partes.path)
+
+def chave(elemento: Elemento) -> Optional[Tuple[str, ...]]:
+    """Identidade de um elemento que não pode repetir-se na página"""
+    attrs = elemento.attrs
+    if elemento.tag == 'script' and attrs.get('src'):
+        return ('script', _normalizar_url(attrs['src']))
+    if elemento.tag == 'link' and attrs.get('rel'):
+        rel = attrs['rel'].lower()
+        if rel in LINKS_UNICOS:
+            return ('link', rel, attrs.get('sizes', ''))
+        if attrs.get('href'):
+            return ('link', rel, _normalizar_url(attrs['href']), attrs.get('media', ''))
+    if elemento.tag == 'meta':
+        if 'charset' in attrs:
+            return ('meta', 'charset')
+        for campo in ('name', 'http-equiv'):
+            if attrs.get(campo):
+                return ('meta', campo, attrs[campo].lower())
+    return None
+
+# =============================================
+# REESCRITA
+# =============================================
+
+_RE_ATRIBUTO = re.compile(r'''(\s)([^\s"'>/=]+)(\s*=\s*)("[^"]*"|'[^']*'|[^\s"'>]+)''')
+_RE_TEXTO_JS = re.compile(r'''(['"])([^'"\\]*)\1''')
+
+def com_atributos(tag: str, atributos: Tuple[Tuple[str, str], ...]) -> str:
+    """Tag de abertura com os atributos substituídos (ou acrescentados antes do >)"""
+    for nome, valor in atributos:
+        escapado = html.escape(valor, quote=False).replace('"', '&quot;')
+        novo = f'{nome}="{escapado}"'
+        trocados = []
+
+        def substituir(m):
+            if trocados or m.group(2).lower() != nome:
+                return m.group()
+            trocados.append(nome)
+            return m.group(1) + novo
+
+        tag = _RE_ATRIBUTO.sub(substituir, tag)
+        if not trocados:
+            fim = len(tag) - (2 if tag.endswith('/>') else 1)
+            tag = f"{tag[:fim].rstrip()} {novo}{tag[fim:]}"
+    return tag
+
+class Reescritor:
+    """
+    Aplica as regras a uma página numa única passagem
+
+    A página é analisada uma vez. Cada elemento passa pelos caminhos (um
+    dicionário: o custo não cresce com o número de regras), depois pela
+    verificação de duplicados, e no fim os blocos das injeções entram com
+    só as linhas que ainda faltam. Todas as alterações são posições no texto
+    original, aplicadas de uma vez ao montar o resultado.
+    """
+
+    def __init__(self, injecoes: Iterable[Injecao] = INJECOES, caminhos: Iterable[Caminho] = CAMINHOS):
+        self.injecoes = list(injecoes)
+        self.caminhos = list(caminhos)
+        self._blocos = {i.marcador: [(linha, chave(_Analisador(linha).elementos[0])) for linha in i.linhas]
+                        for i in self.injecoes}
+
+    def _tabela(self, nome: str) -> Dict[str, Caminho]:
+        return {c.de: c for c in self.caminhos if c.aplica_a(nome)}
+
+    def _url(self, url: str, tabela: Dict[str, Caminho], contagem: Counter) -> str:
+        partes = urlsplit(url)
+        if partes.netloc and partes.netloc not in DOMINIOS:
+            return url
+        prefixo = re.match(r'(?:\./|/)*', partes.path).group()
+        regra = tabela.get(partes.path[len(prefixo):])
+        if regra is None:
+            return url
+        contagem[f"caminho {regra.de} -> {regra.para}  [{regra.origem}]"] += 1
+        return urlunsplit(partes._replace(path=prefixo + regra.para))
+
+    def _atributo(self, nome: str, valor: str, tabela: Dict[str, Caminho], contagem: Counter) -> str:
+        if nome in ATRIBUTOS_URL:
+            return self._url(valor, tabela, contagem)
+        if nome == 'srcset':
+            return ','.join(re.sub(r'^(\s*)(\S+)', lambda m: m.group(1) + self._url(m.group(2), tabela, contagem), parte)
+                            for parte in valor.split(','))
+        if nome.startswith('on'):
+            # onerror="this.src='images/logo.png'"
+            return _RE_TEXTO_JS.sub(lambda m: m.group(1) + self._url(m.group(2), tabela, contagem) + m.group(1), valor)
+        return valor
+
+    def _reescrever_tag(self, fonte: str, tabela: Dict[str, Caminho], contagem: Counter) -> str:
+        def substituir(m):
+            espaco, nome, igual, bruto = m.groups()
+            # O valor é tratado como está no HTML (sem desfazer entidades):
+            # os caminhos não as têm e o resto do valor fica intacto
+            aspas = bruto[0] if bruto[0] in '"\'' else ''
+            valor = bruto[1:-1] if aspas else bruto
+            novo = self._atributo(nome.lower(), valor, tabela, contagem)
+            if novo == valor:
+                return m.group()
+            return f"{espaco}{nome}{igual}{aspas}{novo}{aspas}"
+        return _RE_ATRIBUTO.sub(substituir, fonte)
+
+    def reescrever_texto(self, texto: str, nome: str) -> Tuple[str, Counter]:
+        """(texto reescrito, {regra: vezes})"""
+        contagem: Counter = Counter()
+        elementos = _Analisador(texto).elementos
+        tabela = self._tabela(nome)
+        alteracoes: List[Tuple[int, int, str]] = []
+        vistos = set()
+        marcadores = set()
+        fechos: Dict[str, int] = {}
+
+        for elemento in elementos:
+            if elemento.tipo == 'comentario':
+                marcadores.add(elemento.tag)
+                continue
+            if elemento.tipo == 'fecha':
+                if elemento.tag in ('head', 'body'):
+                    fechos.setdefault(elemento.tag, elemento.inicio)
+                continue
+            fonte = texto[elemento.inicio:elemento.fim]
+            nova = self._reescrever_tag(fonte, tabela, contagem) if tabela else fonte
+            if nova != fonte:
+                elemento.attrs = dict(_Analisador(nova).elementos[0].attrs)
+            # Fica a primeira ocorrência, que é a que os browsers usam
+            identidade = chave(elemento)
+            if identidade is not None and nome not in IGNORAR_PAGINAS:
+                if identidade in vistos:
+                    contagem[f"duplicado {_descrever(identidade)}  [{ORIGEM_DUPLICADOS}]"] += 1
+                    alteracoes.append(_linha_inteira(texto, elemento.inicio, elemento.fecho) + ('',))
+                    continue
+                vistos.add(identidade)
+            if nova != fonte:
+                alteracoes.append((elemento.inicio, elemento.fim, nova))
+
+        for injecao in self.injecoes:
+            if not injecao.aplica_a(nome) or injecao.marcador in marcadores or injecao.local not in fechos:
+                continue
+            faltam = [linha for linha, identidade in self._blocos[injecao.marcador]
+                      if identidade is None or identidade not in vistos]
+            if not faltam:
+                continue
+            vistos.update(identidade for _, identidade in self._blocos[injecao.marcador])
+            posicao = fechos[injecao.local]
+            inicio_linha = texto.rfind('\n', 0, posicao) + 1
+            if texto[inicio_linha:posicao].strip():
+                inicio_linha = posicao
+            recuo = '    '
+            bloco = ''.join(f"{recuo}{linha}\n" for linha in [f"<!-- {injecao.marcador} -->"] + faltam)
+            alteracoes.append((inicio_linha, inicio_linha, bloco))
+            contagem[f"injeção {injecao.marcador}  [{injecao.origem}]"] += 1
+
+        if not alteracoes:
+            return texto, contagem
+        # Inserções no mesmo ponto ficam pela ordem das regras (sort estável)
+        alteracoes.sort(key=lambda a: a[0])
+        partes = []
+        atual = 0
+        for inicio, fim, novo in alteracoes:
+            partes.append(texto[atual:inicio])
+            partes.append(novo)
+            atual = fim
+        partes.append(texto[atual:])
+        return ''.join(partes), contagem
+
+    def reescrever_arquivo(self, caminho: str, gravar: bool = True) -> Counter:
+        """Reescreve um arquivo; só grava se alguma regra o alterou"""
+        with open(caminho, 'rb') as f:
+            original = f.read()
+        texto, contagem = self.reescrever_texto(original.decode('utf-8'), os.path.basename(caminho))
+        if contagem and gravar:
+            escrever_atomico(caminho, texto.encode('utf-8'))
+        return contagem
+
+
+def _linha_inteira(texto: str, inicio: int, fim: int) -> Tuple[int, int]:
+    """Alarga [inicio, fim) à linha inteira se o elemento estiver sozinho nela"""
+    antes = texto.rfind('\n', 0, inicio) + 1
+    depois = texto.find('\n', fim)
+    depois = len(texto) if depois < 0 else depois + 1
+    if texto[antes:inicio].strip() or texto[fim:depois].strip():
+        return inicio, fim
+    return antes, depois
+
+def _descrever(identidade: Tuple[str, ...]) -> str:
+    if identidade[0] == 'script':
+        return f'<script src="{identidade[1]}">'
+    if identidade[0] == 'link':
+        return f'<link rel="{identidade[1]}">' if identidade[1] in LINKS_UNICOS else f'<link href="{identidade[2]}">'
+    return f'<meta {identidade[1]}="{identidade[-1]}">' if len(identidade) > 2 else '<meta charset>'
+
+# =============================================
+# PÁGINAS (paralelo)
+# =============================================
+
+_reescritor_processo: Optional[Reescritor] = None
+
+def _reescrever_em_processo(tarefa: Tuple[str, bool]) -> Tuple[str, Counter, Optional[str]]:
+    global _reescritor_processo
+    if _reescritor_processo is None:
+        _reescritor_processo = Reescritor()
+    caminho, gravar = tarefa
+    try:
+        return caminho, _reescritor_processo.reescrever_arquivo(caminho, gravar), None
+    except (OSError, UnicodeDecodeError) as e:
+        return caminho, Counter(), str(e)
+
+def reescrever(caminhos: List[str], gravar: bool = True, jobs: Optional[int] = None) -> Counter:
+    """Reescreve as páginas (em paralelo se forem muitas); devolve o total por regra"""
+    inicio = time.perf_counter()
+    tarefas = [(caminho, gravar) for caminho in caminhos]
+    if len(tarefas) >= MIN_PARALELO and (jobs or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            resultados = list(pool.map(_reescrever_em_processo, tarefas, chunksize=8))
+    else:
+        resultados = [_reescrever_em_processo(t) for t in tarefas]
+
+    total: Counter = Counter()
+    alterados = 0
+    for caminho, contagem, erro in resultados:
+        if erro:
+            print(f"❌ {caminho}: {erro}")
+        elif contagem:
+            alterados += 1
+            verbo = 'reescrito' if gravar else 'a reescrever'
+            print(f"✅ {caminho}: {sum(contagem.values())} alterações ({verbo})")
+            total.update(contagem)
+    print(f"📂 {len(caminhos)} páginas, {alterados} alteradas "
+          f"({(time.perf_counter() - inicio) * 1000:.0f}ms)")
+    return total
+
+def imprimir_estatisticas(total: Counter):
+    if not total:
+        print("✨ Nada a alterar")
+        return
+    print(f"\n📊 Regras aplicadas ({sum(total.values())} alterações):")
+    for regra, n in sorted(total.items(), key=lambda item: (-item[1], item[0])):
+        print(f"   {n:>6}  {regra}")
+
+# =============================================
+# MAIN
+# =============================================
+
+def main(argv: Optional[List[str]] = None):
+    """Reescreve os .html indicados (padrão: os da raiz do site)"""
+    parser = argparse.ArgumentParser(description="Injeção de tags, duplicados e caminhos numa única passagem")
+    parser.add_argument('caminhos', nargs='*', help="Arquivos, diretórios ou padrões (padrão: *.html)")
+    parser.add_argument('--dry-run', action='store_true', help="Só mostra o que seria alterado")
+    parser.add_argument('--jobs', type=int, help="Processos (padrão: um por CPU)")
+    args = parser.parse_args(argv)
+
+    caminhos = arquivos_html(args.caminhos or [BASE_DIR])
+    imprimir_estatisticas(reescrever(caminhos, gravar=not args.dry_run, jobs=args.jobs))
+
+if __name__ == '__main__':
+    main()
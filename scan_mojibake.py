@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SCAN_MOJIBAKE.PY - Procura mojibake em arquivos de qualquer tamanho
+Substituiu os antigos inspect_*.py: percorre os bytes (mmap, memória constante) à
+procura de UTF-8 duplamente codificado, emojis truncados, controles C1 e
+caracteres perdidos (U+FFFD), e produz um relatório JSON Lines com arquivo,
+offset, linha/coluna, original provável e correção sugerida
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from fix_mojibake import BASE_DIR, EXTENSOES, REGRAS, lido_como_cp1252, percorrer, plausivel
+
+# Além dos arquivos do site, exports e logs
+EXTENSOES_SCAN = EXTENSOES + ('.jsonl', '.csv', '.txt', '.log')
+
+# Janela de leitura para contar linhas/colunas entre ocorrências
+BLOCO = 1 << 20
+
+# Janela de procura: as páginas já vistas são devolvidas ao sistema
+JANELA = 64 << 20
+
+# Maior ocorrência possível (início + 3 continuações de 3 bytes)
+MAIOR_OCORRENCIA = 16
+
+# UTF-8 de cada byte de continuação (80-BF) depois de lido como CP1252,
+# e o caminho inverso para reconstruir os bytes originais
+CONTINUACOES: Dict[bytes, int] = {lido_como_cp1252(b).encode('utf-8'): b for b in range(0x80, 0xC0)}
+
+def _alternativa(sequencias) -> bytes:
+    """Expressão para um conjunto de sequências: prefixo comum + classe do último byte"""
+    por_prefixo: Dict[bytes, List[int]] = {}
+    for sequencia in sequencias:
+        por_prefixo.setdefault(sequencia[:-1], []).append(sequencia[-1])
+    partes = []
+    for prefixo, finais in sorted(por_prefixo.items()):
+        classe = b''.join(re.escape(bytes([b])) for b in sorted(finais))
+        partes.append(re.escape(prefixo) + b'[' + classe + b']')
+    return b'(?:' + b'|'.join(partes) + b')'
+
+_CONT = _alternativa(CONTINUACOES)
+_INICIOS_CONT = re.escape(bytes(sorted({c[0] for c in CONTINUACOES})))
+
+# Um byte inicial C2-F4 lido como CP1252 fica \xc3 + (byte - 0x40): C2-DF abre
+# 1 continuação, E0-EF 2 e F0-F4 3 (quantificadores gulosos: completas se
+# possível, truncadas (ðŸ sem o resto) se não). O lookahead logo a seguir ao
+# \xc3 descarta depressa as letras acentuadas normais; sem grupos de captura
+# o re salta direto até aos bytes C2/C3/EF.
+PADRAO = re.compile(
+    b'\xc3(?=[\x82-\xb4][' + _INICIOS_CONT + b'])(?:'
+    b'[\xb0-\xb4]' + _CONT + b'{1,3}|'
+    b'[\xa0-\xaf]' + _CONT + b'{1,2}|'
+    b'[\x82-\x9f]' + _CONT + b')'
+    b'|\xc2[\x80-\x9f]'   # controle C1 solto
+    b'|\xef\xbf\xbd'      # U+FFFD
+)
+
+# Correções conhecidas do fix_mojibake para o que não se reconstrói sozinho
+SUGESTOES = {r.errado: r.certo for r in REGRAS if r.arquivos is None}
+
+_NAO_CONTINUACAO = bytes(range(0x80, 0xC0))
+
+def _caracteres(trecho: bytes) -> int:
+    """Número de caracteres UTF-8 num trecho (bytes que não são continuação)"""
+    return len(trecho.translate(None, _NAO_CONTINUACAO))
+
+
+class Posicao:
+    """
+    Linha e coluna (em caracteres) de offsets crescentes num arquivo
+
+    Conta só o trecho desde o offset anterior, em blocos de BLOCO bytes:
+    o custo total é linear no tamanho do arquivo, mesmo com linhas enormes
+    (JSON minificado), e a memória não passa de um bloco.
+    """
+
+    def __init__(self, dados):
+        self.dados = dados
+        self.offset = 0
+        self.linha = 1
+        self.coluna = 1
+
+    def avancar(self, offset: int) -> Tuple[int, int]:
+        while self.offset < offset:
+            fim = min(offset, self.offset + BLOCO)
+            trecho = self.dados[self.offset:fim]
+            quebras = trecho.count(b'\n')
+            if quebras:
+                self.linha += quebras
+                self.coluna = 1 + _caracteres(trecho[trecho.rfind(b'\n') + 1:])
+            else:
+                self.coluna += _caracteres(trecho)
+            self.offset = fim
+        return self.linha, self.coluna
+
+
+def _classificar(achado: bytes) -> Tuple[str, Optional[str], Optional[str]]:
+    """(tipo, bytes originais prováveis em hex, correção sugerida)"""
+    if achado == b'\xef\xbf\xbd':
+        return 'perdido', None, None
+    if achado[0] == 0xC2:
+        return 'c1', achado[1:].hex(' '), ''
+    texto = achado.decode('utf-8')
+    original = bytes(CONTINUACOES.get(c.encode('utf-8'), ord(c)) for c in texto)
+    try:
+        return 'duplo', original.hex(' '), original.decode('utf-8')
+    except UnicodeDecodeError:
+        return 'truncado', original.hex(' '), SUGESTOES.get(texto)
+
+def _vizinhos(dados, inicio: int, fim: int) -> Tuple[str, str]:
+    """Caracteres imediatamente antes e depois de dados[inicio:fim]"""
+    antes = bytes(dados[max(0, inicio - 4):inicio]).decode('utf-8', 'ignore')[-1:]
+    depois = bytes(dados[fim:fim + 4]).decode('utf-8', 'ignore')[:1]
+    return antes, depois
+
+def escanear(caminho: str) -> Iterator[Dict]:
+    """Ocorrências de um arquivo, por ordem de offset"""
+    with open(caminho, 'rb') as f:
+        tamanho = os.fstat(f.fileno()).st_size
+        if tamanho == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+            posicao = Posicao(dados)
+            inicio = 0
+            while inicio < tamanho:
+                # A procura vai um pouco além da janela para não cortar uma
+                # ocorrência ao meio (contaria como truncada); só valem as
+                # que começam dentro dela
+                fim = min(inicio + JANELA, tamanho)
+                proximo = fim
+                for encontrado in PADRAO.finditer(dados, inicio, min(fim + MAIOR_OCORRENCIA, tamanho)):
+                    if encontrado.start() >= fim:
+                        break
+                    proximo = max(proximo, encontrado.end())
+                    achado = encontrado.group()
+                    tipo, original, sugestao = _classificar(achado)
+                    # Texto correto também forma sequências ("É”" dá "ɔ"): o
+                    # critério é o mesmo com que o fix_mojibake as reverte
+                    if tipo == 'duplo' and not plausivel(sugestao, *_vizinhos(dados, *encontrado.span())):
+                        continue
+                    linha, coluna = posicao.avancar(encontrado.start())
+                    yield {
+                        'arquivo': caminho, 'offset': encontrado.start(), 'linha': linha,
+                        'coluna': coluna, 'tipo': tipo, 'encontrado': achado.decode('utf-8'),
+                        'original': original, 'sugestao': sugestao,
+                    }
+                if hasattr(dados, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+                    pagina = inicio - inicio % mmap.PAGESIZE
+                    dados.madvise(mmap.MADV_DONTNEED, pagina, fim - pagina)
+                inicio = proximo
+
+def escanear_caminhos(caminhos: List[str], saida: TextIO,
+                      extensoes: Tuple[str, ...] = EXTENSOES_SCAN) -> Counter:
+    """Escreve uma linha JSON por ocorrência em `saida`; devolve a contagem por tipo"""
+    contagem: Counter = Counter()
+    for caminho in caminhos:
+        arquivos = percorrer(caminho, extensoes) if os.path.isdir(caminho) else [caminho]
+        for arquivo in arquivos:
+            contagem['arquivos'] += 1
+            try:
+                contagem['bytes'] += os.path.getsize(arquivo)
+                for ocorrencia in escanear(arquivo):
+                    contagem[ocorrencia['tipo']] += 1
+                    saida.write(json.dumps(ocorrencia, ensure_ascii=False) + '\n')
+            except OSError as e:
+                print(f"❌ {arquivo}: {e}", file=sys.stderr)
+    return contagem
+
+# =============================================
+# MAIN
+# =============================================
+
+def main(argv: Optional[List[str]] = None):
+    """Procura mojibake nos arquivos/diretórios indicados (padrão: o repositório)"""
+    parser = argparse.ArgumentParser(description="Procura mojibake byte a byte (relatório JSON Lines)")
+    parser.add_argument('caminhos', nargs='*', help="Arquivos ou diretórios (padrão: o repositório)")
+    parser.add_argument('--saida', help="Arquivo do relatório (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as saida:
+            contagem = escanear_caminhos(args.caminhos or [BASE_DIR], saida)
+    else:
+        contagem = escanear_caminhos(args.caminhos or [BASE_DIR], sys.stdout)
+    duracao = time.perf_counter() - inicio
+
+    tipos = ', '.join(f"{contagem[t]} {t}" for t in ('duplo', 'truncado', 'c1', 'perdido') if contagem[t])
+    megabytes = contagem['bytes'] / 1024 / 1024
+    print(f"🔎 {contagem['arquivos']} arquivos, {megabytes:.1f}MB em {duracao:.2f}s "
+          f"({megabytes / max(duracao, 1e-9):.0f}MB/s): {tipos or 'nenhum mojibake'}", file=sys.stderr)
+    if any(contagem[t] for t in ('duplo', 'truncado', 'c1', 'perdido')):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,58 +1,96 @@
-const CACHE_NAME = 'yamar-v1.0.0';
-const STATIC_CACHE = 'yamar-static-v1.0.0';
-const DYNAMIC_CACHE = 'yamar-dynamic-v1.0.0';
-
-// Recursos estáticos para cache imediato
-const STATIC_ASSETS = [
-  '/',
-  '/index.html',
-  '/css/styles.css',
-  '/js/app.js',
-  '/js/storage.js',
-  '/js/ui.js',
-  '/manifest.json',
-  '/assets/images/icon-192.png',
-  '/assets/images/icon-512.png'
-];
-
-// Recursos dinâmicos comuns
-const DYNAMIC_ASSETS = [
-  '/sobre.html',
-  '/servicos.html',
-  '/workshops.html',
-  '/produtos.html',
-  '/contacto.html',
-  '/blog.html',
-  '/portfolio.html'
-];
-
-// Install event - cache static assets
+// The precache is versioned by its manifest: a new worker installs into its
+// own cache while the active one keeps serving the old, complete set, and the
+// old cache is only dropped on activate. Unchanged entries are copied over
+// from the previous precache instead of being downloaded again
+const PRECACHE_PREFIX = 'yamar-precache';
+const STATIC_CACHE = 'yamar-static';
+const DYNAMIC_CACHE = 'yamar-dynamic';
+
+// Revisions of what is in each precache (stored in the cache itself)
+const REVISIONS_KEY = '/__precache-revisions';
+
+// Pages available offline plus the scripts, styles and icons they load, with
+// a content hash each. Filled in by the build (precache_manifest.py)
+// <precache-manifest> generated by build_site.py, do not edit
+const PRECACHE_MANIFEST = [];
+const PRECACHE_VERSION = 'dev';
+// </precache-manifest>
+
+const PRECACHE = `${PRECACHE_PREFIX}-${PRECACHE_VERSION}`;
+
+const REVISIONS = new Map(PRECACHE_MANIFEST.map(entry => [entry.url, entry.revision]));
+
+function readRevisions(cache) {
+  return cache.match(REVISIONS_KEY)
+    .then(response => (response ? response.json() : {}))
+    .catch(() => ({}));
+}
+
+function isPrecache(cacheName) {
+  return cacheName === PRECACHE_PREFIX || cacheName.startsWith(`${PRECACHE_PREFIX}-`);
+}
+
+// url -> response with the same revision in an older precache
+function reusable() {
+  return caches.keys()
+    .then(cacheNames => Promise.all(cacheNames
+      .filter(cacheName => isPrecache(cacheName) && cacheName !== PRECACHE)
+      .map(cacheName => caches.open(cacheName)
+        .then(cache => readRevisions(cache).then(cached => Promise.all(
+          PRECACHE_MANIFEST
+            .filter(entry => cached[entry.url] === entry.revision)
+            .map(entry => cache.match(entry.url).then(response => [entry.url, response]))
+        ))))))
+    .then(lists => new Map([].concat(...lists).filter(([, response]) => response)));
+}
+
+// Install event - fill this version's precache; only changed entries hit the network
 self.addEventListener('install', event => {
   console.log('[SW] Install event');
   event.waitUntil(
-    caches.open(STATIC_CACHE)
-      .then(cache => {
-        console.log('[SW] Caching static assets');
-        return cache.addAll(STATIC_ASSETS);
+    reusable()
+      .then(previous => {
+        const changed = PRECACHE_MANIFEST.filter(entry => !previous.has(entry.url));
+        console.log(`[SW] Precaching ${changed.length} of ${PRECACHE_MANIFEST.length} assets`);
+
+        // All or nothing, like cache.addAll: a failed fetch aborts the install
+        // before anything is written
+        return Promise.all(changed.map(entry =>
+          fetch(entry.url, { cache: 'reload' }).then(response => {
+            if (!response.ok) {
+              throw new Error(`[SW] Precache ${entry.url}: HTTP ${response.status}`);
+            }
+            return [entry.url, response];
+          })
+        ))
+          .then(responses => caches.open(PRECACHE).then(cache => Promise.all(
+            [...previous, ...responses].map(([url, response]) => cache.put(url, response))
+          )
+            .then(() => {
+              const revisions = Object.fromEntries(REVISIONS);
+              return cache.put(REVISIONS_KEY, new Response(JSON.stringify(revisions),
+                { headers: { 'Content-Type': 'application/json' } }));
+            })));
       })
       .then(() => self.skipWaiting())
   );
 });
 
-// Activate event - cleanup old caches
+// Activate event - this version now serves: drop the previous precaches and old caches
 self.addEventListener('activate', event => {
   console.log('[SW] Activate event');
+  const current = [PRECACHE, STATIC_CACHE, DYNAMIC_CACHE];
   event.waitUntil(
-    caches.keys().then(cacheNames => {
-      return Promise.all(
-        cacheNames.map(cacheName => {
-          if (cacheName !== STATIC_CACHE && cacheName !== DYNAMIC_CACHE) {
+    caches.keys()
+      .then(cacheNames => Promise.all(
+        cacheNames
+          .filter(cacheName => !current.includes(cacheName))
+          .map(cacheName => {
             console.log('[SW] Deleting old cache:', cacheName);
             return caches.delete(cacheName);
-          }
-        })
-      );
-    }).then(() => self.clients.claim())
+          })
+      ))
+      .then(() => self.clients.claim())
   );
 });
 
@@ -67,8 +105,17 @@ self.addEventListener('fetch', event => {
   // Skip external requests
   if (!url.origin.includes(self.location.origin)) return;
 
+  // Precached assets: cache first (a new revision comes with a new sw.js)
+  if (REVISIONS.has(url.pathname) && request.destination !== 'document') {
+    event.respondWith(
+      caches.open(PRECACHE)
+        .then(cache => cache.match(url.pathname))
+        .then(cachedResponse => cachedResponse || fetch(request))
+    );
+  }
+
   // Network First strategy for HTML pages
-  if (request.destination === 'document' ||
+  else if (request.destination === 'document' ||
       url.pathname.endsWith('.html') ||
       url.pathname === '/') {
     event.respondWith(
@@ -99,30 +146,30 @@ self.addEventListener('fetch', event => {
     );
   }
 
-  // Cache First strategy for static assets
+  // Stale While Revalidate for other static assets: answer from the cache,
+  // refresh it in the background so nothing stays stale for good
   else if (request.destination === 'style' ||
            request.destination === 'script' ||
            request.destination === 'image' ||
            request.destination === 'font') {
     event.respondWith(
-      caches.match(request)
-        .then(cachedResponse => {
-          if (cachedResponse) {
-            return cachedResponse;
-          }
-
-          return fetch(request)
-            .then(response => {
-              const responseClone = response.clone();
-
-              if (response.status === 200) {
-                caches.open(STATIC_CACHE)
-                  .then(cache => cache.put(request, responseClone));
-              }
-
-              return response;
-            });
-        })
+      caches.open(STATIC_CACHE)
+        .then(cache => cache.match(request)
+          .then(cachedResponse => {
+            const network = fetch(request)
+              .then(response => {
+                if (response.status === 200) {
+                  cache.put(request, response.clone());
+                }
+                return response;
+              });
+
+            if (cachedResponse) {
+              network.catch(() => {});
+              return cachedResponse;
+            }
+            return network;
+          }))
     );
   }
 
@@ -171,8 +218,8 @@ self.addEventListener('push', event => {
     const data = event.data.json();
     const options = {
       body: data.body,
-      icon: '/assets/images/icon-192.png',
-      badge: '/assets/images/icon-96.png',
+      icon: '/assets/images/icon-192x192.png',
+      badge: '/assets/images/icon-96x96.png',
       vibrate: [100, 50, 100],
       data: {
         dateOfArrival: Date.now(),
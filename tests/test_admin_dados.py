@@ -0,0 +1,106 @@
+import copy
+import json
+
+import pytest
+
+import admin_dados
+from admin_dados import (DADOS_FILE, Catalog, ErroValidacao, aplicar_lote_stream, atualizar_produto,
+                         atualizar_servico, atualizar_workshop, converter_valor)
+
+
+@pytest.fixture
+def catalogo():
+    with open(DADOS_FILE, encoding='utf-8') as f:
+        return Catalog(copy.deepcopy(json.load(f)))
+
+
+def test_atualizar_id_renomeia_indices(catalogo):
+    produto = catalogo.colecao('produtos')[0]
+    antigo = produto['id']
+    por_categoria = [p['id'] for p in catalogo.filtrar('produtos', categoria=produto['categoria'])]
+
+    catalogo.atualizar('produtos', antigo, id='produto-renomeado')
+
+    assert catalogo.obter('produtos', antigo) is None
+    assert catalogo.obter('produtos', 'produto-renomeado') is produto
+    depois = [p['id'] for p in catalogo.filtrar('produtos', categoria=produto['categoria'])]
+    assert depois == [('produto-renomeado' if i == antigo else i) for i in por_categoria]
+    # O novo id volta a poder ser alterado, e o antigo fica livre
+    catalogo.atualizar('produtos', 'produto-renomeado', id=antigo)
+    assert catalogo.obter('produtos', antigo) is produto
+
+
+def test_atualizar_id_existente(catalogo):
+    primeiro, segundo = catalogo.colecao('produtos')[:2]
+    with pytest.raises(ErroValidacao):
+        catalogo.atualizar('produtos', primeiro['id'], id=segundo['id'])
+    assert catalogo.obter('produtos', primeiro['id']) is primeiro
+
+
+@pytest.mark.parametrize('texto, valor', [
+    ('true', True), ('False', False), ('12', 12), ('12.5', 12.5),
+    ('1.2.3', '1.2.3'), ('abc', 'abc'),
+])
+def test_converter_valor(texto, valor):
+    assert converter_valor(texto) == valor
+    assert type(converter_valor(texto)) is type(valor)
+
+
+@pytest.mark.parametrize('funcao, colecao', [
+    (atualizar_servico, 'servicos'), (atualizar_workshop, 'workshops'), (atualizar_produto, 'produtos'),
+])
+def test_atualizar_pelos_menus_com_id_novo(catalogo, capsys, funcao, colecao):
+    antigo = catalogo.colecao(colecao)[0]['id']
+    assert funcao(catalogo, antigo, id='id-novo') is True
+    assert '✅' in capsys.readouterr().out
+    assert catalogo.obter(colecao, 'id-novo') is not None
+    assert catalogo.obter(colecao, antigo) is None
+
+
+@pytest.fixture
+def dados_tmp(tmp_path, monkeypatch):
+    caminho = tmp_path / 'dados.json'
+    with open(DADOS_FILE, 'rb') as f:
+        caminho.write_bytes(f.read())
+    monkeypatch.setattr(admin_dados, 'DADOS_FILE', str(caminho))
+    return caminho
+
+
+def _patches(tmp_path, *linhas):
+    caminho = tmp_path / 'patches.jsonl'
+    caminho.write_text('\n'.join(json.dumps(linha) for linha in linhas), encoding='utf-8')
+    return str(caminho)
+
+
+def test_apply_stream(dados_tmp, tmp_path, capsys):
+    dados = json.loads(dados_tmp.read_text(encoding='utf-8'))
+    produto, servico = dados['produtos'][0], dados['servicos'][0]
+    patches = _patches(tmp_path,
+                       {'colecao': 'produtos', 'id': produto['id'], 'stock': '7'},
+                       {'colecao': 'servicos', 'id': servico['id'], 'preco': 'caro'},
+                       {'colecao': 'produtos', 'id': 'nao-existe', 'stock': 1},
+                       {'colecao': 'produtos', 'id': produto['id'], 'id_novo': 1},
+                       {'colecao': 'configuracoes', 'secao': 'horarioAtendimento', 'domingo': '10:00-13:00'})
+
+    aplicadas, falhas, erros = aplicar_lote_stream(patches)
+
+    assert (aplicadas, falhas) == (2, 3)
+    assert [linha for linha, _ in erros] == [2, 3, 4]
+    novos = json.loads(dados_tmp.read_text(encoding='utf-8'))
+    assert novos['produtos'][0]['stock'] == 7
+    assert novos['servicos'][0] == servico
+    assert novos['configuracoes']['horarioAtendimento']['domingo'] == '10:00-13:00'
+    assert novos['lastUpdate'] != dados['lastUpdate']
+
+
+def test_apply_stream_sem_alteracoes_ou_dry_run(dados_tmp, tmp_path):
+    original = dados_tmp.read_bytes()
+    produto = json.loads(original)['produtos'][0]
+    mesmo = _patches(tmp_path, {'colecao': 'produtos', 'id': produto['id'], 'stock': produto['stock']})
+    assert aplicar_lote_stream(mesmo)[:2] == (1, 0)
+    assert dados_tmp.read_bytes() == original
+
+    novo = _patches(tmp_path, {'colecao': 'produtos', 'id': produto['id'], 'stock': produto['stock'] + 1})
+    assert aplicar_lote_stream(novo, gravar=False)[:2] == (1, 0)
+    assert dados_tmp.read_bytes() == original
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['dados.json', 'patches.jsonl']
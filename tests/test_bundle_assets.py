@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from bundle_assets import (Gerado, Pacote, apagar, empacotar, gerar_todos, minificar_css,
+                           minificar_js)
+
+
+def test_minificar_js_preserva_strings_regex_e_asi():
+    texto = ("var a = 1; // comentário\n"
+             "var b = a / 2 /* x */\n"
+             "var r = /ab+c/g.test('x // y');\n"
+             "let t = `a ${ {k:1}.k } b`\n"
+             "return\n"
+             "x")
+    minificado, _ = minificar_js(texto)
+    assert minificado == ("var a=1;var b=a/2\nvar r=/ab+c/g.test('x // y');"
+                          "let t=`a ${{k:1}.k} b`\nreturn\nx")
+
+
+def test_minificar_css():
+    texto = "/* c */ a  >  b { color: red ; }\n/*! licença */ @media (min-width: 1px) and (max-width: 2px) { p { margin: 0 } }"
+    minificado, _ = minificar_css(texto)
+    assert minificado == "a>b{color:red}/*! licença */ @media (min-width:1px) and (max-width:2px){p{margin:0}}"
+
+
+def test_apagar_mantem_offsets():
+    texto = "a\nbcd\ne"
+    assert apagar(texto, [(2, 7)]) == "a\n   \n "
+
+
+@pytest.fixture
+def site(tmp_path):
+    base = tmp_path / 'site'
+    (base / 'js').mkdir(parents=True)
+    (base / 'js' / 'a.js').write_text("function a() {\n  return 1; // um\n}\n", encoding='utf-8')
+    (base / 'js' / 'b.js').write_text("var b = a();\n", encoding='utf-8')
+    return str(base), str(tmp_path / 'dist')
+
+
+PACOTE = Pacote('app', 'js', ('js/a.js', 'js/b.js'))
+
+
+def test_gerar_todos_usa_cache_e_apaga_o_antigo(site):
+    base, dist = site
+    (primeiro,), cache, gerados = gerar_todos(base, dist, True, {}, [PACOTE])
+    assert gerados == 1
+    assert primeiro.url.startswith('js/app.') and primeiro.url.endswith('.js')
+    with open(os.path.join(dist, primeiro.url + '.map'), encoding='utf-8') as f:
+        assert json.load(f)['sources'] == ['a.js', 'b.js']
+
+    (igual,), cache, gerados = gerar_todos(base, dist, True, cache, [PACOTE])
+    assert gerados == 0 and igual == primeiro
+
+    with open(os.path.join(base, 'js', 'b.js'), 'a', encoding='utf-8') as f:
+        f.write("b++;\n")
+    (novo,), cache, gerados = gerar_todos(base, dist, True, cache, [PACOTE])
+    assert gerados == 1 and novo.url != primeiro.url
+    assert os.path.exists(os.path.join(dist, novo.url))
+    assert not os.path.exists(os.path.join(dist, primeiro.url))
+
+
+GERADOS = [Gerado('app', 'js', 'js/app.123.js', ('js/storage.js', 'js/ui.js'), 10, 5),
+           Gerado('styles', 'css', 'css/styles.9.css', ('css/styles.css',), 3, 2)]
+PAGINA = ('<head>\n<link rel="stylesheet" href="css/styles.css">\n</head><body>\n'
+          '<script src="js/storage.js" defer></script>\n<!-- x -->\n'
+          '<script src="js/ui.js" defer></script>\n</body>')
+
+
+def test_empacotar():
+    texto, contagem = empacotar(PAGINA, GERADOS)
+    assert texto == ('<head>\n<link rel="stylesheet" href="css/styles.9.css">\n</head><body>\n'
+                     '<script src="js/app.123.js" defer></script>\n<!-- x -->\n</body>')
+    assert contagem == {'app': 1, 'styles': 1}
+
+
+def test_empacotar_modos_diferentes_fica_como_esta():
+    pagina = PAGINA.replace('js/ui.js" defer', 'js/ui.js"')
+    texto, contagem = empacotar(pagina, GERADOS)
+    assert 'js/storage.js' in texto and 'js/ui.js' in texto
+    assert contagem['app'] == 0
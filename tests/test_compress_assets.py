@@ -0,0 +1,72 @@
+import gzip
+import os
+
+import pytest
+
+from compress_assets import MIN_BYTES, comprimir
+
+TEXTO = ('<p class="texto">maquilhagem profissional</p>\n' * 100).encode('utf-8')
+
+
+@pytest.fixture
+def dist(tmp_path):
+    (tmp_path / 'index.html').write_bytes(TEXTO)
+    (tmp_path / 'pequeno.css').write_bytes(b'p{margin:0}')
+    (tmp_path / 'foto.jpg').write_bytes(b'\xff\xd8' * MIN_BYTES)
+    return tmp_path
+
+
+def _comprimir(dist, cache, **kwargs):
+    arquivos, cache = comprimir(str(dist), cache, qualidade=None, **kwargs)
+    return {a.arquivo: a for a in arquivos}, cache
+
+
+def test_comprime_so_texto_grande(dist):
+    arquivos, _ = _comprimir(dist, {})
+    assert list(arquivos) == ['index.html']
+    gz = dist / 'index.html.gz'
+    assert gzip.decompress(gz.read_bytes()) == TEXTO
+    assert arquivos['index.html'].gzip == gz.stat().st_size
+    # O nginx usa a data do .gz no Last-Modified
+    assert gz.stat().st_mtime_ns == (dist / 'index.html').stat().st_mtime_ns
+    assert not (dist / 'pequeno.css.gz').exists()
+
+
+def test_cache_invalidado_pelo_conteudo(dist):
+    _, cache = _comprimir(dist, {})
+    arquivos, cache = _comprimir(dist, cache)
+    assert arquivos['index.html'].reutilizada
+
+    novo = TEXTO + b'<p>novo</p>\n'
+    (dist / 'index.html').write_bytes(novo)
+    arquivos, cache = _comprimir(dist, cache)
+    assert not arquivos['index.html'].reutilizada
+    assert gzip.decompress((dist / 'index.html.gz').read_bytes()) == novo
+
+    # Mesmo conteúdo gravado de novo: não comprime, só acerta a data
+    os.utime(dist / 'index.html', ns=(1, 10 ** 18))
+    arquivos, cache = _comprimir(dist, cache)
+    assert arquivos['index.html'].reutilizada
+    assert (dist / 'index.html.gz').stat().st_mtime_ns == 10 ** 18
+
+
+def test_gz_apagado_ou_outro_nivel(dist):
+    _, cache = _comprimir(dist, {})
+    (dist / 'index.html.gz').unlink()
+    arquivos, cache = _comprimir(dist, cache)
+    assert not arquivos['index.html'].reutilizada and (dist / 'index.html.gz').exists()
+
+    arquivos, _ = _comprimir(dist, cache, nivel=1)
+    assert not arquivos['index.html'].reutilizada
+
+
+def test_orfaos_apagados(dist):
+    _, cache = _comprimir(dist, {})
+    (dist / 'index.html').unlink()
+    (dist / 'velho.js.gz').write_bytes(b'x')
+    (dist / 'pacote.tar.gz').write_bytes(b'x')
+    _, cache = _comprimir(dist, cache)
+    assert not (dist / 'index.html.gz').exists()
+    assert not (dist / 'velho.js.gz').exists()
+    assert (dist / 'pacote.tar.gz').exists()
+    assert cache == {}
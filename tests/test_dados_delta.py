@@ -0,0 +1,65 @@
+import copy
+import json
+import os
+import random
+
+import pytest
+
+from dados_delta import (_catalogo_sintetico, _publicacao_tipica, aplicar_patch, gerar_patch,
+                         ler_indice, publicar_delta, versao_documento)
+
+
+def _ler(diretorio, url):
+    with open(os.path.join(diretorio, os.path.basename(url)), encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('antigo, novo', [
+    ({'a': 1, 'b': [1, 2, 3]}, {'a': 1.0, 'b': [1, 3], 'c': {'d': '~/'}}),
+    ({'x': [0, False]}, {'x': [False, 0]}),
+    ([{'id': 'a', 'v': 1}, {'id': 'b'}], [{'id': 'z'}, {'id': 'a', 'v': 2}, {'id': 'b'}]),
+    ({'a': 1}, [1]),
+])
+def test_patch_reproduz_o_novo(antigo, novo):
+    ops = gerar_patch(antigo, novo)
+    resultado = aplicar_patch(copy.deepcopy(antigo), ops)
+    assert json.dumps(resultado) == json.dumps(novo)
+
+
+def test_patch_alinha_pelo_id():
+    rnd = random.Random(1)
+    antigo = _catalogo_sintetico(2000, rnd)
+    novo = _publicacao_tipica(antigo, rnd)
+    ops = gerar_patch(antigo, novo)
+    assert aplicar_patch(copy.deepcopy(antigo), ops) == novo
+    # Uma inserção não desloca os itens seguintes: o patch fica pequeno
+    assert len(ops) < 50
+
+
+def test_publicar_delta(tmp_path):
+    diretorio = str(tmp_path / 'delta')
+    versoes = [{'lastUpdate': str(i), 'produtos': [{'id': 'p', 'preco': i, 'nome': 'x' * 500}]}
+               for i in range(5)]
+    for dados in versoes:
+        assert publicar_delta(dados, diretorio, manter=3, verbose=False)
+    assert not publicar_delta(versoes[-1], diretorio, manter=3, verbose=False)
+
+    indice = ler_indice(diretorio)
+    atual = versoes[-1]
+    assert indice['version'] == versao_documento(atual)
+    assert _ler(diretorio, indice['url']) == atual
+    anteriores = [versao_documento(d) for d in versoes[2:4]]
+    assert sorted(indice['patches']) == sorted(anteriores)
+    for dados in versoes[2:4]:
+        ops = _ler(diretorio, indice['patches'][versao_documento(dados)]['url'])
+        assert aplicar_patch(copy.deepcopy(dados), ops) == atual
+    # Só as versões do índice atual e do anterior ficam no disco
+    assert f"{versao_documento(versoes[1])}.json" in os.listdir(diretorio)
+    assert f"{versao_documento(versoes[0])}.json" not in os.listdir(diretorio)
+
+
+def test_sem_patch_maior_que_o_snapshot(tmp_path):
+    diretorio = str(tmp_path / 'delta')
+    publicar_delta({'a': 1}, diretorio, verbose=False)
+    publicar_delta({'b': 2}, diretorio, verbose=False)
+    assert ler_indice(diretorio)['patches'] == {}
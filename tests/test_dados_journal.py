@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+import admin_dados
+from admin_dados import DADOS_FILE, carregar_catalogo
+from dados_journal import ErroJournal, Journal, agrupar, sobreposicao
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return Journal(str(tmp_path / 'dados.journal'), fsync=False)
+
+
+def test_registrar_e_ler(journal):
+    journal.registrar([('produtos', 'p1', [('preco', 10, 12), ('stock', 3, 3)]),
+                       ('produtos', 'p1', [('stock', 3, 4)])])
+    entradas = Journal(journal.caminho).ler()
+    # Campos que não mudaram não geram entrada; 1 -> 1.0 gera
+    assert [(e['seq'], e['campo'], e['novo']) for e in entradas] == [(1, 'preco', 12), (2, 'stock', 4)]
+    journal.registrar([('produtos', 'p1', [('preco', 12, 12.0)])])
+    assert Journal(journal.caminho).ler()[-1]['seq'] == 3
+
+
+def test_checkpoint_esvazia_e_mantem_seq(journal):
+    journal.registrar([('produtos', 'p1', [('preco', 10, 12)])])
+    journal.checkpoint()
+    novo = Journal(journal.caminho)
+    assert novo.ler() == [] and novo.pendentes == 0
+    novo.registrar([('produtos', 'p1', [('preco', 12, 13)])])
+    assert [e['seq'] for e in Journal(journal.caminho).ler()] == [2]
+
+
+def test_ultima_linha_incompleta_descartada(journal, capsys):
+    journal.registrar([('produtos', 'p1', [('preco', 10, 12)])])
+    with open(journal.caminho, 'ab') as f:
+        f.write(b'{"seq": 2, "op": "se')
+    assert len(Journal(journal.caminho).ler()) == 1
+    assert 'incompleta' in capsys.readouterr().out
+    # O arquivo foi truncado: o append seguinte fica numa linha própria
+    seguinte = Journal(journal.caminho)
+    seguinte.ler()
+    seguinte.registrar([('produtos', 'p1', [('preco', 12, 14)])])
+    assert [e['novo'] for e in Journal(journal.caminho).ler()] == [12, 14]
+
+
+def test_linha_corrompida_no_meio(journal):
+    with open(journal.caminho, 'w', encoding='utf-8') as f:
+        f.write('{"seq": 1, "op": "set"\n{"seq": 2}\n')
+    with pytest.raises(ErroJournal, match=':1:'):
+        Journal(journal.caminho).ler()
+
+
+def test_agrupar_e_sobreposicao():
+    entradas = [
+        {'colecao': 'produtos', 'id': 'p1', 'campo': 'preco', 'antigo': 10, 'novo': 11},
+        {'colecao': 'produtos', 'id': 'p1', 'campo': 'preco', 'antigo': 11, 'novo': 12},
+        {'colecao': 'servicos', 'id': 's1', 'campo': 'preco', 'antigo': 5, 'novo': 6},
+        {'colecao': 'produtos', 'id': 'p1', 'campo': 'stock', 'antigo': 1, 'novo': 2},
+    ]
+    assert list(agrupar(entradas)) == [
+        ('produtos', 'p1', {'preco': 12}, {'preco': 10}),
+        ('servicos', 's1', {'preco': 6}, {'preco': 5}),
+        ('produtos', 'p1', {'stock': 2}, {'stock': 1}),
+    ]
+    assert sobreposicao(entradas, 'produtos') == {'p1': {'preco': 12, 'stock': 2}}
+
+
+@pytest.fixture
+def arquivos(tmp_path, monkeypatch):
+    dados = tmp_path / 'dados.json'
+    with open(DADOS_FILE, 'rb') as f:
+        dados.write_bytes(f.read())
+    journal = tmp_path / 'dados.journal'
+    monkeypatch.setattr(admin_dados, 'DADOS_FILE', str(dados))
+    monkeypatch.setattr(admin_dados, 'JOURNAL_FILE', str(journal))
+    return dados, journal
+
+
+def test_journal_reaplicado_e_compactado(arquivos):
+    dados, journal = arquivos
+    original = dados.read_bytes()
+    catalogo = carregar_catalogo(usar_journal=True)
+    produto = catalogo.colecao('produtos')[0]
+    stock = produto['stock'] + 5
+    catalogo.atualizar('produtos', produto['id'], stock=stock)
+    assert catalogo.salvar() is True
+    # Só o journal foi escrito; o snapshot fica igual até ao compact
+    assert dados.read_bytes() == original
+    assert len(Journal(str(journal)).ler()) == 1
+
+    reaberto = carregar_catalogo()
+    assert reaberto.obter('produtos', produto['id'])['stock'] == stock
+    reaberto.compactar()
+    assert Journal(str(journal)).ler() == []
+    assert json.loads(dados.read_bytes())['produtos'][0]['stock'] == stock
@@ -0,0 +1,82 @@
+import copy
+import json
+import os
+
+import pytest
+
+from dados_io import serializar
+from dados_shards import exportar_colecao_stream, exportar_shards, ler_manifest
+
+DOCUMENTO = {
+    'version': '1.0.0',
+    'lastUpdate': '2026-01-01T00:00:00',
+    'produtos': [{'id': 'p1', 'preco': 10}, {'id': 'p2', 'preco': 20}],
+    'servicos': [{'id': 's1', 'categoria': 'noivas'}],
+    'configuracoes': {'horario': {'domingo': 'Fechado'}},
+}
+
+
+def _shard(diretorio, manifest, chave):
+    with open(os.path.join(diretorio, os.path.basename(manifest['shards'][chave]['url'])), 'rb') as f:
+        return f.read()
+
+
+def _escrever_dados(tmp_path, dados):
+    caminho = tmp_path / 'dados.json'
+    caminho.write_text(json.dumps(dados, indent=2, ensure_ascii=False), encoding='utf-8')
+    return str(caminho)
+
+
+@pytest.fixture
+def diretorio(tmp_path):
+    destino = str(tmp_path / 'dados')
+    exportar_shards(copy.deepcopy(DOCUMENTO), destino, verbose=False)
+    return destino
+
+
+def test_exportar_shards(diretorio):
+    manifest = ler_manifest(diretorio)
+    assert manifest['lastUpdate'] == DOCUMENTO['lastUpdate']
+    assert set(manifest['shards']) == {'produtos', 'servicos', 'configuracoes'}
+    for chave in manifest['shards']:
+        assert _shard(diretorio, manifest, chave) == serializar(DOCUMENTO[chave], compacto=True)
+
+
+def test_exportar_so_regenera_o_que_mudou(diretorio):
+    anterior = ler_manifest(diretorio)
+    dados = copy.deepcopy(DOCUMENTO)
+    dados['produtos'][0]['preco'] = 11
+    assert exportar_shards(dados, diretorio, verbose=False) == ['produtos']
+    assert exportar_shards(dados, diretorio, verbose=False) == []
+
+    manifest = ler_manifest(diretorio)
+    assert manifest['shards']['servicos'] == anterior['shards']['servicos']
+    # O shard anterior fica mais uma versão para quem leu o manifest antigo
+    nomes = os.listdir(diretorio)
+    assert os.path.basename(anterior['shards']['produtos']['url']) in nomes
+
+    dados['produtos'][0]['preco'] = 12
+    exportar_shards(dados, diretorio, verbose=False)
+    assert os.path.basename(anterior['shards']['produtos']['url']) not in os.listdir(diretorio)
+
+
+@pytest.mark.parametrize('chave', ['produtos', 'configuracoes'])
+def test_exportar_colecao_stream(tmp_path, diretorio, chave):
+    dados = copy.deepcopy(DOCUMENTO)
+    if chave == 'produtos':
+        dados['produtos'].append({'id': 'p3', 'preco': 30.5})
+    else:
+        dados['configuracoes']['horario']['domingo'] = '10:00-13:00'
+    dados['lastUpdate'] = '2026-01-02T00:00:00'
+
+    assert exportar_colecao_stream(_escrever_dados(tmp_path, dados), chave, diretorio, verbose=False)
+    manifest = ler_manifest(diretorio)
+    assert manifest['lastUpdate'] == dados['lastUpdate']
+    assert _shard(diretorio, manifest, chave) == serializar(dados[chave], compacto=True)
+    # O resultado é o mesmo de uma exportação completa
+    assert exportar_shards(dados, diretorio, verbose=False) == []
+
+
+def test_exportar_colecao_stream_sem_manifest(tmp_path):
+    caminho = _escrever_dados(tmp_path, DOCUMENTO)
+    assert exportar_colecao_stream(caminho, 'produtos', str(tmp_path / 'vazio'), verbose=False) is False
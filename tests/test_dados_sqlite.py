@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from admin_dados import DADOS_FILE, ErroValidacao, atualizar_servico
+from dados_sqlite import CatalogSQLite, importar_json
+
+
+@pytest.fixture
+def catalogo(tmp_path):
+    catalogo = CatalogSQLite(str(tmp_path / 'dados.db'))
+    with open(DADOS_FILE, encoding='utf-8') as f:
+        importar_json(catalogo.conn, json.load(f))
+    yield catalogo
+    catalogo.conn.close()
+
+
+def test_atualizar_id_muda_a_chave(catalogo):
+    antigo = catalogo.colecao('produtos')[0]['id']
+    catalogo.atualizar('produtos', antigo, id='produto-renomeado')
+    assert catalogo.obter('produtos', antigo) is None
+    assert catalogo.obter('produtos', 'produto-renomeado')['id'] == 'produto-renomeado'
+
+
+def test_atualizar_id_existente(catalogo):
+    primeiro, segundo = catalogo.colecao('produtos')[:2]
+    with pytest.raises(ErroValidacao, match='já existe'):
+        catalogo.atualizar('produtos', primeiro['id'], id=segundo['id'])
+    assert catalogo.obter('produtos', primeiro['id']) == primeiro
+
+
+def test_salvar_referencia_invalida_desfaz(catalogo, capsys):
+    servico = next(s for s in catalogo.colecao('servicos') if s['categoria'] == 'noivas')
+    catalogo.atualizar('servicos', servico['id'], categoria='outra')
+    assert catalogo.salvar() is False
+    assert 'Referências inválidas' in capsys.readouterr().out
+    assert catalogo.obter('servicos', servico['id'])['categoria'] == 'noivas'
+
+
+def test_atualizar_servico_com_id_novo(catalogo, capsys):
+    antigo = catalogo.colecao('servicos')[0]['id']
+    assert atualizar_servico(catalogo, antigo, id='servico-renomeado') is True
+    assert '✅' in capsys.readouterr().out
+    assert catalogo.obter('servicos', 'servico-renomeado') is not None
+    assert catalogo.obter('servicos', antigo) is None
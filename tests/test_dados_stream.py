@@ -0,0 +1,85 @@
+import io
+import itertools
+import json
+
+import pytest
+
+from dados_stream import ErroStream, LeitorStream, iterar_colecao, ler_chave, reescrever
+
+DOCUMENTO = {
+    'site': {'nome': 'Loja', 'emoji': '💄'},
+    'produtos': [{'id': f'p{i}', 'preco': 10, 'nome': 'Sérum ' * i} for i in range(50)],
+    'vazia': [],
+    'lastUpdate': '2024-01-01T00:00:00',
+}
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    caminho = tmp_path / 'dados.json'
+    caminho.write_text(json.dumps(DOCUMENTO, indent=2, ensure_ascii=False), encoding='utf-8')
+    return caminho
+
+
+@pytest.mark.parametrize('bloco', [1, 7, 1 << 16])
+def test_leitor_percorre_chaves_e_itens(arquivo, bloco):
+    lidos = {}
+    with open(arquivo, 'rb') as f:
+        leitor = LeitorStream(f, tamanho_bloco=bloco)
+        for chave in leitor.chaves():
+            if chave in ('produtos', 'vazia'):
+                lidos[chave] = list(leitor.itens())
+            elif chave == 'lastUpdate':
+                lidos[chave] = leitor.valor()
+    assert lidos == {k: DOCUMENTO[k] for k in ('produtos', 'vazia', 'lastUpdate')}
+
+
+def test_iterar_colecao_e_ler_chave(arquivo):
+    assert list(iterar_colecao(str(arquivo), 'produtos')) == DOCUMENTO['produtos']
+    assert list(iterar_colecao(str(arquivo), 'ausente')) == []
+    assert ler_chave(str(arquivo), 'site') == DOCUMENTO['site']
+    assert ler_chave(str(arquivo), 'ausente', 'padrao') == 'padrao'
+
+
+def test_leitor_json_invalido():
+    with pytest.raises(ErroStream):
+        leitor = LeitorStream(io.BytesIO(b'{"produtos": [1, 2'))
+        for _ in leitor.chaves():
+            list(leitor.itens())
+
+
+def test_reescrever_sem_alteracoes_mantem_bytes(arquivo):
+    original = arquivo.read_bytes()
+    reescrever(str(arquivo), {'produtos': lambda itens: itens})
+    assert arquivo.read_bytes() == original
+
+
+def test_reescrever_altera_so_a_colecao(arquivo):
+    def transformar(itens):
+        for item in itens:
+            if item['id'] == 'p3':
+                item['preco'] = 12
+            yield item
+
+    reescrever(str(arquivo), {'produtos': transformar, 'lastUpdate': 'agora'})
+    dados = json.loads(arquivo.read_text(encoding='utf-8'))
+    assert dados['produtos'][3]['preco'] == 12
+    assert dados['produtos'][4] == DOCUMENTO['produtos'][4]
+    assert dados['site'] == DOCUMENTO['site'] and dados['lastUpdate'] == 'agora'
+
+
+def test_reescrever_distingue_inteiro_de_float(arquivo):
+    def transformar(itens):
+        for item in itens:
+            item['preco'] = float(item['preco'])
+            yield item
+
+    reescrever(str(arquivo), {'produtos': transformar})
+    assert '"preco": 10.0' in arquivo.read_text(encoding='utf-8')
+
+
+def test_reescrever_recusa_transformacao_incompleta(arquivo):
+    original = arquivo.read_bytes()
+    with pytest.raises(ErroStream, match='não consumiu'):
+        reescrever(str(arquivo), {'produtos': lambda itens: itertools.islice(itens, 5)})
+    assert arquivo.read_bytes() == original
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from fix_mojibake import BASE_DIR, Reparador, decodificar, plausivel
+
+
+@pytest.fixture(scope='module')
+def reparador():
+    return Reparador()
+
+
+# Texto correto que forma sequências UTF-8 válidas quando lido como bytes
+@pytest.mark.parametrize('texto', [
+    '“ATÉ”',   # É” = C9 94 -> ɔ
+    '«JOSÉ»',  # É» = C9 BB -> ɻ
+    '“SÓ”',    # Ó” = D3 94 -> Ӕ (cirílico)
+    'Ç™',      # C7 99 -> Ǚ
+    'Ø€',      # D8 80 -> U+0600 (árabe)
+])
+def test_texto_correto_fica_igual(reparador, texto):
+    assert decodificar(texto)[0] == texto
+    assert reparador.reparar_texto(texto, 'index.html') == (texto, {})
+
+
+@pytest.mark.parametrize('errado, certo', [
+    ('aÃ§Ã£o', 'ação'),
+    ('aÃƒÂ§Ã£o', 'ação'),  # codificado duas vezes
+    ('â€™', '’'),
+    ('â‚¬ 10', '€ 10'),
+    ('a â†’ b', 'a → b'),
+    ('ðŸ”\x8d', '🔍'),
+    ('â\x9d¤ï¸\x8f', '❤️'),
+    ('Ã‡ÃƒO', 'ÇÃO'),
+])
+def test_mojibake_corrigido(reparador, errado, certo):
+    assert reparador.reparar_texto(errado, 'index.html')[0] == certo
+
+
+def test_plausivel():
+    assert plausivel('ç') and plausivel('’') and plausivel('🔍')
+    assert plausivel('️', '⚙')
+    assert not plausivel('️', 'a')
+    assert not plausivel('ɔ') and not plausivel('؀') and not plausivel('́')
+    assert not plausivel('™', 'a', 'b')
+
+
+def test_regras_genericas_so_nos_html(reparador):
+    texto = 'Ã à'
+    assert reparador.reparar_texto('INÃ CIO', 'index.html')[0] == 'INÍCIO'
+    assert reparador.reparar_texto(texto, 'guia.md')[0] == texto
+    assert reparador.reparar_texto(texto, 'app.js')[0] == texto
+
+
+def test_codigo_markdown_fica_igual(reparador):
+    texto = ('Exemplo: `"â†’" -> "→"`\n\n'
+             '```bash\n# "â†’" -> "→"\npython fix_mojibake.py\n```\n'
+             'Fora do código: aÃ§Ã£o\n')
+    corrigido, contagem = reparador.reparar_texto(texto, 'QUICKSTART.md')
+    assert corrigido == texto.replace('aÃ§Ã£o', 'ação')
+    assert sum(contagem.values()) == 2
+
+
+def test_quickstart_sem_alteracoes():
+    with open(os.path.join(BASE_DIR, 'QUICKSTART.md'), 'rb') as f:
+        original = f.read()
+    assert Reparador().reparar_bytes(original, 'QUICKSTART.md')[0] == original
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from perf_budget import excessos, limites, main, medir, novo_orcamento, relatorio
+
+PAGINA = """<!DOCTYPE html><html><head>
+<link rel="preconnect" href="https://fonts.googleapis.com">
+<link rel="preconnect" href="https://cdn.naousado.com">
+<link rel="stylesheet" href="css/style.css">
+<link rel="stylesheet" href="css/print.css" media="print">
+<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Lato">
+<script src="js/app.js" defer></script>
+</head><body>
+<img src="img/foto.jpg">
+<noscript><img src="img/pixel.gif"></noscript>
+<script src="js/fim.js"></script>
+<script src="js/app.js"></script>
+</body></html>
+"""
+
+
+@pytest.fixture
+def site(tmp_path):
+    arquivos = {
+        'index.html': PAGINA,
+        'css/style.css': '@import "base.css";\n@font-face { src: url(../fonts/lato.woff2); }\n',
+        'css/base.css': 'body{margin:0}\n' * 200,
+        'css/print.css': 'p{}',
+        'js/app.js': "fetch('dados.json').then(init);\nfetch('nao-existe.json');\n",
+        'js/fim.js': 'fim();',
+        'dados.json': '{}',
+        'img/foto.jpg': 'x' * 500,
+    }
+    for nome, conteudo in arquivos.items():
+        (tmp_path / nome).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / nome).write_text(conteudo, encoding='utf-8')
+    return tmp_path
+
+
+def test_medir_grafo(site):
+    medida = medir(str(site), 'index.html')
+    recursos = {r.url: r for r in medida.recursos}
+    assert '/img/pixel.gif' not in recursos and '/nao-existe.json' not in recursos
+    assert recursos['/css/style.css'].bloqueante and not recursos['/css/print.css'].bloqueante
+    # O @import de uma folha bloqueante também bloqueia, um nível abaixo
+    assert recursos['/css/base.css'].bloqueante and recursos['/css/base.css'].profundidade == 3
+    assert recursos['/fonts/lato.woff2'].bytes is None and not recursos['/fonts/lato.woff2'].bloqueante
+    # O mesmo script duas vezes conta uma, com o primeiro <script> (defer)
+    assert not recursos['/js/app.js'].bloqueante and recursos['/js/fim.js'].bloqueante
+    assert recursos['/dados.json'].tipo == 'dados' and recursos['/dados.json'].pai == '/js/app.js'
+    assert recursos['/img/foto.jpg'].transferencia == 500
+    # Comprimível sem .gz ao lado: gzip calculado
+    assert recursos['/css/base.css'].transferencia < recursos['/css/base.css'].bytes
+
+    metricas = medida.metricas()
+    assert metricas['pedidos'] == len(medida.recursos)
+    assert metricas['pedidos_bloqueantes'] == 4   # style, base, a folha das fontes, fim.js
+    assert metricas['profundidade'] == 3
+    assert metricas['origens'] == 1
+    notas = medida.notas()
+    assert notas['faltam'] == ['/fonts/lato.woff2']
+    assert notas['preconexoes_sem_uso'] == ['cdn.naousado.com']
+    assert notas['origens_sem_preconexao'] == []
+
+
+def test_transferencia_do_gz(site):
+    (site / 'js' / 'fim.js.gz').write_bytes(b'123')
+    recursos = {r.url: r for r in medir(str(site), 'index.html').recursos}
+    assert recursos['/js/fim.js'].transferencia == 3
+
+
+def test_limites_e_excessos():
+    orcamento = {'padrao': {'pedidos': 10, 'origens': 2},
+                 'paginas': {'produto/*.html': {'pedidos': 5}, 'index.html': {'origens': 0}}}
+    assert limites(orcamento, 'produto/batom.html') == {'pedidos': 5, 'origens': 2}
+    assert limites(orcamento, 'index.html') == {'pedidos': 10, 'origens': 0}
+    metricas = {'pedidos': 6, 'origens': 1, 'transferencia': 10 ** 9}
+    assert excessos(metricas, limites(orcamento, 'produto/batom.html')) == ['pedidos']
+    assert excessos(metricas, limites(orcamento, 'sobre.html')) == []
+
+
+def test_novo_orcamento(site):
+    (site / 'produto').mkdir()
+    (site / 'produto' / 'a.html').write_text('<script src="/js/fim.js"></script>', encoding='utf-8')
+    (site / 'produto' / 'b.html').write_text('<img src="/img/foto.jpg"><img src="x.jpg">', encoding='utf-8')
+    orcamento = novo_orcamento(relatorio(str(site), {}))
+    assert sorted(orcamento['paginas']) == ['index.html', 'produto/*.html']
+    produto = orcamento['paginas']['produto/*.html']
+    assert produto['pedidos'] == 3 and produto['pedidos_bloqueantes'] == 1
+    # Bytes com margem, arredondados a KB inteiros
+    assert produto['transferencia'] % 1024 == 0 and produto['transferencia'] >= 500
+    assert orcamento['padrao']['pedidos'] == orcamento['paginas']['index.html']['pedidos']
+
+
+def test_main(site, tmp_path_factory, capsys):
+    orcamento = tmp_path_factory.mktemp('orc') / 'orcamento.json'
+    main([str(site), '--orcamento', str(orcamento), '--atualizar'])
+    main([str(site), '--orcamento', str(orcamento), '--markdown', str(site / 'relatorio.md')])
+    assert '✅ 1 páginas, 0 acima' in capsys.readouterr().out
+    assert '| index.html |' in (site / 'relatorio.md').read_text(encoding='utf-8')
+
+    dados = json.loads(orcamento.read_text(encoding='utf-8'))
+    dados['paginas']['index.html']['pedidos'] = 1
+    orcamento.write_text(json.dumps(dados), encoding='utf-8')
+    with pytest.raises(SystemExit) as saida:
+        main([str(site), '--orcamento', str(orcamento), '--markdown', str(site / 'relatorio.md')])
+    assert saida.value.code == 1
+    assert '❌ index.html: pedidos acima do orçamento' in capsys.readouterr().out
@@ -0,0 +1,69 @@
+import pytest
+
+from precache_manifest import ErroPrecache, gerar, inserir, listar, main, manifesto, publicado
+
+SW = """const X = 1;
+// <precache-manifest> gerado pelo build
+const PRECACHE_MANIFEST = [];
+// </precache-manifest>
+self.addEventListener('install', () => {});
+"""
+
+
+@pytest.fixture
+def site(tmp_path):
+    (tmp_path / 'index.html').write_text(
+        '<link rel="stylesheet" href="css/style.css"><script src="js/main.js"></script>'
+        '<script src="https://cdn.exemplo.com/x.js"></script>', encoding='utf-8')
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'style.css').write_text('p{}', encoding='utf-8')
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'main.js').write_text('init();', encoding='utf-8')
+    (tmp_path / 'sw-origem.js').write_text(SW, encoding='utf-8')
+    return tmp_path
+
+
+def test_listar_e_manifesto(site):
+    urls = listar(str(site), paginas=('index.html',), extras=())
+    assert urls == ['/', '/index.html', '/css/style.css', '/js/main.js']
+    entradas = manifesto(str(site), urls)
+    assert entradas[0].arquivo == 'index.html' and entradas[0].revisao == entradas[1].revisao
+
+
+def test_url_sem_arquivo(site):
+    (site / 'js' / 'main.js').unlink()
+    urls = listar(str(site), paginas=('index.html', 'sobre.html'), extras=())
+    with pytest.raises(ErroPrecache) as erro:
+        manifesto(str(site), urls)
+    # Todas as que faltam na mensagem, não só a primeira
+    assert '/js/main.js' in str(erro.value) and '/sobre.html' in str(erro.value)
+
+
+def test_gerar_falha_sem_gravar(site, monkeypatch):
+    monkeypatch.setattr('precache_manifest.PAGINAS', ('index.html',))
+    with pytest.raises(ErroPrecache):
+        gerar(str(site), origem=str(site / 'sw-origem.js'))  # faltam os EXTRAS
+    assert not (site / 'sw.js').exists()
+
+
+def test_gerar_so_grava_se_mudou(site, monkeypatch):
+    monkeypatch.setattr('precache_manifest.listar', lambda d: listar(d, ('index.html',), ()))
+    origem = str(site / 'sw-origem.js')
+    entradas, gravado = gerar(str(site), origem=origem)
+    assert gravado
+    sw = (site / 'sw.js').read_text(encoding='utf-8')
+    assert publicado(sw) == {e.url: e.revisao for e in entradas}
+    assert sw.endswith("self.addEventListener('install', () => {});\n")
+    assert gerar(str(site), origem=origem) == (entradas, False)
+
+
+def test_sw_sem_marcadores():
+    with pytest.raises(ErroPrecache):
+        inserir('const X = 1;\n', [])
+
+
+def test_main_sai_com_erro(site, capsys):
+    with pytest.raises(SystemExit) as saida:
+        main([str(site)])
+    assert saida.value.code == 1
+    assert 'manifest.json' in capsys.readouterr().out
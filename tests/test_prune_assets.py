@@ -0,0 +1,64 @@
+from prune_assets import Uso, aplicar, analisar, funcoes_js, grafo_js, podar_css
+
+JS = """// usada
+function usada() { return ajudante(); }
+
+function ajudante() { return 1; }
+
+/** morta */
+async function morta() { usada(); }
+var x = function naoConta() {};
+init();
+function init() {}
+function dup() { return 1; }
+function dup() { return 2; }
+"""
+
+
+def _vivas(raizes):
+    funcoes, _ = funcoes_js(JS)
+    grafo = grafo_js({'a.js': JS}, raizes)
+    return [(f.nome, f.inicio) for f in funcoes if ('a.js', f.inicio) in grafo.vivas]
+
+
+def test_funcoes_js():
+    funcoes, fora = funcoes_js(JS)
+    assert [f.nome for f in funcoes] == ['usada', 'ajudante', 'morta', 'init', 'dup', 'dup']
+    # O comentário encostado vai com a função; a expressão fica no código de fora
+    assert JS[funcoes[2].inicio:].startswith('/** morta */')
+    assert any('naoConta' in JS[inicio:fim] for inicio, fim in fora)
+
+
+def test_grafo_js():
+    assert [nome for nome, _ in _vivas(['usada()'])] == ['usada', 'ajudante', 'init']
+    assert [nome for nome, _ in _vivas([])] == ['init']
+    # Com dois dup() só a última declaração conta
+    (dup,) = [inicio for nome, inicio in _vivas(['dup()']) if nome == 'dup']
+    assert JS[dup:].startswith('function dup() { return 2; }')
+
+
+def test_podar_css():
+    uso = Uso()
+    uso.pagina('<div class="card ativo" id="topo"><button onclick="usada()">x</button></div>'
+               '<script>el.className = `toast-${tipo}`</script>')
+    css = (".card { a: 1 }\n.nada { b: 2 }\n#topo, .zz { c: 3 }\n.toast-erro { d: 4 }\n"
+           "@media (max-width: 1px) { .nada2 { e: 5 } }\np { f: 6 }\n")
+    trechos, removidas = podar_css(css, uso)
+    assert removidas == ['.nada', '@media (max-width: 1px)', 'p']
+    assert aplicar(css, trechos) == ".card { a: 1 }\n\n#topo, .zz { c: 3 }\n.toast-erro { d: 4 }\n\n\n"
+    assert 'usada()' in uso.entradas
+
+
+def test_analisar(tmp_path):
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'js' / 'app.js').write_text(JS, encoding='utf-8')
+    # Scripts não podados correm sempre: o que chamam fica
+    (tmp_path / 'js' / 'outro.js').write_text('morta();\n', encoding='utf-8')
+    (tmp_path / 'css' / 'styles.css').write_text('.card { a: 1 }\n.nada { b: 2 }\n', encoding='utf-8')
+
+    poda = analisar(['<p class="card">x</p>'], str(tmp_path), extras=())
+
+    assert poda.removidos == {'css/styles.css': ['.nada'], 'js/app.js': ['dup', 'dup']}
+    antes, depois = poda.tamanhos['js/app.js']
+    assert antes > depois
@@ -0,0 +1,25 @@
+import pytest
+
+from scan_mojibake import escanear
+
+
+def _ocorrencias(tmp_path, texto):
+    caminho = tmp_path / 'pagina.html'
+    caminho.write_text(texto, encoding='utf-8')
+    return [(o['tipo'], o['sugestao']) for o in escanear(str(caminho))]
+
+
+@pytest.mark.parametrize('texto', ['“ATÉ”', '«JOSÉ»', '“SÓ”', 'Ç™', 'Ø€', 'ação à noite'])
+def test_texto_correto_nao_e_mojibake(tmp_path, texto):
+    assert _ocorrencias(tmp_path, texto) == []
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('aÃ§Ã£o', [('duplo', 'ç'), ('duplo', 'ã')]),
+    ('preço: â‚¬ 10', [('duplo', '€')]),
+    ('seta â†’ aqui', [('duplo', '→')]),
+    ('lupa ðŸ” ', [('truncado', '🔍')]),
+    ('perdido: Servi�os', [('perdido', None)]),
+])
+def test_mojibake_encontrado(tmp_path, texto, esperado):
+    assert _ocorrencias(tmp_path, texto) == esperado